@@ -8,6 +8,8 @@ from .monitor import TaskMonitor, TestMonitor
 from .base_agent import BaseAgent, Task, AgentResult, AgentCapability, TaskPriority
 from .communication import AgentCommunicationBus, Message, MessageType
 from .coordinator import AgentCoordinator, CoordinationPlan, CoordinationStrategy
+from .transport import MessageTransport, UnixSocketClientTransport, UnixSocketServerTransport
+from .supervisor import AgentSupervisor
 
 # Specialized Agents
 from .architect import ArchitectAgent, ArchitecturePattern, TechnologyRecommendation, SystemDesign
@@ -38,6 +40,10 @@ __all__ = [
     "AgentCoordinator",
     "CoordinationPlan",
     "CoordinationStrategy",
+    "MessageTransport",
+    "UnixSocketClientTransport",
+    "UnixSocketServerTransport",
+    "AgentSupervisor",
     
     # Specialized Agents
     "ArchitectAgent",
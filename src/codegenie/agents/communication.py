@@ -3,15 +3,24 @@ Agent communication system for inter-agent messaging and coordination.
 """
 
 import asyncio
+import contextvars
+import itertools
 import logging
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Set
 from uuid import uuid4
 
+if TYPE_CHECKING:
+    from .transport import MessageTransport
+
 logger = logging.getLogger(__name__)
 
+# Set while a mailbox worker runs a handler; sends from there bypass the mailbox bound
+_in_mailbox_worker: contextvars.ContextVar[bool] = contextvars.ContextVar('in_mailbox_worker', default=False)
+
 
 class MessageType(Enum):
     """Types of messages that can be sent between agents."""
@@ -60,17 +69,140 @@ class MessageHandler:
     agent_name: str
 
 
+@dataclass
+class MailboxStats:
+    """Delivery statistics of one agent mailbox."""
+    
+    delivered: int = 0
+    rejected: int = 0  # Sends that gave up on a full mailbox
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_handling: float = 0.0
+    
+    def record(self, wait: float, handling: float) -> None:
+        self.delivered += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_handling += handling
+
+
+class AgentMailbox:
+    """Bounded priority queue of the messages for one agent, drained by its own workers."""
+    
+    def __init__(self, agent_name: str, maxsize: int, concurrency: int):
+        self.agent_name = agent_name
+        self.concurrency = max(1, concurrency)
+        self.maxsize = maxsize
+        # The bound is enforced by put(), so that it can be bypassed
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.workers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.stats = MailboxStats()
+        self._sequence = itertools.count()
+        self._space = asyncio.Event()
+    
+    @property
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self.queue.qsize()
+    
+    async def put(self, message: Message, timeout: Optional[float] = None, block: bool = True) -> bool:
+        """
+        Queue a message, waiting while the mailbox is full.
+        
+        Args:
+            message: The message to queue
+            timeout: Seconds to wait for free space, or None to wait indefinitely
+            block: Whether to wait for free space; if False the message is
+                queued even when the mailbox is full
+            
+        Returns:
+            True if the message was queued, False if the mailbox stayed full
+        """
+        # Higher priorities first, FIFO within a priority
+        item = (-message.priority.value, next(self._sequence), time.perf_counter(), message)
+        if block and self.full:
+            try:
+                await asyncio.wait_for(self._wait_for_space(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.stats.rejected += 1
+                return False
+        self.queue.put_nowait(item)
+        return True
+    
+    async def get(self):
+        """Take the next queued item and wake senders waiting for space."""
+        item = await self.queue.get()
+        self._space.set()
+        return item
+    
+    async def _wait_for_space(self) -> None:
+        while self.full:
+            self._space.clear()
+            await self._space.wait()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        delivered = self.stats.delivered
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.maxsize,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "delivered": delivered,
+            "rejected": self.stats.rejected,
+            "mean_wait_ms": self.stats.total_wait / delivered * 1000 if delivered else 0.0,
+            "max_wait_ms": self.stats.max_wait * 1000,
+            "mean_handling_ms": self.stats.total_handling / delivered * 1000 if delivered else 0.0
+        }
+
+
 class AgentCommunicationBus:
-    """Central communication bus for agent messaging."""
+    """
+    Central communication bus for agent messaging.
     
-    def __init__(self):
+    Every agent has its own bounded mailbox ordered by message priority and
+    drained by a configurable number of workers, so a slow handler only
+    delays messages for its own agent. Senders wait while a mailbox is full,
+    up to ``send_timeout``. Messages sent by handlers, responses included,
+    are queued even when the recipient's mailbox is full: a handler waiting
+    on a mailbox that only another blocked handler could drain would
+    deadlock both agents.
+    Messages for agents without a local mailbox go through the transport,
+    if one is attached, to the process hosting them.
+    """
+    
+    def __init__(
+        self,
+        history_size: int = 1000,
+        mailbox_size: int = 1000,
+        default_concurrency: int = 1,
+        send_timeout: Optional[float] = 30.0,
+        transport: Optional['MessageTransport'] = None
+    ):
+        """
+        Initialize the communication bus.
+        
+        Args:
+            history_size: Number of handled messages kept in ``message_history``
+            mailbox_size: Maximum number of queued messages per agent
+            default_concurrency: Messages handled at once per agent, unless
+                set when the agent is registered
+            send_timeout: Seconds a sender waits on a full mailbox before the
+                message is rejected, or None to wait indefinitely
+            transport: Transport to agents hosted in other processes
+        """
         self.agents: Dict[str, Any] = {}  # agent_name -> agent_instance
         self.message_handlers: Dict[str, Dict[MessageType, MessageHandler]] = {}
-        self.message_queue: asyncio.Queue = asyncio.Queue()
+        self.mailboxes: Dict[str, AgentMailbox] = {}
+        self.mailbox_size = mailbox_size
+        self.default_concurrency = default_concurrency
+        self.send_timeout = send_timeout
+        self.transport = transport
         self.broadcast_subscribers: Set[str] = set()
-        self.message_history: List[Message] = []
+        # Ring buffer: the oldest messages are dropped once it is full
+        self.message_history: Deque[Message] = deque(maxlen=history_size)
+        # Request message id -> future resolved with the response message
+        self.pending_responses: Dict[str, asyncio.Future] = {}
         self.running = False
-        self.processor_task: Optional[asyncio.Task] = None
         
         logger.info("Initialized AgentCommunicationBus")
     
@@ -80,7 +212,10 @@ class AgentCommunicationBus:
             return
         
         self.running = True
-        self.processor_task = asyncio.create_task(self._process_messages())
+        for mailbox in self.mailboxes.values():
+            self._start_workers(mailbox)
+        if self.transport:
+            await self.transport.start(self._receive_remote, self.get_agent_list())
         logger.info("Started AgentCommunicationBus")
     
     async def stop(self) -> None:
@@ -90,25 +225,60 @@ class AgentCommunicationBus:
         
         self.running = False
         
-        if self.processor_task:
-            self.processor_task.cancel()
-            try:
-                await self.processor_task
-            except asyncio.CancelledError:
-                pass
+        if self.transport:
+            await self.transport.stop()
+        
+        workers = [worker for mailbox in self.mailboxes.values() for worker in mailbox.workers]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for mailbox in self.mailboxes.values():
+            mailbox.workers.clear()
+        
+        # Nobody will answer the outstanding requests any more
+        for message_id in list(self.pending_responses):
+            self._resolve_pending(message_id, None)
         
         logger.info("Stopped AgentCommunicationBus")
     
-    def register_agent(self, agent_name: str, agent_instance: Any) -> None:
+    async def attach_transport(self, transport: 'MessageTransport') -> None:
+        """
+        Attach the transport to agents hosted in other processes.
+        
+        Args:
+            transport: The transport, started right away if the bus is running
+        """
+        self.transport = transport
+        if self.running:
+            await transport.start(self._receive_remote, self.get_agent_list())
+    
+    def register_agent(
+        self,
+        agent_name: str,
+        agent_instance: Any,
+        concurrency: Optional[int] = None
+    ) -> None:
         """
         Register an agent with the communication bus.
         
         Args:
             agent_name: Name of the agent
             agent_instance: The agent instance
+            concurrency: Messages handled at once for this agent
         """
         self.agents[agent_name] = agent_instance
         self.message_handlers[agent_name] = {}
+        
+        # Messages already queued for a re-registered agent are kept
+        mailbox = self.mailboxes.get(agent_name)
+        if mailbox is None:
+            mailbox = AgentMailbox(agent_name, self.mailbox_size, concurrency or self.default_concurrency)
+            self.mailboxes[agent_name] = mailbox
+        elif concurrency:
+            mailbox.concurrency = concurrency
+        
+        if self.running:
+            self._start_workers(mailbox)
         logger.info(f"Registered agent: {agent_name}")
     
     def unregister_agent(self, agent_name: str) -> None:
@@ -121,6 +291,11 @@ class AgentCommunicationBus:
         self.agents.pop(agent_name, None)
         self.message_handlers.pop(agent_name, None)
         self.broadcast_subscribers.discard(agent_name)
+        
+        mailbox = self.mailboxes.pop(agent_name, None)
+        if mailbox is not None:
+            for worker in mailbox.workers:
+                worker.cancel()
         logger.info(f"Unregistered agent: {agent_name}")
     
     def register_message_handler(
@@ -195,14 +370,14 @@ class AgentCommunicationBus:
                     logger.error("Non-broadcast message must have a recipient")
                     return False
                 
-                if message.recipient not in self.agents:
+                if message.recipient not in self.agents and not self._hosted_remotely(message.recipient):
                     logger.error(f"Recipient agent {message.recipient} not registered")
                     return False
             
-            # Queue the message
-            await self.message_queue.put(message)
-            logger.debug(f"Queued message from {message.sender} to {message.recipient or 'broadcast'}")
-            return True
+            if message.message_type == MessageType.BROADCAST:
+                return await self._handle_broadcast_message(message)
+            
+            return await self._deliver(message.recipient, message)
             
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
@@ -309,41 +484,113 @@ class AgentCommunicationBus:
             response_timeout=timeout
         )
         
+        # Register before sending so a fast response cannot be missed
+        self._expect_response(message.id)
+        
         success = await self.send_message(message)
         if not success:
+            self._discard_pending(message.id)
             return None
         
-        # Wait for response
-        try:
-            response = await asyncio.wait_for(
-                self._wait_for_response(message.id),
-                timeout=timeout
-            )
-            return response.content if response else None
-            
-        except asyncio.TimeoutError:
-            logger.warning(f"Collaboration request from {sender} to {recipient} timed out")
+        response = await self._wait_for_response(message.id, timeout)
+        if response is None:
+            logger.warning(f"Collaboration request from {sender} to {recipient} got no response")
             return None
+        
+        return response.content
+    
+    async def _deliver(self, agent_name: str, message: Message) -> bool:
+        """
+        Queue a message in the mailbox of an agent.
+        
+        Args:
+            agent_name: Name of the receiving agent
+            message: The message to queue
+            
+        Returns:
+            True if the message was queued, False otherwise
+        """
+        mailbox = self.mailboxes.get(agent_name)
+        if mailbox is None:
+            if self._hosted_remotely(agent_name):
+                return await self.transport.send(message)
+            logger.warning(f"No mailbox for agent: {agent_name}")
+            return False
+        
+        if not await mailbox.put(message, timeout=self.send_timeout, block=not _in_mailbox_worker.get()):
+            logger.warning(f"Mailbox of {agent_name} is full, rejected message from {message.sender}")
+            return False
+        
+        logger.debug(f"Queued message from {message.sender} to {agent_name}")
+        return True
+    
+    def _hosted_remotely(self, agent_name: str) -> bool:
+        return self.transport is not None and self.transport.hosts(agent_name)
+    
+    async def _receive_remote(self, message: Message, origin: Optional[str]) -> None:
+        """
+        Route a message that arrived through the transport.
+        
+        Args:
+            message: The incoming message
+            origin: Peer the message came from
+        """
+        if message.message_type == MessageType.BROADCAST and not message.recipient:
+            await self._handle_broadcast_message(message, origin)
+            return
+        
+        if (message.message_type == MessageType.TASK_RESPONSE and message.correlation_id
+                and self._resolve_pending(message.correlation_id, message)):
+            self.message_history.append(message)
+            return
+        
+        if message.message_type == MessageType.ERROR_NOTIFICATION and message.content.get("undeliverable"):
+            # The request could not be delivered: no response will come
+            self._resolve_pending(message.correlation_id or "", None)
+            return
+        
+        if not await self._deliver(message.recipient, message) and message.requires_response:
+            await self._reject_undeliverable(message)
+    
+    async def _reject_undeliverable(self, message: Message) -> None:
+        """
+        Tell the sender of a request from another process that it was not delivered.
+        
+        Args:
+            message: The request that could not be delivered
+        """
+        notice = Message(
+            sender=message.recipient,
+            recipient=message.sender,
+            message_type=MessageType.ERROR_NOTIFICATION,
+            content={"undeliverable": True, "original_message_id": message.id},
+            correlation_id=message.id
+        )
+        await self._deliver(message.sender, notice)
+    
+    def _start_workers(self, mailbox: AgentMailbox) -> None:
+        mailbox.workers = [worker for worker in mailbox.workers if not worker.done()]
+        while len(mailbox.workers) < mailbox.concurrency:
+            mailbox.workers.append(asyncio.create_task(self._process_messages(mailbox)))
     
-    async def _process_messages(self) -> None:
-        """Process messages from the queue."""
-        logger.info("Started message processor")
+    async def _process_messages(self, mailbox: AgentMailbox) -> None:
+        """
+        Process messages from the mailbox of one agent.
         
-        while self.running:
+        Args:
+            mailbox: The mailbox to drain
+        """
+        _in_mailbox_worker.set(True)
+        while True:
+            _, _, queued_at, message = await mailbox.get()
+            started = time.perf_counter()
+            mailbox.in_flight += 1
             try:
-                # Get message with timeout to allow checking running status
-                message = await asyncio.wait_for(
-                    self.message_queue.get(),
-                    timeout=1.0
-                )
-                
                 await self._handle_message(message)
-                
-            except asyncio.TimeoutError:
-                # Normal timeout, continue loop
-                continue
-            except Exception as e:
-                logger.error(f"Error processing message: {e}")
+            finally:
+                mailbox.in_flight -= 1
+                mailbox.queue.task_done()
+                mailbox.stats.record(started - queued_at, time.perf_counter() - started)
     
     async def _handle_message(self, message: Message) -> None:
         """
@@ -356,20 +603,16 @@ class AgentCommunicationBus:
             # Add to history
             self.message_history.append(message)
             
-            # Handle broadcast messages
-            if message.message_type == MessageType.BROADCAST:
-                await self._handle_broadcast_message(message)
-                return
-            
-            # Handle direct messages
             recipient = message.recipient
             if recipient not in self.message_handlers:
                 logger.warning(f"No handlers registered for agent: {recipient}")
+                self._resolve_pending(message.id, None)
                 return
             
             handlers = self.message_handlers[recipient]
             if message.message_type not in handlers:
                 logger.warning(f"No handler for message type {message.message_type.value} in agent {recipient}")
+                self._resolve_pending(message.id, None)
                 return
             
             # Execute handler
@@ -391,14 +634,20 @@ class AgentCommunicationBus:
         except Exception as e:
             logger.error(f"Error handling message: {e}")
     
-    async def _handle_broadcast_message(self, message: Message) -> None:
+    async def _handle_broadcast_message(self, message: Message, origin: Optional[str] = None) -> bool:
         """
-        Handle broadcast messages.
+        Queue a copy of a broadcast message for every subscriber.
         
         Args:
             message: The broadcast message
+            origin: Transport peer the message came from, None if sent locally
+            
+        Returns:
+            True once the copies are queued
         """
-        for subscriber in self.broadcast_subscribers:
+        self.message_history.append(message)
+        
+        for subscriber in list(self.broadcast_subscribers):
             if subscriber == message.sender:
                 continue  # Don't send to sender
             
@@ -413,7 +662,12 @@ class AgentCommunicationBus:
                 correlation_id=message.id
             )
             
-            await self._handle_message(individual_message)
+            await self._deliver(subscriber, individual_message)
+        
+        if self.transport:
+            await self.transport.broadcast(message, origin)
+        
+        return True
     
     async def _execute_handler(self, handler_func: Callable, message: Message) -> Any:
         """
@@ -454,33 +708,72 @@ class AgentCommunicationBus:
             correlation_id=original_message.id
         )
         
+        # A waiting requester gets the response directly; otherwise it is
+        # delivered like any other message
+        if self._resolve_pending(original_message.id, response_message):
+            self.message_history.append(response_message)
+            return
+        
         await self.send_message(response_message)
     
-    async def _wait_for_response(self, message_id: str) -> Optional[Message]:
+    def _expect_response(self, message_id: str) -> asyncio.Future:
         """
-        Wait for a response to a specific message.
+        Register a future for the response to a message.
         
         Args:
-            message_id: ID of the message to wait for response to
+            message_id: ID of the request message
             
         Returns:
-            Response message or None if not found
-        """
-        # This is a simplified implementation
-        # In a real system, you'd want a more sophisticated response tracking mechanism
-        start_time = time.time()
-        timeout = 30.0  # Default timeout
-        
-        while time.time() - start_time < timeout:
-            # Check recent messages for response
-            for message in reversed(self.message_history[-100:]):  # Check last 100 messages
-                if (message.correlation_id == message_id and 
-                    message.message_type == MessageType.TASK_RESPONSE):
-                    return message
+            Future resolved with the response message
+        """
+        future = self.pending_responses.get(message_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending_responses[message_id] = future
+        return future
+    
+    def _resolve_pending(self, message_id: str, response: Optional[Message]) -> bool:
+        """
+        Resolve the future waiting for the response to a message.
+        
+        Args:
+            message_id: ID of the request message
+            response: Response message, or None if no response will come
             
-            await asyncio.sleep(0.1)  # Small delay
+        Returns:
+            True if a waiting requester received the response, False otherwise
+        """
+        future = self.pending_responses.pop(message_id, None)
+        if future is None or future.done():
+            return False
         
-        return None
+        future.set_result(response)
+        return True
+    
+    def _discard_pending(self, message_id: str) -> None:
+        future = self.pending_responses.pop(message_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+    
+    async def _wait_for_response(self, message_id: str, timeout: float = 30.0) -> Optional[Message]:
+        """
+        Wait for the response to a specific message.
+        
+        Args:
+            message_id: ID of the message to wait for response to
+            timeout: Seconds to wait before giving up
+            
+        Returns:
+            Response message or None on timeout or if no response will come
+        """
+        future = self._expect_response(message_id)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for response to message {message_id}")
+            return None
+        finally:
+            self._discard_pending(message_id)
     
     def get_agent_list(self) -> List[str]:
         """Get list of registered agents."""
@@ -508,7 +801,9 @@ class AgentCommunicationBus:
             "broadcast_subscribers": len(self.broadcast_subscribers),
             "message_types": type_counts,
             "message_priorities": priority_counts,
-            "queue_size": self.message_queue.qsize(),
+            "queue_size": sum(mailbox.queue.qsize() for mailbox in self.mailboxes.values()),
+            "mailboxes": {name: mailbox.get_stats() for name, mailbox in self.mailboxes.items()},
+            "pending_responses": len(self.pending_responses),
             "running": self.running
         }
     
@@ -519,9 +814,8 @@ class AgentCommunicationBus:
         Args:
             keep_recent: Number of recent messages to keep
         """
-        if keep_recent > 0:
-            self.message_history = self.message_history[-keep_recent:]
-        else:
-            self.message_history.clear()
+        recent = list(self.message_history)[-keep_recent:] if keep_recent > 0 else []
+        self.message_history.clear()
+        self.message_history.extend(recent)
         
         logger.info(f"Cleared message history, kept {len(self.message_history)} recent messages")
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Supervisor that hosts agents in worker processes.
+Each worker runs its own communication bus connected to the supervisor's bus
+over a Unix-domain socket, so CPU-heavy agents run in parallel instead of
+sharing one interpreter.
+"""
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import shutil
+import socket
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .communication import AgentCommunicationBus
+from .transport import UnixSocketClientTransport, UnixSocketServerTransport
+
+logger = logging.getLogger(__name__)
+
+# Called in the worker process with the worker's bus; registers the agents
+# it hosts and their message handlers. Must be picklable, i.e. defined at
+# module level.
+WorkerFactory = Callable[[AgentCommunicationBus], Any]
+
+
+@dataclass
+class WorkerSpec:
+    """Definition of one worker process."""
+
+    name: str
+    factory: WorkerFactory
+    default_concurrency: int = 1
+
+
+def _run_worker(socket_path: str, spec: WorkerSpec) -> None:
+    """Entry point of a worker process."""
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        asyncio.run(_serve_worker(socket_path, spec))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve_worker(socket_path: str, spec: WorkerSpec) -> None:
+    transport = UnixSocketClientTransport(Path(socket_path), spec.name)
+    bus = AgentCommunicationBus(default_concurrency=spec.default_concurrency, transport=transport)
+
+    result = spec.factory(bus)
+    if inspect.isawaitable(result):
+        await result
+
+    await bus.start()
+    try:
+        # Run until the supervisor closes the connection
+        await transport.wait_closed()
+    finally:
+        await bus.stop()
+
+
+class AgentSupervisor:
+    """
+    Runs agents in worker processes behind a communication bus.
+
+    Agents hosted by workers are addressed through the supervisor's bus
+    with the usual ``send_message``, ``broadcast_message`` and
+    ``request_collaboration`` calls. Message content and handler results
+    cross process boundaries as JSON.
+    """
+
+    def __init__(
+        self,
+        bus: AgentCommunicationBus,
+        socket_path: Optional[Path] = None,
+        start_timeout: float = 30.0,
+        start_method: str = 'spawn'
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            bus: Bus of the supervisor process
+            socket_path: Socket the workers connect to; a private temporary
+                directory is used if not given
+            start_timeout: Seconds to wait for a worker to connect
+            start_method: Multiprocessing start method for the workers
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("AgentSupervisor requires Unix-domain socket support")
+
+        self.bus = bus
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._temp_dir: Optional[str] = None
+        if socket_path is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='codegenie-agents-')
+            socket_path = Path(self._temp_dir) / 'bus.sock'
+
+        self.transport = UnixSocketServerTransport(socket_path)
+        self.workers: Dict[str, WorkerSpec] = {}
+        self.processes: Dict[str, multiprocessing.Process] = {}
+
+    def add_worker(self, name: str, factory: WorkerFactory, default_concurrency: int = 1) -> None:
+        """
+        Define a worker process.
+
+        Args:
+            name: Unique name of the worker
+            factory: Module-level function that registers the worker's agents
+            default_concurrency: Messages handled at once per hosted agent
+        """
+        if name in self.workers:
+            raise ValueError(f"Worker {name} is already defined")
+        self.workers[name] = WorkerSpec(name, factory, default_concurrency)
+
+    async def start(self) -> bool:
+        """
+        Start the bus transport and every worker process.
+
+        Returns:
+            True if all workers connected, False otherwise
+        """
+        await self.bus.attach_transport(self.transport)
+        await self.bus.start()
+
+        for name, spec in self.workers.items():
+            if name in self.processes and self.processes[name].is_alive():
+                continue
+            process = self._context.Process(
+                target=_run_worker,
+                args=(str(self.transport.socket_path), spec),
+                name=f"codegenie-agent-{name}",
+                daemon=True
+            )
+            process.start()
+            self.processes[name] = process
+
+        all_connected = True
+        for name in self.workers:
+            if not await self.transport.wait_for_peer(name, self.start_timeout):
+                logger.error(f"Worker {name} did not connect within {self.start_timeout}s")
+                all_connected = False
+
+        logger.info(f"Started {len(self.processes)} agent worker processes")
+        return all_connected
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the bus and the worker processes.
+
+        Args:
+            timeout: Seconds to wait for a worker to exit before terminating it
+        """
+        # Closing the connections tells the workers to shut down
+        await self.bus.stop()
+
+        loop = asyncio.get_running_loop()
+        for name, process in self.processes.items():
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"Terminating unresponsive worker {name}")
+                process.terminate()
+                await loop.run_in_executor(None, process.join, timeout)
+        self.processes.clear()
+
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get the process and hosted agents of every worker."""
+        status = {}
+        for name in self.workers:
+            process = self.processes.get(name)
+            peer = self.transport.peers.get(name)
+            status[name] = {
+                "pid": process.pid if process else None,
+                "alive": process.is_alive() if process else False,
+                "connected": peer is not None,
+                "agents": list(peer.agents) if peer else []
+            }
+        return status
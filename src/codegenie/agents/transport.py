@@ -0,0 +1,400 @@
+"""
+Transports that carry communication bus messages between processes.
+Messages travel as length-prefixed frames in a compact binary encoding over
+Unix-domain sockets; the supervisor process relays between its workers.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .communication import Message, MessagePriority, MessageType
+
+logger = logging.getLogger(__name__)
+
+WIRE_VERSION = 1
+
+# Frames above this size are treated as a protocol error
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Version, message type, priority, flags, timestamp, response timeout
+_HEADER = struct.Struct('!BBBBdd')
+_STRING_LENGTH = struct.Struct('!H')
+_FRAME_LENGTH = struct.Struct('!I')
+
+_FLAG_REQUIRES_RESPONSE = 1
+_FLAG_HAS_TIMEOUT = 2
+_FLAG_HAS_CORRELATION = 4
+
+_MESSAGE_TYPES = tuple(MessageType)
+_MESSAGE_TYPE_CODES = {message_type: code for code, message_type in enumerate(_MESSAGE_TYPES)}
+
+# Called with an incoming message and the name of the peer it came from
+DeliverCallback = Callable[[Message, Optional[str]], Awaitable[None]]
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return _STRING_LENGTH.pack(len(data)) + data
+
+
+def _unpack_string(data: bytes, offset: int):
+    (length,) = _STRING_LENGTH.unpack_from(data, offset)
+    offset += _STRING_LENGTH.size
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+def encode_message(message: Message) -> bytes:
+    """
+    Encode a message in the binary wire format.
+
+    Content values that are not JSON serializable are sent as strings.
+
+    Args:
+        message: The message to encode
+
+    Returns:
+        Encoded message
+    """
+    flags = 0
+    if message.requires_response:
+        flags |= _FLAG_REQUIRES_RESPONSE
+    if message.response_timeout is not None:
+        flags |= _FLAG_HAS_TIMEOUT
+    if message.correlation_id is not None:
+        flags |= _FLAG_HAS_CORRELATION
+
+    parts = [
+        _HEADER.pack(
+            WIRE_VERSION,
+            _MESSAGE_TYPE_CODES[message.message_type],
+            message.priority.value,
+            flags,
+            message.timestamp,
+            message.response_timeout or 0.0
+        ),
+        _pack_string(message.id),
+        _pack_string(message.sender),
+        _pack_string(message.recipient),
+        _pack_string(message.correlation_id or ''),
+        json.dumps(message.content, separators=(',', ':'), default=str).encode('utf-8')
+    ]
+    return b''.join(parts)
+
+
+def decode_message(data: bytes) -> Message:
+    """
+    Decode a message encoded by ``encode_message``.
+
+    Args:
+        data: Encoded message
+
+    Returns:
+        The decoded message
+
+    Raises:
+        ValueError: If the data is not a valid encoded message
+    """
+    try:
+        version, type_code, priority, flags, timestamp, timeout = _HEADER.unpack_from(data)
+        if version != WIRE_VERSION:
+            raise ValueError(f"Unsupported wire version {version}")
+
+        offset = _HEADER.size
+        message_id, offset = _unpack_string(data, offset)
+        sender, offset = _unpack_string(data, offset)
+        recipient, offset = _unpack_string(data, offset)
+        correlation_id, offset = _unpack_string(data, offset)
+        content = json.loads(data[offset:].decode('utf-8'))
+
+        return Message(
+            id=message_id,
+            sender=sender,
+            recipient=recipient,
+            message_type=_MESSAGE_TYPES[type_code],
+            priority=MessagePriority(priority),
+            content=content,
+            timestamp=timestamp,
+            requires_response=bool(flags & _FLAG_REQUIRES_RESPONSE),
+            response_timeout=timeout if flags & _FLAG_HAS_TIMEOUT else None,
+            correlation_id=correlation_id if flags & _FLAG_HAS_CORRELATION else None
+        )
+    except (struct.error, IndexError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Malformed message frame: {e}") from e
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """
+    Read one length-prefixed frame.
+
+    Returns:
+        Frame payload, or None once the stream is closed or sent an
+        oversized frame
+    """
+    try:
+        header = await reader.readexactly(_FRAME_LENGTH.size)
+        (length,) = _FRAME_LENGTH.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            # The stream cannot be resynchronized; close it like a protocol error
+            logger.error(f"Frame of {length} bytes exceeds the limit, closing the connection")
+            return None
+        return await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+def frame(payload: bytes) -> bytes:
+    return _FRAME_LENGTH.pack(len(payload)) + payload
+
+
+@dataclass
+class _Peer:
+    """Connection to one process on the other end of a transport."""
+
+    name: str
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    agents: List[str] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def send(self, payload: bytes) -> bool:
+        try:
+            async with self.lock:
+                self.writer.write(frame(payload))
+                await self.writer.drain()
+            return True
+        except (ConnectionError, RuntimeError) as e:
+            logger.error(f"Failed to send to {self.name}: {e}")
+            return False
+
+    async def pump(self, deliver: DeliverCallback) -> None:
+        """Deliver incoming messages until the connection closes."""
+        while True:
+            payload = await read_frame(self.reader)
+            if payload is None:
+                return
+            try:
+                message = decode_message(payload)
+            except ValueError as e:
+                logger.error(f"Dropped frame from {self.name}: {e}")
+                continue
+            await deliver(message, self.name)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class MessageTransport:
+    """
+    Carries messages to agents hosted outside this process.
+
+    The bus hands over every message whose recipient has no local mailbox
+    and passes incoming messages on through the ``deliver`` callback.
+    """
+
+    async def start(self, deliver: DeliverCallback, local_agents: List[str]) -> None:
+        """
+        Start carrying messages.
+
+        Args:
+            deliver: Callback for incoming messages
+            local_agents: Agents registered with the local bus
+        """
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    def hosts(self, agent_name: str) -> bool:
+        """Check whether messages for an agent can be sent through this transport."""
+        raise NotImplementedError
+
+    async def send(self, message: Message) -> bool:
+        """
+        Send a message to the process hosting its recipient.
+
+        Returns:
+            True if the message was sent, False otherwise
+        """
+        raise NotImplementedError
+
+    async def broadcast(self, message: Message, origin: Optional[str] = None) -> None:
+        """
+        Pass a broadcast message on to the other processes.
+
+        Args:
+            message: The broadcast message
+            origin: Peer the message came from, or None if it was sent locally
+        """
+        raise NotImplementedError
+
+
+class UnixSocketServerTransport(MessageTransport):
+    """
+    Supervisor side of the Unix-domain socket transport.
+
+    Workers connect and announce their agents; messages between workers
+    are relayed through this process.
+    """
+
+    def __init__(self, socket_path: Path):
+        self.socket_path = Path(socket_path)
+        self.peers: Dict[str, _Peer] = {}
+        self.routes: Dict[str, _Peer] = {}  # agent_name -> hosting peer
+        self._deliver: Optional[DeliverCallback] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connected: Optional[asyncio.Condition] = None
+
+    async def start(self, deliver: DeliverCallback, local_agents: List[str]) -> None:
+        if self._server is not None:
+            return
+
+        self._deliver = deliver
+        self._connected = asyncio.Condition()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self._server = await asyncio.start_unix_server(self._accept, path=str(self.socket_path))
+        logger.info(f"Listening for agent workers on {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.close()
+        for peer in list(self.peers.values()):
+            peer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+    async def wait_for_peer(self, name: str, timeout: float) -> bool:
+        """
+        Wait until a worker has connected.
+
+        Args:
+            name: Name the worker announces itself with
+            timeout: Seconds to wait
+
+        Returns:
+            True if the worker is connected, False on timeout
+        """
+        if self._connected is None:
+            return False
+
+        async with self._connected:
+            try:
+                await asyncio.wait_for(
+                    self._connected.wait_for(lambda: name in self.peers), timeout=timeout
+                )
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        hello = await read_frame(reader)
+        if hello is None:
+            writer.close()
+            return
+
+        try:
+            announcement = json.loads(hello.decode('utf-8'))
+            peer = _Peer(announcement['worker'], reader, writer, list(announcement['agents']))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Rejected worker connection: {e}")
+            writer.close()
+            return
+
+        async with self._connected:
+            self.peers[peer.name] = peer
+            for agent_name in peer.agents:
+                self.routes[agent_name] = peer
+            self._connected.notify_all()
+        logger.info(f"Worker {peer.name} connected with agents: {peer.agents}")
+
+        try:
+            await peer.pump(self._deliver)
+        finally:
+            self.peers.pop(peer.name, None)
+            for agent_name in peer.agents:
+                if self.routes.get(agent_name) is peer:
+                    del self.routes[agent_name]
+            peer.close()
+            logger.info(f"Worker {peer.name} disconnected")
+
+    def hosts(self, agent_name: str) -> bool:
+        return agent_name in self.routes
+
+    async def send(self, message: Message) -> bool:
+        peer = self.routes.get(message.recipient)
+        if peer is None:
+            logger.warning(f"No worker hosts agent: {message.recipient}")
+            return False
+        return await peer.send(encode_message(message))
+
+    async def broadcast(self, message: Message, origin: Optional[str] = None) -> None:
+        payload = encode_message(message)
+        for peer in list(self.peers.values()):
+            if peer.name != origin:
+                await peer.send(payload)
+
+
+class UnixSocketClientTransport(MessageTransport):
+    """
+    Worker side of the Unix-domain socket transport.
+
+    Every message for an agent outside the worker goes to the supervisor,
+    which routes it on. The worker does not know which agents exist; the
+    supervisor answers a request it cannot deliver with an undeliverable
+    notice, so the requester gets None instead of waiting for its timeout.
+    """
+
+    def __init__(self, socket_path: Path, worker_name: str):
+        self.socket_path = Path(socket_path)
+        self.worker_name = worker_name
+        self._peer: Optional[_Peer] = None
+        self._pump_task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: DeliverCallback, local_agents: List[str]) -> None:
+        if self._peer is not None:
+            return
+
+        reader, writer = await asyncio.open_unix_connection(str(self.socket_path))
+        self._peer = _Peer('supervisor', reader, writer)
+        announcement = {'worker': self.worker_name, 'agents': local_agents}
+        await self._peer.send(json.dumps(announcement).encode('utf-8'))
+        self._pump_task = asyncio.create_task(self._peer.pump(deliver))
+
+    async def stop(self) -> None:
+        if self._peer is None:
+            return
+
+        self._peer.close()
+        if self._pump_task:
+            self._pump_task.cancel()
+            await asyncio.gather(self._pump_task, return_exceptions=True)
+        self._peer = None
+
+    async def wait_closed(self) -> None:
+        """Wait until the supervisor closes the connection."""
+        if self._pump_task:
+            await asyncio.gather(self._pump_task, return_exceptions=True)
+
+    def hosts(self, agent_name: str) -> bool:
+        # Routing is up to the supervisor, which rejects unknown recipients
+        return self._peer is not None
+
+    async def send(self, message: Message) -> bool:
+        if self._peer is None:
+            return False
+        return await self._peer.send(encode_message(message))
+
+    async def broadcast(self, message: Message, origin: Optional[str] = None) -> None:
+        # Broadcasts from the supervisor have already reached everyone else
+        if origin is None and self._peer is not None:
+            await self._peer.send(encode_message(message))
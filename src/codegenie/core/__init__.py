@@ -61,7 +61,7 @@ from .proactive_assistant import (
 from .proactive_monitoring import (
     ProactiveAssistant, CodebaseMonitor, IssueDetector, SuggestionEngine,
     WorkflowPredictor, ProactiveSuggestion, DetectedIssue, WorkflowPrediction,
-    MonitoringResult, ChangeEvent, SuggestionType, Severity
+    MonitoringResult, ChangeEvent, IssueDelta, SuggestionType, Severity
 )
 from .related_code_finder import (
     RelatedCodeFinder, DependencyAnalyzer, TestSuggestionEngine,
@@ -83,6 +83,7 @@ from .tool_executor import (
     CommandResult, OutputAnalysis, FileEdit, REPLResult, GitOperation,
     CommandStatus, EditType
 )
+from .git_backend import GitBackend, GitBackendError, GitStatus, IndexEntry, get_git_backend
 from .agentic_search import (
     AgenticSearchEngine, CodebaseScanner, RelevanceScorer, SearchStrategySelector,
     Symbol, FileIndex, SearchResult, SearchIntent
@@ -223,6 +224,7 @@ __all__ = [
     "WorkflowPrediction",
     "MonitoringResult",
     "ChangeEvent",
+    "IssueDelta",
     "SuggestionType",
     "Severity",
     "RelatedCodeFinder",
@@ -266,6 +268,11 @@ __all__ = [
     "GitOperation",
     "CommandStatus",
     "EditType",
+    "GitBackend",
+    "GitBackendError",
+    "GitStatus",
+    "IndexEntry",
+    "get_git_backend",
     "AgenticSearchEngine",
     "CodebaseScanner",
     "RelevanceScorer",
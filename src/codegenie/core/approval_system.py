@@ -11,7 +11,11 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from .content_store import ContentStore
+from .interval_tree import IntervalTree
 
 logger = logging.getLogger(__name__)
 
@@ -157,6 +161,7 @@ class ApprovalSystem:
         self.preferences: Dict[str, Any] = {}
         self.undo_history: List[UndoPoint] = []
         self.conflicts: List[Conflict] = []
+        self.conflict_detector = ConflictDetector()
         
         # Callbacks
         self.approval_callback: Optional[Callable[[Operation], bool]] = None
@@ -228,6 +233,13 @@ class ApprovalSystem:
         
         # Add to pending if no decision made
         self.pending_operations.append(operation)
+        if operation.operation_type == OperationType.FILE_MODIFY:
+            overlapping = self.conflict_detector.register_pending(operation)
+            if overlapping:
+                logger.warning(
+                    f"Pending operation {operation.id} overlaps lines of {', '.join(overlapping)} "
+                    f"in {operation.target}"
+                )
         logger.info(f"Operation pending approval: {operation.description}")
         return ApprovalDecision.DEFERRED
     
@@ -296,6 +308,7 @@ class ApprovalSystem:
         operation.decision_timestamp = datetime.now()
         self.pending_operations.remove(operation)
         self.approved_operations.append(operation)
+        self.conflict_detector.release_pending(operation.id)
         
         logger.info(f"Approved operation: {operation.description}")
         return True
@@ -319,6 +332,7 @@ class ApprovalSystem:
         operation.decision_timestamp = datetime.now()
         self.pending_operations.remove(operation)
         self.rejected_operations.append(operation)
+        self.conflict_detector.release_pending(operation.id)
         
         logger.info(f"Rejected operation: {operation.description}")
         return True
@@ -336,6 +350,7 @@ class ApprovalSystem:
             operation.decision = ApprovalDecision.APPROVED
             operation.decision_timestamp = datetime.now()
             self.approved_operations.append(operation)
+            self.conflict_detector.release_pending(operation.id)
         
         self.pending_operations.clear()
         
@@ -355,6 +370,7 @@ class ApprovalSystem:
             operation.decision = ApprovalDecision.REJECTED
             operation.decision_timestamp = datetime.now()
             self.rejected_operations.append(operation)
+            self.conflict_detector.release_pending(operation.id)
         
         self.pending_operations.clear()
         
@@ -535,13 +551,22 @@ class ApprovalSystem:
         
         # Check for conflicts on same target
         for target, ops in target_operations.items():
-            if len(ops) > 1:
+            if len(ops) <= 1:
+                continue
+            
+            # Modifications of disjoint line ranges do not conflict
+            if all(op.operation_type == OperationType.FILE_MODIFY for op in ops):
+                groups = self.conflict_detector.find_overlapping_groups(ops)
+            else:
+                groups = [ops]
+            
+            for group in groups:
                 # Multiple operations on same target
                 conflict = Conflict(
-                    id=f"conflict_{datetime.now().timestamp()}",
+                    id=f"conflict_{uuid4().hex}",
                     conflict_type=ConflictType.CONCURRENT_EDIT,
                     description=f"Multiple operations on {target}",
-                    affected_operations=[op.id for op in ops],
+                    affected_operations=[op.id for op in group],
                     affected_resources=[target],
                     resolution_suggestions=[
                         "Review operations and decide which to keep",
@@ -559,6 +584,18 @@ class ApprovalSystem:
         
         return conflicts
     
+    def plan_concurrent_batches(self, operations: List[Operation]) -> List[List[Operation]]:
+        """
+        Split operations into batches that can be applied concurrently.
+        
+        Args:
+            operations: Operations in the order they were requested
+            
+        Returns:
+            Batches to apply one after another
+        """
+        return self.conflict_detector.plan_concurrent_batches(operations)
+    
     def resolve_conflict(
         self,
         conflict_id: str,
@@ -715,19 +752,31 @@ class FileUndoManager:
     """
     Manages undo operations specifically for file changes.
     
-    Provides file-level undo with backup and restore capabilities.
+    Provides file-level undo with backup and restore capabilities. File
+    content lives in a content-addressed, compressed store; each backup is a
+    hardlinked handle to its object plus a record in an append-only journal,
+    so backing up an unchanged file never copies it again.
     """
     
-    def __init__(self, backup_dir: Optional[Path] = None):
+    JOURNAL_NAME = "backups.jsonl"
+    
+    def __init__(self, backup_dir: Optional[Path] = None, compression_level: int = 6):
         """
         Initialize file undo manager.
         
         Args:
             backup_dir: Directory to store file backups
+            compression_level: zlib compression level for stored content
         """
         self.backup_dir = backup_dir or Path.home() / ".codegenie" / "backups"
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         
+        self.store = ContentStore(self.backup_dir / "store", compression_level=compression_level)
+        self.journal_file = self.backup_dir / self.JOURNAL_NAME
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._journal_records = 0
+        self._load_journal()
+        
         logger.info(f"FileUndoManager initialized with backup dir: {self.backup_dir}")
     
     def create_backup(self, file_path: Path) -> Optional[Path]:
@@ -745,14 +794,27 @@ class FileUndoManager:
             return None
         
         try:
-            # Create backup filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"{file_path.name}.{timestamp}.backup"
-            backup_path = self.backup_dir / backup_name
+            digest = self.store.put_file(file_path)
+            created = datetime.now()
+            
+            # Microsecond timestamp plus content hash keeps names unique
+            base_name = f"{file_path.name}.{created.strftime('%Y%m%d_%H%M%S_%f')}.{digest[:12]}"
+            backup_path = self.backup_dir / f"{base_name}.backup"
+            counter = 1
+            while backup_path.exists() or backup_path.name in self._entries:
+                backup_path = self.backup_dir / f"{base_name}.{counter}.backup"
+                counter += 1
             
-            # Copy file to backup
-            import shutil
-            shutil.copy2(file_path, backup_path)
+            self.store.link(digest, backup_path)
+            self._append_journal({
+                'op': 'backup',
+                'name': backup_path.name,
+                'source': str(file_path.resolve()),
+                'digest': digest,
+                'size': file_path.stat().st_size,
+                'mode': file_path.stat().st_mode & 0o7777,
+                'created': created.isoformat(),
+            })
             
             logger.info(f"Created backup: {backup_path}")
             return backup_path
@@ -760,6 +822,29 @@ class FileUndoManager:
             logger.error(f"Error creating backup: {e}")
             return None
     
+    def read_backup(self, backup_path: Path) -> Optional[bytes]:
+        """
+        Read the original content of a backup.
+        
+        Args:
+            backup_path: Path to backup file
+            
+        Returns:
+            Backed up content, or None if the backup does not exist
+        """
+        if not backup_path.exists():
+            return None
+        
+        entry = self._entries.get(backup_path.name)
+        try:
+            if entry is None:
+                # Plain copy written before the content store existed
+                return backup_path.read_bytes()
+            return self.store.read_bytes(entry['digest'], source=backup_path)
+        except Exception as e:
+            logger.error(f"Error reading backup: {e}")
+            return None
+    
     def restore_backup(self, backup_path: Path, target_path: Path) -> bool:
         """
         Restore a file from backup.
@@ -776,8 +861,14 @@ class FileUndoManager:
             return False
         
         try:
-            import shutil
-            shutil.copy2(backup_path, target_path)
+            entry = self._entries.get(backup_path.name)
+            if entry is None:
+                import shutil
+                shutil.copy2(backup_path, target_path)
+            elif not self.store.restore(
+                entry['digest'], target_path, mode=entry.get('mode'), source=backup_path
+            ):
+                logger.debug(f"{target_path} already matches backup, nothing to write")
             logger.info(f"Restored backup to: {target_path}")
             return True
         except Exception as e:
@@ -800,6 +891,10 @@ class FileUndoManager:
         
         try:
             backup_path.unlink()
+            entry = self._entries.get(backup_path.name)
+            if entry is not None:
+                self._append_journal({'op': 'delete', 'name': backup_path.name})
+                self.store.release(entry['digest'], self._referenced_digests())
             logger.info(f"Deleted backup: {backup_path}")
             return True
         except Exception as e:
@@ -822,8 +917,8 @@ class FileUndoManager:
             else:
                 backups = list(self.backup_dir.glob("*.backup"))
             
-            # Sort by modification time (newest first)
-            backups.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            # Sort by creation time (newest first)
+            backups.sort(key=self._created_timestamp, reverse=True)
             
             return backups
         except Exception as e:
@@ -847,20 +942,97 @@ class FileUndoManager:
         
         try:
             for backup in self.backup_dir.glob("*.backup"):
-                if backup.stat().st_mtime < cutoff_time:
+                if self._created_timestamp(backup) < cutoff_time:
                     backup.unlink()
+                    if backup.name in self._entries:
+                        self._append_journal({'op': 'delete', 'name': backup.name})
                     deleted += 1
             
+            self.store.gc(self._referenced_digests())
+            self._compact_journal()
+            
             logger.info(f"Cleaned up {deleted} old backups")
             return deleted
         except Exception as e:
             logger.error(f"Error cleaning up backups: {e}")
             return deleted
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get backup counts and logical versus stored sizes."""
+        logical = sum(entry.get('size', 0) for entry in self._entries.values())
+        return {
+            'backups': len(self._entries),
+            'unique_objects': len(self._referenced_digests()),
+            'logical_bytes': logical,
+            'stored_bytes': self.store.disk_usage(),
+        }
+    
+    def _created_timestamp(self, backup_path: Path) -> float:
+        entry = self._entries.get(backup_path.name)
+        if entry is not None:
+            return datetime.fromisoformat(entry['created']).timestamp()
+        return backup_path.stat().st_mtime
+    
+    def _referenced_digests(self) -> set:
+        return {entry['digest'] for entry in self._entries.values()}
+    
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        if record.get('op') == 'backup':
+            self._entries[record['name']] = record
+        elif record.get('op') == 'delete':
+            self._entries.pop(record['name'], None)
+    
+    def _append_journal(self, record: Dict[str, Any]) -> None:
+        """Append one record to the backup journal."""
+        with open(self.journal_file, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        self._journal_records += 1
+        self._apply_record(record)
+    
+    def _load_journal(self) -> None:
+        """Replay the backup journal."""
+        if not self.journal_file.exists():
+            return
+        
+        try:
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        self._apply_record(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn final write leaves a partial line behind
+                        logger.warning("Skipping corrupt backup journal record")
+                        continue
+                    self._journal_records += 1
+            
+            # Drop records whose handle was removed outside the manager
+            for name in [n for n in self._entries if not (self.backup_dir / n).exists()]:
+                del self._entries[name]
+        except Exception as e:
+            logger.error(f"Error loading backup journal: {e}")
+    
+    def _compact_journal(self) -> None:
+        """Rewrite the journal with only live records once it is mostly dead."""
+        if self._journal_records <= 2 * len(self._entries) + 100:
+            return
+        
+        tmp_file = self.journal_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry) + '\n')
+        tmp_file.replace(self.journal_file)
+        self._journal_records = len(self._entries)
 
 
 class UndoHistory:
     """
     Manages a history of undo points with persistence.
+    
+    Changes are appended to a JSON-lines journal (one record per add, remove
+    or clear), so recording an undo point costs one small write regardless
+    of history size. The journal is compacted once dead records dominate.
     """
     
     def __init__(self, history_file: Optional[Path] = None):
@@ -870,8 +1042,14 @@ class UndoHistory:
         Args:
             history_file: Path to store undo history
         """
-        self.history_file = history_file or Path.home() / ".codegenie" / "undo_history.json"
+        self.history_file = history_file or Path.home() / ".codegenie" / "undo_history.jsonl"
+        if history_file is None:
+            legacy_file = self.history_file.with_suffix('.json')
+            if legacy_file.exists() and not self.history_file.exists():
+                legacy_file.replace(self.history_file)
         self.history: List[UndoPoint] = []
+        self._index: Dict[str, UndoPoint] = {}
+        self._journal_records = 0
         self._load_history()
         
         logger.info("UndoHistory initialized")
@@ -879,7 +1057,8 @@ class UndoHistory:
     def add(self, undo_point: UndoPoint) -> None:
         """Add an undo point to history."""
         self.history.append(undo_point)
-        self._save_history()
+        self._index[undo_point.id] = undo_point
+        self._append_record({'op': 'add', 'point': undo_point.to_dict()})
     
     def get_latest(self) -> Optional[UndoPoint]:
         """Get the most recent undo point."""
@@ -887,26 +1066,69 @@ class UndoHistory:
     
     def get_by_id(self, undo_id: str) -> Optional[UndoPoint]:
         """Get an undo point by ID."""
-        return next((up for up in self.history if up.id == undo_id), None)
+        return self._index.get(undo_id)
     
     def remove(self, undo_id: str) -> bool:
         """Remove an undo point from history."""
         undo_point = self.get_by_id(undo_id)
         if undo_point:
             self.history.remove(undo_point)
-            self._save_history()
+            del self._index[undo_id]
+            self._append_record({'op': 'remove', 'id': undo_id})
+            self._maybe_compact()
             return True
         return False
     
     def clear(self) -> None:
         """Clear all undo history."""
         self.history.clear()
-        self._save_history()
+        self._index.clear()
+        self._append_record({'op': 'clear'})
+        self._maybe_compact()
     
     def get_all(self) -> List[UndoPoint]:
         """Get all undo points."""
         return self.history.copy()
     
+    @staticmethod
+    def _undo_point_from_dict(item: Dict[str, Any]) -> UndoPoint:
+        operations = [
+            Operation(
+                id=op['id'],
+                operation_type=OperationType(op['operation_type']),
+                description=op['description'],
+                target=op['target'],
+                risk_level=op.get('risk_level', 'medium'),
+                metadata=op.get('metadata', {}),
+                timestamp=datetime.fromisoformat(op['timestamp']),
+                decision=ApprovalDecision(op['decision']) if op.get('decision') else None,
+                decision_timestamp=datetime.fromisoformat(op['decision_timestamp']) if op.get('decision_timestamp') else None
+            )
+            for op in item['operations']
+        ]
+        
+        return UndoPoint(
+            id=item['id'],
+            timestamp=datetime.fromisoformat(item['timestamp']),
+            operations=operations,
+            state_snapshot=item['state_snapshot'],
+            description=item['description']
+        )
+    
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        op = record.get('op')
+        if op == 'add':
+            undo_point = self._undo_point_from_dict(record['point'])
+            self.history.append(undo_point)
+            self._index[undo_point.id] = undo_point
+        elif op == 'remove':
+            undo_point = self._index.pop(record['id'], None)
+            if undo_point:
+                self.history.remove(undo_point)
+        elif op == 'clear':
+            self.history.clear()
+            self._index.clear()
+    
     def _load_history(self) -> None:
         """Load history from file."""
         if not self.history_file.exists():
@@ -914,51 +1136,57 @@ class UndoHistory:
         
         try:
             with open(self.history_file, 'r') as f:
-                data = json.load(f)
+                content = f.read()
             
-            # Reconstruct undo points
-            for item in data:
-                operations = [
-                    Operation(
-                        id=op['id'],
-                        operation_type=OperationType(op['operation_type']),
-                        description=op['description'],
-                        target=op['target'],
-                        risk_level=op.get('risk_level', 'medium'),
-                        metadata=op.get('metadata', {}),
-                        timestamp=datetime.fromisoformat(op['timestamp']),
-                        decision=ApprovalDecision(op['decision']) if op.get('decision') else None,
-                        decision_timestamp=datetime.fromisoformat(op['decision_timestamp']) if op.get('decision_timestamp') else None
-                    )
-                    for op in item['operations']
-                ]
-                
-                undo_point = UndoPoint(
-                    id=item['id'],
-                    timestamp=datetime.fromisoformat(item['timestamp']),
-                    operations=operations,
-                    state_snapshot=item['state_snapshot'],
-                    description=item['description']
-                )
-                self.history.append(undo_point)
+            if content.lstrip().startswith('['):
+                # Legacy format: a single JSON array of undo points
+                for item in json.loads(content):
+                    undo_point = self._undo_point_from_dict(item)
+                    self.history.append(undo_point)
+                    self._index[undo_point.id] = undo_point
+                self._compact()
+            else:
+                for line in content.splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        self._apply_record(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping corrupt undo history record")
+                        continue
+                    self._journal_records += 1
             
             logger.info(f"Loaded {len(self.history)} undo points")
         except Exception as e:
             logger.error(f"Error loading undo history: {e}")
     
-    def _save_history(self) -> None:
-        """Save history to file."""
+    def _append_record(self, record: Dict[str, Any]) -> None:
+        """Append one record to the history journal."""
         try:
             self.history_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = [up.to_dict() for up in self.history]
-            
-            with open(self.history_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
+            with open(self.history_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            self._journal_records += 1
             logger.debug("Saved undo history")
         except Exception as e:
             logger.error(f"Error saving undo history: {e}")
+    
+    def _maybe_compact(self) -> None:
+        if self._journal_records > 2 * len(self.history) + 100:
+            self._compact()
+    
+    def _compact(self) -> None:
+        """Rewrite the journal with one add record per live undo point."""
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.history_file.with_suffix(self.history_file.suffix + '.tmp')
+            with open(tmp_file, 'w') as f:
+                for undo_point in self.history:
+                    f.write(json.dumps({'op': 'add', 'point': undo_point.to_dict()}) + '\n')
+            tmp_file.replace(self.history_file)
+            self._journal_records = len(self.history)
+        except Exception as e:
+            logger.error(f"Error compacting undo history: {e}")
 
 
 
@@ -971,12 +1199,185 @@ class ConflictDetector:
     - File deletions while modifications are pending
     - Dependency conflicts
     - Merge conflicts
+    
+    ``FILE_MODIFY`` operations may declare the lines they touch in
+    ``metadata['line_range']`` (``[start, end]``, inclusive) or
+    ``metadata['line_ranges']`` (a list of ranges). Modifications of
+    disjoint ranges of the same file do not conflict. Operations without
+    ranges are treated as touching the whole file. A modification that keeps
+    the file's line count declares ``metadata['line_delta'] = 0``; any other
+    modification shifts the lines after it.
     """
     
+    WHOLE_FILE = (0, float('inf'))
+    
     def __init__(self):
         """Initialize conflict detector."""
+        # Per-file index of pending modifications: target -> IntervalTree of operation IDs
+        self._pending_index: Dict[str, IntervalTree] = {}
+        self._pending_ranges: Dict[str, Tuple[str, List[Tuple[float, float]]]] = {}
         logger.info("ConflictDetector initialized")
     
+    @classmethod
+    def get_line_ranges(cls, operation: Operation) -> List[Tuple[float, float]]:
+        """
+        Get the line ranges an operation touches.
+        
+        Args:
+            operation: Operation to inspect
+            
+        Returns:
+            List of inclusive ``(start, end)`` ranges
+        """
+        ranges = operation.metadata.get('line_ranges')
+        if ranges is None and 'line_range' in operation.metadata:
+            ranges = [operation.metadata['line_range']]
+        if not ranges or operation.operation_type != OperationType.FILE_MODIFY:
+            return [cls.WHOLE_FILE]
+        
+        try:
+            return [(int(start), int(end)) for start, end in ranges if int(start) <= int(end)] or [cls.WHOLE_FILE]
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid line ranges on operation {operation.id}: {ranges}")
+            return [cls.WHOLE_FILE]
+    
+    @classmethod
+    def get_batch_ranges(cls, operation: Operation) -> List[Tuple[float, float]]:
+        """
+        Get the lines an operation affects when applied alongside others.
+        
+        An edit that may change the line count moves every line after its
+        first range, so it affects the rest of the file.
+        
+        Args:
+            operation: Operation to inspect
+            
+        Returns:
+            List of inclusive ``(start, end)`` ranges
+        """
+        ranges = cls.get_line_ranges(operation)
+        if ranges == [cls.WHOLE_FILE] or operation.metadata.get('line_delta') == 0:
+            return ranges
+        return [(min(start for start, _ in ranges), float('inf'))]
+    
+    def find_overlapping_groups(self, operations: List[Operation]) -> List[List[Operation]]:
+        """
+        Group modifications of one file whose line ranges overlap.
+        
+        Each operation is checked against an interval tree of the ranges
+        seen so far, so a batch of n operations costs O(n log n) plus the
+        number of overlaps found.
+        
+        Args:
+            operations: Operations on the same target
+            
+        Returns:
+            Groups of two or more mutually connected overlapping operations
+        """
+        parent = list(range(len(operations)))
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        tree = IntervalTree()
+        for index, op in enumerate(operations):
+            for start, end in self.get_line_ranges(op):
+                for _, _, other in tree.overlap(start, end):
+                    parent[find(other)] = find(index)
+            for start, end in self.get_line_ranges(op):
+                tree.add(start, end, index)
+        
+        groups: Dict[int, List[Operation]] = {}
+        for index, op in enumerate(operations):
+            groups.setdefault(find(index), []).append(op)
+        return [group for group in groups.values() if len(group) > 1]
+    
+    def plan_concurrent_batches(self, operations: List[Operation]) -> List[List[Operation]]:
+        """
+        Split operations into batches that can be applied concurrently.
+        
+        An operation goes into the batch after the latest batch holding an
+        overlapping operation on the same target, so conflicting operations
+        keep their relative order while disjoint edits share a batch. Edits
+        that may change the line count overlap everything below them (see
+        ``get_batch_ranges``), so line numbers of a batch never shift.
+        
+        Args:
+            operations: Operations in the order they were requested
+            
+        Returns:
+            Batches to apply one after another
+        """
+        batches: List[List[Operation]] = []
+        trees: Dict[str, IntervalTree] = {}
+        
+        for op in operations:
+            tree = trees.setdefault(op.target, IntervalTree())
+            ranges = self.get_batch_ranges(op)
+            
+            batch = 0
+            for start, end in ranges:
+                for _, _, other_batch in tree.overlap(start, end):
+                    batch = max(batch, other_batch + 1)
+            
+            if batch == len(batches):
+                batches.append([])
+            batches[batch].append(op)
+            for start, end in ranges:
+                tree.add(start, end, batch)
+        
+        return batches
+    
+    def register_pending(self, operation: Operation) -> List[str]:
+        """
+        Index a pending operation and report the pending operations it overlaps.
+        
+        Args:
+            operation: Operation awaiting approval or application
+            
+        Returns:
+            IDs of already pending operations on the same lines
+        """
+        tree = self._pending_index.setdefault(operation.target, IntervalTree())
+        ranges = self.get_line_ranges(operation)
+        
+        overlapping: List[str] = []
+        for start, end in ranges:
+            for _, _, op_id in tree.overlap(start, end):
+                if op_id not in overlapping and op_id != operation.id:
+                    overlapping.append(op_id)
+        
+        for start, end in ranges:
+            tree.add(start, end, operation.id)
+        self._pending_ranges[operation.id] = (operation.target, ranges)
+        return overlapping
+    
+    def release_pending(self, operation_id: str) -> bool:
+        """
+        Remove an applied or cancelled operation from the pending index.
+        
+        Args:
+            operation_id: ID of the operation
+            
+        Returns:
+            True if the operation was indexed
+        """
+        entry = self._pending_ranges.pop(operation_id, None)
+        if entry is None:
+            return False
+        
+        target, ranges = entry
+        tree = self._pending_index.get(target)
+        if tree is not None:
+            for start, end in ranges:
+                tree.remove(start, end, operation_id)
+            if not tree:
+                del self._pending_index[target]
+        return True
+    
     def detect_file_conflicts(
         self,
         operations: List[Operation]
@@ -1017,7 +1418,7 @@ class ConflictDetector:
             
             if has_delete and has_modify:
                 conflict = Conflict(
-                    id=f"conflict_{datetime.now().timestamp()}",
+                    id=f"conflict_{uuid4().hex}",
                     conflict_type=ConflictType.FILE_DELETED,
                     description=f"File {file_path} is being deleted while modifications are pending",
                     affected_operations=[op.id for op in ops],
@@ -1030,14 +1431,14 @@ class ConflictDetector:
                 )
                 conflicts.append(conflict)
             
-            # Check for multiple modifications
+            # Check for multiple modifications touching the same lines
             modify_ops = [op for op in ops if op.operation_type == OperationType.FILE_MODIFY]
-            if len(modify_ops) > 1:
+            for group in self.find_overlapping_groups(modify_ops):
                 conflict = Conflict(
-                    id=f"conflict_{datetime.now().timestamp()}",
+                    id=f"conflict_{uuid4().hex}",
                     conflict_type=ConflictType.CONCURRENT_EDIT,
                     description=f"Multiple concurrent modifications to {file_path}",
-                    affected_operations=[op.id for op in modify_ops],
+                    affected_operations=[op.id for op in group],
                     affected_resources=[file_path],
                     resolution_suggestions=[
                         "Merge the modifications",
@@ -1051,7 +1452,7 @@ class ConflictDetector:
             create_ops = [op for op in ops if op.operation_type == OperationType.FILE_CREATE]
             if len(create_ops) > 1:
                 conflict = Conflict(
-                    id=f"conflict_{datetime.now().timestamp()}",
+                    id=f"conflict_{uuid4().hex}",
                     conflict_type=ConflictType.FILE_MODIFIED,
                     description=f"Multiple attempts to create {file_path}",
                     affected_operations=[op.id for op in create_ops],
@@ -1088,7 +1489,7 @@ class ConflictDetector:
                     # Check if they're in wrong order
                     if op1.timestamp > op2.timestamp:
                         conflict = Conflict(
-                            id=f"conflict_{datetime.now().timestamp()}",
+                            id=f"conflict_{uuid4().hex}",
                             conflict_type=ConflictType.DEPENDENCY_CONFLICT,
                             description=f"Operation depends on another that hasn't executed yet",
                             affected_operations=[op1.id, op2.id],
@@ -1122,7 +1523,7 @@ class ConflictDetector:
         # Simple conflict detection - check if contents differ
         if local_content != remote_content:
             conflict = Conflict(
-                id=f"conflict_{datetime.now().timestamp()}",
+                id=f"conflict_{uuid4().hex}",
                 conflict_type=ConflictType.MERGE_CONFLICT,
                 description=f"Merge conflict in {file_path}",
                 affected_operations=[],
@@ -0,0 +1,308 @@
+"""
+Batched SQLite writer for high-volume monitoring data.
+Owns a single long-lived connection on a background thread and writes
+buffered rows in `executemany` transactions on a WAL-mode database.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from enum import Enum
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What to do with a new row when the buffer is full."""
+    DROP_NEWEST = "drop_newest"  # Reject the new row
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest buffered row
+    BLOCK = "block"  # Wait up to ``block_timeout`` for room, then reject
+
+
+def configure_connection(conn: sqlite3.Connection) -> None:
+    """Put a connection in WAL mode so readers never block the writer."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+
+class BatchWriter:
+    """
+    Single writer for one SQLite database.
+
+    Rows are buffered in memory and written by a background thread once
+    ``batch_size`` rows are pending or ``flush_interval`` seconds after the
+    first pending row, whichever comes first. Consecutive rows with the same
+    statement are written with one ``executemany`` and each batch is one
+    transaction.
+
+    Droppable rows (samples, events) are bounded by ``max_pending`` and
+    handled by the overflow policy when the buffer is full. Rows submitted
+    with ``droppable=False`` (rollups, alerts) are never dropped and
+    are written ahead of droppable rows. If a batch fails, its rows are
+    written again one statement at a time so a single bad row only loses
+    itself.
+
+    Every row gets a sequence number; ``flush`` waits for the rows submitted
+    before it was called, not for the buffer to run empty, so readers are
+    not starved by sustained ingest.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        max_pending: int = 100000,
+        batch_size: int = 1000,
+        flush_interval: float = 0.5,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        block_timeout: float = 1.0
+    ):
+        self.db_path = Path(db_path)
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.block_timeout = block_timeout
+
+        self._cond = threading.Condition()
+        # Rows are (sql, params, sequence number)
+        self._pending: Deque[Tuple[str, Sequence[Any], int]] = deque()
+        self._reliable: Deque[Tuple[str, Sequence[Any], int]] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self._writing_seq: Optional[int] = None  # Oldest row of the batch being written
+        self._flush_seq = 0  # Rows up to this one are written without waiting for a full batch
+        self._closed = False
+
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_batch': 0,
+            'write_seconds': 0.0,
+        }
+
+    def submit(self, sql: str, params: Sequence[Any], droppable: bool = True) -> bool:
+        """
+        Buffer a row for writing.
+
+        Args:
+            sql: Parameterized statement
+            params: Statement parameters
+            droppable: Whether the row may be dropped under backpressure
+
+        Returns:
+            True if the row was buffered, False if it was dropped
+        """
+        with self._cond:
+            if self._closed:
+                self.stats['dropped'] += 1
+                return False
+
+            if droppable:
+                if len(self._pending) >= self.max_pending and not self._make_room():
+                    self.stats['dropped'] += 1
+                    return False
+                self._seq += 1
+                self._pending.append((sql, params, self._seq))
+            else:
+                self._seq += 1
+                self._reliable.append((sql, params, self._seq))
+
+            self.stats['submitted'] += 1
+            buffered = len(self._pending) + len(self._reliable)
+            if buffered == 1 or buffered >= self.batch_size:
+                self._cond.notify_all()
+
+        self._ensure_thread()
+        return True
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full buffer (lock held)."""
+        if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+            self._pending.popleft()
+            self.stats['dropped'] += 1
+            return True
+
+        if self.overflow_policy == OverflowPolicy.BLOCK:
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: len(self._pending) < self.max_pending or self._closed,
+                self.block_timeout
+            ) and not self._closed
+
+        return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every row buffered so far has been written.
+
+        Rows submitted while waiting are not waited for.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the rows were written within the timeout
+        """
+        with self._cond:
+            mark = self._seq
+            if self._written_through(mark):
+                return True
+            self._flush_seq = max(self._flush_seq, mark)
+            self._cond.notify_all()
+
+        self._ensure_thread()
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written_through(mark), timeout)
+
+    def _oldest_seq(self) -> Optional[int]:
+        """Sequence number of the oldest buffered row (lock held)."""
+        heads = [rows[0][2] for rows in (self._pending, self._reliable) if rows]
+        return min(heads) if heads else None
+
+    def _written_through(self, seq: int) -> bool:
+        """Whether no row up to ``seq`` is buffered or being written (lock held)."""
+        oldest = self._oldest_seq()
+        if oldest is not None and oldest <= seq:
+            return False
+        return self._writing_seq is None or self._writing_seq > seq
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Write everything still buffered and stop the writer thread."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        """Number of rows waiting to be written."""
+        return len(self._pending) + len(self._reliable)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending) + len(self._reliable)
+        written_per_second = stats['written'] / stats['write_seconds'] if stats['write_seconds'] else 0.0
+        stats['rows_per_second'] = written_per_second
+        return stats
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread on first use."""
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"BatchWriter[{self.db_path.name}]",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _next_batch(self) -> Optional[List[Tuple[str, Sequence[Any], int]]]:
+        """Wait for a batch to be due and take it (lock held)."""
+        deadline = None
+        while True:
+            buffered = len(self._pending) + len(self._reliable)
+            if self._closed and not buffered:
+                return None
+            flush_due = buffered and self._oldest_seq() <= self._flush_seq
+            if buffered and (self._closed or flush_due or buffered >= self.batch_size):
+                break
+            if buffered and deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        # Rows that must not be dropped go first: samples may refer to them
+        batch = list(self._reliable)
+        self._reliable.clear()
+        for _ in range(min(len(self._pending), max(0, self.batch_size - len(batch)))):
+            batch.append(self._pending.popleft())
+
+        self._writing_seq = min(row[2] for row in batch)
+        # Wake submitters blocked on a full buffer
+        self._cond.notify_all()
+        return batch
+
+    def _run(self) -> None:
+        """Writer thread: write batches until closed."""
+        conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            configure_connection(conn)
+            while True:
+                with self._cond:
+                    batch = self._next_batch()
+                if batch is None:
+                    return
+                self._write(conn, batch)
+                with self._cond:
+                    self._writing_seq = None
+                    self._cond.notify_all()
+        except Exception as e:
+            logger.error(f"Batch writer for {self.db_path} stopped: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+            # The next submit or flush starts a new thread
+            with self._cond:
+                self._writing_seq = None
+                self._thread = None
+                self._cond.notify_all()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple[str, Sequence[Any], int]]) -> None:
+        """Write a batch in one transaction, falling back to one statement per row."""
+        started = time.perf_counter()
+        try:
+            with conn:
+                start = 0
+                while start < len(batch):
+                    sql = batch[start][0]
+                    end = start + 1
+                    while end < len(batch) and batch[end][0] == sql:
+                        end += 1
+                    conn.executemany(sql, [row[1] for row in batch[start:end]])
+                    start = end
+            written, failed = len(batch), 0
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write {len(batch)} rows to {self.db_path}, retrying per row: {e}")
+            written, failed = self._write_rows(conn, batch)
+
+        with self._cond:
+            self.stats['written'] += written
+            self.stats['failed'] += failed
+            self.stats['batches'] += 1
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+            self.stats['write_seconds'] += time.perf_counter() - started
+
+    def _write_rows(self, conn: sqlite3.Connection, batch: List[Tuple[str, Sequence[Any], int]]) -> Tuple[int, int]:
+        """Write rows one statement at a time; returns (written, failed)."""
+        written = failed = 0
+        try:
+            with conn:
+                for sql, params, _ in batch:
+                    try:
+                        conn.execute(sql, params)
+                        written += 1
+                    except sqlite3.Error as e:
+                        failed += 1
+                        logger.error(f"Failed to write row to {self.db_path}: {e}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(batch)} rows to {self.db_path}: {e}")
+            written, failed = 0, len(batch)
+        return written, failed
@@ -0,0 +1,292 @@
+"""
+Content-addressed blob storage for backups and undo snapshots.
+
+This module provides a small deduplicating object store including:
+- SHA-256 named, zlib-compressed objects written atomically
+- Single-pass hashing and compression of large files in chunks
+- A stat-signature cache so unchanged files are never re-read
+- Hardlink-based handles so the filesystem tracks object references
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ContentStore:
+    """
+    Deduplicating store of compressed blobs named by their content hash.
+
+    Storing the same content twice costs only a hash (or nothing, when the
+    source file's stat signature is unchanged); objects are never rewritten.
+    """
+
+    # Files changed within this window of now may change again without a new
+    # mtime, so their stat signature is not cached until they are older
+    RACY_WINDOW_NS = 1_000_000_000
+
+    def __init__(
+        self,
+        root: Path,
+        compression_level: int = 6,
+        chunk_size: int = 1024 * 1024,
+        stat_cache_size: int = 4096
+    ):
+        """
+        Initialize the content store.
+
+        Args:
+            root: Directory holding the ``objects`` tree
+            compression_level: zlib compression level (0-9)
+            chunk_size: Read size used when streaming files
+            stat_cache_size: Number of file stat signatures to remember
+        """
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.compression_level = compression_level
+        self.chunk_size = chunk_size
+        self.stat_cache_size = stat_cache_size
+
+        self._stat_cache: "OrderedDict[str, Tuple[Tuple[int, ...], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> Tuple[int, ...]:
+        # ctime catches rewrites whose mtime was set back afterwards
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+    def _cached_digest(self, key: str, signature: Tuple[int, ...]) -> Optional[str]:
+        with self._lock:
+            cached = self._stat_cache.get(key)
+        return cached[1] if cached and cached[0] == signature else None
+
+    def _remember(self, key: str, st: os.stat_result, digest: str) -> None:
+        if time.time_ns() - max(st.st_mtime_ns, st.st_ctime_ns) < self.RACY_WINDOW_NS:
+            with self._lock:
+                self._stat_cache.pop(key, None)
+            return
+
+        with self._lock:
+            self._stat_cache[key] = (self._signature(st), digest)
+            self._stat_cache.move_to_end(key)
+            if len(self._stat_cache) > self.stat_cache_size:
+                self._stat_cache.popitem(last=False)
+
+    def _hash_file(self, file_path: Path) -> str:
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def object_path(self, digest: str) -> Path:
+        """Return the path of an object."""
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def contains(self, digest: str) -> bool:
+        """Check whether an object is stored."""
+        return self.object_path(digest).exists()
+
+    def put_file(self, file_path: Path) -> str:
+        """
+        Store the content of a file.
+
+        Args:
+            file_path: File to store
+
+        Returns:
+            Hex digest naming the stored object
+        """
+        st = file_path.stat()
+        key = str(file_path.resolve())
+
+        cached = self._cached_digest(key, self._signature(st))
+        if cached and self.contains(cached):
+            return cached
+
+        with open(file_path, "rb") as f:
+            digest = self._write_stream(iter(lambda: f.read(self.chunk_size), b""))
+
+        self._remember(key, st, digest)
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store raw bytes and return their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.contains(digest):
+            self._write_stream(iter([data]), expected_digest=digest)
+        return digest
+
+    def _write_stream(self, chunks: Iterator[bytes], expected_digest: Optional[str] = None) -> str:
+        """Hash and compress chunks in one pass, keeping the object only if new."""
+        hasher = hashlib.sha256()
+        compressor = zlib.compressobj(self.compression_level)
+        fd, tmp_name = tempfile.mkstemp(dir=self.objects_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    tmp.write(compressor.compress(chunk))
+                tmp.write(compressor.flush())
+
+            digest = expected_digest or hasher.hexdigest()
+            target = self.object_path(digest)
+            if target.exists():
+                os.unlink(tmp_name)
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.chmod(tmp_name, 0o444)
+                os.replace(tmp_name, target)
+            return digest
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def iter_chunks(self, digest: str, source: Optional[Path] = None) -> Iterator[bytes]:
+        """
+        Stream the decompressed content of an object.
+
+        Args:
+            digest: Object digest
+            source: Alternative path to read the compressed data from (e.g. a handle)
+        """
+        decompressor = zlib.decompressobj()
+        with open(source or self.object_path(digest), "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                yield decompressor.decompress(chunk)
+        yield decompressor.flush()
+
+    def read_bytes(self, digest: str, source: Optional[Path] = None) -> bytes:
+        """Return the decompressed content of an object."""
+        return b"".join(self.iter_chunks(digest, source))
+
+    def matches(self, digest: str, file_path: Path) -> bool:
+        """Check whether a file currently holds the object's content, hashing it afresh."""
+        try:
+            return self._hash_file(file_path) == digest
+        except OSError:
+            return False
+
+    def file_digest(self, file_path: Path) -> str:
+        """Hash a file without storing it, using the stat cache when possible."""
+        st = file_path.stat()
+        key = str(file_path.resolve())
+        cached = self._cached_digest(key, self._signature(st))
+        if cached:
+            return cached
+
+        digest = self._hash_file(file_path)
+        self._remember(key, st, digest)
+        return digest
+
+    def restore(
+        self,
+        digest: str,
+        target: Path,
+        mode: Optional[int] = None,
+        source: Optional[Path] = None
+    ) -> bool:
+        """
+        Atomically write an object's content to ``target``.
+
+        The write is skipped when ``target`` already holds the content.
+
+        Args:
+            digest: Object digest
+            target: Destination file
+            mode: Permission bits to apply
+            source: Alternative path to read the compressed data from
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        if target.exists() and self.matches(digest, target):
+            return False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in self.iter_chunks(digest, source):
+                    tmp.write(chunk)
+            if mode is not None:
+                os.chmod(tmp_name, mode)
+            os.replace(tmp_name, target)
+            return True
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def link(self, digest: str, handle: Path) -> Path:
+        """
+        Create a handle referencing an object.
+
+        Handles are hardlinks, so an object's link count is its reference
+        count. Filesystems without hardlinks fall back to a copy of the
+        compressed object.
+        """
+        try:
+            os.link(self.object_path(digest), handle)
+        except OSError:
+            shutil.copyfile(self.object_path(digest), handle)
+        return handle
+
+    def release(self, digest: str, referenced: Optional[Set[str]] = None) -> bool:
+        """
+        Remove an object once nothing references it.
+
+        Args:
+            digest: Object digest
+            referenced: Digests still referenced; when omitted the hardlink
+                count of the object decides
+
+        Returns:
+            True if the object was removed
+        """
+        path = self.object_path(digest)
+        try:
+            unreferenced = (
+                digest not in referenced if referenced is not None
+                else path.stat().st_nlink <= 1
+            )
+            if unreferenced:
+                path.unlink()
+                return True
+        except OSError:
+            pass
+        return False
+
+    def gc(self, referenced: Optional[Set[str]] = None) -> int:
+        """
+        Remove every unreferenced object.
+
+        Args:
+            referenced: Digests still referenced (defaults to hardlink counts)
+
+        Returns:
+            Number of objects removed
+        """
+        removed = 0
+        for path in self.objects_dir.glob("??/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            if self.release(path.parent.name + path.name, referenced):
+                removed += 1
+        return removed
+
+    def disk_usage(self) -> int:
+        """Return the compressed size of all objects in bytes."""
+        return sum(p.stat().st_size for p in self.objects_dir.glob("??/*"))
@@ -19,6 +19,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from .git_backend import GitBackendError, get_git_backend
+
 logger = logging.getLogger(__name__)
 
 
@@ -667,15 +669,16 @@ class ContextAnalyzer:
         
         git_info = GitInfo(is_repo=True)
         
-        # Try to read current branch
-        head_file = git_dir / 'HEAD'
-        if head_file.exists():
-            try:
-                content = head_file.read_text().strip()
-                if content.startswith('ref: refs/heads/'):
-                    git_info.branch = content.replace('ref: refs/heads/', '')
-            except Exception:
-                pass
+        backend = get_git_backend(project_path)
+        if backend is None:
+            return git_info
+        
+        try:
+            git_info.branch = backend.current_branch()
+            git_info.remote = backend.remote_url()
+            git_info.has_uncommitted = backend.status(include_untracked=False).has_uncommitted
+        except (GitBackendError, OSError) as e:
+            logger.debug(f"Could not read git status for {project_path}: {e}")
         
         return git_info
     
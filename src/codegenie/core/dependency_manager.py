@@ -6,16 +6,38 @@ across multiple programming languages and package managers.
 """
 
 import re
+import os
 import json
+import time
+import asyncio
+import hashlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when import extraction changes so stale cached results are discarded
+IMPORT_CACHE_VERSION = 1
+
+SOURCE_EXTENSIONS = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'javascript',
+    '.tsx': 'typescript',
+    '.rs': 'rust',
+    '.go': 'go',
+}
+
+IGNORED_DIRECTORIES = {
+    'node_modules', 'venv', '.venv', 'target', 'dist', 'build', '__pycache__', '.git', '.codegenie'
+}
+
 
 class PackageManager(Enum):
     """Supported package managers."""
@@ -38,6 +60,20 @@ class Language(Enum):
     UNKNOWN = "unknown"
 
 
+# Registry queried for package versions, shared by package managers of an ecosystem
+REGISTRY_BY_PACKAGE_MANAGER = {
+    PackageManager.PIP: 'pypi',
+    PackageManager.POETRY: 'pypi',
+    PackageManager.NPM: 'npm',
+    PackageManager.YARN: 'npm',
+    PackageManager.CARGO: 'crates',
+    PackageManager.GO_MODULES: 'go',
+}
+
+# Failed lookups are retried sooner than successful ones are refreshed
+NEGATIVE_VERSION_TTL = 300.0
+
+
 @dataclass
 class Dependency:
     """Represents a package dependency."""
@@ -68,6 +104,15 @@ class PackageFile:
     dev_dependencies: Dict[str, str] = field(default_factory=dict)
 
 
+@dataclass
+class ImportCacheEntry:
+    """Cached imports of one source file, valid while the file is unchanged."""
+    mtime_ns: int
+    size: int
+    digest: str
+    imports: List[str]
+
+
 class DependencyManager:
     """
     Manages dependencies across multiple languages and package managers.
@@ -79,15 +124,69 @@ class DependencyManager:
     - Updates package files automatically
     """
     
-    def __init__(self, project_path: Path):
+    # Files modified this recently may change again without a new mtime
+    RACY_WINDOW_NS = 1_000_000_000
+    
+    def __init__(
+        self,
+        project_path: Path,
+        import_cache_path: Optional[Path] = None,
+        max_workers: int = 8,
+        parallel_threshold: int = 32,
+        version_cache_path: Optional[Path] = None,
+        version_cache_ttl: float = 86400.0,
+        local_index_path: Optional[Path] = None,
+        registry_mirrors: Optional[Dict[str, str]] = None,
+        offline: bool = False,
+        resolve_timeout: float = 10.0,
+        max_concurrent_resolves: int = 16
+    ):
         """
         Initialize the DependencyManager.
         
         Args:
             project_path: Root path of the project
+            import_cache_path: File persisting scanned imports between runs
+                (defaults to ``.codegenie/import_cache.json`` in the project)
+            max_workers: Worker threads used to scan changed files
+            parallel_threshold: Minimum number of changed files to scan in parallel
+            version_cache_path: File persisting resolved versions between runs
+                (defaults to ``.codegenie/version_cache.json`` in the project)
+            version_cache_ttl: Seconds a resolved version is reused
+            local_index_path: Directory with version snapshots (``pypi.json``,
+                ``npm.json``, ``crates.json``, ``go.json``) consulted before
+                any registry, e.g. one written by ``export_version_snapshot``
+            registry_mirrors: Registry name -> mirror/index URL to query instead
+                of the public registry
+            offline: Never query registries; resolve from the snapshot and cache only
+            resolve_timeout: Seconds allowed for one registry query
+            max_concurrent_resolves: Registry queries run at once by ``resolve_versions``
         """
         self.project_path = Path(project_path)
         self.package_files: Dict[PackageManager, PackageFile] = {}
+        self.import_cache_path = (
+            Path(import_cache_path) if import_cache_path
+            else self.project_path / '.codegenie' / 'import_cache.json'
+        )
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+        self._import_cache: Optional[Dict[str, ImportCacheEntry]] = None
+        self._import_cache_dirty = False
+        self.import_cache_stats = {'hits': 0, 'rehashed': 0, 'scanned': 0}
+        
+        self.version_cache_path = (
+            Path(version_cache_path) if version_cache_path
+            else self.project_path / '.codegenie' / 'version_cache.json'
+        )
+        self.version_cache_ttl = version_cache_ttl
+        self.local_index_path = Path(local_index_path) if local_index_path else None
+        self.registry_mirrors = dict(registry_mirrors or {})
+        self.offline = offline
+        self.resolve_timeout = resolve_timeout
+        self.max_concurrent_resolves = max_concurrent_resolves
+        self._version_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._local_indexes: Dict[str, Dict[str, Any]] = {}
+        self.version_stats = {'local_index': 0, 'cache_hits': 0, 'queries': 0, 'failures': 0}
         self._discover_package_files()
         
         # Common package name mappings (import name -> package name)
@@ -228,6 +327,10 @@ class DependencyManager:
         """
         Detect missing dependencies by analyzing import statements.
         
+        Imports are served from a per-file cache while a file's size and
+        modification time (or, failing that, its content hash) are unchanged,
+        so repeated checks only rescan files that were edited.
+        
         Args:
             file_path: Specific file to analyze, or None to analyze all files
             
@@ -237,15 +340,16 @@ class DependencyManager:
         missing_deps: List[Dependency] = []
         
         if file_path:
-            files_to_analyze = [file_path]
+            files_to_analyze = [Path(file_path)]
         else:
             files_to_analyze = self._get_source_files()
         
+        imports_by_file = self._scan_imports(files_to_analyze, prune=file_path is None)
+        
         for file in files_to_analyze:
             language = self._detect_language(file)
-            imports = self._extract_imports(file, language)
             
-            for import_name in imports:
+            for import_name in sorted(imports_by_file.get(file, ())):
                 if not self._is_dependency_installed(import_name, language):
                     dep = Dependency(
                         name=self._map_import_to_package(import_name, language),
@@ -258,59 +362,188 @@ class DependencyManager:
         return missing_deps
     
     def _get_source_files(self) -> List[Path]:
-        """Get all source files in the project."""
-        extensions = {
-            '.py': Language.PYTHON,
-            '.js': Language.JAVASCRIPT,
-            '.ts': Language.TYPESCRIPT,
-            '.jsx': Language.JAVASCRIPT,
-            '.tsx': Language.TYPESCRIPT,
-            '.rs': Language.RUST,
-            '.go': Language.GO,
-        }
-        
+        """Get all source files in the project with a single directory walk."""
         source_files = []
-        for ext in extensions.keys():
-            source_files.extend(self.project_path.rglob(f'*{ext}'))
-        
-        # Filter out common directories to ignore
-        ignore_dirs = {'node_modules', 'venv', '.venv', 'target', 'dist', 'build', '__pycache__'}
-        return [f for f in source_files if not any(d in f.parts for d in ignore_dirs)]
+        for root, dirs, files in os.walk(self.project_path):
+            # Prune ignored directories in place so they are never descended into
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRECTORIES)
+            for name in sorted(files):
+                if os.path.splitext(name)[1] in SOURCE_EXTENSIONS:
+                    source_files.append(Path(root) / name)
+        return source_files
     
     def _detect_language(self, file_path: Path) -> Language:
         """Detect programming language from file extension."""
-        ext = file_path.suffix.lower()
-        mapping = {
-            '.py': Language.PYTHON,
-            '.js': Language.JAVASCRIPT,
-            '.ts': Language.TYPESCRIPT,
-            '.jsx': Language.JAVASCRIPT,
-            '.tsx': Language.TYPESCRIPT,
-            '.rs': Language.RUST,
-            '.go': Language.GO,
+        return Language(SOURCE_EXTENSIONS.get(file_path.suffix.lower(), Language.UNKNOWN.value))
+    
+    def _scan_imports(self, files: List[Path], prune: bool = False) -> Dict[Path, Set[str]]:
+        """
+        Get the imports of source files, scanning only files not in the cache.
+        
+        Args:
+            files: Source files to get imports for
+            prune: Drop cache entries of files that are no longer present
+            
+        Returns:
+            Mapping of file to its imports
+        """
+        cache = self._load_import_cache()
+        results: Dict[Path, Set[str]] = {}
+        changed: List[Tuple[Path, str, os.stat_result]] = []
+        
+        for file in files:
+            key = self._import_cache_key(file)
+            try:
+                stat = file.stat()
+            except OSError as e:
+                logger.error(f"Error extracting imports from {file}: {e}")
+                results[file] = set()
+                continue
+            
+            entry = cache.get(key)
+            if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self.import_cache_stats['hits'] += 1
+                results[file] = set(entry.imports)
+            else:
+                changed.append((file, key, stat))
+        
+        if len(changed) >= self.parallel_threshold and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                entries = list(executor.map(lambda item: self._scan_file(*item), changed))
+        else:
+            entries = [self._scan_file(*item) for item in changed]
+        
+        now = time.time_ns()
+        for (file, key, stat), entry in zip(changed, entries):
+            if entry is None:
+                results[file] = set()
+                continue
+            results[file] = set(entry.imports)
+            if now - stat.st_mtime_ns < self.RACY_WINDOW_NS:
+                # Scanned again next time rather than trusting this stat
+                if cache.pop(key, None) is not None:
+                    self._import_cache_dirty = True
+                continue
+            cache[key] = entry
+            self._import_cache_dirty = True
+        
+        if prune:
+            present = {self._import_cache_key(file) for file in files}
+            stale = [key for key in cache if key not in present]
+            for key in stale:
+                del cache[key]
+            self._import_cache_dirty = self._import_cache_dirty or bool(stale)
+        
+        self._save_import_cache()
+        return results
+    
+    def _scan_file(self, file_path: Path, key: str, stat: os.stat_result) -> Optional[ImportCacheEntry]:
+        """Read a changed file and extract its imports unless its content is cached."""
+        try:
+            data = file_path.read_bytes()
+        except OSError as e:
+            logger.error(f"Error extracting imports from {file_path}: {e}")
+            return None
+        
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        cached = self._import_cache.get(key) if self._import_cache is not None else None
+        if cached and cached.digest == digest:
+            # Touched but not modified: keep the imports, refresh the stat
+            self.import_cache_stats['rehashed'] += 1
+            imports = cached.imports
+        else:
+            self.import_cache_stats['scanned'] += 1
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError as e:
+                logger.error(f"Error extracting imports from {file_path}: {e}")
+                return None
+            imports = sorted(self._extract_imports_from_content(content, self._detect_language(file_path)))
+        
+        return ImportCacheEntry(mtime_ns=stat.st_mtime_ns, size=stat.st_size, digest=digest, imports=imports)
+    
+    def _import_cache_key(self, file_path: Path) -> str:
+        """Cache key of a file: its project-relative path when inside the project."""
+        try:
+            return file_path.resolve().relative_to(self.project_path.resolve()).as_posix()
+        except ValueError:
+            return str(file_path.resolve())
+    
+    def _load_import_cache(self) -> Dict[str, ImportCacheEntry]:
+        """Load the persisted import cache, starting empty if it is missing or stale."""
+        if self._import_cache is not None:
+            return self._import_cache
+        
+        self._import_cache = {}
+        if not self.import_cache_path.exists():
+            return self._import_cache
+        
+        try:
+            with open(self.import_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == IMPORT_CACHE_VERSION:
+                self._import_cache = {
+                    key: ImportCacheEntry(**entry) for key, entry in data.get('files', {}).items()
+                }
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable import cache {self.import_cache_path}: {e}")
+        
+        return self._import_cache
+    
+    def _save_import_cache(self) -> None:
+        """Persist the import cache if it changed."""
+        if not self._import_cache_dirty or self._import_cache is None:
+            return
+        
+        data = {
+            'version': IMPORT_CACHE_VERSION,
+            'files': {
+                key: {'mtime_ns': e.mtime_ns, 'size': e.size, 'digest': e.digest, 'imports': e.imports}
+                for key, e in self._import_cache.items()
+            },
         }
-        return mapping.get(ext, Language.UNKNOWN)
+        try:
+            self.import_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.import_cache_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.import_cache_path)
+            self._import_cache_dirty = False
+        except Exception as e:
+            logger.warning(f"Could not save import cache {self.import_cache_path}: {e}")
+    
+    def clear_import_cache(self) -> None:
+        """Forget all cached imports, including the persisted cache file."""
+        self._import_cache = {}
+        self._import_cache_dirty = False
+        try:
+            self.import_cache_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove import cache {self.import_cache_path}: {e}")
     
     def _extract_imports(self, file_path: Path, language: Language) -> Set[str]:
         """Extract import statements from a source file."""
-        imports = set()
-        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                if language == Language.PYTHON:
-                    imports.update(self._extract_python_imports(content))
-                elif language in [Language.JAVASCRIPT, Language.TYPESCRIPT]:
-                    imports.update(self._extract_js_imports(content))
-                elif language == Language.RUST:
-                    imports.update(self._extract_rust_imports(content))
-                elif language == Language.GO:
-                    imports.update(self._extract_go_imports(content))
+                return self._extract_imports_from_content(f.read(), language)
         except Exception as e:
             logger.error(f"Error extracting imports from {file_path}: {e}")
         
-        return imports
+        return set()
+    
+    def _extract_imports_from_content(self, content: str, language: Language) -> Set[str]:
+        """Extract import statements from source text."""
+        if language == Language.PYTHON:
+            return self._extract_python_imports(content)
+        elif language in [Language.JAVASCRIPT, Language.TYPESCRIPT]:
+            return self._extract_js_imports(content)
+        elif language == Language.RUST:
+            return self._extract_rust_imports(content)
+        elif language == Language.GO:
+            return self._extract_go_imports(content)
+        return set()
 
     
     def _extract_python_imports(self, content: str) -> Set[str]:
@@ -338,7 +571,7 @@ class DependencyManager:
         
         # Match: import ... from 'package', require('package')
         import_patterns = [
-            r'import\s+.*?\s+from\s+[\'"]([^\'".][^\'"]*)[\'"',
+            r'import\s+.*?\s+from\s+[\'"]([^\'".][^\'"]*)[\'"]',
             r'require\s*\(\s*[\'"]([^\'".][^\'"]*)[\'"]\s*\)',
         ]
         
@@ -462,6 +695,9 @@ class DependencyManager:
         """
         Resolve the best version for a package.
         
+        Versions come from the local index snapshot, then the version cache,
+        and only then from the package registry (unless offline).
+        
         Args:
             package_name: Name of the package
             language: Programming language
@@ -469,95 +705,289 @@ class DependencyManager:
         Returns:
             Recommended version string or None
         """
-        pm = self._get_package_manager_for_language(language)
+        registry = self._get_registry_for_language(language)
+        if registry is None:
+            return None
+        
+        found, version = self._lookup_known_version(registry, package_name)
+        if found or self.offline:
+            return version
         
         try:
-            if pm == PackageManager.PIP:
-                return self._resolve_pip_version(package_name)
-            elif pm in [PackageManager.NPM, PackageManager.YARN]:
-                return self._resolve_npm_version(package_name)
-            elif pm == PackageManager.CARGO:
-                return self._resolve_cargo_version(package_name)
-            elif pm == PackageManager.GO_MODULES:
-                return self._resolve_go_version(package_name)
+            version = self._run_version_query(registry, package_name)
         except Exception as e:
             logger.error(f"Error resolving version for {package_name}: {e}")
+            version = None
         
-        return None
+        self._store_version(registry, package_name, version)
+        self._save_version_cache()
+        return version
     
-    def _resolve_pip_version(self, package_name: str) -> Optional[str]:
-        """Resolve latest version from PyPI."""
-        try:
-            result = subprocess.run(
-                ['pip', 'index', 'versions', package_name],
-                capture_output=True,
-                text=True,
-                timeout=10
+    async def resolve_versions(
+        self,
+        packages: Iterable[Tuple[str, Language]],
+        max_concurrency: Optional[int] = None
+    ) -> Dict[Tuple[str, Language], Optional[str]]:
+        """
+        Resolve versions for many packages concurrently.
+        
+        Known versions are answered from the local index and cache; the rest
+        are queried with at most ``max_concurrency`` registry commands running
+        at once, and each distinct package is queried only once.
+        
+        Args:
+            packages: (package name, language) pairs
+            max_concurrency: Concurrent registry queries (defaults to
+                ``max_concurrent_resolves``)
+            
+        Returns:
+            Mapping of each (package name, language) pair to its version or None
+        """
+        results: Dict[Tuple[str, Language], Optional[str]] = {}
+        pending: Dict[Tuple[str, str], List[Tuple[str, Language]]] = {}
+        
+        for package_name, language in packages:
+            registry = self._get_registry_for_language(language)
+            if registry is None:
+                results[(package_name, language)] = None
+                continue
+            
+            found, version = self._lookup_known_version(registry, package_name)
+            if found or self.offline:
+                results[(package_name, language)] = version
+            else:
+                pending.setdefault((registry, package_name), []).append((package_name, language))
+        
+        if pending:
+            semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrent_resolves)
+            queries = list(pending)
+            versions = await asyncio.gather(
+                *(self._run_version_query_async(registry, name, semaphore) for registry, name in queries)
             )
-            if result.returncode == 0:
-                # Parse output to get latest version
-                match = re.search(r'Available versions: ([^\s,]+)', result.stdout)
-                if match:
-                    return match.group(1)
-        except Exception as e:
-            logger.debug(f"Could not resolve pip version: {e}")
+            for (registry, name), version in zip(queries, versions):
+                self._store_version(registry, name, version)
+                for key in pending[(registry, name)]:
+                    results[key] = version
+            self._save_version_cache()
         
-        return None
-
+        return results
     
-    def _resolve_npm_version(self, package_name: str) -> Optional[str]:
-        """Resolve latest version from npm registry."""
+    def export_version_snapshot(self, directory: Path) -> Dict[str, int]:
+        """
+        Write cached versions as a local index snapshot for offline resolution.
+        
+        Args:
+            directory: Directory to write ``<registry>.json`` files into
+            
+        Returns:
+            Number of packages written per registry
+        """
+        snapshot: Dict[str, Dict[str, str]] = {}
+        for key, entry in self._load_version_cache().items():
+            registry, _, name = key.partition(':')
+            if entry.get('version'):
+                snapshot.setdefault(registry, {})[name] = entry['version']
+        
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for registry, versions in snapshot.items():
+            existing = self._read_local_index(directory / f'{registry}.json')
+            existing.update(versions)
+            with open(directory / f'{registry}.json', 'w', encoding='utf-8') as f:
+                json.dump(existing, f, indent=2, sort_keys=True)
+        
+        return {registry: len(versions) for registry, versions in snapshot.items()}
+    
+    def _get_registry_for_language(self, language: Language) -> Optional[str]:
+        """Get the registry that serves packages for a language."""
+        return REGISTRY_BY_PACKAGE_MANAGER.get(self._get_package_manager_for_language(language))
+    
+    def _lookup_known_version(self, registry: str, package_name: str) -> Tuple[bool, Optional[str]]:
+        """Look a version up in the local index and then the cache, without querying."""
+        index = self._load_local_index(registry)
+        if package_name in index:
+            self.version_stats['local_index'] += 1
+            versions = index[package_name]
+            if isinstance(versions, list):
+                return True, versions[-1] if versions else None
+            return True, versions
+        
+        entry = self._load_version_cache().get(f'{registry}:{package_name}')
+        if entry:
+            ttl = self.version_cache_ttl if entry.get('version') else min(self.version_cache_ttl, NEGATIVE_VERSION_TTL)
+            if time.time() - entry.get('resolved_at', 0) < ttl:
+                self.version_stats['cache_hits'] += 1
+                return True, entry.get('version')
+        
+        return False, None
+    
+    def _store_version(self, registry: str, package_name: str, version: Optional[str]) -> None:
+        """Record a query result in the version cache."""
+        self.version_stats['queries'] += 1
+        if version is None:
+            self.version_stats['failures'] += 1
+        self._load_version_cache()[f'{registry}:{package_name}'] = {
+            'version': version,
+            'resolved_at': time.time(),
+        }
+    
+    def _load_local_index(self, registry: str) -> Dict[str, Any]:
+        """Load the local index snapshot of a registry (once)."""
+        if self.local_index_path is None:
+            return {}
+        if registry not in self._local_indexes:
+            self._local_indexes[registry] = self._read_local_index(self.local_index_path / f'{registry}.json')
+        return self._local_indexes[registry]
+    
+    def _read_local_index(self, path: Path) -> Dict[str, Any]:
+        """Read a snapshot file of package name -> version (or list of versions, latest last)."""
+        if not path.exists():
+            return {}
         try:
-            result = subprocess.run(
-                ['npm', 'view', package_name, 'version'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                return result.stdout.strip()
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
         except Exception as e:
-            logger.debug(f"Could not resolve npm version: {e}")
+            logger.warning(f"Ignoring unreadable version index {path}: {e}")
+            return {}
+    
+    def _load_version_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load the persisted version cache."""
+        if self._version_cache is not None:
+            return self._version_cache
         
-        return None
+        self._version_cache = {}
+        if self.version_cache_path.exists():
+            try:
+                with open(self.version_cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._version_cache = data
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable version cache {self.version_cache_path}: {e}")
+        
+        return self._version_cache
     
-    def _resolve_cargo_version(self, package_name: str) -> Optional[str]:
-        """Resolve latest version from crates.io."""
+    def _save_version_cache(self) -> None:
+        """Persist the version cache."""
+        if self._version_cache is None:
+            return
         try:
-            result = subprocess.run(
-                ['cargo', 'search', package_name, '--limit', '1'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                # Parse: package_name = "version" # description
-                match = re.search(rf'{package_name}\s*=\s*"([^"]+)"', result.stdout)
-                if match:
-                    return match.group(1)
+            self.version_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.version_cache_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._version_cache, f)
+            os.replace(temp_path, self.version_cache_path)
         except Exception as e:
-            logger.debug(f"Could not resolve cargo version: {e}")
+            logger.warning(f"Could not save version cache {self.version_cache_path}: {e}")
+    
+    def _version_query(self, registry: str, package_name: str) -> Tuple[List[str], Optional[Dict[str, str]]]:
+        """Get the command (and environment) that asks a registry for a package's versions."""
+        mirror = self.registry_mirrors.get(registry)
+        env = None
+        
+        if registry == 'pypi':
+            command = ['pip', 'index', 'versions', package_name]
+            if mirror:
+                command += ['--index-url', mirror]
+        elif registry == 'npm':
+            command = ['npm', 'view', package_name, 'version']
+            if mirror:
+                command += ['--registry', mirror]
+        elif registry == 'crates':
+            command = ['cargo', 'search', package_name, '--limit', '1']
+            if mirror:
+                command += ['--index', mirror]
+        else:
+            command = ['go', 'list', '-m', '-versions', package_name]
+            if mirror:
+                env = {**os.environ, 'GOPROXY': mirror}
         
+        return command, env
+    
+    def _parse_version_output(self, registry: str, package_name: str, output: str) -> Optional[str]:
+        """Extract the latest version from a registry command's output."""
+        if registry == 'pypi':
+            match = re.search(r'Available versions: ([^\s,]+)', output)
+            return match.group(1) if match else None
+        elif registry == 'npm':
+            return output.strip() or None
+        elif registry == 'crates':
+            # Parse: package_name = "version" # description
+            match = re.search(rf'{re.escape(package_name)}\s*=\s*"([^"]+)"', output)
+            return match.group(1) if match else None
+        
+        versions = output.strip().split()
+        if len(versions) > 1:
+            return versions[-1]  # Last version is usually the latest
         return None
     
-    def _resolve_go_version(self, package_name: str) -> Optional[str]:
-        """Resolve latest version for Go module."""
+    def _run_version_query(self, registry: str, package_name: str) -> Optional[str]:
+        """Query a registry for the latest version of a package."""
+        command, env = self._version_query(registry, package_name)
         try:
             result = subprocess.run(
-                ['go', 'list', '-m', '-versions', package_name],
+                command,
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=self.resolve_timeout,
+                env=env
             )
             if result.returncode == 0:
-                versions = result.stdout.strip().split()
-                if len(versions) > 1:
-                    return versions[-1]  # Last version is usually the latest
+                return self._parse_version_output(registry, package_name, result.stdout)
         except Exception as e:
-            logger.debug(f"Could not resolve go version: {e}")
+            logger.debug(f"Could not resolve {registry} version of {package_name}: {e}")
         
         return None
     
+    async def _run_version_query_async(
+        self,
+        registry: str,
+        package_name: str,
+        semaphore: asyncio.Semaphore
+    ) -> Optional[str]:
+        """Query a registry without blocking the event loop."""
+        command, env = self._version_query(registry, package_name)
+        async with semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    env=env
+                )
+            except Exception as e:
+                logger.debug(f"Could not resolve {registry} version of {package_name}: {e}")
+                return None
+            
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(), self.resolve_timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                logger.debug(f"Timed out resolving {registry} version of {package_name}")
+                return None
+            
+            if process.returncode != 0:
+                return None
+            return self._parse_version_output(registry, package_name, stdout.decode('utf-8', 'replace'))
+    
+    def _resolve_pip_version(self, package_name: str) -> Optional[str]:
+        """Resolve latest version from PyPI."""
+        return self._run_version_query('pypi', package_name)
+    
+    def _resolve_npm_version(self, package_name: str) -> Optional[str]:
+        """Resolve latest version from npm registry."""
+        return self._run_version_query('npm', package_name)
+    
+    def _resolve_cargo_version(self, package_name: str) -> Optional[str]:
+        """Resolve latest version from crates.io."""
+        return self._run_version_query('crates', package_name)
+    
+    def _resolve_go_version(self, package_name: str) -> Optional[str]:
+        """Resolve latest version for Go module."""
+        return self._run_version_query('go', package_name)
+    
     def detect_conflicts(self) -> List[DependencyConflict]:
         """
         Detect version conflicts in dependencies.
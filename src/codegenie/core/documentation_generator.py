@@ -11,16 +11,25 @@ This module provides comprehensive documentation generation capabilities includi
 """
 
 import ast
+import os
 import re
+import json
+import hashlib
 import logging
-from dataclasses import dataclass, field
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Bump when module analysis changes so persisted incremental results are discarded
+DOC_CACHE_VERSION = 1
+
 
 class DocstringStyle(Enum):
     """Docstring formatting styles."""
@@ -108,6 +117,34 @@ class DocSyncIssue:
     suggestion: Optional[str] = None
 
 
+@dataclass
+class ParsedModule:
+    """Source and syntax tree of a module, shared by all documentation passes."""
+    content: str
+    tree: ast.Module
+    digest: str
+
+
+def _module_doc_from_dict(data: Dict[str, Any]) -> ModuleDoc:
+    """Rebuild a ModuleDoc from its ``asdict`` form."""
+    return ModuleDoc(
+        name=data["name"],
+        description=data["description"],
+        functions=[FunctionDoc(**func) for func in data.get("functions", [])],
+        classes=[
+            ClassDoc(**{**cls, "methods": [FunctionDoc(**method) for method in cls.get("methods", [])]})
+            for cls in data.get("classes", [])
+        ],
+        constants=data.get("constants", []),
+        imports=data.get("imports", []),
+    )
+
+
+def _analyze_module_source(name: str, content: str) -> ModuleDoc:
+    """Analyze module source in a worker process."""
+    return DocumentationGenerator()._analyze_module_content(name, content)
+
+
 class DocumentationGenerator:
     """
     Generates comprehensive documentation for code.
@@ -120,15 +157,38 @@ class DocumentationGenerator:
     - Documentation maintenance
     """
     
-    def __init__(self, docstring_style: DocstringStyle = DocstringStyle.GOOGLE):
+    # Files modified this recently may change again without a new mtime
+    RACY_WINDOW_NS = 1_000_000_000
+    
+    def __init__(
+        self,
+        docstring_style: DocstringStyle = DocstringStyle.GOOGLE,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 16,
+        max_cached_modules: int = 1024
+    ):
         """
         Initialize the Documentation Generator.
         
         Args:
             docstring_style: Style for generated docstrings
+            max_workers: Worker processes for module analysis (defaults to the CPU count)
+            parallel_threshold: Minimum number of modules to analyze in a process pool
+            max_cached_modules: Parsed modules kept in memory, keyed by content hash
         """
         self.docstring_style = docstring_style
         self._cache: Dict[str, Any] = {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.max_cached_modules = max_cached_modules
+        
+        # path -> (mtime_ns, size, digest), to skip rehashing unchanged files
+        self._file_digests: Dict[str, Tuple[int, int, str]] = {}
+        # digest -> parsed module, shared by API docs, sync checks and docstring updates
+        self._parsed_modules: "OrderedDict[str, ParsedModule]" = OrderedDict()
+        # (module name, digest) -> analysis result
+        self._module_docs: "OrderedDict[Tuple[str, str], ModuleDoc]" = OrderedDict()
+        self.analysis_stats = {"parsed": 0, "parse_hits": 0, "analyzed": 0, "reused": 0}
     
     def generate_docstring(
         self,
@@ -609,7 +669,8 @@ class DocumentationGenerator:
     def generate_api_documentation(
         self,
         project_path: Path,
-        output_format: DocumentationFormat = DocumentationFormat.MARKDOWN
+        output_format: DocumentationFormat = DocumentationFormat.MARKDOWN,
+        incremental: bool = False
     ) -> APIDocumentation:
         """
         Generate API documentation for a project.
@@ -617,6 +678,8 @@ class DocumentationGenerator:
         Args:
             project_path: Path to the project root
             output_format: Format for the documentation
+            incremental: Reuse the documentation of modules unchanged since the
+                last incremental run (persisted in ``.codegenie/api_docs_cache.json``)
             
         Returns:
             APIDocumentation object with complete API docs
@@ -626,37 +689,185 @@ class DocumentationGenerator:
             format=output_format
         )
         
-        # Find all Python modules
-        python_files = list(project_path.rglob("*.py"))
+        cache_path = project_path / ".codegenie" / "api_docs_cache.json"
+        if incremental:
+            self._load_doc_cache(cache_path, project_path)
         
-        for py_file in python_files:
-            # Skip test files and __pycache__
-            if "test" in str(py_file) or "__pycache__" in str(py_file):
-                continue
-            
-            try:
-                module_doc = self._analyze_module(py_file)
-                if module_doc.functions or module_doc.classes:
-                    api_doc.modules.append(module_doc)
-            except Exception as e:
-                logger.warning(f"Error analyzing {py_file}: {e}")
-                continue
+        # Find all Python modules, skipping tests
+        python_files = self._get_python_files(project_path)
+        
+        for module_doc in self._analyze_modules(python_files):
+            if module_doc.functions or module_doc.classes:
+                api_doc.modules.append(module_doc)
+        
+        if incremental:
+            self._save_doc_cache(cache_path, project_path, python_files)
         
         # Generate overview
         api_doc.overview = self._generate_api_overview(api_doc.modules)
         
         return api_doc
     
+    def _get_python_files(self, project_path: Path, skip_tests: bool = True) -> List[Path]:
+        """Find the project's Python files in a single walk."""
+        python_files = []
+        for root, dirs, files in os.walk(project_path):
+            dirs[:] = sorted(d for d in dirs if d not in {"__pycache__", ".git", ".codegenie"})
+            for name in sorted(files):
+                if not name.endswith(".py"):
+                    continue
+                path = Path(root) / name
+                # Only look for "test" below the project root, not in the directories above it
+                if skip_tests and "test" in path.relative_to(project_path).as_posix():
+                    continue
+                python_files.append(path)
+        return python_files
+    
+    def _parse_module(self, file_path: Path) -> Optional[ParsedModule]:
+        """
+        Read and parse a module through the shared content-hash cache.
+        
+        Args:
+            file_path: Python file to parse
+            
+        Returns:
+            Parsed module, or None if the file cannot be read or parsed
+        """
+        try:
+            stat = file_path.stat()
+            digest = self._known_digest(file_path, stat)
+            if digest is None:
+                data = file_path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if time.time_ns() - stat.st_mtime_ns >= self.RACY_WINDOW_NS:
+                    self._file_digests[str(file_path)] = (stat.st_mtime_ns, stat.st_size, digest)
+                else:
+                    # Hashed again next time rather than trusting this stat
+                    self._file_digests.pop(str(file_path), None)
+            else:
+                data = None
+        except OSError as e:
+            logger.debug(f"Error reading {file_path}: {e}")
+            return None
+        
+        parsed = self._parsed_modules.get(digest)
+        if parsed is not None:
+            self._parsed_modules.move_to_end(digest)
+            self.analysis_stats["parse_hits"] += 1
+            return parsed
+        
+        try:
+            if data is None:
+                data = file_path.read_bytes()
+            content = data.decode("utf-8")
+            tree = ast.parse(content)
+        except Exception as e:
+            logger.debug(f"Error parsing {file_path}: {e}")
+            return None
+        
+        self.analysis_stats["parsed"] += 1
+        parsed = ParsedModule(content=content, tree=tree, digest=digest)
+        self._parsed_modules[digest] = parsed
+        while len(self._parsed_modules) > self.max_cached_modules:
+            self._parsed_modules.popitem(last=False)
+        return parsed
+    
+    def _known_digest(self, file_path: Path, stat: os.stat_result) -> Optional[str]:
+        """Get the recorded content hash of a file if it has not changed since."""
+        known = self._file_digests.get(str(file_path))
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2]
+        return None
+    
+    def _analyze_modules(self, file_paths: List[Path]) -> List[ModuleDoc]:
+        """
+        Analyze modules, reusing results for unchanged sources.
+        
+        Modules not analyzed before are analyzed in a process pool once there
+        are at least ``parallel_threshold`` of them.
+        
+        Args:
+            file_paths: Python files to analyze
+            
+        Returns:
+            Module documentation in the order of ``file_paths``
+        """
+        results: Dict[int, ModuleDoc] = {}
+        pending: List[Tuple[int, Tuple[str, str], ParsedModule]] = []
+        
+        for index, file_path in enumerate(file_paths):
+            try:
+                digest = self._known_digest(file_path, file_path.stat())
+            except OSError:
+                digest = None
+            key = (file_path.stem, digest)
+            if digest is not None and key in self._module_docs:
+                self._module_docs.move_to_end(key)
+                self.analysis_stats["reused"] += 1
+                results[index] = self._module_docs[key]
+                continue
+            
+            parsed = self._parse_module(file_path)
+            if parsed is None:
+                logger.warning(f"Error analyzing module {file_path}")
+                results[index] = ModuleDoc(name=file_path.stem, description=f"Module {file_path.stem}")
+                continue
+            key = (file_path.stem, parsed.digest)
+            if key in self._module_docs:
+                # Same content as an already analyzed module (e.g. touched but unchanged)
+                self._module_docs.move_to_end(key)
+                self.analysis_stats["reused"] += 1
+                results[index] = self._module_docs[key]
+                continue
+            pending.append((index, (file_path.stem, parsed.digest), parsed))
+        
+        analyzed: List[ModuleDoc] = []
+        if len(pending) >= self.parallel_threshold and self.max_workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    analyzed = list(executor.map(
+                        _analyze_module_source,
+                        [key[0] for _, key, _ in pending],
+                        [parsed.content for _, _, parsed in pending],
+                        chunksize=max(1, len(pending) // (self.max_workers * 4))
+                    ))
+            except Exception as e:
+                logger.warning(f"Parallel module analysis failed, analyzing serially: {e}")
+                analyzed = []
+        if len(analyzed) != len(pending):
+            analyzed = [
+                self._analyze_module_content(key[0], parsed.content, parsed.tree)
+                for _, key, parsed in pending
+            ]
+        
+        for (index, key, _), module_doc in zip(pending, analyzed):
+            self.analysis_stats["analyzed"] += 1
+            self._module_docs[key] = module_doc
+            results[index] = module_doc
+        while len(self._module_docs) > self.max_cached_modules:
+            self._module_docs.popitem(last=False)
+        
+        return [results[index] for index in range(len(file_paths))]
+    
     def _analyze_module(self, file_path: Path) -> ModuleDoc:
         """Analyze a Python module and extract documentation."""
+        return self._analyze_modules([file_path])[0]
+    
+    def _analyze_module_content(
+        self,
+        name: str,
+        content: str,
+        tree: Optional[ast.Module] = None
+    ) -> ModuleDoc:
+        """Extract documentation from module source."""
         module_doc = ModuleDoc(
-            name=file_path.stem,
-            description=f"Module {file_path.stem}"
+            name=name,
+            description=f"Module {name}"
         )
         
         try:
-            content = file_path.read_text()
-            tree = ast.parse(content)
+            if tree is None:
+                tree = ast.parse(content)
             
             # Extract module docstring
             if ast.get_docstring(tree):
@@ -680,10 +891,50 @@ class DocumentationGenerator:
                             })
         
         except Exception as e:
-            logger.warning(f"Error analyzing module {file_path}: {e}")
+            logger.warning(f"Error analyzing module {name}: {e}")
         
         return module_doc
     
+    def _load_doc_cache(self, cache_path: Path, project_path: Path) -> None:
+        """Seed the in-memory caches with the results of the last incremental run."""
+        if not cache_path.exists():
+            return
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != DOC_CACHE_VERSION:
+                return
+            for relative, entry in data.get("modules", {}).items():
+                file_path = project_path / relative
+                self._file_digests[str(file_path)] = (entry["mtime_ns"], entry["size"], entry["digest"])
+                self._module_docs[(file_path.stem, entry["digest"])] = _module_doc_from_dict(entry["doc"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable documentation cache {cache_path}: {e}")
+    
+    def _save_doc_cache(self, cache_path: Path, project_path: Path, file_paths: List[Path]) -> None:
+        """Persist the analysis of the current modules for the next incremental run."""
+        modules = {}
+        for file_path in file_paths:
+            known = self._file_digests.get(str(file_path))
+            module_doc = self._module_docs.get((file_path.stem, known[2])) if known else None
+            if module_doc is None:
+                continue
+            modules[file_path.relative_to(project_path).as_posix()] = {
+                "mtime_ns": known[0],
+                "size": known[1],
+                "digest": known[2],
+                "doc": asdict(module_doc),
+            }
+        
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": DOC_CACHE_VERSION, "modules": modules}, f)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not save documentation cache {cache_path}: {e}")
+    
     def _generate_api_overview(self, modules: List[ModuleDoc]) -> str:
         """Generate overview section for API documentation."""
         lines = [
@@ -1052,15 +1303,13 @@ class DocumentationGenerator:
         """Check if docstrings are in sync with code."""
         issues = []
         
-        python_files = list(project_path.rglob("*.py"))
-        
-        for py_file in python_files:
-            if "__pycache__" in str(py_file) or "test" in str(py_file):
+        for py_file in self._get_python_files(project_path):
+            parsed = self._parse_module(py_file)
+            if parsed is None:
                 continue
             
             try:
-                content = py_file.read_text()
-                tree = ast.parse(content)
+                tree = parsed.tree
                 
                 # Check functions
                 for node in ast.walk(tree):
@@ -1208,15 +1457,14 @@ class DocumentationGenerator:
         """Add missing docstrings to code."""
         count = 0
         
-        python_files = list(project_path.rglob("*.py"))
-        
-        for py_file in python_files:
-            if "__pycache__" in str(py_file) or "test" in str(py_file):
+        for py_file in self._get_python_files(project_path):
+            parsed = self._parse_module(py_file)
+            if parsed is None:
                 continue
             
             try:
-                content = py_file.read_text()
-                tree = ast.parse(content)
+                content = parsed.content
+                tree = parsed.tree
                 
                 modified = False
                 lines = content.split('\n')
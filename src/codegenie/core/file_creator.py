@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
 from ..utils.file_operations import FileOperations
+from .template_engine import TemplateSyntax, get_template_engine
 
 logger = logging.getLogger(__name__)
 
@@ -715,6 +716,37 @@ class FileCreator:
         # Create file with generated content
         return self.create_file(path, content, preview)
     
+    def create_files_from_templates(
+        self,
+        templates: Dict[Union[str, Path], str],
+        context: Optional[Dict[str, Any]] = None,
+        preview: bool = None,
+        force: bool = False
+    ) -> List[FileOperation]:
+        """
+        Render a multi-file template and create every file.
+        
+        Templates use ``{variable}`` placeholders. Each body is compiled once
+        and rendered from the shared cache.
+        
+        Args:
+            templates: Mapping of file path to template content
+            context: Variable values
+            preview: Whether to show preview
+            force: Whether to overwrite existing files
+            
+        Returns:
+            List of FileOperation, in the order of ``templates``
+        """
+        contents = {str(path): content for path, content in templates.items()}
+        rendered = self.content_generator.engine.render_many(
+            contents, context or {}, TemplateSyntax.FORMAT
+        )
+        return [
+            self.create_file(path, content, preview=preview, force=force)
+            for path, content in rendered.items()
+        ]
+    
     def add_template(self, name: str, template: str) -> None:
         """Add a custom template."""
         self.content_generator.add_template(name, template)
@@ -918,6 +950,7 @@ class ContentGenerator:
         """
         self.model_client = model_client
         self.templates = self._load_default_templates()
+        self.engine = get_template_engine()
         
         logger.info("ContentGenerator initialized")
     
@@ -1359,12 +1392,8 @@ module.exports = {{}};
         """Apply a template with context."""
         template = self.templates.get(template_name, '')
         
-        # Simple template variable substitution
-        for key, value in context.items():
-            placeholder = f'{{{key}}}'
-            template = template.replace(placeholder, str(value))
-        
-        return template
+        # Single-pass substitution of {key} placeholders
+        return self.engine.render(template, context, TemplateSyntax.FORMAT)
     
     def add_template(self, name: str, template: str) -> None:
         """
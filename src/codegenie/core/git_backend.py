@@ -0,0 +1,960 @@
+"""
+Long-lived Git backend for fast repository reads.
+
+This module provides an in-process view of a Git repository including:
+- Persistent ``git cat-file --batch`` / ``--batch-check`` processes per repository
+- Direct parsing of refs, packed-refs, the index and loose objects
+- Stat-first working tree status with racy-git protection
+- Unified diffs of the working tree against the index or HEAD
+
+Mutating operations (commit, checkout, ...) are intentionally left to the
+``git`` CLI; this backend only accelerates the read paths that agents hit in
+tight loops.
+"""
+
+import atexit
+import difflib
+import fnmatch
+import hashlib
+import logging
+import os
+import re
+import stat
+import struct
+import subprocess
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class GitBackendError(Exception):
+    """Raised when the backend cannot serve a request."""
+
+
+@dataclass
+class IndexEntry:
+    """A single entry of the Git index (staging area)."""
+    path: str
+    mode: int
+    sha: str
+    size: int
+    mtime_s: int
+    mtime_ns: int
+    ctime_s: int = 0
+    ctime_ns: int = 0
+    stage: int = 0
+    assume_valid: bool = False
+    skip_worktree: bool = False
+
+
+@dataclass
+class GitObject:
+    """A Git object read from the object database."""
+    sha: str
+    type: str
+    size: int
+    data: Optional[bytes] = None
+
+
+@dataclass
+class GitStatus:
+    """Working tree status relative to the index and HEAD."""
+    branch: Optional[str] = None
+    staged: Dict[str, str] = field(default_factory=dict)
+    unstaged: Dict[str, str] = field(default_factory=dict)
+    untracked: List[str] = field(default_factory=list)
+    unmerged: List[str] = field(default_factory=list)
+    # ``core.quotePath``: whether non-ASCII paths are quoted in porcelain output
+    quote_non_ascii: bool = field(default=True, compare=False, repr=False)
+
+    @property
+    def is_clean(self) -> bool:
+        """Whether there are no staged, unstaged, unmerged or untracked changes."""
+        return not (self.staged or self.unstaged or self.untracked or self.unmerged)
+
+    @property
+    def has_uncommitted(self) -> bool:
+        """Whether tracked files differ from HEAD."""
+        return bool(self.staged or self.unstaged or self.unmerged)
+
+    def to_porcelain(self) -> str:
+        """
+        Render the status in ``git status --porcelain`` (v1) format.
+
+        Paths are C-quoted like git quotes them. Unlike git, renames are
+        not detected (they show as a deletion and an addition) and every
+        unmerged path is reported as ``UU``.
+        """
+        def quote(path: str) -> str:
+            return quote_path(path, self.quote_non_ascii)
+
+        lines = []
+        for path in sorted(set(self.staged) | set(self.unstaged)):
+            x = self.staged.get(path, ' ')
+            y = self.unstaged.get(path, ' ')
+            lines.append(f"{x}{y} {quote(path)}")
+        for path in sorted(self.unmerged):
+            lines.append(f"UU {quote(path)}")
+        for path in sorted(self.untracked):
+            lines.append(f"?? {quote(path)}")
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+
+_QUOTE_ESCAPES = {
+    0x07: b'\\a', 0x08: b'\\b', 0x09: b'\\t', 0x0a: b'\\n', 0x0b: b'\\v',
+    0x0c: b'\\f', 0x0d: b'\\r', 0x22: b'\\"', 0x5c: b'\\\\',
+}
+
+
+def quote_path(path: str, quote_non_ascii: bool = True) -> str:
+    """
+    Quote a path the way ``git status --porcelain`` does.
+
+    Paths containing spaces, quotes, backslashes, control characters or
+    (with ``quote_non_ascii``) non-ASCII bytes are wrapped in double quotes
+    with C-style escapes; other paths are returned unchanged.
+    """
+    quoted = bytearray()
+    needs_quotes = False
+    for byte in path.encode('utf-8', errors='surrogateescape'):
+        if byte in _QUOTE_ESCAPES:
+            quoted += _QUOTE_ESCAPES[byte]
+        elif byte < 0x20 or byte == 0x7f or (byte >= 0x80 and quote_non_ascii):
+            quoted += f'\\{byte:03o}'.encode('ascii')
+        else:
+            quoted.append(byte)
+            needs_quotes = needs_quotes or byte == 0x20
+            continue
+        needs_quotes = True
+    if not needs_quotes:
+        return path
+    return '"' + quoted.decode('utf-8', errors='surrogateescape') + '"'
+
+
+class _CatFileProcess:
+    """A persistent ``git cat-file --batch`` or ``--batch-check`` process."""
+
+    def __init__(self, git_dir: Path, with_content: bool):
+        self.git_dir = git_dir
+        self.with_content = with_content
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+
+    def _start(self) -> subprocess.Popen:
+        mode = '--batch' if self.with_content else '--batch-check'
+        try:
+            return subprocess.Popen(
+                ['git', '--git-dir', str(self.git_dir), 'cat-file', mode],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise GitBackendError(f"Cannot start git cat-file: {e}") from e
+
+    def query(self, name: str) -> Optional[GitObject]:
+        """
+        Look up an object by SHA or revision expression.
+
+        Args:
+            name: Object name understood by ``git cat-file`` (e.g. ``HEAD:README``)
+
+        Returns:
+            GitObject, or None if the object does not exist
+        """
+        if '\n' in name:
+            raise GitBackendError("Object names cannot contain newlines")
+
+        with self._lock:
+            for attempt in range(2):
+                if self._process is None or self._process.poll() is not None:
+                    self._process = self._start()
+                try:
+                    return self._query_locked(name)
+                except (BrokenPipeError, OSError, ValueError) as e:
+                    self._kill_locked()
+                    if attempt:
+                        raise GitBackendError(f"git cat-file failed: {e}") from e
+        return None
+
+    def _query_locked(self, name: str) -> Optional[GitObject]:
+        process = self._process
+        process.stdin.write(name.encode('utf-8') + b'\n')
+        process.stdin.flush()
+
+        header = process.stdout.readline()
+        if not header:
+            raise ValueError("unexpected end of output")
+        parts = header.decode('utf-8', errors='replace').split()
+        if len(parts) < 3 or parts[-1] == 'missing':
+            return None
+
+        sha, obj_type, size = parts[0], parts[1], int(parts[2])
+        data = None
+        if self.with_content:
+            data = process.stdout.read(size)
+            process.stdout.read(1)  # trailing newline
+        return GitObject(sha=sha, type=obj_type, size=size, data=data)
+
+    def _kill_locked(self) -> None:
+        if self._process is not None:
+            try:
+                self._process.kill()
+                self._process.wait()
+            except OSError:
+                pass
+            self._process = None
+
+    def close(self) -> None:
+        """Terminate the underlying process."""
+        with self._lock:
+            if self._process is not None:
+                try:
+                    self._process.stdin.close()
+                    self._process.wait(timeout=2)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill_locked()
+
+
+def _xdg_config_dir() -> Path:
+    """Directory of git's XDG config and ignore files."""
+    base = os.environ.get('XDG_CONFIG_HOME')
+    return (Path(base) if base else Path.home() / '.config') / 'git'
+
+
+class _IgnoreRules:
+    """Minimal ``.gitignore`` matcher used for untracked file discovery."""
+
+    def __init__(self):
+        # (base directory, compiled regex, negated, directory only, basename only)
+        self.rules: List[Tuple[str, re.Pattern, bool, bool, bool]] = []
+
+    def load(self, file_path: Path, base: str) -> None:
+        """Add the patterns of an ignore file rooted at ``base``."""
+        try:
+            content = file_path.read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return
+
+        for raw in content.splitlines():
+            line = raw.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            if line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            regex = re.compile(self._translate(line))
+            self.rules.append((base, regex, negate, dir_only, not anchored))
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+                parts.append('/.*')
+                i += 3
+            elif pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            elif pattern[i] == '[':
+                end = pattern.find(']', i + 1)
+                if end == -1:
+                    parts.append(re.escape(pattern[i]))
+                    i += 1
+                else:
+                    parts.append(fnmatch.translate(pattern[i:end + 1])[4:-3])
+                    i = end + 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return '^' + ''.join(parts) + '$'
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether a worktree-relative path is ignored (last matching rule wins)."""
+        ignored = False
+        basename = rel_path.rsplit('/', 1)[-1]
+        for base, regex, negate, dir_only, basename_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + '/'):
+                    continue
+                candidate = rel_path[len(base) + 1:]
+            else:
+                candidate = rel_path
+            if regex.match(basename if basename_only else candidate):
+                ignored = not negate
+        return ignored
+
+
+class GitBackend:
+    """
+    In-process reader for a single Git repository.
+
+    Refs, the index and loose objects are parsed directly from ``.git``;
+    packed objects are served by persistent ``git cat-file`` processes so no
+    fork+exec happens per read.
+    """
+
+    _BINARY_PROBE = 8000
+
+    def __init__(self, work_tree: Path, git_dir: Optional[Path] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            work_tree: Repository working tree
+            git_dir: Git directory (discovered from ``work_tree`` when omitted)
+        """
+        self.work_tree = Path(work_tree).resolve()
+        self.git_dir = git_dir or self._discover_git_dir(self.work_tree)
+        self.common_dir = self._discover_common_dir(self.git_dir)
+
+        config = self._read_config()
+        object_format = config.get(('extensions', None, 'objectformat'), 'sha1')
+        if object_format not in ('sha1', 'sha256'):
+            raise GitBackendError(f"Unsupported object format: {object_format}")
+        self._hash_name = object_format
+        self._hash_len = 20 if object_format == 'sha1' else 32
+        self._config = config
+
+        self._batch = _CatFileProcess(self.git_dir, with_content=True)
+        self._batch_check = _CatFileProcess(self.git_dir, with_content=False)
+
+        # The caches below are shared by the executor threads reading through this backend
+        self._cache_lock = threading.Lock()
+        self._index_cache: Optional[Tuple[Tuple[int, int], List[IndexEntry]]] = None
+        self._packed_refs_cache: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
+        self._tree_cache: 'OrderedDict[str, Dict[str, Tuple[int, str]]]' = OrderedDict()
+        self._tree_cache_size = 16
+
+    @staticmethod
+    def _discover_git_dir(work_tree: Path) -> Path:
+        dot_git = work_tree / '.git'
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            content = dot_git.read_text(encoding='utf-8').strip()
+            if content.startswith('gitdir:'):
+                git_dir = Path(content[len('gitdir:'):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = (work_tree / git_dir).resolve()
+                return git_dir
+        raise GitBackendError(f"Not a git repository: {work_tree}")
+
+    @staticmethod
+    def _discover_common_dir(git_dir: Path) -> Path:
+        commondir_file = git_dir / 'commondir'
+        if commondir_file.exists():
+            common = Path(commondir_file.read_text(encoding='utf-8').strip())
+            return common if common.is_absolute() else (git_dir / common).resolve()
+        return git_dir
+
+    def _read_config(self) -> Dict[Tuple[str, Optional[str], str], str]:
+        """
+        Read the user and repository config into ``{(section, subsection, key): value}``.
+
+        Repository settings override user settings; the system config and
+        includes are not read.
+        """
+        values: Dict[Tuple[str, Optional[str], str], str] = {}
+        for config_file in (_xdg_config_dir() / 'config', Path.home() / '.gitconfig', self.common_dir / 'config'):
+            values.update(self._parse_config(config_file))
+        return values
+
+    @staticmethod
+    def _parse_config(config_file: Path) -> Dict[Tuple[str, Optional[str], str], str]:
+        """Parse one config file into ``{(section, subsection, key): value}``."""
+        values: Dict[Tuple[str, Optional[str], str], str] = {}
+        try:
+            content = config_file.read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return values
+
+        section: Optional[str] = None
+        subsection: Optional[str] = None
+        for raw in content.splitlines():
+            line = raw.strip()
+            if not line or line[0] in '#;':
+                continue
+            header = re.match(r'^\[\s*([\w.-]+)(?:\s+"(.*)")?\s*\]$', line)
+            if header:
+                section = header.group(1).lower()
+                subsection = header.group(2)
+                continue
+            if section is None:
+                continue
+            key, _, value = line.partition('=')
+            values[(section, subsection, key.strip().lower())] = value.strip().strip('"')
+        return values
+
+    # ------------------------------------------------------------------ refs
+
+    def _packed_refs(self) -> Dict[str, str]:
+        packed_file = self.common_dir / 'packed-refs'
+        try:
+            st = packed_file.stat()
+        except OSError:
+            return {}
+
+        key = (st.st_mtime_ns, st.st_size)
+        with self._cache_lock:
+            cached = self._packed_refs_cache
+        if cached and cached[0] == key:
+            return cached[1]
+
+        refs: Dict[str, str] = {}
+        for line in packed_file.read_text(encoding='utf-8').splitlines():
+            if not line or line[0] in '#^':
+                continue
+            sha, _, name = line.partition(' ')
+            refs[name.strip()] = sha
+        with self._cache_lock:
+            self._packed_refs_cache = (key, refs)
+        return refs
+
+    def _read_ref_file(self, name: str) -> Optional[str]:
+        # Per-worktree refs (HEAD) live in git_dir, shared refs in common_dir
+        for base in (self.git_dir, self.common_dir):
+            ref_file = base / name
+            if ref_file.is_file():
+                try:
+                    return ref_file.read_text(encoding='utf-8').strip()
+                except OSError:
+                    return None
+        return None
+
+    def resolve_ref(self, name: str = 'HEAD', max_depth: int = 10) -> Optional[str]:
+        """
+        Resolve a ref (e.g. ``HEAD``, ``refs/heads/main``) to an object SHA.
+
+        Args:
+            name: Fully qualified ref name
+            max_depth: Maximum number of symbolic refs to follow
+
+        Returns:
+            Object SHA, or None for unborn or missing refs
+        """
+        for _ in range(max_depth):
+            content = self._read_ref_file(name)
+            if content is None:
+                return self._packed_refs().get(name)
+            if content.startswith('ref:'):
+                name = content[4:].strip()
+                continue
+            return content
+        raise GitBackendError(f"Symbolic ref loop while resolving {name}")
+
+    def current_branch(self) -> Optional[str]:
+        """Return the checked out branch name, or None when HEAD is detached."""
+        content = self._read_ref_file('HEAD')
+        if content and content.startswith('ref: refs/heads/'):
+            return content[len('ref: refs/heads/'):]
+        return None
+
+    def list_branches(self) -> Dict[str, str]:
+        """Return local branches as ``{name: sha}``."""
+        branches = {
+            name[len('refs/heads/'):]: sha
+            for name, sha in self._packed_refs().items()
+            if name.startswith('refs/heads/')
+        }
+        heads_dir = self.common_dir / 'refs' / 'heads'
+        if heads_dir.is_dir():
+            for root, _, files in os.walk(heads_dir):
+                for filename in files:
+                    ref_path = Path(root) / filename
+                    name = ref_path.relative_to(heads_dir).as_posix()
+                    try:
+                        branches[name] = ref_path.read_text(encoding='utf-8').strip()
+                    except OSError:
+                        continue
+        return branches
+
+    def remote_url(self, remote: str = 'origin') -> Optional[str]:
+        """Return the configured URL of a remote."""
+        return self._config.get(('remote', remote, 'url'))
+
+    # --------------------------------------------------------------- objects
+
+    def _read_loose_object(self, sha: str) -> Optional[GitObject]:
+        object_file = self.common_dir / 'objects' / sha[:2] / sha[2:]
+        try:
+            raw = zlib.decompress(object_file.read_bytes())
+        except (OSError, zlib.error):
+            return None
+        header, _, data = raw.partition(b'\0')
+        obj_type, _, size = header.decode('ascii').partition(' ')
+        return GitObject(sha=sha, type=obj_type, size=int(size), data=data)
+
+    def read_object(self, name: str) -> Optional[GitObject]:
+        """
+        Read an object with its content.
+
+        Loose objects are decompressed in-process; everything else goes
+        through the persistent ``cat-file --batch`` process.
+
+        Args:
+            name: Object SHA or revision expression
+
+        Returns:
+            GitObject, or None if the object does not exist
+        """
+        if re.fullmatch(r'[0-9a-f]{40}|[0-9a-f]{64}', name):
+            obj = self._read_loose_object(name)
+            if obj is not None:
+                return obj
+        return self._batch.query(name)
+
+    def object_info(self, name: str) -> Optional[GitObject]:
+        """Return the type and size of an object without reading its content."""
+        return self._batch_check.query(name)
+
+    def read_blob(self, path: str, revision: Optional[str] = 'HEAD') -> Optional[bytes]:
+        """
+        Read file content from a revision or from the index.
+
+        Args:
+            path: Worktree-relative path using forward slashes
+            revision: Revision to read from, or None to read the staged version
+
+        Returns:
+            Blob content, or None if the path does not exist there
+        """
+        if revision is None:
+            for entry in self.read_index():
+                if entry.path == path and entry.stage == 0:
+                    obj = self.read_object(entry.sha)
+                    return obj.data if obj else None
+            return None
+
+        sha = self.resolve_ref(revision) if revision == 'HEAD' else None
+        tree = self.read_commit_tree(sha) if sha else None
+        if tree is not None:
+            item = tree.get(path)
+            if item is None:
+                return None
+            obj = self.read_object(item[1])
+            return obj.data if obj else None
+
+        obj = self.read_object(f"{revision}:{path}")
+        return obj.data if obj and obj.type == 'blob' else None
+
+    def read_commit_tree(self, commit_sha: str) -> Dict[str, Tuple[int, str]]:
+        """
+        Return the flattened tree of a commit as ``{path: (mode, sha)}``.
+
+        Trees are immutable, so flattened results are cached by tree SHA.
+        """
+        commit = self.read_object(commit_sha)
+        if commit is None or commit.type != 'commit':
+            raise GitBackendError(f"Not a commit: {commit_sha}")
+        first_line = commit.data.split(b'\n', 1)[0].decode('ascii')
+        if not first_line.startswith('tree '):
+            raise GitBackendError(f"Malformed commit: {commit_sha}")
+        tree_sha = first_line[5:].strip()
+
+        with self._cache_lock:
+            cached = self._tree_cache.get(tree_sha)
+            if cached is not None:
+                self._tree_cache.move_to_end(tree_sha)
+                return cached
+
+        flattened: Dict[str, Tuple[int, str]] = {}
+        self._flatten_tree(tree_sha, '', flattened)
+        with self._cache_lock:
+            self._tree_cache[tree_sha] = flattened
+            if len(self._tree_cache) > self._tree_cache_size:
+                self._tree_cache.popitem(last=False)
+        return flattened
+
+    def _flatten_tree(self, tree_sha: str, prefix: str, out: Dict[str, Tuple[int, str]]) -> None:
+        tree = self.read_object(tree_sha)
+        if tree is None or tree.type != 'tree':
+            raise GitBackendError(f"Not a tree: {tree_sha}")
+        data = tree.data
+        pos = 0
+        while pos < len(data):
+            space = data.index(b' ', pos)
+            nul = data.index(b'\0', space)
+            mode = int(data[pos:space], 8)
+            name = data[space + 1:nul].decode('utf-8', errors='surrogateescape')
+            sha = data[nul + 1:nul + 1 + self._hash_len].hex()
+            pos = nul + 1 + self._hash_len
+            path = f"{prefix}{name}"
+            if mode == 0o40000:
+                self._flatten_tree(sha, path + '/', out)
+            else:
+                out[path] = (mode, sha)
+
+    # ----------------------------------------------------------------- index
+
+    def read_index(self) -> List[IndexEntry]:
+        """
+        Parse the index file (versions 2, 3 and 4).
+
+        The parsed entries are cached until the index file changes.
+        """
+        index_file = self.git_dir / 'index'
+        try:
+            st = index_file.stat()
+        except OSError:
+            return []
+
+        key = (st.st_mtime_ns, st.st_size)
+        with self._cache_lock:
+            cached = self._index_cache
+        if cached and cached[0] == key:
+            return cached[1]
+
+        entries = self._parse_index(index_file.read_bytes())
+        with self._cache_lock:
+            self._index_cache = (key, entries)
+        return entries
+
+    def _parse_index(self, data: bytes) -> List[IndexEntry]:
+        if data[:4] != b'DIRC':
+            raise GitBackendError("Invalid index signature")
+        version, count = struct.unpack('>II', data[4:12])
+        if version not in (2, 3, 4):
+            raise GitBackendError(f"Unsupported index version: {version}")
+
+        entries: List[IndexEntry] = []
+        pos = 12
+        previous_path = b''
+        fixed = struct.Struct('>10I')
+        for _ in range(count):
+            start = pos
+            (ctime_s, ctime_ns, mtime_s, mtime_ns, _, _, mode, _, _, size) = fixed.unpack_from(data, pos)
+            pos += fixed.size
+            sha = data[pos:pos + self._hash_len].hex()
+            pos += self._hash_len
+            flags, = struct.unpack_from('>H', data, pos)
+            pos += 2
+            extended_flags = 0
+            if version >= 3 and flags & 0x4000:
+                extended_flags, = struct.unpack_from('>H', data, pos)
+                pos += 2
+
+            if version == 4:
+                strip, pos = self._read_varint(data, pos)
+                nul = data.index(b'\0', pos)
+                path = previous_path[:len(previous_path) - strip] + data[pos:nul]
+                pos = nul + 1
+            else:
+                nul = data.index(b'\0', pos)
+                path = data[pos:nul]
+                # Entries are NUL-padded to a multiple of eight bytes
+                pos = start + ((nul - start + 8) // 8) * 8
+            previous_path = path
+
+            entries.append(IndexEntry(
+                path=path.decode('utf-8', errors='surrogateescape'),
+                mode=mode,
+                sha=sha,
+                size=size,
+                mtime_s=mtime_s,
+                mtime_ns=mtime_ns,
+                ctime_s=ctime_s,
+                ctime_ns=ctime_ns,
+                stage=(flags >> 12) & 0x3,
+                assume_valid=bool(flags & 0x8000),
+                skip_worktree=bool(extended_flags & 0x4000),
+            ))
+        return entries
+
+    @staticmethod
+    def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+        """Decode the offset-encoded varint used by index v4."""
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value = ((value + 1) << 7) | (byte & 0x7F)
+        return value, pos
+
+    # ---------------------------------------------------------------- status
+
+    def hash_blob(self, content: bytes) -> str:
+        """Compute the Git blob id of some content."""
+        digest = hashlib.new(self._hash_name)
+        digest.update(b'blob %d\0' % len(content))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _worktree_content(self, path: str, mode: int) -> bytes:
+        full_path = self.work_tree / path
+        if stat.S_ISLNK(mode):
+            return os.fsencode(os.readlink(full_path))
+        return full_path.read_bytes()
+
+    @staticmethod
+    def _same_time(stat_ns: int, index_s: int, index_ns: int) -> bool:
+        if index_ns == 0:
+            return stat_ns // 1_000_000_000 == index_s
+        return stat_ns == index_s * 1_000_000_000 + index_ns
+
+    def _worktree_state(self, entry: IndexEntry, index_mtime_ns: int) -> Optional[str]:
+        """Return ``'M'``/``'D'`` if the worktree differs from the index entry."""
+        if entry.assume_valid or entry.skip_worktree or entry.mode == 0o160000:
+            return None
+
+        full_path = self.work_tree / entry.path
+        try:
+            st = full_path.lstat()
+        except OSError:
+            return 'D'
+
+        if stat.S_ISLNK(entry.mode) != stat.S_ISLNK(st.st_mode):
+            return 'M'
+        if not stat.S_ISLNK(entry.mode):
+            if not stat.S_ISREG(st.st_mode):
+                return 'D'
+            if bool(entry.mode & 0o100) != bool(st.st_mode & stat.S_IXUSR):
+                return 'M'
+
+        entry_mtime_ns = entry.mtime_s * 1_000_000_000 + entry.mtime_ns
+        same_stat = (
+            self._same_time(st.st_mtime_ns, entry.mtime_s, entry.mtime_ns)
+            and self._same_time(st.st_ctime_ns, entry.ctime_s, entry.ctime_ns)
+        )
+        if (st.st_size & 0xFFFFFFFF) == entry.size and same_stat:
+            # Racy git: a file modified in the same tick the index was written
+            # may look clean by stat alone, so hash it to be sure.
+            if entry_mtime_ns < index_mtime_ns:
+                return None
+        elif (st.st_size & 0xFFFFFFFF) != entry.size and not stat.S_ISLNK(st.st_mode):
+            return 'M'
+
+        try:
+            content = self._worktree_content(entry.path, entry.mode)
+        except OSError:
+            return 'D'
+        return None if self.hash_blob(content) == entry.sha else 'M'
+
+    def status(self, include_untracked: bool = True) -> GitStatus:
+        """
+        Compute the repository status without spawning ``git status``.
+
+        Args:
+            include_untracked: Whether to walk the worktree for untracked files
+
+        Returns:
+            GitStatus with staged, unstaged, unmerged and untracked paths
+        """
+        quote_setting = self._config.get(('core', None, 'quotepath'), 'true')
+        result = GitStatus(
+            branch=self.current_branch(),
+            quote_non_ascii=quote_setting.lower() not in ('false', 'no', 'off', '0')
+        )
+        entries = self.read_index()
+        try:
+            index_mtime_ns = (self.git_dir / 'index').stat().st_mtime_ns
+        except OSError:
+            index_mtime_ns = 0
+
+        head_sha = self.resolve_ref('HEAD')
+        head_tree = self.read_commit_tree(head_sha) if head_sha else {}
+
+        tracked = set()
+        for entry in entries:
+            tracked.add(entry.path)
+            if entry.stage:
+                if entry.path not in result.unmerged:
+                    result.unmerged.append(entry.path)
+                continue
+
+            head_item = head_tree.get(entry.path)
+            if head_item is None:
+                result.staged[entry.path] = 'A'
+            elif head_item[1] != entry.sha or head_item[0] != entry.mode:
+                result.staged[entry.path] = 'M'
+
+            worktree_state = self._worktree_state(entry, index_mtime_ns)
+            if worktree_state:
+                result.unstaged[entry.path] = worktree_state
+
+        for path in head_tree:
+            if path not in tracked:
+                result.staged[path] = 'D'
+
+        if include_untracked:
+            result.untracked = list(self._iter_untracked(tracked))
+        return result
+
+    def _iter_untracked(self, tracked: set) -> Iterator[str]:
+        tracked_dirs = set()
+        for path in tracked:
+            parts = path.split('/')[:-1]
+            for i in range(1, len(parts) + 1):
+                tracked_dirs.add('/'.join(parts[:i]))
+
+        # Lowest precedence first: the last matching rule wins
+        rules = _IgnoreRules()
+        excludes_file = self._config.get(('core', None, 'excludesfile'))
+        if excludes_file:
+            rules.load(self.work_tree / Path(excludes_file).expanduser(), '')
+        else:
+            rules.load(_xdg_config_dir() / 'ignore', '')
+        rules.load(self.common_dir / 'info' / 'exclude', '')
+
+        for root, dirs, files in os.walk(self.work_tree):
+            rel_root = Path(root).relative_to(self.work_tree).as_posix()
+            rel_root = '' if rel_root == '.' else rel_root
+            if '.gitignore' in files:
+                rules.load(Path(root) / '.gitignore', rel_root)
+
+            kept_dirs = []
+            for name in sorted(dirs):
+                if name == '.git':
+                    continue
+                rel_path = f"{rel_root}/{name}" if rel_root else name
+                if rel_path in tracked_dirs or not rules.is_ignored(rel_path, True):
+                    kept_dirs.append(name)
+            dirs[:] = kept_dirs
+
+            for name in sorted(files):
+                rel_path = f"{rel_root}/{name}" if rel_root else name
+                if rel_path not in tracked and not rules.is_ignored(rel_path, False):
+                    yield rel_path
+
+    # ------------------------------------------------------------------ diff
+
+    def diff(self, paths: Optional[List[str]] = None, cached: bool = False) -> str:
+        """
+        Produce a unified diff without spawning ``git diff``.
+
+        Args:
+            paths: Restrict the diff to these worktree-relative paths
+            cached: Diff the index against HEAD instead of the worktree against the index
+
+        Returns:
+            Unified diff text
+        """
+        wanted = set(paths) if paths else None
+        status = self.status(include_untracked=False)
+        changes = status.staged if cached else status.unstaged
+
+        output = []
+        for path in sorted(changes):
+            if wanted is not None and path not in wanted:
+                continue
+            change = changes[path]
+            if cached:
+                old = self.read_blob(path, 'HEAD') if change != 'A' else None
+                new = self.read_blob(path, None) if change != 'D' else None
+            else:
+                old = self.read_blob(path, None)
+                new = None
+                if change != 'D':
+                    entry_mode = next(
+                        (e.mode for e in self.read_index() if e.path == path), 0o100644
+                    )
+                    new = self._worktree_content(path, entry_mode)
+            output.append(self._format_diff(path, old, new))
+        return ''.join(output)
+
+    def _format_diff(self, path: str, old: Optional[bytes], new: Optional[bytes]) -> str:
+        header = f"diff --git a/{path} b/{path}\n"
+        from_file = f"a/{path}" if old is not None else '/dev/null'
+        to_file = f"b/{path}" if new is not None else '/dev/null'
+        old = old or b''
+        new = new or b''
+
+        if b'\0' in old[:self._BINARY_PROBE] or b'\0' in new[:self._BINARY_PROBE]:
+            return header + f"Binary files {from_file} and {to_file} differ\n"
+
+        old_lines = old.decode('utf-8', errors='replace').splitlines(keepends=True)
+        new_lines = new.decode('utf-8', errors='replace').splitlines(keepends=True)
+        lines = []
+        for line in difflib.unified_diff(old_lines, new_lines, from_file, to_file):
+            if not line.endswith('\n'):
+                line += '\n\\ No newline at end of file\n'
+            lines.append(line)
+        return header + ''.join(lines)
+
+    def close(self) -> None:
+        """Terminate the persistent cat-file processes."""
+        self._batch.close()
+        self._batch_check.close()
+
+
+_backends: Dict[Path, GitBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def find_work_tree(path: Path) -> Optional[Path]:
+    """Return the working tree containing ``path``, or None."""
+    current = Path(path).resolve()
+    if current.is_file():
+        current = current.parent
+    for candidate in (current, *current.parents):
+        if (candidate / '.git').exists():
+            return candidate
+    return None
+
+
+def get_git_backend(path: Optional[Path] = None) -> Optional[GitBackend]:
+    """
+    Return the shared backend for the repository containing ``path``.
+
+    Backends (and their cat-file processes) are kept alive per repository
+    for the lifetime of the process.
+
+    Args:
+        path: Any path inside the repository (defaults to the current directory)
+
+    Returns:
+        GitBackend, or None if ``path`` is not inside a usable repository
+    """
+    work_tree = find_work_tree(path or Path.cwd())
+    if work_tree is None:
+        return None
+
+    with _backends_lock:
+        backend = _backends.get(work_tree)
+        if backend is None:
+            try:
+                backend = GitBackend(work_tree)
+            except (GitBackendError, OSError) as e:
+                logger.debug(f"Git backend unavailable for {work_tree}: {e}")
+                return None
+            _backends[work_tree] = backend
+        return backend
+
+
+def close_all_backends() -> None:
+    """Close every shared backend."""
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
+
+
+atexit.register(close_all_backends)
@@ -0,0 +1,195 @@
+"""
+Interval tree for line-range overlap queries.
+
+This module provides a balanced interval index including:
+- Closed integer intervals carrying an arbitrary value
+- O(log n) insertion and removal (treap with random priorities)
+- Overlap queries in O(log n + k) using subtree max-end augmentation
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class _Node:
+    """Treap node ordered by (start, end, sequence)."""
+    start: int
+    end: int
+    value: Any
+    key: Tuple[int, int, int]
+    priority: float
+    max_end: int
+    left: Optional['_Node'] = None
+    right: Optional['_Node'] = None
+
+
+def _update(node: _Node) -> None:
+    node.max_end = node.end
+    if node.left is not None and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+
+
+def _split(node: Optional[_Node], key: Tuple[int, int, int]) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into nodes with keys < key and >= key."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        _update(node)
+        return node, right
+    left, node.left = _split(node.left, key)
+    _update(node)
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """Merge two treaps where every key in ``left`` is below every key in ``right``."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class IntervalTree:
+    """
+    Set of closed intervals ``[start, end]`` with attached values.
+
+    The same interval may be stored several times with different values.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize an empty tree.
+
+        Args:
+            seed: Seed for node priorities (for reproducible shapes)
+        """
+        self._root: Optional[_Node] = None
+        self._size = 0
+        self._sequence = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Tuple[int, int, Any]]:
+        """Iterate over ``(start, end, value)`` in start order."""
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.start, node.end, node.value
+            node = node.right
+
+    def add(self, start: int, end: int, value: Any = None) -> None:
+        """
+        Insert an interval.
+
+        Args:
+            start: First point of the interval
+            end: Last point of the interval (inclusive)
+            value: Value attached to the interval
+        """
+        if end < start:
+            raise ValueError(f"Invalid interval [{start}, {end}]")
+        self._sequence += 1
+        key = (start, end, self._sequence)
+        node = _Node(start, end, value, key, self._random.random(), end)
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, node), right)
+        self._size += 1
+
+    def remove(self, start: int, end: int, value: Any = None) -> bool:
+        """
+        Remove one interval equal to ``[start, end]`` holding ``value``.
+
+        Returns:
+            True if an interval was removed
+        """
+        # Sequences are positive, so these bounds enclose exactly the copies
+        # of [start, end]; ``end + 1`` would not for an unbounded end
+        left, rest = _split(self._root, (start, end, 0))
+        middle, right = _split(rest, (start, end, float('inf')))
+
+        # middle holds every copy of [start, end]; drop the first matching one
+        kept = [n for n in self._nodes(middle)]
+        removed = False
+        rebuilt: Optional[_Node] = None
+        for node in kept:
+            if not removed and node.value == value:
+                removed = True
+                continue
+            node.left = node.right = None
+            node.max_end = node.end
+            rebuilt = _merge(rebuilt, node)
+
+        self._root = _merge(_merge(left, rebuilt), right)
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlap(self, start: int, end: int) -> List[Tuple[int, int, Any]]:
+        """
+        Find intervals overlapping ``[start, end]``.
+
+        Returns:
+            List of ``(start, end, value)`` in start order
+        """
+        results: List[Tuple[int, int, Any]] = []
+        self._collect(self._root, start, end, results)
+        return results
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Check whether any interval overlaps ``[start, end]``."""
+        node = self._root
+        while node is not None:
+            if node.start <= end and start <= node.end:
+                return True
+            if node.left is not None and node.left.max_end >= start:
+                node = node.left
+            elif node.start <= end:
+                node = node.right
+            else:
+                return False
+        return False
+
+    def clear(self) -> None:
+        """Remove all intervals."""
+        self._root = None
+        self._size = 0
+
+    def _collect(self, node: Optional[_Node], start: int, end: int, results: List[Tuple[int, int, Any]]) -> None:
+        while node is not None and node.max_end >= start:
+            self._collect(node.left, start, end, results)
+            if node.start > end:
+                return
+            if start <= node.end:
+                results.append((node.start, node.end, node.value))
+            node = node.right
+
+    @staticmethod
+    def _nodes(node: Optional[_Node]) -> List[_Node]:
+        nodes: List[_Node] = []
+        stack: List[_Node] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            nodes.append(node)
+            node = node.right
+        return nodes
@@ -5,12 +5,14 @@ Learning engine for user preference modeling and adaptive behavior.
 import json
 import logging
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
+from .preference_store import PreferenceStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -106,19 +108,42 @@ class Recommendation:
 
 
 class UserPreferenceModeler:
-    """Models user preferences based on interactions and feedback."""
+    """Models user preferences based on interactions and feedback.
+    
+    Preferences and coding patterns are stored one record per row in a
+    ``PreferenceStore``; a learning event upserts only the records it
+    changed. Preferences are also indexed by domain and key, with the
+    confident ones kept as a ready-made view per domain, and every domain
+    (and the coding style) has a version that changes whenever its
+    recommendation-relevant data (values and confidences) changes.
+    """
+    
+    # Minimum confidence for a preference or pattern to be reported
+    VIEW_CONFIDENCE = 0.3
+    LEGACY_IMPORTED = "legacy_json_imported"
     
     def __init__(self, storage_path: Path):
         self.storage_path = storage_path
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
+        # Files written by earlier versions; imported into the store once
         self.preferences_file = self.storage_path / "user_preferences.json"
         self.coding_patterns_file = self.storage_path / "coding_patterns.json"
+        self.store = PreferenceStore(self.storage_path / "preferences.db")
         
         # In-memory data
         self.preferences: Dict[str, UserPreference] = {}
         self.coding_patterns: Dict[str, CodingStylePattern] = {}
         
+        # (domain, preference key) -> preference, and the per-domain view of confident ones
+        self._preference_index: Dict[Tuple[LearningDomain, str], UserPreference] = {}
+        self._domain_views: Dict[LearningDomain, Dict[str, Dict[str, Any]]] = {
+            domain: {} for domain in LearningDomain
+        }
+        self._coding_style_view: Dict[str, Dict[str, Any]] = {}
+        self.domain_versions: Dict[LearningDomain, int] = {domain: 0 for domain in LearningDomain}
+        self.coding_style_version = 0
+        
         # Load existing data
         self._load_data()
         
@@ -127,48 +152,128 @@ class UserPreferenceModeler:
     def _load_data(self) -> None:
         """Load preferences and patterns from storage."""
         try:
-            # Load preferences
-            if self.preferences_file.exists():
-                with open(self.preferences_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for pref_data in data:
-                        pref = self._deserialize_preference(pref_data)
-                        self.preferences[pref.id] = pref
+            if self.store.get_meta(self.LEGACY_IMPORTED) is None:
+                self._import_legacy_files()
+            
+            for pref_data in self.store.load_preferences():
+                pref = self._deserialize_preference(pref_data)
+                self.preferences[pref.id] = pref
+                self._index_preference(pref)
             
-            # Load coding patterns
-            if self.coding_patterns_file.exists():
-                with open(self.coding_patterns_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for pattern_data in data:
-                        pattern = self._deserialize_coding_pattern(pattern_data)
-                        self.coding_patterns[pattern.pattern_type] = pattern
+            for pattern_data in self.store.load_coding_patterns():
+                pattern = self._deserialize_coding_pattern(pattern_data)
+                self.coding_patterns[pattern.pattern_type] = pattern
+                self._index_coding_pattern(pattern)
             
             logger.info(f"Loaded {len(self.preferences)} preferences and {len(self.coding_patterns)} coding patterns")
             
         except Exception as e:
             logger.error(f"Error loading preference data: {e}")
     
+    def _import_legacy_files(self) -> None:
+        """Move data of the old JSON files into the store."""
+        preferences, patterns = [], []
+        if self.preferences_file.exists():
+            with open(self.preferences_file, 'r', encoding='utf-8') as f:
+                preferences = json.load(f)
+        if self.coding_patterns_file.exists():
+            with open(self.coding_patterns_file, 'r', encoding='utf-8') as f:
+                patterns = json.load(f)
+        
+        self.store.upsert(preferences, patterns)
+        self.store.set_meta(self.LEGACY_IMPORTED, str(time.time()))
+        if preferences or patterns:
+            logger.info(f"Imported {len(preferences)} preferences and {len(patterns)} coding patterns from JSON files")
+    
     def _save_data(self) -> None:
-        """Save preferences and patterns to storage."""
+        """Save all preferences and patterns to storage."""
         try:
-            # Save preferences
-            pref_data = [self._serialize_preference(pref) for pref in self.preferences.values()]
-            with open(self.preferences_file, 'w', encoding='utf-8') as f:
-                json.dump(pref_data, f, indent=2)
-            
-            # Save coding patterns
-            pattern_data = [self._serialize_coding_pattern(pattern) for pattern in self.coding_patterns.values()]
-            with open(self.coding_patterns_file, 'w', encoding='utf-8') as f:
-                json.dump(pattern_data, f, indent=2)
-            
+            self.store.upsert(
+                [self._serialize_preference(pref) for pref in self.preferences.values()],
+                [self._serialize_coding_pattern(pattern) for pattern in self.coding_patterns.values()]
+            )
             logger.debug("Saved preference and pattern data")
             
         except Exception as e:
             logger.error(f"Error saving preference data: {e}")
     
+    def _save_records(
+        self,
+        preferences: List[UserPreference] = (),
+        coding_patterns: List[CodingStylePattern] = ()
+    ) -> None:
+        """Upsert changed records in one transaction."""
+        try:
+            self.store.upsert(
+                [self._serialize_preference(pref) for pref in preferences],
+                [self._serialize_coding_pattern(pattern) for pattern in coding_patterns]
+            )
+        except Exception as e:
+            logger.error(f"Error saving preference data: {e}")
+    
+    def _index_preference(self, pref: UserPreference) -> None:
+        """Update the domain index and view after a preference changed."""
+        key = (pref.domain, pref.preference_key)
+        # With duplicate keys the first preference wins, as in _find_preference
+        if self._preference_index.setdefault(key, pref) is not pref:
+            return
+        
+        view = self._domain_views[pref.domain]
+        previous = view.get(pref.preference_key)
+        if pref.confidence > self.VIEW_CONFIDENCE:
+            view[pref.preference_key] = {
+                "value": pref.preference_value,
+                "confidence": pref.confidence,
+                "evidence_count": pref.evidence_count
+            }
+        else:
+            view.pop(pref.preference_key, None)
+        
+        if not self._same_view_entry(previous, view.get(pref.preference_key)):
+            self.domain_versions[pref.domain] += 1
+    
+    def _index_coding_pattern(self, pattern: CodingStylePattern) -> None:
+        """Update the coding style view after a pattern changed."""
+        previous = self._coding_style_view.get(pattern.pattern_type)
+        if pattern.confidence > self.VIEW_CONFIDENCE:
+            self._coding_style_view[pattern.pattern_type] = {
+                "value": pattern.pattern_value,
+                "confidence": pattern.confidence,
+                "evidence_count": pattern.evidence_count
+            }
+        else:
+            self._coding_style_view.pop(pattern.pattern_type, None)
+        
+        if not self._same_view_entry(previous, self._coding_style_view.get(pattern.pattern_type)):
+            self.coding_style_version += 1
+    
+    @staticmethod
+    def _same_view_entry(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> bool:
+        """Whether two view entries lead to the same recommendations (evidence counts aside)."""
+        if old is None or new is None:
+            return old is new
+        return old["value"] == new["value"] and old["confidence"] == new["confidence"]
+    
+    def preference_version(self, domain: Optional[LearningDomain] = None) -> Tuple:
+        """
+        Get a version key for the data recommendations depend on.
+        
+        Args:
+            domain: Domain of the recommendations, or None for all domains
+            
+        Returns:
+            A key that changes whenever relevant preferences or patterns change
+        """
+        if domain is None:
+            domains = tuple(self.domain_versions[d] for d in LearningDomain)
+        else:
+            domains = (self.domain_versions[domain],)
+        return domains + (self.coding_style_version,)
+    
     def learn_from_code(self, code: str, language: str = "python") -> None:
         """Learn coding style patterns from user code."""
         patterns = self._analyze_code_patterns(code, language)
+        changed = []
         
         for pattern_type, pattern_value in patterns.items():
             if pattern_type in self.coding_patterns:
@@ -200,8 +305,11 @@ class UserPreferenceModeler:
                     evidence_count=1,
                     examples=[code[:100] + "..." if len(code) > 100 else code]
                 )
+            
+            changed.append(self.coding_patterns[pattern_type])
+            self._index_coding_pattern(self.coding_patterns[pattern_type])
         
-        self._save_data()
+        self._save_records(coding_patterns=changed)
     
     def learn_from_feedback(self, feedback: UserFeedback) -> None:
         """Learn preferences from user feedback."""
@@ -218,9 +326,10 @@ class UserPreferenceModeler:
         if existing_pref:
             # Update existing preference
             self._update_preference(existing_pref, feedback, preference_value)
+            pref = existing_pref
         else:
             # Create new preference
-            new_pref = UserPreference(
+            pref = UserPreference(
                 domain=feedback.domain,
                 preference_key=preference_key,
                 preference_value=preference_value,
@@ -228,37 +337,19 @@ class UserPreferenceModeler:
                 evidence_count=1,
                 supporting_feedback=[feedback.id]
             )
-            self.preferences[new_pref.id] = new_pref
+            self.preferences[pref.id] = pref
         
-        self._save_data()
+        self._index_preference(pref)
+        self._save_records(preferences=[pref])
     
     def get_coding_style_preferences(self) -> Dict[str, Any]:
         """Get learned coding style preferences."""
-        style_prefs = {}
-        
-        for pattern in self.coding_patterns.values():
-            if pattern.confidence > 0.3:  # Only include confident patterns
-                style_prefs[pattern.pattern_type] = {
-                    "value": pattern.pattern_value,
-                    "confidence": pattern.confidence,
-                    "evidence_count": pattern.evidence_count
-                }
-        
-        return style_prefs
+        # Only confident patterns are in the view
+        return {key: dict(entry) for key, entry in self._coding_style_view.items()}
     
     def get_preferences_by_domain(self, domain: LearningDomain) -> Dict[str, Any]:
         """Get preferences for a specific domain."""
-        domain_prefs = {}
-        
-        for pref in self.preferences.values():
-            if pref.domain == domain and pref.confidence > 0.3:
-                domain_prefs[pref.preference_key] = {
-                    "value": pref.preference_value,
-                    "confidence": pref.confidence,
-                    "evidence_count": pref.evidence_count
-                }
-        
-        return domain_prefs
+        return {key: dict(entry) for key, entry in self._domain_views[domain].items()}
     
     def _analyze_code_patterns(self, code: str, language: str) -> Dict[str, Any]:
         """Analyze code to extract style patterns."""
@@ -421,10 +512,7 @@ class UserPreferenceModeler:
     
     def _find_preference(self, domain: LearningDomain, preference_key: str) -> Optional[UserPreference]:
         """Find existing preference by domain and key."""
-        for pref in self.preferences.values():
-            if pref.domain == domain and pref.preference_key == preference_key:
-                return pref
-        return None
+        return self._preference_index.get((domain, preference_key))
     
     def _update_preference(self, preference: UserPreference, feedback: UserFeedback, new_value: Any) -> None:
         """Update existing preference with new feedback."""
@@ -682,12 +770,20 @@ class FeedbackProcessor:
 
 
 class PersonalizedRecommendationEngine:
-    """Generates personalized recommendations based on learned preferences."""
+    """Generates personalized recommendations based on learned preferences.
+    
+    Candidate recommendations are cached per domain and rebuilt only when
+    the modeler's version for that domain (or the coding style) changes.
+    """
     
     def __init__(self, preference_modeler: UserPreferenceModeler):
         self.preference_modeler = preference_modeler
         self.recommendation_history: List[Recommendation] = []
         
+        # domain (None: all) -> (preference version, candidates sorted by confidence)
+        self._candidate_cache: Dict[Optional[LearningDomain], Tuple[Tuple, List[Recommendation]]] = {}
+        self.cache_stats = {"hits": 0, "misses": 0}
+        
         logger.info("Initialized PersonalizedRecommendationEngine")
     
     def generate_recommendations(
@@ -698,7 +794,33 @@ class PersonalizedRecommendationEngine:
     ) -> List[Recommendation]:
         """Generate personalized recommendations based on context."""
         
+        version = self.preference_modeler.preference_version(domain)
+        cached = self._candidate_cache.get(domain)
+        if cached is not None and cached[0] == version:
+            self.cache_stats["hits"] += 1
+            candidates = cached[1]
+        else:
+            self.cache_stats["misses"] += 1
+            candidates = self._build_candidates(domain)
+            self._candidate_cache[domain] = (version, candidates)
+        
+        # Fresh recommendations for this context
+        now = time.time()
+        recommendations = [
+            replace(candidate, id=str(uuid4()), context=context, created_at=now)
+            for candidate in candidates[:limit]
+        ]
+        
+        # Store in history
+        self.recommendation_history.extend(recommendations)
+        
+        return recommendations
+    
+    def _build_candidates(self, domain: Optional[LearningDomain]) -> List[Recommendation]:
+        """Build every recommendation the current preferences support, best first."""
+        
         recommendations = []
+        context: Dict[str, Any] = {}
         
         # Get relevant preferences
         if domain:
@@ -728,13 +850,8 @@ class PersonalizedRecommendationEngine:
                 if rec:
                     recommendations.append(rec)
         
-        # Sort by confidence and limit
+        # Sort by confidence
         recommendations.sort(key=lambda x: x.confidence, reverse=True)
-        recommendations = recommendations[:limit]
-        
-        # Store in history
-        self.recommendation_history.extend(recommendations)
-        
         return recommendations
     
     def _create_recommendation_from_preference(
@@ -0,0 +1,218 @@
+"""
+Streaming metric rollups for CodeGenie monitoring.
+Maintains count/sum/min/max and mergeable quantile sketches per series in
+fixed time buckets as metrics are ingested.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Bucket widths in seconds maintained for every series
+DEFAULT_RESOLUTIONS = (1, 60, 3600)
+
+# (resolution, name id, label set id, bucket start)
+RollupKey = Tuple[int, int, int, float]
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative error guarantees (DDSketch).
+
+    Values are counted in logarithmically sized buckets so that any quantile
+    is estimated within ``relative_accuracy`` of the true value. Sketches with
+    the same accuracy merge by adding bucket counts, which makes them suitable
+    for combining rollups across time buckets and label sets.
+    """
+
+    # Values closer to zero than this are counted as zero
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Add a value to the sketch."""
+        if value > self.MIN_INDEXABLE:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + count
+        elif value < -self.MIN_INDEXABLE:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Add another sketch's counts to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, bucket_count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + bucket_count
+        for key, bucket_count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile ``q`` (0-1), or None if empty."""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        # Most negative values first: larger keys are further from zero
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            'a': self.relative_accuracy,
+            'p': {str(key): value for key, value in self.positive.items()},
+            'n': {str(key): value for key, value in self.negative.items()},
+            'z': self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Deserialize a sketch written by ``to_dict``."""
+        sketch = cls(data.get('a', 0.01))
+        sketch.positive = {int(key): value for key, value in data.get('p', {}).items()}
+        sketch.negative = {int(key): value for key, value in data.get('n', {}).items()}
+        sketch.zero_count = data.get('z', 0)
+        sketch.count = sum(sketch.positive.values()) + sum(sketch.negative.values()) + sketch.zero_count
+        return sketch
+
+
+@dataclass
+class Rollup:
+    """Aggregate of the values of one series in one time bucket."""
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, value: float) -> None:
+        """Add a value to the rollup."""
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.sketch.add(value)
+
+    def merge(self, other: 'Rollup') -> None:
+        """Add another rollup of the same series and bucket (or coarser grouping)."""
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.sketch.merge(other.sketch)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile, clamped to the observed range."""
+        value = self.sketch.quantile(q)
+        if value is None:
+            return None
+        return min(max(value, self.minimum), self.maximum)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get count, sum, min, max, mean and standard quantiles."""
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.minimum if self.count else None,
+            'max': self.maximum if self.count else None,
+            'avg': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class RollupAggregator:
+    """
+    In-memory rollups of the buckets that are still receiving values.
+
+    Every ingested value updates one bucket per resolution. Buckets are
+    sealed (removed and returned for persistence) once their end plus a
+    grace period for late values has passed.
+    """
+
+    def __init__(
+        self,
+        resolutions: Iterable[int] = DEFAULT_RESOLUTIONS,
+        relative_accuracy: float = 0.01,
+        grace_period: float = 1.0
+    ):
+        self.resolutions = tuple(sorted(resolutions))
+        self.relative_accuracy = relative_accuracy
+        self.grace_period = grace_period
+        self.open: Dict[RollupKey, Rollup] = {}
+
+    def add(self, name_id: int, label_set_id: int, timestamp: float, value: float) -> None:
+        """Add a value to the open bucket of every resolution."""
+        for resolution in self.resolutions:
+            key = (resolution, name_id, label_set_id, timestamp - timestamp % resolution)
+            rollup = self.open.get(key)
+            if rollup is None:
+                rollup = self.open[key] = Rollup(sketch=QuantileSketch(self.relative_accuracy))
+            rollup.add(value)
+
+    def seal(self, now: float) -> List[Tuple[RollupKey, Rollup]]:
+        """Remove and return the buckets that can no longer receive values."""
+        sealed = [
+            (key, rollup) for key, rollup in self.open.items()
+            if key[3] + key[0] + self.grace_period <= now
+        ]
+        for key, _ in sealed:
+            del self.open[key]
+        return sealed
+
+    def drain(self) -> List[Tuple[RollupKey, Rollup]]:
+        """Remove and return all buckets, sealed or not."""
+        drained = list(self.open.items())
+        self.open.clear()
+        return drained
+
+    def select(
+        self,
+        resolution: int,
+        name_ids: Optional[Iterable[int]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> List[Tuple[RollupKey, Rollup]]:
+        """Get open buckets of a resolution, optionally filtered by name and time."""
+        wanted = set(name_ids) if name_ids is not None else None
+        return [
+            (key, rollup) for key, rollup in self.open.items()
+            if key[0] == resolution
+            and (wanted is None or key[1] in wanted)
+            and (start is None or key[3] + resolution > start)
+            and (end is None or key[3] <= end)
+        ]
@@ -0,0 +1,248 @@
+"""
+In-process metrics registry for CodeGenie.
+Keeps native counters, gauges and histograms in memory and renders them in
+the OpenMetrics text exposition format for scraping.
+"""
+
+import bisect
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Bucket upper bounds in seconds, suited to request and function timings
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Sorted (label name, label value) pairs identifying one series of a family
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_:]')
+_INVALID_LABEL_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def sanitize_metric_name(name: str) -> str:
+    """Map a dotted or dashed metric name onto the OpenMetrics name charset."""
+    name = _INVALID_NAME_CHARS.sub('_', name)
+    return f"_{name}" if not name or name[0].isdigit() else name
+
+
+def _sanitize_label_name(name: str) -> str:
+    name = _INVALID_LABEL_CHARS.sub('_', name)
+    return f"_{name}" if not name or name[0].isdigit() else name
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _label_key(labels: Optional[Dict[str, object]]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((_sanitize_label_name(str(name)), str(value)) for name, value in labels.items()))
+
+
+class Counter:
+    """Monotonically increasing value of one series."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name: str, key: LabelKey) -> List[str]:
+        return [f"{name}_total{_format_labels(key)} {_format_value(self.value)}"]
+
+
+class Gauge:
+    """Value of one series that can go up and down."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        # A single attribute store needs no lock
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def samples(self, name: str, key: LabelKey) -> List[str]:
+        return [f"{name}{_format_labels(key)} {_format_value(self.value)}"]
+
+
+class Histogram:
+    """Distribution of the observations of one series in fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.bounds = tuple(sorted(buckets))
+        # One count per bound plus the +Inf bucket; counts are not cumulative
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def samples(self, name: str, key: LabelKey) -> List[str]:
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds + (math.inf,), counts):
+            cumulative += bucket_count
+            lines.append(
+                f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}"
+            )
+        lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+_METRIC_TYPES = {Counter: 'counter', Gauge: 'gauge', Histogram: 'histogram'}
+
+
+class MetricFamily:
+    """All series of one metric name, keyed by their label values."""
+
+    def __init__(self, name: str, metric_class: type, help_text: str = '',
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.metric_class = metric_class
+        self.type = _METRIC_TYPES[metric_class]
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.children: Dict[LabelKey, Metric] = {}
+
+    def labels(self, labels: Optional[Dict[str, object]] = None) -> Metric:
+        """Get the series for a label set, creating it on first use."""
+        key = _label_key(labels)
+        # Lock-free fast path: only creating a series takes the family lock
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.get(key)
+                if child is None:
+                    child = Histogram(self.buckets) if self.metric_class is Histogram else self.metric_class()
+                    self.children[key] = child
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} {self.type}"]
+        if self.help:
+            lines.append(f"# HELP {self.name} {_escape(self.help)}")
+        for key, child in sorted(self.children.items()):
+            lines.extend(child.samples(self.name, key))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registry of in-memory metric families.
+
+    Recording takes at most one uncontended per-series lock; the registry
+    lock is only taken when a new family is created. Rendering reads the
+    current values and never touches disk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.families: Dict[str, MetricFamily] = {}
+
+    def _family(self, name: str, metric_class: type, help_text: str,
+                buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        name = sanitize_metric_name(name)
+        if metric_class is Counter and name.endswith('_total'):
+            name = name[:-len('_total')]
+
+        family = self.families.get(name)
+        if family is None:
+            with self._lock:
+                family = self.families.get(name)
+                if family is None:
+                    family = MetricFamily(name, metric_class, help_text, buckets)
+                    self.families[name] = family
+        if family.metric_class is not metric_class:
+            raise ValueError(f"Metric {name} is already registered as a {family.type}")
+        return family
+
+    def counter(self, name: str, labels: Optional[Dict[str, object]] = None,
+                help_text: str = '') -> Counter:
+        """Get the counter series for a name and label set."""
+        return self._family(name, Counter, help_text).labels(labels)
+
+    def gauge(self, name: str, labels: Optional[Dict[str, object]] = None,
+              help_text: str = '') -> Gauge:
+        """Get the gauge series for a name and label set."""
+        return self._family(name, Gauge, help_text).labels(labels)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, object]] = None,
+                  help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get the histogram series for a name and label set."""
+        return self._family(name, Histogram, help_text, buckets).labels(labels)
+
+    def unregister(self, name: str) -> bool:
+        """Remove a metric family and all of its series."""
+        with self._lock:
+            return self.families.pop(sanitize_metric_name(name), None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self.families.clear()
+
+    def names(self) -> Iterable[str]:
+        return list(self.families)
+
+    def render_openmetrics(self) -> str:
+        """Render every family in the OpenMetrics text format."""
+        lines: List[str] = []
+        for name in sorted(self.families):
+            lines.extend(self.families[name].render())
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_default_registry() -> MetricsRegistry:
+    """Get the process-wide registry served by the ``/metrics`` endpoints."""
+    return _default_registry
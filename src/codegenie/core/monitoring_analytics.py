@@ -19,6 +19,10 @@ from concurrent.futures import ThreadPoolExecutor
 import sqlite3
 import uuid
 
+from .batch_writer import BatchWriter, OverflowPolicy, configure_connection
+from .metric_rollups import DEFAULT_RESOLUTIONS, QuantileSketch, Rollup, RollupAggregator
+from .metrics_registry import MetricsRegistry, get_default_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -95,8 +99,67 @@ class UsageStats:
     avg_duration: float = 0.0
 
 
+# Longest a query waits for earlier writes before reading what is on disk
+QUERY_FLUSH_TIMEOUT = 5.0
+
+
+def _create_writer(db_path: Path, config: Dict[str, Any]) -> BatchWriter:
+    """Create the batched writer of a monitoring database from its config."""
+    return BatchWriter(
+        db_path,
+        max_pending=config.get('write_buffer_size', 100000),
+        batch_size=config.get('write_batch_size', 1000),
+        flush_interval=config.get('flush_interval', 0.5),
+        overflow_policy=OverflowPolicy(config.get('overflow_policy', OverflowPolicy.DROP_OLDEST.value)),
+        block_timeout=config.get('block_timeout', 1.0)
+    )
+
+
+def _start_background_task(coro_factory: Callable) -> Optional[asyncio.Task]:
+    """Start a background task if an event loop is running."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return loop.create_task(coro_factory())
+
+
 class MetricsCollector:
-    """Collects and stores system metrics."""
+    """Collects and stores system metrics.
+    
+    Samples are written by a single batched writer into a narrow table of
+    (name id, label set id, type, timestamp, value) rows; metric names and
+    tag/label sets are interned in dimension tables. Dimension ids are
+    assigned by SQLite, so collectors in several processes can share one
+    database.
+    
+    Every sample also updates 1 s, 1 min and 1 h rollups (count, sum, min,
+    max and a quantile sketch) that are persisted once their bucket closes.
+    Raw samples and rollups are deleted after per-resolution retention
+    periods, so older data is only kept at coarser resolutions.
+    
+    Counters, gauges and timers are also kept as native in-memory metrics in
+    a ``MetricsRegistry`` (the process-wide one unless ``metrics_registry``
+    is configured) so they can be scraped without querying the database.
+    """
+    
+    # Default retention in seconds: raw samples, then rollups by resolution
+    RAW_RETENTION = 86400
+    ROLLUP_RETENTION = {1: 3600, 60: 7 * 86400, 3600: 365 * 86400}
+    
+    INSERT_SAMPLE_SQL = '''
+        INSERT INTO metric_samples (name_id, label_set_id, metric_type, timestamp, value)
+        VALUES (?, ?, ?, ?, ?)
+    '''
+    INSERT_NAME_SQL = "INSERT OR IGNORE INTO metric_names (name) VALUES (?)"
+    SELECT_NAME_SQL = "SELECT id FROM metric_names WHERE name = ?"
+    INSERT_LABEL_SET_SQL = "INSERT OR IGNORE INTO label_sets (tags, labels) VALUES (?, ?)"
+    SELECT_LABEL_SET_SQL = "SELECT id FROM label_sets WHERE tags = ? AND labels = ?"
+    INSERT_ROLLUP_SQL = '''
+        INSERT INTO metric_rollups
+            (resolution, name_id, label_set_id, bucket_start, count, sum, min, max, sketch)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
@@ -104,33 +167,188 @@ class MetricsCollector:
         self.aggregated_metrics: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.metric_handlers: Dict[str, Callable] = {}
         
+        # Interned dimensions: metric name -> id, (tags, labels) -> id, and back
+        self._name_ids: Dict[str, int] = {}
+        self._label_set_ids: Dict[tuple, int] = {}
+        self._names: Dict[int, str] = {}
+        self._label_sets: Dict[int, tuple] = {}
+        # Guards the maps above, which query threads refresh from the database
+        self._dimension_lock = threading.Lock()
+        
+        # Open rollup buckets, sealed into the database as they close
+        self.rollups = RollupAggregator(
+            resolutions=config.get('rollup_resolutions', DEFAULT_RESOLUTIONS),
+            relative_accuracy=config.get('quantile_accuracy', 0.01)
+        )
+        self.raw_retention = config.get('raw_retention', self.RAW_RETENTION)
+        self.rollup_retention = {**self.ROLLUP_RETENTION, **config.get('rollup_retention', {})}
+        self.retention_interval = config.get('retention_interval', 600)
+        self._next_seal = 0.0
+        self._rollup_readers = 0
+        
+        # Live counters, gauges and timer histograms for the /metrics endpoints
+        self.registry: MetricsRegistry = config.get('metrics_registry') or get_default_registry()
+        
         # Database for persistent storage
         self.db_path = Path(config.get('db_path', 'metrics.db'))
         self._init_database()
+        self.writer = _create_writer(self.db_path, config)
         
-        # Background aggregation
-        self._aggregation_task = asyncio.create_task(self._aggregate_metrics())
+        # Background aggregation (started on first use if no loop is running yet)
+        self._aggregation_task = _start_background_task(self._aggregate_metrics)
     
     def _init_database(self) -> None:
         """Initialize metrics database."""
         
         with sqlite3.connect(self.db_path) as conn:
+            configure_connection(conn)
             conn.execute('''
-                CREATE TABLE IF NOT EXISTS metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    value REAL NOT NULL,
+                CREATE TABLE IF NOT EXISTS metric_names (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS label_sets (
+                    id INTEGER PRIMARY KEY,
+                    tags TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    UNIQUE (tags, labels)
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS metric_samples (
+                    name_id INTEGER NOT NULL,
+                    label_set_id INTEGER NOT NULL,
                     metric_type TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    tags TEXT,
-                    labels TEXT
+                    timestamp REAL NOT NULL,
+                    value REAL NOT NULL
                 )
             ''')
             
             conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_metrics_name_timestamp 
-                ON metrics(name, timestamp)
+                CREATE INDEX IF NOT EXISTS idx_metric_samples_name_timestamp
+                ON metric_samples(name_id, timestamp)
             ''')
+            
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_metric_samples_timestamp
+                ON metric_samples(timestamp)
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS metric_rollups (
+                    resolution INTEGER NOT NULL,
+                    name_id INTEGER NOT NULL,
+                    label_set_id INTEGER NOT NULL,
+                    bucket_start REAL NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    sketch TEXT NOT NULL
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_metric_rollups_lookup
+                ON metric_rollups(resolution, name_id, bucket_start)
+            ''')
+            
+            self._load_dimensions(conn)
+            self._migrate_legacy_metrics(conn)
+    
+    def _load_dimensions(self, conn: sqlite3.Connection) -> None:
+        """Load the dimension ids stored so far, including other collectors' ones."""
+        
+        names = conn.execute("SELECT id, name FROM metric_names").fetchall()
+        label_sets = conn.execute("SELECT id, tags, labels FROM label_sets").fetchall()
+        with self._dimension_lock:
+            for name_id, name in names:
+                self._name_ids[name] = name_id
+                self._names[name_id] = name
+            for label_set_id, tags, labels in label_sets:
+                key = (tuple(sorted(json.loads(tags).items())), tuple(sorted(json.loads(labels).items())))
+                self._label_set_ids[key] = label_set_id
+                self._label_sets[label_set_id] = key
+    
+    def _migrate_legacy_metrics(self, conn: sqlite3.Connection) -> None:
+        """Move rows of the old one-row-per-metric table into the sample table."""
+        
+        legacy = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'metrics'"
+        ).fetchone()
+        if not legacy:
+            return
+        
+        rows = conn.execute(
+            "SELECT name, value, metric_type, timestamp, tags, labels FROM metrics"
+        ).fetchall()
+        samples = []
+        for name, value, metric_type, timestamp, tags, labels in rows:
+            name_id, label_set_id = self._intern(
+                name, json.loads(tags) if tags else {}, json.loads(labels) if labels else {}, conn
+            )
+            samples.append((name_id, label_set_id, metric_type, datetime.fromisoformat(timestamp).timestamp(), value))
+        
+        conn.executemany(self.INSERT_SAMPLE_SQL, samples)
+        conn.execute("DROP TABLE metrics")
+        logger.info(f"Migrated {len(samples)} metrics in {self.db_path} to the sample table")
+    
+    def _intern(
+        self,
+        name: str,
+        tags: Dict[str, str],
+        labels: Dict[str, str],
+        conn: Optional[sqlite3.Connection] = None
+    ) -> tuple:
+        """
+        Get the dimension ids of a metric.
+        
+        New names and label sets are inserted right away so SQLite assigns
+        their ids; another collector may have stored them already.
+        
+        Args:
+            name: Metric name
+            tags: Metric tags
+            labels: Metric labels
+            conn: Connection to use instead of a new one
+            
+        Returns:
+            Tuple of (name id, label set id)
+            
+        Raises:
+            sqlite3.Error: If a new dimension cannot be stored
+        """
+        
+        key = (tuple(sorted(tags.items())), tuple(sorted(labels.items()))) if tags or labels else ((), ())
+        name_id = self._name_ids.get(name)
+        label_set_id = self._label_set_ids.get(key)
+        if name_id is not None and label_set_id is not None:
+            return name_id, label_set_id
+        
+        if conn is None:
+            with sqlite3.connect(self.db_path) as new_conn:
+                configure_connection(new_conn)
+                return self._intern(name, tags, labels, new_conn)
+        
+        with self._dimension_lock:
+            if name_id is None:
+                conn.execute(self.INSERT_NAME_SQL, (name,))
+                (name_id,) = conn.execute(self.SELECT_NAME_SQL, (name,)).fetchone()
+                self._name_ids[name] = name_id
+                self._names[name_id] = name
+            
+            if label_set_id is None:
+                params = (json.dumps(dict(key[0]), sort_keys=True), json.dumps(dict(key[1]), sort_keys=True))
+                conn.execute(self.INSERT_LABEL_SET_SQL, params)
+                (label_set_id,) = conn.execute(self.SELECT_LABEL_SET_SQL, params).fetchone()
+                self._label_set_ids[key] = label_set_id
+                self._label_sets[label_set_id] = key
+        
+        return name_id, label_set_id
     
     async def record_metric(
         self,
@@ -153,8 +371,11 @@ class MetricsCollector:
         # Add to in-memory storage
         self.metrics.append(metric)
         
-        # Store in database
-        await self._store_metric_db(metric)
+        # Buffer for the batched database writer
+        self._store_metric_db(metric)
+        
+        if self._aggregation_task is None:
+            self._aggregation_task = _start_background_task(self._aggregate_metrics)
         
         # Call custom handlers
         if name in self.metric_handlers:
@@ -163,26 +384,85 @@ class MetricsCollector:
             except Exception as e:
                 logger.error(f"Metric handler error for {name}: {e}")
     
-    async def _store_metric_db(self, metric: Metric) -> None:
-        """Store metric in database."""
+    def _store_metric_db(self, metric: Metric) -> bool:
+        """Buffer a metric for the database writer."""
         
-        def store():
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    INSERT INTO metrics (name, value, metric_type, timestamp, tags, labels)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    metric.name,
-                    metric.value,
-                    metric.metric_type.value,
-                    metric.timestamp.isoformat(),
-                    json.dumps(metric.tags),
-                    json.dumps(metric.labels)
-                ))
-        
-        # Run in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, store)
+        try:
+            name_id, label_set_id = self._intern(metric.name, metric.tags, metric.labels)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store dimensions of metric {metric.name}: {e}")
+            return False
+        
+        timestamp = metric.timestamp.timestamp()
+        self.rollups.add(name_id, label_set_id, timestamp, metric.value)
+        if timestamp >= self._next_seal:
+            self._seal_rollups(timestamp)
+        
+        return self.writer.submit(self.INSERT_SAMPLE_SQL, (
+            name_id,
+            label_set_id,
+            metric.metric_type.value,
+            timestamp,
+            metric.value
+        ))
+    
+    def _seal_rollups(self, now: float, drain: bool = False) -> int:
+        """Persist rollup buckets that are closed (or all of them when draining)."""
+        
+        self._next_seal = now + 1.0
+        # Readers merge open buckets with stored ones; sealing during a read would count twice
+        if self._rollup_readers and not drain:
+            return 0
+        
+        sealed = self.rollups.drain() if drain else self.rollups.seal(now)
+        for (resolution, name_id, label_set_id, bucket_start), rollup in sealed:
+            self.writer.submit(self.INSERT_ROLLUP_SQL, (
+                resolution,
+                name_id,
+                label_set_id,
+                bucket_start,
+                rollup.count,
+                rollup.total,
+                rollup.minimum,
+                rollup.maximum,
+                json.dumps(rollup.sketch.to_dict())
+            ), droppable=False)
+        return len(sealed)
+    
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all buffered metrics are written."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.writer.flush, timeout)
+    
+    async def close(self) -> None:
+        """Stop background work and write all buffered metrics and open rollups."""
+        if self._aggregation_task is not None:
+            self._aggregation_task.cancel()
+        self._seal_rollups(time.time(), drain=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.writer.close)
+    
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get statistics of the batched database writer."""
+        stats = self.writer.get_stats()
+        stats['series_names'] = len(self._name_ids)
+        stats['label_sets'] = len(self._label_set_ids)
+        return stats
+    
+    def _update_registry(
+        self,
+        factory: Callable,
+        name: str,
+        tags: Optional[Dict[str, str]],
+        operation: str,
+        value: Union[int, float]
+    ) -> None:
+        """Apply an update to the in-memory series of a metric."""
+        
+        try:
+            getattr(factory(name, tags), operation)(value)
+        except ValueError as e:
+            logger.warning(f"Metric {name} not exported: {e}")
     
     async def increment_counter(
         self,
@@ -197,6 +477,7 @@ class MetricsCollector:
         new_value = current + value
         
         await self.record_metric(name, new_value, MetricType.COUNTER, tags)
+        self._update_registry(self.registry.counter, name, tags, 'inc', value)
         
         # Update aggregated value
         self.aggregated_metrics[name]['value'] = new_value
@@ -211,6 +492,7 @@ class MetricsCollector:
         """Set a gauge metric."""
         
         await self.record_metric(name, value, MetricType.GAUGE, tags)
+        self._update_registry(self.registry.gauge, name, tags, 'set', value)
         
         # Update aggregated value
         self.aggregated_metrics[name]['value'] = value
@@ -225,6 +507,7 @@ class MetricsCollector:
         """Record a timer metric."""
         
         await self.record_metric(name, duration, MetricType.TIMER, tags)
+        self._update_registry(self.registry.histogram, name, tags, 'observe', duration)
         
         # Update aggregated statistics
         if name not in self.aggregated_metrics:
@@ -249,71 +532,281 @@ class MetricsCollector:
         """Register a custom handler for a metric."""
         self.metric_handlers[metric_name] = handler
     
+    def _match_name_ids(
+        self,
+        name: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        name_pattern: Optional[str] = None
+    ) -> Optional[List[int]]:
+        """
+        Resolve name filters to interned ids so queries can use the name index.
+        
+        Args:
+            name: Exact metric name
+            name_prefix: Metric name prefix
+            name_pattern: Substring of the metric name
+            
+        Returns:
+            Matching name ids, or None if no filter was given
+        """
+        if name is None and name_prefix is None and not name_pattern:
+            return None
+        
+        with self._dimension_lock:
+            name_ids = list(self._name_ids.items())
+        return [
+            name_id for metric_name, name_id in name_ids
+            if (name is None or metric_name == name)
+            and (name_prefix is None or metric_name.startswith(name_prefix))
+            and (not name_pattern or name_pattern in metric_name)
+        ]
+    
+    def _resolve_name_ids(
+        self,
+        conn: sqlite3.Connection,
+        name: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        name_pattern: Optional[str] = None
+    ) -> Optional[List[int]]:
+        """Resolve name filters, reloading names another collector may have stored."""
+        name_ids = self._match_name_ids(name, name_prefix, name_pattern)
+        if name_ids == []:
+            self._load_dimensions(conn)
+            name_ids = self._match_name_ids(name, name_prefix, name_pattern)
+        return name_ids
+    
+    def _load_unknown_dimensions(self, conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        """Reload dimensions if rows reference ids stored by another collector."""
+        if any(row[0] not in self._names or row[1] not in self._label_sets for row in rows):
+            self._load_dimensions(conn)
+    
     async def get_metrics(
         self,
         name_pattern: Optional[str] = None,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
-        limit: int = 1000
+        limit: int = 1000,
+        name: Optional[str] = None,
+        name_prefix: Optional[str] = None
     ) -> List[Metric]:
-        """Get metrics from storage."""
-        
+        """
+        Get raw metrics from storage, newest first.
+        
+        Args:
+            name_pattern: Substring of the metric name
+            start_time: Earliest timestamp
+            end_time: Latest timestamp
+            limit: Maximum number of metrics
+            name: Exact metric name
+            name_prefix: Metric name prefix
+            
+        Returns:
+            Matching metrics
+        """
         def query():
+            # Read your own writes: wait for rows buffered before the query
+            self.writer.flush(QUERY_FLUSH_TIMEOUT)
+            
             with sqlite3.connect(self.db_path) as conn:
-                query_sql = "SELECT * FROM metrics WHERE 1=1"
-                params = []
+                name_ids = self._resolve_name_ids(conn, name, name_prefix, name_pattern)
+                if name_ids == []:
+                    return []
+                
+                query_sql = '''
+                    SELECT name_id, label_set_id, value, metric_type, timestamp
+                    FROM metric_samples
+                    WHERE 1=1
+                '''
+                params: List[Any] = []
                 
-                if name_pattern:
-                    query_sql += " AND name LIKE ?"
-                    params.append(f"%{name_pattern}%")
+                if name_ids is not None:
+                    query_sql += f" AND name_id IN ({','.join('?' * len(name_ids))})"
+                    params.extend(name_ids)
                 
                 if start_time:
                     query_sql += " AND timestamp >= ?"
-                    params.append(start_time.isoformat())
+                    params.append(start_time.timestamp())
                 
                 if end_time:
                     query_sql += " AND timestamp <= ?"
-                    params.append(end_time.isoformat())
+                    params.append(end_time.timestamp())
                 
                 query_sql += " ORDER BY timestamp DESC LIMIT ?"
                 params.append(limit)
                 
-                cursor = conn.execute(query_sql, params)
-                rows = cursor.fetchall()
+                rows = conn.execute(query_sql, params).fetchall()
+                self._load_unknown_dimensions(conn, rows)
+                return rows
+        
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, query)
+        
+        metrics = []
+        for name_id, label_set_id, value, metric_type, timestamp in rows:
+            tags, labels = self._label_sets.get(label_set_id, ((), ()))
+            metrics.append(Metric(
+                name=self._names.get(name_id, str(name_id)),
+                value=value,
+                metric_type=MetricType(metric_type),
+                timestamp=datetime.fromtimestamp(timestamp),
+                tags=dict(tags),
+                labels=dict(labels)
+            ))
+        
+        return metrics
+    
+    async def get_rollups(
+        self,
+        resolution: int = 60,
+        name: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        merge_label_sets: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get rolled-up metrics, including buckets that are still open.
+        
+        Args:
+            resolution: Bucket width in seconds (one of the rollup resolutions)
+            name: Exact metric name
+            name_prefix: Metric name prefix
+            start_time: Earliest bucket to include
+            end_time: Latest bucket to include
+            merge_label_sets: Combine the series of a name across tags/labels
+            
+        Returns:
+            One summary per (name[, label set], bucket), ordered by bucket and name
+        """
+        if resolution not in self.rollups.resolutions:
+            raise ValueError(f"Unsupported rollup resolution: {resolution}")
+        
+        start = start_time.timestamp() if start_time else None
+        end = end_time.timestamp() if end_time else None
+        
+        def query():
+            self.writer.flush(QUERY_FLUSH_TIMEOUT)
+            
+            with sqlite3.connect(self.db_path) as conn:
+                name_ids = self._resolve_name_ids(conn, name, name_prefix)
+                if name_ids == []:
+                    return name_ids, []
                 
-                metrics = []
-                for row in rows:
-                    metric = Metric(
-                        name=row[1],
-                        value=row[2],
-                        metric_type=MetricType(row[3]),
-                        timestamp=datetime.fromisoformat(row[4]),
-                        tags=json.loads(row[5]) if row[5] else {},
-                        labels=json.loads(row[6]) if row[6] else {}
-                    )
-                    metrics.append(metric)
+                query_sql = '''
+                    SELECT name_id, label_set_id, bucket_start, count, sum, min, max, sketch
+                    FROM metric_rollups
+                    WHERE resolution = ?
+                '''
+                params: List[Any] = [resolution]
+                
+                if name_ids is not None:
+                    query_sql += f" AND name_id IN ({','.join('?' * len(name_ids))})"
+                    params.extend(name_ids)
+                
+                if start is not None:
+                    query_sql += " AND bucket_start > ?"
+                    params.append(start - resolution)
+                
+                if end is not None:
+                    query_sql += " AND bucket_start <= ?"
+                    params.append(end)
                 
-                return metrics
+                rows = conn.execute(query_sql, params).fetchall()
+                self._load_unknown_dimensions(conn, rows)
+                return name_ids, rows
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, query)
+        self._rollup_readers += 1
+        try:
+            loop = asyncio.get_running_loop()
+            name_ids, rows = await loop.run_in_executor(None, query)
+            open_buckets = self.rollups.select(resolution, name_ids, start, end)
+        finally:
+            self._rollup_readers -= 1
+        
+        merged: Dict[tuple, Rollup] = {}
+        
+        def add(name_id: int, label_set_id: int, bucket_start: float, rollup: Rollup) -> None:
+            key = (name_id, None if merge_label_sets else label_set_id, bucket_start)
+            existing = merged.get(key)
+            if existing is None:
+                existing = merged[key] = Rollup(sketch=QuantileSketch(rollup.sketch.relative_accuracy))
+            existing.merge(rollup)
+        
+        for name_id, label_set_id, bucket_start, count, total, minimum, maximum, sketch in rows:
+            add(name_id, label_set_id, bucket_start, Rollup(
+                count=count,
+                total=total,
+                minimum=minimum,
+                maximum=maximum,
+                sketch=QuantileSketch.from_dict(json.loads(sketch))
+            ))
+        for (_, name_id, label_set_id, bucket_start), rollup in open_buckets:
+            add(name_id, label_set_id, bucket_start, rollup)
+        
+        results = []
+        for (name_id, label_set_id, bucket_start), rollup in merged.items():
+            entry = {
+                'name': self._names.get(name_id, str(name_id)),
+                'resolution': resolution,
+                'bucket_start': datetime.fromtimestamp(bucket_start),
+                **rollup.summary()
+            }
+            if label_set_id is not None:
+                tags, labels = self._label_sets.get(label_set_id, ((), ()))
+                entry['tags'] = dict(tags)
+                entry['labels'] = dict(labels)
+            results.append(entry)
+        
+        results.sort(key=lambda entry: (entry['bucket_start'], entry['name']))
+        return results
+    
+    async def apply_retention(self, now: Optional[float] = None) -> None:
+        """Delete raw samples and rollups older than their retention period."""
+        
+        now = time.time() if now is None else now
+        # Deletes are written ahead of buffered samples, so write those first
+        await self.flush()
+        self.writer.submit(
+            "DELETE FROM metric_samples WHERE timestamp < ?",
+            (now - self.raw_retention,),
+            droppable=False
+        )
+        for resolution, retention in self.rollup_retention.items():
+            self.writer.submit(
+                "DELETE FROM metric_rollups WHERE resolution = ? AND bucket_start < ?",
+                (resolution, now - retention),
+                droppable=False
+            )
+        await self.flush()
     
     async def _aggregate_metrics(self) -> None:
-        """Background task to aggregate metrics."""
+        """Background task sealing rollups and applying retention."""
+        
+        last_cleanup = last_retention = time.time()
         
         while True:
             try:
-                # Aggregate metrics every minute
-                await asyncio.sleep(60)
+                # Seal closed rollup buckets even when no metrics arrive
+                await asyncio.sleep(1)
+                now = time.time()
+                self._seal_rollups(now)
                 
-                # Clean up old aggregated data
-                cutoff_time = datetime.now() - timedelta(hours=24)
+                # Clean up old aggregated data every minute
+                if now - last_cleanup >= 60:
+                    last_cleanup = now
+                    cutoff_time = datetime.now() - timedelta(hours=24)
+                    
+                    for name, data in list(self.aggregated_metrics.items()):
+                        last_updated = data.get('last_updated')
+                        if last_updated and last_updated < cutoff_time:
+                            del self.aggregated_metrics[name]
                 
-                for name, data in list(self.aggregated_metrics.items()):
-                    last_updated = data.get('last_updated')
-                    if last_updated and last_updated < cutoff_time:
-                        del self.aggregated_metrics[name]
+                if now - last_retention >= self.retention_interval:
+                    last_retention = now
+                    await self.apply_retention(now)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Metrics aggregation error: {e}")
                 await asyncio.sleep(60)
@@ -335,14 +828,16 @@ class AlertManager:
         # Database for persistent storage
         self.db_path = Path(config.get('db_path', 'alerts.db'))
         self._init_database()
+        self.writer = _create_writer(self.db_path, config)
         
-        # Background processing
-        self._processing_task = asyncio.create_task(self._process_alerts())
+        # Background processing (started on first use if no loop is running yet)
+        self._processing_task = _start_background_task(self._process_alerts)
     
     def _init_database(self) -> None:
         """Initialize alerts database."""
         
         with sqlite3.connect(self.db_path) as conn:
+            configure_connection(conn)
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS alerts (
                     id TEXT PRIMARY KEY,
@@ -380,6 +875,9 @@ class AlertManager:
         
         self.alerts[alert_id] = alert
         
+        if self._processing_task is None:
+            self._processing_task = _start_background_task(self._process_alerts)
+        
         # Store in database
         await self._store_alert_db(alert)
         
@@ -409,42 +907,40 @@ class AlertManager:
     async def _store_alert_db(self, alert: Alert) -> None:
         """Store alert in database."""
         
-        def store():
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    INSERT INTO alerts (id, title, description, severity, source, timestamp, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    alert.id,
-                    alert.title,
-                    alert.description,
-                    alert.severity.value,
-                    alert.source,
-                    alert.timestamp.isoformat(),
-                    json.dumps(alert.metadata)
-                ))
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, store)
+        # Alerts are never dropped under backpressure
+        self.writer.submit('''
+            INSERT INTO alerts (id, title, description, severity, source, timestamp, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            alert.id,
+            alert.title,
+            alert.description,
+            alert.severity.value,
+            alert.source,
+            alert.timestamp.isoformat(),
+            json.dumps(alert.metadata)
+        ), droppable=False)
     
     async def _update_alert_db(self, alert: Alert) -> None:
         """Update alert in database."""
         
-        def update():
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    UPDATE alerts 
-                    SET resolved = ?, resolved_at = ?, metadata = ?
-                    WHERE id = ?
-                ''', (
-                    1 if alert.resolved else 0,
-                    alert.resolved_at.isoformat() if alert.resolved_at else None,
-                    json.dumps(alert.metadata),
-                    alert.id
-                ))
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, update)
+        self.writer.submit('''
+            UPDATE alerts 
+            SET resolved = ?, resolved_at = ?, metadata = ?
+            WHERE id = ?
+        ''', (
+            1 if alert.resolved else 0,
+            alert.resolved_at.isoformat() if alert.resolved_at else None,
+            json.dumps(alert.metadata),
+            alert.id
+        ), droppable=False)
+    
+    async def close(self) -> None:
+        """Stop background work and write all buffered alerts."""
+        if self._processing_task is not None:
+            self._processing_task.cancel()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.writer.close)
     
     async def _send_notifications(self, alert: Alert) -> None:
         """Send alert notifications."""
@@ -508,6 +1004,8 @@ class AlertManager:
         """Get alerts from storage."""
         
         def query():
+            self.writer.flush(QUERY_FLUSH_TIMEOUT)
+            
             with sqlite3.connect(self.db_path) as conn:
                 query_sql = "SELECT * FROM alerts WHERE 1=1"
                 params = []
@@ -543,7 +1041,7 @@ class AlertManager:
                 
                 return alerts
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, query)
 
 
@@ -556,12 +1054,15 @@ class HealthMonitor:
         self.health_status: Dict[str, HealthCheck] = {}
         self.overall_status = HealthStatus.HEALTHY
         
-        # Background monitoring
-        self._monitor_task = asyncio.create_task(self._monitor_health())
+        # Background monitoring (started on first use if no loop is running yet)
+        self._monitor_task = _start_background_task(self._monitor_health)
     
     def register_health_check(self, name: str, check_func: Callable) -> None:
         """Register a health check function."""
         self.health_checks[name] = check_func
+        
+        if self._monitor_task is None:
+            self._monitor_task = _start_background_task(self._monitor_health)
     
     async def run_health_check(self, name: str) -> HealthCheck:
         """Run a specific health check."""
@@ -692,11 +1193,13 @@ class UsageTracker:
         # Database for persistent storage
         self.db_path = Path(config.get('db_path', 'usage.db'))
         self._init_database()
+        self.writer = _create_writer(self.db_path, config)
     
     def _init_database(self) -> None:
         """Initialize usage database."""
         
         with sqlite3.connect(self.db_path) as conn:
+            configure_connection(conn)
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS usage_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -753,27 +1256,29 @@ class UsageTracker:
     ) -> None:
         """Store usage event in database."""
         
-        def store():
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    INSERT INTO usage_events (feature, event_type, timestamp, duration, success, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    feature,
-                    event_type,
-                    datetime.now().isoformat(),
-                    duration,
-                    1 if success else 0,
-                    json.dumps(metadata) if metadata else None
-                ))
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, store)
+        self.writer.submit('''
+            INSERT INTO usage_events (feature, event_type, timestamp, duration, success, metadata)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            feature,
+            event_type,
+            datetime.now().isoformat(),
+            duration,
+            1 if success else 0,
+            json.dumps(metadata) if metadata else None
+        ))
+    
+    async def close(self) -> None:
+        """Write all buffered usage events."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.writer.close)
     
     async def get_usage_insights(self, days: int = 7) -> Dict[str, Any]:
         """Get usage insights for the last N days."""
         
         def query():
+            self.writer.flush(QUERY_FLUSH_TIMEOUT)
+            
             with sqlite3.connect(self.db_path) as conn:
                 cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
                 
@@ -828,7 +1333,7 @@ class UsageTracker:
                     'average_durations': avg_durations
                 }
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, query)
     
     def get_current_stats(self) -> Dict[str, UsageStats]:
@@ -960,11 +1465,22 @@ class MonitoringAnalytics:
     async def get_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive dashboard data."""
         
-        # Get recent metrics
-        recent_metrics = await self.metrics_collector.get_metrics(
-            start_time=datetime.now() - timedelta(hours=1),
-            limit=1000
+        # Get the last hour of per-minute rollups rather than raw points
+        recent_rollups = await self.metrics_collector.get_rollups(
+            resolution=60,
+            start_time=datetime.now() - timedelta(hours=1)
         )
+        series: Dict[str, Dict[str, Any]] = {}
+        for rollup in recent_rollups:  # Ordered by bucket, so the latest minute wins
+            summary = series.setdefault(
+                rollup['name'], {'count': 0, 'sum': 0.0, 'min': rollup['min'], 'max': rollup['max']}
+            )
+            summary['count'] += rollup['count']
+            summary['sum'] += rollup['sum']
+            summary['min'] = min(summary['min'], rollup['min'])
+            summary['max'] = max(summary['max'], rollup['max'])
+            summary['avg'] = summary['sum'] / summary['count']
+            summary['latest_p95'] = rollup['p95']
         
         # Get recent alerts
         recent_alerts = await self.alert_manager.get_alerts(
@@ -985,7 +1501,8 @@ class MonitoringAnalytics:
             'timestamp': datetime.now().isoformat(),
             'health': health_summary,
             'metrics': {
-                'recent_count': len(recent_metrics),
+                'recent_count': sum(summary['count'] for summary in series.values()),
+                'series': series,
                 'aggregated': aggregated_metrics
             },
             'alerts': {
@@ -1002,12 +1519,10 @@ class MonitoringAnalytics:
     async def cleanup(self) -> None:
         """Clean up monitoring system."""
         
-        # Cancel background tasks
-        if hasattr(self.metrics_collector, '_aggregation_task'):
-            self.metrics_collector._aggregation_task.cancel()
-        
-        if hasattr(self.alert_manager, '_processing_task'):
-            self.alert_manager._processing_task.cancel()
+        # Cancel background tasks and write buffered data
+        await self.metrics_collector.close()
+        await self.alert_manager.close()
+        await self.usage_tracker.close()
         
-        if hasattr(self.health_monitor, '_monitor_task'):
+        if self.health_monitor._monitor_task is not None:
             self.health_monitor._monitor_task.cancel()
\ No newline at end of file
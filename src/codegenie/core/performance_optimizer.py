@@ -18,6 +18,8 @@ from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 import threading
 
+from .metrics_registry import MetricsRegistry, get_default_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -423,13 +425,24 @@ class AnalysisCache:
 class Profiler:
     """
     Performance profiler for tracking execution times.
+    
+    Execution times are also observed in the
+    ``codegenie_function_duration_seconds`` histogram of a metrics registry.
     """
     
-    def __init__(self):
-        """Initialize profiler."""
+    DURATION_METRIC = 'codegenie_function_duration_seconds'
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize profiler.
+        
+        Args:
+            registry: Metrics registry to export timings to (process-wide by default)
+        """
         self.profiles: Dict[str, ProfileResult] = {}
         self.enabled = True
         self.lock = threading.RLock()
+        self.registry = registry or get_default_registry()
         logger.info("Profiler initialized")
     
     def profile(self, func: Callable) -> Callable:
@@ -459,6 +472,11 @@ class Profiler:
     
     def _record_execution(self, func_name: str, execution_time: float) -> None:
         """Record function execution time."""
+        self.registry.histogram(
+            self.DURATION_METRIC,
+            {'function': func_name},
+            help_text='Execution time of profiled functions'
+        ).observe(execution_time)
         with self.lock:
             if func_name in self.profiles:
                 profile = self.profiles[func_name]
@@ -0,0 +1,111 @@
+"""
+Transactional storage for learned user preferences and coding patterns.
+Backed by an embedded SQLite database with one row per record, so a
+learning event writes only the records it changed.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .batch_writer import configure_connection
+
+logger = logging.getLogger(__name__)
+
+
+class PreferenceStore:
+    """SQLite store of serialized preferences and coding patterns."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        configure_connection(self._conn)
+        with self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS preferences (
+                    id TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    preference_key TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_preferences_domain
+                ON preferences(domain, preference_key)
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS coding_patterns (
+                    pattern_type TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            ''')
+
+    def load_preferences(self) -> List[Dict[str, Any]]:
+        """Get every stored preference record, oldest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM preferences ORDER BY rowid").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def load_coding_patterns(self) -> List[Dict[str, Any]]:
+        """Get every stored coding pattern record."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM coding_patterns ORDER BY rowid").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def upsert(
+        self,
+        preferences: Iterable[Dict[str, Any]] = (),
+        coding_patterns: Iterable[Dict[str, Any]] = ()
+    ) -> None:
+        """
+        Insert or replace records in one transaction.
+
+        Args:
+            preferences: Serialized preferences, keyed by their ``id``
+            coding_patterns: Serialized coding patterns, keyed by their ``pattern_type``
+        """
+        preference_rows = [
+            (record["id"], record["domain"], record["preference_key"], json.dumps(record))
+            for record in preferences
+        ]
+        pattern_rows = [(record["pattern_type"], json.dumps(record)) for record in coding_patterns]
+        if not preference_rows and not pattern_rows:
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany('''
+                INSERT INTO preferences (id, domain, preference_key, data) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    domain = excluded.domain,
+                    preference_key = excluded.preference_key,
+                    data = excluded.data
+            ''', preference_rows)
+            self._conn.executemany('''
+                INSERT INTO coding_patterns (pattern_type, data) VALUES (?, ?)
+                ON CONFLICT(pattern_type) DO UPDATE SET data = excluded.data
+            ''', pattern_rows)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
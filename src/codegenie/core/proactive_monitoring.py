@@ -11,14 +11,30 @@ This module provides:
 
 import asyncio
 import ast
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any, Tuple
-from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from enum import Enum
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict
 import hashlib
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    _WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    _WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 
 class SuggestionType(Enum):
     """Types of proactive suggestions."""
@@ -91,6 +107,16 @@ class WorkflowPrediction:
     priority: int  # 1-5, 5 being highest
 
 
+@dataclass
+class IssueDelta:
+    """Issues that appeared or disappeared since the previous scan."""
+    new_issues: List[DetectedIssue] = field(default_factory=list)
+    resolved_issues: List[DetectedIssue] = field(default_factory=list)
+    files_analyzed: int = 0  # Files whose content had to be analyzed
+    files_reused: int = 0  # Files whose issues were reused from the cache
+    files_removed: int = 0  # Files no longer in the scan
+
+
 @dataclass
 class MonitoringResult:
     """Result of codebase monitoring."""
@@ -98,6 +124,7 @@ class MonitoringResult:
     suggestions: List[ProactiveSuggestion]
     files_monitored: int
     timestamp: datetime = field(default_factory=datetime.now)
+    delta: Optional[IssueDelta] = None
 
 
 @dataclass
@@ -109,117 +136,332 @@ class ChangeEvent:
     content_hash: Optional[str] = None
 
 
+class _ChangeCollector(FileSystemEventHandler):
+    """Records paths reported by the file system watcher for the monitor."""
+    
+    def __init__(self, monitor: 'CodebaseMonitor'):
+        super().__init__()
+        self.monitor = monitor
+    
+    def on_any_event(self, event) -> None:
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        if event.is_directory:
+            # Directory creations, moves and deletions can affect many files
+            if event.event_type != 'modified':
+                self.monitor._mark_dirty(None)
+            return
+        for path in paths:
+            if path:
+                self.monitor._mark_dirty(Path(os.fsdecode(path)))
+
+
 class CodebaseMonitor:
-    """Monitors codebase for continuous change tracking."""
+    """Monitors codebase for continuous change tracking.
     
-    def __init__(self, project_root: Path):
+    Files are compared by (mtime, size) first and only re-hashed when those
+    changed. When watching, a file system watcher (inotify on Linux, via
+    watchdog) records which files were touched so a change check only stats
+    those files; without watchdog the whole tree is polled.
+    """
+    
+    RACY_WINDOW_NS = 1_000_000_000
+    
+    def __init__(
+        self,
+        project_root: Path,
+        debounce_interval: float = 0.2,
+        poll_interval: float = 2.0,
+        max_batch_size: int = 500
+    ):
         """
         Initialize codebase monitor.
         
         Args:
             project_root: Root directory of the project
+            debounce_interval: Quiet time to wait for after the last change
+                before a batch of changes is reported
+            poll_interval: Seconds between scans when no watcher is available
+            max_batch_size: Maximum number of changes reported in one batch
         """
         self.project_root = project_root
         self.file_hashes: Dict[Path, str] = {}
+        self.file_stats: Dict[Path, Tuple[int, int]] = {}  # path -> (mtime_ns, size)
         self.last_scan: Optional[datetime] = None
         self.change_history: List[ChangeEvent] = []
         self.ignore_patterns = [
             '.git', '__pycache__', 'node_modules', '.venv', 'venv',
             'dist', 'build', '.pytest_cache', '.mypy_cache'
         ]
+        self.debounce_interval = debounce_interval
+        self.poll_interval = poll_interval
+        self.max_batch_size = max_batch_size
+        
+        # Paths reported by the watcher since the last check; full scan when set
+        self._lock = threading.Lock()
+        self._dirty: Set[Path] = set()
+        self._rescan_needed = False
+        self._last_event = 0.0
+        self._observer = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.stats = {'scans': 0, 'files_statted': 0, 'files_hashed': 0}
     
-    async def start_monitoring(self) -> None:
-        """Start continuous monitoring of the codebase."""
+    async def start_monitoring(self, watch: bool = False) -> None:
+        """
+        Start continuous monitoring of the codebase.
+        
+        Args:
+            watch: Also start the file system watcher
+        """
         await self._initial_scan()
         self.last_scan = datetime.now()
+        if watch:
+            self.start_watching()
     
     async def _initial_scan(self) -> None:
         """Perform initial scan of all files."""
-        python_files = self._find_python_files()
+        for file_path in self._find_python_files():
+            self._check_file(file_path)
+    
+    def start_watching(self) -> bool:
+        """
+        Start the file system watcher.
+        
+        Returns:
+            True if a watcher is running, False if changes will be polled
+        """
+        if self._observer is not None:
+            return True
+        if not _WATCHDOG_AVAILABLE:
+            logger.info("watchdog is not installed; polling for changes")
+            return False
+        
+        try:
+            observer = Observer()
+            observer.schedule(_ChangeCollector(self), str(self.project_root), recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            logger.warning(f"Could not watch {self.project_root}, polling instead: {e}")
+            return False
         
-        for file_path in python_files:
+        self._observer = observer
+        # Changes made before the watcher started are found by one full scan
+        self._mark_dirty(None)
+        return True
+    
+    def stop_watching(self) -> None:
+        """Stop the file system watcher."""
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+    
+    @property
+    def watching(self) -> bool:
+        return self._observer is not None
+    
+    def _is_ignored(self, path: Path) -> bool:
+        try:
+            parts = path.relative_to(self.project_root).parts
+        except ValueError:
+            return True
+        return any(part in self.ignore_patterns for part in parts[:-1])
+    
+    def _mark_dirty(self, path: Optional[Path]) -> None:
+        """Record a watcher event (None: rescan everything). Called from the watcher thread."""
+        if path is not None and (path.suffix != '.py' or self._is_ignored(path)):
+            return
+        with self._lock:
+            if path is None:
+                self._rescan_needed = True
+            else:
+                self._dirty.add(path)
+            self._last_event = time.monotonic()
+            wakeup, loop = self._wakeup, self._loop
+        if wakeup is not None and loop is not None:
             try:
-                content = file_path.read_text(encoding='utf-8')
-                content_hash = hashlib.md5(content.encode()).hexdigest()
-                self.file_hashes[file_path] = content_hash
-            except Exception as e:
-                print(f"Error scanning {file_path}: {e}")
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The waiting loop was closed
+                pass
     
     def _find_python_files(self) -> List[Path]:
         """Find all Python files in project."""
         python_files = []
         
-        for path in self.project_root.rglob('*.py'):
-            if any(ignore in str(path) for ignore in self.ignore_patterns):
-                continue
-            python_files.append(path)
+        for dirpath, dirnames, filenames in os.walk(self.project_root):
+            dirnames[:] = [name for name in dirnames if name not in self.ignore_patterns]
+            directory = Path(dirpath)
+            python_files.extend(directory / name for name in filenames if name.endswith('.py'))
         
         return python_files
     
-    async def detect_changes(self) -> List[ChangeEvent]:
+    def _check_file(self, file_path: Path) -> Optional[str]:
+        """
+        Compare a file against its last known state.
+        
+        The file is only read and hashed if its mtime or size changed.
+        
+        Returns:
+            'created', 'modified' or 'deleted', or None if unchanged
+        """
+        self.stats['files_statted'] += 1
+        try:
+            stat = file_path.stat()
+        except OSError:
+            stat = None
+        
+        known = file_path in self.file_hashes
+        if stat is None:
+            if not known:
+                return None
+            del self.file_hashes[file_path]
+            self.file_stats.pop(file_path, None)
+            return 'deleted'
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if known and self.file_stats.get(file_path) == signature:
+            return None
+        # A file written within the mtime granularity of now could change again
+        # without a new mtime, so its stat is not trusted until it is older
+        racy = time.time_ns() - stat.st_mtime_ns < self.RACY_WINDOW_NS
+        
+        try:
+            content = file_path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Error reading {file_path}: {e}")
+            return None
+        self.stats['files_hashed'] += 1
+        content_hash = hashlib.md5(content).hexdigest()
+        
+        if racy:
+            self.file_stats.pop(file_path, None)
+        else:
+            self.file_stats[file_path] = signature
+        previous = self.file_hashes.get(file_path)
+        self.file_hashes[file_path] = content_hash
+        if previous is None:
+            return 'created'
+        return 'modified' if previous != content_hash else None
+    
+    def _take_candidates(self) -> Optional[Set[Path]]:
+        """Take the paths to check: watcher events, or None for a full scan."""
+        with self._lock:
+            if self._observer is None or self._rescan_needed:
+                self._rescan_needed = False
+                self._dirty.clear()
+                return None
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+    
+    async def detect_changes(self, limit: Optional[int] = None) -> List[ChangeEvent]:
         """
         Detect changes since last scan.
         
+        Args:
+            limit: Maximum number of changes to report; the remaining changed
+                files are reported by the next call
+        
         Returns:
             List of change events
         """
         changes = []
-        current_files = set(self._find_python_files())
-        previous_files = set(self.file_hashes.keys())
+        candidates = self._take_candidates()
+        self.stats['scans'] += 1
         
-        # Detect new files
-        new_files = current_files - previous_files
-        for file_path in new_files:
-            try:
-                content = file_path.read_text(encoding='utf-8')
-                content_hash = hashlib.md5(content.encode()).hexdigest()
-                self.file_hashes[file_path] = content_hash
-                
-                change = ChangeEvent(
-                    file_path=file_path,
-                    change_type='created',
-                    timestamp=datetime.now(),
-                    content_hash=content_hash
-                )
-                changes.append(change)
-                self.change_history.append(change)
-            except Exception as e:
-                print(f"Error reading new file {file_path}: {e}")
+        if candidates is None:
+            current_files = self._find_python_files()
+            # Known files no longer found were deleted
+            paths = current_files + list(set(self.file_hashes) - set(current_files))
+        else:
+            paths = sorted(candidates)
         
-        # Detect deleted files
-        deleted_files = previous_files - current_files
-        for file_path in deleted_files:
+        for index, file_path in enumerate(paths):
+            if limit is not None and len(changes) >= limit:
+                # Leave the rest for the next batch
+                with self._lock:
+                    if candidates is None:
+                        self._rescan_needed = True
+                    else:
+                        self._dirty.update(paths[index:])
+                break
+            
+            change_type = self._check_file(file_path)
+            if change_type is None:
+                continue
             change = ChangeEvent(
                 file_path=file_path,
-                change_type='deleted',
-                timestamp=datetime.now()
+                change_type=change_type,
+                timestamp=datetime.now(),
+                content_hash=self.file_hashes.get(file_path)
             )
             changes.append(change)
             self.change_history.append(change)
-            del self.file_hashes[file_path]
-        
-        # Detect modified files
-        for file_path in current_files & previous_files:
-            try:
-                content = file_path.read_text(encoding='utf-8')
-                content_hash = hashlib.md5(content.encode()).hexdigest()
-                
-                if content_hash != self.file_hashes[file_path]:
-                    self.file_hashes[file_path] = content_hash
-                    change = ChangeEvent(
-                        file_path=file_path,
-                        change_type='modified',
-                        timestamp=datetime.now(),
-                        content_hash=content_hash
-                    )
-                    changes.append(change)
-                    self.change_history.append(change)
-            except Exception as e:
-                print(f"Error checking file {file_path}: {e}")
         
         self.last_scan = datetime.now()
         return changes
     
+    async def wait_for_changes(self, timeout: Optional[float] = None) -> List[ChangeEvent]:
+        """
+        Wait for the next batch of changes.
+        
+        With a watcher, this sleeps until files are touched, then waits for
+        ``debounce_interval`` without further events so that a burst of
+        writes (a save, a checkout) is reported as one batch. Without a
+        watcher, the tree is polled every ``poll_interval`` seconds.
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+        
+        Returns:
+            Up to ``max_batch_size`` change events (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+        
+        while True:
+            if not self.watching:
+                changes = await self.detect_changes(limit=self.max_batch_size)
+                if changes or (deadline is not None and remaining() <= 0):
+                    return changes
+                wait = self.poll_interval if deadline is None else min(self.poll_interval, remaining())
+                await asyncio.sleep(wait)
+                continue
+            
+            with self._lock:
+                pending = bool(self._dirty) or self._rescan_needed
+                if not pending:
+                    self._loop = asyncio.get_running_loop()
+                    self._wakeup = asyncio.Event()
+                wakeup = self._wakeup
+            
+            if not pending:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), remaining())
+                except asyncio.TimeoutError:
+                    return []
+                finally:
+                    with self._lock:
+                        self._wakeup = None
+            
+            # Debounce: wait until the tree has been quiet for a while
+            while True:
+                with self._lock:
+                    quiet_for = time.monotonic() - self._last_event
+                if quiet_for >= self.debounce_interval:
+                    break
+                await asyncio.sleep(self.debounce_interval - quiet_for)
+            
+            changes = await self.detect_changes(limit=self.max_batch_size)
+            if changes or (deadline is not None and remaining() <= 0):
+                return changes
+    
     def get_recent_changes(self, since: Optional[datetime] = None) -> List[ChangeEvent]:
         """
         Get recent changes since a specific time.
@@ -248,12 +490,49 @@ class CodebaseMonitor:
         return sum(1 for change in self.change_history if change.file_path == file_path)
 
 
+def _detect_issues_in_source(file_path: str, content: str) -> List[DetectedIssue]:
+    """Detect issues in file content in a worker process."""
+    return IssueDetector()._analyze_content(Path(file_path), content)
+
+
+def _issue_key(issue: DetectedIssue) -> Tuple:
+    """Identity of an issue across scans; line numbers shift with unrelated edits."""
+    return (issue.file_path, issue.issue_type, issue.description)
+
+
 class IssueDetector:
-    """Detects issues proactively in the codebase."""
+    """Detects issues proactively in the codebase.
     
-    def __init__(self):
-        """Initialize issue detector."""
+    Results are cached per file content hash, so unchanged files (or files
+    with the same content) are not parsed again. ``detected_issues`` holds
+    the current issues of every analyzed file.
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 64,
+        max_cached_results: int = 20000
+    ):
+        """
+        Initialize issue detector.
+        
+        Args:
+            max_workers: Worker processes for detection (defaults to the CPU count)
+            parallel_threshold: Minimum number of changed files to analyze in a process pool
+            max_cached_results: Per-content results kept in memory
+        """
         self.detected_issues: List[DetectedIssue] = []
+        self.file_issues: Dict[Path, List[DetectedIssue]] = {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.max_cached_results = max_cached_results
+        
+        # path -> (mtime_ns, size, digest), to skip reading unchanged files
+        self._file_digests: Dict[Path, Tuple[int, int, str]] = {}
+        # content digest -> issues found in that content
+        self._results: "OrderedDict[str, List[DetectedIssue]]" = OrderedDict()
+        self.scan_stats = {'analyzed': 0, 'reused': 0, 'unchanged': 0}
     
     async def detect_issues(self, file_path: Path) -> List[DetectedIssue]:
         """
@@ -265,11 +544,166 @@ class IssueDetector:
         Returns:
             List of detected issues
         """
+        issues = (await self._analyze_files([file_path]))[file_path]
+        self.file_issues[file_path] = issues
+        self._refresh_detected_issues()
+        return issues
+    
+    async def scan_files(self, file_paths: List[Path]) -> Tuple[List[DetectedIssue], IssueDelta]:
+        """
+        Detect issues in a set of files, replacing the results of the last scan.
+        
+        Files are only analyzed if their content changed since they were
+        last analyzed; many changed files are analyzed in a process pool.
+        
+        Args:
+            file_paths: Every file that is part of the scan
+            
+        Returns:
+            All current issues and the delta against the previous results
+        """
+        stats_before = dict(self.scan_stats)
+        results = await self._analyze_files(file_paths)
+        
+        previous = self.file_issues
+        removed = [path for path in previous if path not in results]
+        self.file_issues = results
+        self._refresh_detected_issues()
+        for path in removed:
+            self._file_digests.pop(path, None)
+        
+        old_keys = Counter(_issue_key(issue) for issues in previous.values() for issue in issues)
+        new_keys = Counter(_issue_key(issue) for issue in self.detected_issues)
+        delta = IssueDelta(
+            new_issues=self._unmatched(self.detected_issues, old_keys),
+            resolved_issues=self._unmatched(
+                [issue for issues in previous.values() for issue in issues], new_keys
+            ),
+            files_analyzed=self.scan_stats['analyzed'] - stats_before['analyzed'],
+            files_reused=len(file_paths) - (self.scan_stats['analyzed'] - stats_before['analyzed']),
+            files_removed=len(removed)
+        )
+        return self.detected_issues, delta
+    
+    @staticmethod
+    def _unmatched(issues: List[DetectedIssue], other_keys: Counter) -> List[DetectedIssue]:
+        """Issues without a counterpart in ``other_keys`` (multiset difference)."""
+        remaining = Counter(other_keys)
+        unmatched = []
+        for issue in issues:
+            key = _issue_key(issue)
+            if remaining[key]:
+                remaining[key] -= 1
+            else:
+                unmatched.append(issue)
+        return unmatched
+    
+    def _refresh_detected_issues(self) -> None:
+        self.detected_issues = [issue for issues in self.file_issues.values() for issue in issues]
+    
+    async def _analyze_files(self, file_paths: List[Path]) -> Dict[Path, List[DetectedIssue]]:
+        """Get the issues of each file, analyzing only content not seen before."""
+        results: Dict[Path, List[DetectedIssue]] = {}
+        pending: Dict[str, Tuple[Path, str]] = {}  # digest -> first file with that content
+        waiting: List[Tuple[Path, str]] = []
+        
+        for file_path in file_paths:
+            digest, content = self._read_if_changed(file_path)
+            if digest is None:
+                results[file_path] = []
+                continue
+            cached = self._results.get(digest)
+            if cached is not None:
+                self._results.move_to_end(digest)
+                self.scan_stats['reused'] += 1
+                results[file_path] = self._for_path(cached, file_path)
+            elif digest in pending:
+                waiting.append((file_path, digest))
+            else:
+                if content is None:
+                    # Stat unchanged but the result was evicted from the cache
+                    _, content = self._read(file_path)
+                pending[digest] = (file_path, content or '')
+                waiting.append((file_path, digest))
+        
+        analyzed: List[List[DetectedIssue]] = []
+        jobs = list(pending.items())
+        if len(jobs) >= self.parallel_threshold and self.max_workers > 1:
+            try:
+                # The pool is created and drained off the event loop
+                analyzed = await asyncio.get_running_loop().run_in_executor(
+                    None, self._detect_in_pool, [(str(path), content) for _, (path, content) in jobs]
+                )
+            except Exception as e:
+                logger.warning(f"Parallel issue detection failed, detecting serially: {e}")
+                analyzed = []
+        if len(analyzed) != len(jobs):
+            analyzed = [self._analyze_content(path, content) for _, (path, content) in jobs]
+        
+        for (digest, _), issues in zip(jobs, analyzed):
+            self.scan_stats['analyzed'] += 1
+            self._results[digest] = issues
+        while len(self._results) > self.max_cached_results:
+            self._results.popitem(last=False)
+        
+        for file_path, digest in waiting:
+            results[file_path] = self._for_path(self._results.get(digest, []), file_path)
+        return results
+    
+    def _detect_in_pool(self, sources: List[Tuple[str, str]]) -> List[List[DetectedIssue]]:
+        """Detect issues of (path, content) pairs in a process pool."""
+        # Forking would copy the watcher thread's locks into the workers
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context(method)
+        ) as executor:
+            return list(executor.map(
+                _detect_issues_in_source,
+                [path for path, _ in sources],
+                [content for _, content in sources],
+                chunksize=max(1, len(sources) // (self.max_workers * 4))
+            ))
+    
+    @staticmethod
+    def _for_path(issues: List[DetectedIssue], file_path: Path) -> List[DetectedIssue]:
+        """Issues of a content hash attributed to a specific file."""
+        return [issue if issue.file_path == file_path else replace(issue, file_path=file_path)
+                for issue in issues]
+    
+    def _read(self, file_path: Path) -> Tuple[Optional[str], Optional[str]]:
+        """Read a file and remember its stat and digest."""
+        try:
+            stat = file_path.stat()
+            data = file_path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Error reading {file_path}: {e}")
+            return None, None
+        digest = hashlib.sha256(data).hexdigest()
+        # Recently written files may change without a new mtime; always re-read those
+        if time.time_ns() - stat.st_mtime_ns >= CodebaseMonitor.RACY_WINDOW_NS:
+            self._file_digests[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        else:
+            self._file_digests.pop(file_path, None)
+        return digest, data.decode('utf-8', errors='replace')
+    
+    def _read_if_changed(self, file_path: Path) -> Tuple[Optional[str], Optional[str]]:
+        """Get a file's digest, reading it only if its stat changed."""
+        known = self._file_digests.get(file_path)
+        if known is not None:
+            try:
+                stat = file_path.stat()
+            except OSError:
+                return None, None
+            if (stat.st_mtime_ns, stat.st_size) == known[:2]:
+                self.scan_stats['unchanged'] += 1
+                return known[2], None
+        return self._read(file_path)
+    
+    def _analyze_content(self, file_path: Path, content: str) -> List[DetectedIssue]:
+        """Run every detector on a file's content."""
         issues = []
         
         try:
-            content = file_path.read_text(encoding='utf-8')
-            
             # Parse AST
             tree = ast.parse(content)
             
@@ -283,9 +717,8 @@ class IssueDetector:
             issues.extend(self._detect_inconsistencies(tree, file_path, content))
             
         except Exception as e:
-            print(f"Error detecting issues in {file_path}: {e}")
+            logger.warning(f"Error detecting issues in {file_path}: {e}")
         
-        self.detected_issues.extend(issues)
         return issues
     
     def _detect_missing_docstrings(
@@ -589,11 +1022,21 @@ class ProactiveAssistant:
         self.workflow_predictor = WorkflowPredictor()
         self.monitoring_active = False
     
-    async def start(self) -> None:
-        """Start the proactive assistant."""
-        await self.monitor.start_monitoring()
+    async def start(self, watch: bool = False) -> None:
+        """
+        Start the proactive assistant.
+        
+        Args:
+            watch: Watch the file system so changes are found without full scans
+        """
+        await self.monitor.start_monitoring(watch=watch)
         self.monitoring_active = True
     
+    def stop(self) -> None:
+        """Stop the proactive assistant."""
+        self.monitor.stop_watching()
+        self.monitoring_active = False
+    
     async def monitor_and_suggest(self) -> MonitoringResult:
         """
         Perform a monitoring cycle: detect changes, find issues, generate suggestions.
@@ -601,9 +1044,37 @@ class ProactiveAssistant:
         Returns:
             MonitoringResult with issues and suggestions
         """
-        # Detect changes
         changes = await self.monitor.detect_changes()
+        return await self._analyze_changes(changes)
+    
+    async def run_continuously(
+        self,
+        on_result: Callable[[MonitoringResult], Awaitable[None]]
+    ) -> None:
+        """
+        Analyze batches of changes as they happen until stopped or cancelled.
         
+        The assistant sleeps while the codebase is idle; with the watcher
+        running, a batch only costs a stat and hash of the touched files.
+        
+        Args:
+            on_result: Coroutine called with the result of every batch
+        """
+        if not self.monitoring_active:
+            await self.start(watch=True)
+        
+        while self.monitoring_active:
+            changes = await self.monitor.wait_for_changes(timeout=1.0)
+            if not changes:
+                continue
+            result = await self._analyze_changes(changes)
+            try:
+                await on_result(result)
+            except Exception as e:
+                logger.error(f"Monitoring result handler failed: {e}")
+    
+    async def _analyze_changes(self, changes: List[ChangeEvent]) -> MonitoringResult:
+        """Find issues in changed files and generate suggestions."""
         # Detect issues in changed files
         all_issues = []
         changed_files = [c.file_path for c in changes if c.change_type in ['created', 'modified']]
@@ -650,12 +1121,8 @@ class ProactiveAssistant:
         Returns:
             MonitoringResult with all issues and suggestions
         """
-        all_issues = []
         python_files = self.monitor._find_python_files()
-        
-        for file_path in python_files:
-            issues = await self.issue_detector.detect_issues(file_path)
-            all_issues.extend(issues)
+        all_issues, delta = await self.issue_detector.scan_files(python_files)
         
         # Generate suggestions
         context = {'total_files': len(python_files)}
@@ -664,7 +1131,8 @@ class ProactiveAssistant:
         return MonitoringResult(
             issues=all_issues,
             suggestions=suggestions,
-            files_monitored=len(python_files)
+            files_monitored=len(python_files),
+            delta=delta
         )
     
     def get_summary(self) -> Dict[str, Any]:
@@ -18,8 +18,10 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Callable
 
-from .file_creator import FileCreator, FileOperation, OperationType
+from .file_creator import FileCreator, FileOperation, OperationStatus, OperationType
 from .command_executor import CommandExecutor, CommandResult
+from .template_engine import get_template_engine
+from .template_manager import Template, render_template_files
 
 logger = logging.getLogger(__name__)
 
@@ -193,6 +195,9 @@ class ProjectScaffolder:
         
         # Template configurations
         self.templates = self._initialize_templates()
+        
+        # Compiled renderer for multi-file templates
+        self.template_engine = get_template_engine()
     
     def _initialize_type_patterns(self) -> Dict[ProjectType, List[str]]:
         """Initialize patterns for project type detection."""
@@ -533,6 +538,85 @@ class ProjectScaffolder:
         logger.info(f"Successfully created {proj_type.value} project: {name}")
         return project
 
+    def create_project_from_template(
+        self,
+        template: Template,
+        name: str,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> Project:
+        """
+        Create a project from a multi-file template.
+        
+        Every file body is compiled once and rendered from the shared cache.
+        Rendering and writing are serial: both are dominated by GIL-bound work
+        on small files, and a thread pool measured no faster.
+        
+        Args:
+            template: Template to scaffold from
+            name: Name of the project
+            variables: Variable values (``project_name`` defaults to ``name``)
+            
+        Returns:
+            Created Project object
+            
+        Raises:
+            RuntimeError: If any file could not be written
+        """
+        values = {'project_name': name, **(variables or {})}
+        rendered = render_template_files(template, values, self.template_engine)
+        
+        try:
+            proj_type = ProjectType(template.metadata.name.replace('-', '_'))
+        except ValueError:
+            proj_type = ProjectType.GENERIC
+        
+        config = ProjectConfig(
+            name=name,
+            project_type=proj_type,
+            description=template.metadata.description,
+            author=template.metadata.author,
+            version=values.get('version', '0.1.0'),
+            dependencies=list(template.dependencies),
+            dev_dependencies=list(template.dev_dependencies),
+        )
+        
+        project_path = self.base_path / name
+        logger.info(f"Creating project from template {template.metadata.name} at: {project_path}")
+        
+        structure = DirectoryStructure(
+            directories=[
+                Path(name) / self.template_engine.render(d, values)
+                for d in template.directories
+            ],
+            files={Path(name) / path: content for path, content in rendered.items()},
+        )
+        
+        for directory in structure.directories:
+            (self.base_path / directory).mkdir(parents=True, exist_ok=True)
+        
+        failures = []
+        for file_path, content in structure.files.items():
+            full_path = self.base_path / file_path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            operation = self.file_creator.create_file(path=full_path, content=content, preview=False)
+            if operation.status == OperationStatus.FAILED:
+                failures.append(f"{full_path}: {operation.error_message}")
+        
+        if failures:
+            logger.error(f"Failed to create {len(failures)} files from template {template.metadata.name}")
+            raise RuntimeError("Failed to create project files:\n" + "\n".join(failures))
+        
+        project = Project(
+            name=name,
+            path=project_path,
+            project_type=proj_type,
+            config=config,
+            structure=structure,
+        )
+        
+        logger.info(f"Successfully created project from template {template.metadata.name}: {name}")
+        return project
+
     # Template generation methods
     
     def _generate_requirements_txt(self, template: Dict[str, Any]) -> str:
@@ -3,13 +3,26 @@ Telemetry and Analytics System for CodeGenie
 Collects anonymous usage data to improve the product (opt-in only)
 """
 
+import atexit
+import base64
+import gzip
 import json
+import logging
+import math
+import os
+import shutil
+import threading
 import uuid
 import hashlib
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Set
+from dataclasses import dataclass, asdict, field
+
+logger = logging.getLogger(__name__)
+
+# Bump when the summary sidecar layout changes; older sidecars are rebuilt
+SUMMARY_VERSION = 1
 
 
 @dataclass
@@ -23,10 +36,149 @@ class TelemetryEvent:
     version: str
 
 
+class SessionSketch:
+    """Mergeable distinct count of session ids
+    
+    Counts are exact up to ``exact_limit`` sessions; beyond that the
+    HyperLogLog registers, which are always maintained, give an estimate
+    with about 3% standard error.
+    """
+    
+    PRECISION = 10
+    
+    def __init__(self, exact_limit: int = 256):
+        self.exact_limit = exact_limit
+        self.registers = bytearray(1 << self.PRECISION)
+        self.exact: Optional[Set[str]] = set()
+    
+    def add(self, session_id: str):
+        """Add a session id"""
+        digest = hashlib.blake2b(session_id.encode(), digest_size=8).digest()
+        if self.exact is not None:
+            self.exact.add(digest.hex())
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+        
+        value = int.from_bytes(digest, 'big')
+        index = value >> (64 - self.PRECISION)
+        rest_bits = 64 - self.PRECISION
+        rank = rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def merge(self, other: 'SessionSketch'):
+        """Add the sessions counted by another sketch"""
+        for index, rank in enumerate(other.registers):
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+        if self.exact is not None and other.exact is not None:
+            self.exact |= other.exact
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+        else:
+            self.exact = None
+    
+    def count(self) -> int:
+        """Get the (estimated) number of distinct sessions"""
+        if self.exact is not None:
+            return len(self.exact)
+        
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "registers": base64.b64encode(bytes(self.registers)).decode(),
+            "exact": sorted(self.exact) if self.exact is not None else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionSketch':
+        sketch = cls()
+        sketch.registers = bytearray(base64.b64decode(data["registers"]))
+        sketch.exact = set(data["exact"]) if data.get("exact") is not None else None
+        return sketch
+
+
+@dataclass
+class EventFileSummary:
+    """Summary of one day of events, kept in a sidecar next to the event file"""
+    events: int = 0
+    events_by_type: Dict[str, int] = field(default_factory=dict)
+    sessions: SessionSketch = field(default_factory=SessionSketch)
+    start: Optional[str] = None
+    end: Optional[str] = None
+    size: int = 0  # Bytes of the uncompressed event file covered by the summary
+    compressed: bool = False
+    
+    def add(self, event: Dict[str, Any]):
+        """Add one event"""
+        event_type, session_id, timestamp = event["event_type"], event["session_id"], event["timestamp"]
+        self.events += 1
+        self.events_by_type[event_type] = self.events_by_type.get(event_type, 0) + 1
+        self.sessions.add(session_id)
+        if self.start is None or timestamp < self.start:
+            self.start = timestamp
+        if self.end is None or timestamp > self.end:
+            self.end = timestamp
+    
+    def merge(self, other: 'EventFileSummary'):
+        """Add the events summarized by another summary"""
+        self.events += other.events
+        for event_type, count in other.events_by_type.items():
+            self.events_by_type[event_type] = self.events_by_type.get(event_type, 0) + count
+        self.sessions.merge(other.sessions)
+        if other.start is not None and (self.start is None or other.start < self.start):
+            self.start = other.start
+        if other.end is not None and (self.end is None or other.end > self.end):
+            self.end = other.end
+        self.size += other.size
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": SUMMARY_VERSION,
+            "events": self.events,
+            "events_by_type": self.events_by_type,
+            "sessions": self.sessions.to_dict(),
+            "start": self.start,
+            "end": self.end,
+            "size": self.size,
+            "compressed": self.compressed
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EventFileSummary':
+        return cls(
+            events=data["events"],
+            events_by_type=dict(data["events_by_type"]),
+            sessions=SessionSketch.from_dict(data["sessions"]),
+            start=data["start"],
+            end=data["end"],
+            size=data["size"],
+            compressed=data["compressed"]
+        )
+
+
 class TelemetryManager:
-    """Manages telemetry collection and reporting"""
+    """Manages telemetry collection and reporting
     
-    def __init__(self, config_dir: Path):
+    Events are buffered in memory and appended to the daily
+    ``events_YYYYMMDD.jsonl`` file in batches, every ``flush_interval``
+    seconds or once ``buffer_size`` events are pending. Every event file has
+    an ``events_YYYYMMDD.summary.json`` sidecar (event counts by type,
+    session sketch, time range) updated as batches are written, and files of
+    past days are gzip-compressed. Usage statistics are merged from the
+    summaries without reading the events themselves.
+    
+    Events that cannot be written are kept for the next flush, up to
+    ``10 * buffer_size`` of them; telemetry errors never reach callers.
+    """
+    
+    def __init__(self, config_dir: Path, flush_interval: float = 5.0, buffer_size: int = 100):
         self.config_dir = config_dir
         self.telemetry_dir = config_dir.parent.parent / ".codegenie" / "telemetry"
         self.telemetry_dir.mkdir(parents=True, exist_ok=True)
@@ -35,6 +187,19 @@ class TelemetryManager:
         self.user_id = self._get_or_create_user_id()
         self.session_id = str(uuid.uuid4())
         
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._lock = threading.RLock()
+        self._buffer: List[TelemetryEvent] = []
+        self._summaries: Dict[str, EventFileSummary] = {}  # Day -> summary of its event file
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._rotated_day: Optional[str] = None
+        
+        if self.enabled:
+            self.rotate()
+            atexit.register(self.close)
+        
     def _check_enabled(self) -> bool:
         """Check if telemetry is enabled"""
         config_file = self.config_dir / "config.yaml"
@@ -103,11 +268,214 @@ class TelemetryManager:
         return sanitized
     
     def _save_event(self, event: TelemetryEvent):
-        """Save event to local storage"""
-        events_file = self.telemetry_dir / f"events_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        """Buffer an event for the next batched write"""
+        with self._lock:
+            self._buffer.append(event)
+            pending = len(self._buffer)
         
-        with open(events_file, 'a') as f:
-            f.write(json.dumps(asdict(event)) + '\n')
+        if pending >= self.buffer_size:
+            self.flush()
+        else:
+            self._ensure_flush_thread()
+    
+    def _ensure_flush_thread(self):
+        """Start the periodic flush thread on first use"""
+        if self._flush_thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._flush_thread is None:
+                self._flush_thread = threading.Thread(
+                    target=self._flush_periodically, name="TelemetryFlush", daemon=True
+                )
+                self._flush_thread.start()
+    
+    def _flush_periodically(self):
+        try:
+            while not self._stop.wait(self.flush_interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Telemetry flush failed: {e}")
+        finally:
+            # Let the next event start a new thread
+            with self._lock:
+                if self._flush_thread is threading.current_thread():
+                    self._flush_thread = None
+    
+    def flush(self):
+        """Write buffered events and update the summaries of their files"""
+        with self._lock:
+            events, self._buffer = self._buffer, []
+            if not events:
+                return
+            
+            by_day: Dict[str, List[TelemetryEvent]] = {}
+            for event in events:
+                by_day.setdefault(event.timestamp[:10].replace('-', ''), []).append(event)
+            
+            unwritten: List[TelemetryEvent] = []
+            for day, day_events in by_day.items():
+                try:
+                    self._append_events(day, day_events)
+                except OSError as e:
+                    logger.warning(f"Could not write {len(day_events)} telemetry events for {day}: {e}")
+                    unwritten.extend(day_events)
+            
+            if unwritten:
+                # Retried by the next flush; the oldest events go first if writes keep failing
+                self._buffer = (unwritten + self._buffer)[-self.buffer_size * 10:]
+            
+            if self._rotated_day != self._today():
+                try:
+                    self.rotate()
+                except OSError as e:
+                    logger.warning(f"Could not rotate telemetry files: {e}")
+    
+    def close(self):
+        """Stop the flush thread and write everything still buffered"""
+        self._stop.set()
+        self.flush()
+    
+    def _today(self) -> str:
+        return datetime.now().strftime('%Y%m%d')
+    
+    def _events_file(self, day: str, compressed: bool = False) -> Path:
+        return self.telemetry_dir / f"events_{day}.jsonl{'.gz' if compressed else ''}"
+    
+    def _summary_file(self, day: str) -> Path:
+        return self.telemetry_dir / f"events_{day}.summary.json"
+    
+    def _append_events(self, day: str, events: List[TelemetryEvent]):
+        """Append events to a day's file and fold them into its summary"""
+        events_file = self._events_file(day)
+        if not events_file.exists() and self._events_file(day, compressed=True).exists():
+            # Late events for a day that was already rotated
+            self._merge_into_compressed(day, events)
+            return
+        
+        summary = self._current_summary(day)
+        records = [asdict(event) for event in events]
+        payload = ''.join(json.dumps(record) + '\n' for record in records).encode()
+        
+        with open(events_file, 'ab') as f:
+            f.write(payload)
+        
+        for record in records:
+            summary.add(record)
+        summary.size += len(payload)
+        self._save_summary(day, summary)
+    
+    def _current_summary(self, day: str) -> EventFileSummary:
+        """Get the summary of a plain event file, rebuilding it if it is stale"""
+        events_file = self._events_file(day)
+        size = events_file.stat().st_size if events_file.exists() else 0
+        
+        summary = self._summaries.get(day)
+        if summary is None or summary.compressed or summary.size != size:
+            # Missing, or another process appended to the file since
+            summary = self._load_summary(day)
+            if summary is None or summary.compressed or summary.size != size:
+                summary = self._build_summary(events_file)
+                if size:
+                    self._write_summary(day, summary)
+            self._summaries[day] = summary
+        return summary
+    
+    def _merge_into_compressed(self, day: str, events: List[TelemetryEvent]):
+        """Add late events to an already compressed day"""
+        compressed_file = self._events_file(day, compressed=True)
+        summary = self._load_summary(day)
+        if summary is None or not summary.compressed:
+            summary = self._build_summary(compressed_file)
+        payload = ''.join(json.dumps(asdict(event)) + '\n' for event in events).encode()
+        
+        # Gzip members concatenate into one valid stream
+        with open(compressed_file, 'ab') as f:
+            f.write(gzip.compress(payload))
+        
+        for event in events:
+            summary.add(asdict(event))
+        summary.size += len(payload)
+        summary.compressed = True
+        self._summaries[day] = summary
+        self._save_summary(day, summary)
+    
+    def rotate(self):
+        """Compress the event files of past days"""
+        today = self._today()
+        with self._lock:
+            self._rotated_day = today
+            for events_file in sorted(self.telemetry_dir.glob("events_*.jsonl")):
+                day = events_file.stem[len("events_"):]
+                if day >= today:
+                    continue
+                
+                previous = self._load_summary(day)
+                summary = self._current_summary(day)
+                compressed_file = self._events_file(day, compressed=True)
+                if compressed_file.exists() and previous is not None and previous.compressed:
+                    # The day was already rotated: append the plain events to its compressed file
+                    with open(events_file, 'rb') as src, open(compressed_file, 'ab') as dst:
+                        dst.write(gzip.compress(src.read()))
+                    previous.merge(summary)
+                    summary = previous
+                else:
+                    # Also replaces the output of a rotation that was interrupted
+                    temp_file = compressed_file.with_suffix('.tmp')
+                    with open(events_file, 'rb') as src, gzip.open(temp_file, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.replace(temp_file, compressed_file)
+                
+                # Unlink before writing the summary: a crash in between leaves a
+                # plain summary next to a compressed file, which is rebuilt on read
+                events_file.unlink()
+                summary.compressed = True
+                self._write_summary(day, summary)
+                self._summaries[day] = summary
+    
+    def _load_summary(self, day: str) -> Optional[EventFileSummary]:
+        """Read a day's summary sidecar, or None if missing or unreadable"""
+        try:
+            data = json.loads(self._summary_file(day).read_text())
+            if data.get("version") != SUMMARY_VERSION:
+                return None
+            return EventFileSummary.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _save_summary(self, day: str, summary: EventFileSummary):
+        """Write a sidecar after its events were written, without failing the write"""
+        try:
+            self._write_summary(day, summary)
+        except OSError as e:
+            logger.warning(f"Could not write telemetry summary for {day}: {e}")
+            # A missing sidecar is rebuilt from the events on read
+            try:
+                self._summary_file(day).unlink()
+            except OSError:
+                pass
+    
+    def _write_summary(self, day: str, summary: EventFileSummary):
+        summary_file = self._summary_file(day)
+        temp_file = summary_file.with_suffix('.tmp')
+        temp_file.write_text(json.dumps(summary.to_dict()))
+        os.replace(temp_file, summary_file)
+    
+    def _build_summary(self, events_file: Path) -> EventFileSummary:
+        """Summarize an event file by reading all of its events"""
+        summary = EventFileSummary(compressed=events_file.suffix == '.gz')
+        if not events_file.exists():
+            return summary
+        
+        opener = gzip.open if summary.compressed else open
+        with opener(events_file, 'rb') as f:
+            for line in f:
+                summary.size += len(line)
+                try:
+                    summary.add(json.loads(line))
+                except (ValueError, KeyError):
+                    continue
+        return summary
     
     def _get_version(self) -> str:
         """Get CodeGenie version"""
@@ -117,35 +485,41 @@ class TelemetryManager:
         except:
             return "unknown"
     
+    def _compressed_summary(self, day: str) -> EventFileSummary:
+        """Get the summary of a compressed event file, rebuilding it if missing"""
+        summary = self._load_summary(day)
+        if summary is None or not summary.compressed:
+            summary = self._build_summary(self._events_file(day, compressed=True))
+            self._write_summary(day, summary)
+        return summary
+    
     def get_usage_stats(self) -> Dict[str, Any]:
-        """Get local usage statistics"""
-        stats = {
-            "total_events": 0,
-            "events_by_type": {},
-            "sessions": set(),
-            "date_range": {"start": None, "end": None}
-        }
+        """Get local usage statistics
         
-        for events_file in self.telemetry_dir.glob("events_*.jsonl"):
-            with open(events_file) as f:
-                for line in f:
-                    event = json.loads(line)
-                    stats["total_events"] += 1
-                    
-                    event_type = event["event_type"]
-                    stats["events_by_type"][event_type] = \
-                        stats["events_by_type"].get(event_type, 0) + 1
-                    
-                    stats["sessions"].add(event["session_id"])
-                    
-                    timestamp = event["timestamp"]
-                    if stats["date_range"]["start"] is None or timestamp < stats["date_range"]["start"]:
-                        stats["date_range"]["start"] = timestamp
-                    if stats["date_range"]["end"] is None or timestamp > stats["date_range"]["end"]:
-                        stats["date_range"]["end"] = timestamp
-        
-        stats["sessions"] = len(stats["sessions"])
-        return stats
+        Merged from the per-file summaries; event files are only read to
+        rebuild a summary that is missing or out of date.
+        """
+        self.flush()
+        
+        days = set()
+        for events_file in self.telemetry_dir.glob("events_*.jsonl*"):
+            if events_file.name.endswith((".jsonl", ".jsonl.gz")):
+                days.add(events_file.name[len("events_"):].split(".", 1)[0])
+        
+        total = EventFileSummary()
+        with self._lock:
+            for day in sorted(days):
+                if self._events_file(day).exists():
+                    total.merge(self._current_summary(day))
+                else:
+                    total.merge(self._compressed_summary(day))
+        
+        return {
+            "total_events": total.events,
+            "events_by_type": total.events_by_type,
+            "sessions": total.sessions.count(),
+            "date_range": {"start": total.start, "end": total.end}
+        }
 
 
 class UsageAnalytics:
@@ -0,0 +1,235 @@
+"""
+Compiled template rendering for scaffolding.
+
+This module provides a small template compiler including:
+- One-time parsing of template text into literal/variable segments
+- An LRU cache of compiled templates keyed by content hash
+- Single-pass rendering that never rescans substituted values
+- Rendering of multi-file templates from the shared cache
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateSyntax(Enum):
+    """Placeholder syntaxes understood by the engine."""
+    TEMPLATE = "template"  # ${var}, $var, $$ and {{ var }} (TemplateManager)
+    FORMAT = "format"  # {var} (FileCreator content templates)
+
+
+_SYNTAX_PATTERNS = {
+    TemplateSyntax.TEMPLATE: re.compile(
+        r'\$(?:(?P<escaped>\$)|(?P<named>[_a-z][_a-z0-9]*)|\{(?P<braced>[_a-z][_a-z0-9]*)\})'
+        r'|\{\{\s*(?P<mustache>[^{}]+?)\s*\}\}',
+        re.IGNORECASE | re.ASCII
+    ),
+    TemplateSyntax.FORMAT: re.compile(r'\{(?P<named>[^{}]+)\}'),
+}
+
+# Segment kinds
+LITERAL = 0
+VARIABLE = 1
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    A template parsed into segments.
+
+    Each segment is ``(LITERAL, text, text)`` or ``(VARIABLE, name, raw)``
+    where ``raw`` is the original placeholder, emitted unchanged when the
+    variable is not supplied.
+    """
+    segments: Tuple[Tuple[int, str, str], ...]
+    variables: FrozenSet[str]
+
+    def render(self, variables: Mapping[str, Any]) -> str:
+        """
+        Render the template in a single pass.
+
+        Args:
+            variables: Variable values
+
+        Returns:
+            Rendered text
+        """
+        parts = []
+        append = parts.append
+        for kind, value, raw in self.segments:
+            if kind == LITERAL:
+                append(value)
+            elif value in variables:
+                append(str(variables[value]))
+            else:
+                append(raw)
+        return ''.join(parts)
+
+
+def compile_template(content: str, syntax: TemplateSyntax = TemplateSyntax.TEMPLATE) -> CompiledTemplate:
+    """
+    Parse template text into a segment list.
+
+    Args:
+        content: Template text
+        syntax: Placeholder syntax to recognise
+
+    Returns:
+        CompiledTemplate
+    """
+    segments: List[Tuple[int, str, str]] = []
+    names = set()
+    position = 0
+
+    def add_literal(text: str) -> None:
+        if not text:
+            return
+        if segments and segments[-1][0] == LITERAL:
+            merged = segments[-1][1] + text
+            segments[-1] = (LITERAL, merged, merged)
+        else:
+            segments.append((LITERAL, text, text))
+
+    for match in _SYNTAX_PATTERNS[syntax].finditer(content):
+        add_literal(content[position:match.start()])
+        position = match.end()
+
+        groups = match.groupdict()
+        if groups.get('escaped'):
+            add_literal('$')
+            continue
+
+        name = groups.get('named') or groups.get('braced') or groups.get('mustache')
+        segments.append((VARIABLE, name, match.group(0)))
+        names.add(name)
+
+    add_literal(content[position:])
+    return CompiledTemplate(segments=tuple(segments), variables=frozenset(names))
+
+
+class TemplateEngine:
+    """
+    Compiles and renders templates with a shared cache.
+
+    Compiled templates are keyed by a hash of their content, so the same
+    file body used by several templates (or several renders) is parsed once.
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the template engine.
+
+        Args:
+            cache_size: Maximum number of compiled templates to keep
+        """
+        self.cache_size = cache_size
+
+        self._cache: 'OrderedDict[Tuple[TemplateSyntax, bytes], CompiledTemplate]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, content: str, syntax: TemplateSyntax = TemplateSyntax.TEMPLATE) -> CompiledTemplate:
+        """
+        Return the compiled form of ``content``, compiling it on first use.
+
+        Args:
+            content: Template text
+            syntax: Placeholder syntax
+
+        Returns:
+            CompiledTemplate
+        """
+        key = (syntax, hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = compile_template(content, syntax)
+        with self._lock:
+            self._cache[key] = compiled
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def render(
+        self,
+        content: str,
+        variables: Mapping[str, Any],
+        syntax: TemplateSyntax = TemplateSyntax.TEMPLATE
+    ) -> str:
+        """
+        Compile (or fetch) and render a template.
+
+        Args:
+            content: Template text
+            variables: Variable values
+            syntax: Placeholder syntax
+
+        Returns:
+            Rendered text
+        """
+        return self.compile(content, syntax).render(variables)
+
+    def render_many(
+        self,
+        contents: Mapping[str, str],
+        variables: Mapping[str, Any],
+        syntax: TemplateSyntax = TemplateSyntax.TEMPLATE
+    ) -> Dict[str, str]:
+        """
+        Render several templates.
+
+        Rendering is serial: it is GIL-bound string work, and a thread pool
+        measured no faster for multi-file templates.
+
+        Args:
+            contents: Mapping of key (e.g. file path) to template text
+            variables: Variable values shared by all templates
+            syntax: Placeholder syntax
+
+        Returns:
+            Mapping of the same keys to rendered text
+        """
+        return {key: self.render(text, variables, syntax) for key, text in contents.items()}
+
+    def clear_cache(self) -> None:
+        """Drop all compiled templates."""
+        with self._lock:
+            self._cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit rate."""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'max_size': self.cache_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_default_engine: Optional[TemplateEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_template_engine() -> TemplateEngine:
+    """Return the process-wide template engine."""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = TemplateEngine()
+        return _default_engine
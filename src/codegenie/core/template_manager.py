@@ -11,14 +11,18 @@ This module provides template management with:
 
 import json
 import logging
+import os
 import re
 import shutil
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
-from string import Template as StringTemplate
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .template_engine import TemplateEngine, get_template_engine
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +77,81 @@ class TemplateFile:
         return cls(**data)
 
 
+class LazyTemplateFile(TemplateFile):
+    """
+    A template file whose content is read from disk on first access.
+    
+    Falls back to the inline content from ``template.json`` when the body
+    file does not exist. Loaded content is dropped by ``refresh`` when the
+    body file changes on disk.
+    """
+    
+    def __init__(self, path: str, source: Path, is_template: bool = True, inline_content: str = ""):
+        """
+        Initialize a lazily loaded template file.
+        
+        Args:
+            path: Relative path within project
+            source: File holding the content
+            is_template: Whether to perform variable substitution
+            inline_content: Content to use when ``source`` does not exist
+        """
+        self.source = source
+        self._inline_content = inline_content
+        self._content: Optional[str] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        super().__init__(path=path, content=None, is_template=is_template)
+    
+    @property
+    def content(self) -> str:
+        """File content, loaded on first access."""
+        if self._content is None:
+            self._content, self._signature = self._read()
+        return self._content
+    
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self._content = value
+        self._signature = None
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the content has been read."""
+        return self._content is not None
+    
+    def _read(self) -> Tuple[str, Optional[Tuple[int, int]]]:
+        try:
+            with open(self.source, 'r') as f:
+                signature = _stat_signature(os.fstat(f.fileno()))
+                return f.read(), signature
+        except FileNotFoundError:
+            return self._inline_content, None
+    
+    def refresh(self) -> bool:
+        """
+        Drop loaded content if the body file changed since it was read.
+        
+        Returns:
+            True if the content was dropped
+        """
+        if self._signature is None:
+            return False
+        try:
+            current = _stat_signature(self.source.stat())
+        except OSError:
+            current = None
+        if current != self._signature:
+            self._content = None
+            self._signature = None
+            return True
+        return False
+
+
+def _stat_signature(st: os.stat_result) -> Tuple[int, int]:
+    """Return the (mtime, size) pair used to validate cached data."""
+    return (st.st_mtime_ns, st.st_size)
+
+
 @dataclass
 class Template:
     """Represents a project template."""
@@ -122,6 +201,41 @@ class ValidationResult:
         return asdict(self)
 
 
+def render_template_files(
+    template: Template,
+    variables: Optional[Dict[str, Any]] = None,
+    engine: Optional[TemplateEngine] = None
+) -> Dict[str, str]:
+    """
+    Render the paths and contents of a template's files.
+    
+    Files marked ``is_template=False`` are copied verbatim.
+    
+    Args:
+        template: Template to render
+        variables: Variable values (merged over the template defaults)
+        engine: Template engine (defaults to the shared engine)
+        
+    Returns:
+        Dictionary mapping rendered relative paths to rendered content
+    """
+    engine = engine or get_template_engine()
+    values = {**template.variables, **(variables or {})}
+    
+    to_render = {
+        str(index): template_file.content
+        for index, template_file in enumerate(template.files)
+        if template_file.is_template
+    }
+    rendered = engine.render_many(to_render, values)
+    
+    files = {}
+    for index, template_file in enumerate(template.files):
+        path = engine.render(template_file.path, values)
+        files[path] = rendered.get(str(index), template_file.content)
+    return files
+
+
 class TemplateManager:
     """
     Template management system for project scaffolding.
@@ -134,12 +248,16 @@ class TemplateManager:
     - Template versioning
     """
     
-    def __init__(self, templates_dir: Optional[Path] = None):
+    CATALOG_FILE = 'catalog.json'
+    CATALOG_VERSION = 1
+    
+    def __init__(self, templates_dir: Optional[Path] = None, cache_size: int = 64):
         """
         Initialize template manager.
         
         Args:
             templates_dir: Directory containing templates (defaults to ~/.codegenie/templates)
+            cache_size: Maximum number of loaded templates to keep in memory
         """
         if templates_dir:
             self.templates_dir = Path(templates_dir)
@@ -156,8 +274,17 @@ class TemplateManager:
         for dir_path in [self.builtin_dir, self.custom_dir, self.imported_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
         
-        # Cache of loaded templates
-        self._template_cache: Dict[str, Template] = {}
+        # LRU cache of loaded templates: cache key -> (template.json path, signature, template)
+        self.cache_size = cache_size
+        self._template_cache: 'OrderedDict[str, Tuple[Path, Tuple[int, int], Template]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Catalog of template metadata, validated per entry by template.json mtime/size
+        self.catalog_path = self.templates_dir / self.CATALOG_FILE
+        self._catalog: Optional[Dict[str, Dict[str, Any]]] = None
+        
+        # Compiled template renderer shared across managers
+        self.engine = get_template_engine()
         
         logger.info(f"Initialized TemplateManager with templates_dir: {self.templates_dir}")
     
@@ -174,9 +301,10 @@ class TemplateManager:
         """
         # Check cache first
         cache_key = f"{template_type.value if template_type else 'any'}:{name}"
-        if cache_key in self._template_cache:
+        cached = self._get_cached_template(cache_key)
+        if cached is not None:
             logger.debug(f"Loaded template from cache: {name}")
-            return self._template_cache[cache_key]
+            return cached
         
         # Determine search directories
         if template_type:
@@ -189,8 +317,9 @@ class TemplateManager:
             template_path = search_dir / name / 'template.json'
             if template_path.exists():
                 try:
+                    signature = _stat_signature(template_path.stat())
                     template = self._load_template_from_file(template_path)
-                    self._template_cache[cache_key] = template
+                    self._cache_template(cache_key, template_path, signature, template)
                     logger.info(f"Loaded template: {name} from {search_dir}")
                     return template
                 except Exception as e:
@@ -200,20 +329,81 @@ class TemplateManager:
         logger.warning(f"Template not found: {name}")
         return None
     
+    def _get_cached_template(self, cache_key: str) -> Optional[Template]:
+        """Return a cached template if its template.json is unchanged."""
+        with self._cache_lock:
+            entry = self._template_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        template_path, signature, template = entry
+        try:
+            current = _stat_signature(template_path.stat())
+        except OSError:
+            current = None
+        
+        if current != signature:
+            self._evict_template(cache_key)
+            return None
+        
+        # Bodies already read are re-read on next access if they changed
+        for template_file in template.files:
+            if isinstance(template_file, LazyTemplateFile):
+                template_file.refresh()
+        
+        with self._cache_lock:
+            if cache_key in self._template_cache:
+                self._template_cache.move_to_end(cache_key)
+        return template
+    
+    def _cache_template(
+        self,
+        cache_key: str,
+        template_path: Path,
+        signature: Tuple[int, int],
+        template: Template
+    ) -> None:
+        """Add a template to the LRU cache."""
+        with self._cache_lock:
+            self._template_cache[cache_key] = (template_path, signature, template)
+            self._template_cache.move_to_end(cache_key)
+            while len(self._template_cache) > self.cache_size:
+                self._template_cache.popitem(last=False)
+    
+    def _evict_template(self, *cache_keys: str) -> None:
+        """Remove templates from the cache."""
+        with self._cache_lock:
+            for cache_key in cache_keys:
+                self._template_cache.pop(cache_key, None)
+    
+    def clear_cache(self) -> None:
+        """Drop all cached templates and the in-memory catalog."""
+        with self._cache_lock:
+            self._template_cache.clear()
+        self._catalog = None
+    
     def _load_template_from_file(self, template_path: Path) -> Template:
-        """Load template from JSON file."""
+        """
+        Load template from JSON file.
+        
+        Only the structure is parsed; file bodies stored under ``files/``
+        are read when their content is first accessed.
+        """
         with open(template_path, 'r') as f:
             data = json.load(f)
         
+        files_dir = template_path.parent / 'files'
+        file_entries = data.pop('files', [])
         template = Template.from_dict(data)
-        
-        # Load file contents from separate files if they exist
-        template_dir = template_path.parent
-        for template_file in template.files:
-            file_path = template_dir / 'files' / template_file.path
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    template_file.content = f.read()
+        template.files = [
+            LazyTemplateFile(
+                path=entry['path'],
+                source=files_dir / entry['path'],
+                is_template=entry.get('is_template', True),
+                inline_content=entry.get('content', ''),
+            )
+            for entry in file_entries
+        ]
         
         return template
     
@@ -247,8 +437,14 @@ class TemplateManager:
             for template_file in template.files:
                 file_path = files_dir / template_file.path
                 file_path.parent.mkdir(parents=True, exist_ok=True)
+                # Read lazily loaded content before the target is truncated
+                content = template_file.content
                 with open(file_path, 'w') as f:
-                    f.write(template_file.content)
+                    f.write(content)
+                if isinstance(template_file, LazyTemplateFile):
+                    # The saved copy now backs this file (e.g. after an import)
+                    template_file.source = file_path
+                    template_file.content = content
             
             # Save template.json without file contents (they're in separate files)
             template_data_copy = template_data.copy()
@@ -262,9 +458,16 @@ class TemplateManager:
             
             logger.info(f"Saved template: {template.metadata.name} to {save_dir}")
             
-            # Update cache
-            cache_key = f"{template_type.value}:{template.metadata.name}"
-            self._template_cache[cache_key] = template
+            # Update cache and catalog
+            name = template.metadata.name
+            self._evict_template(f"any:{name}")
+            self._cache_template(
+                f"{template_type.value}:{name}",
+                template_file_path,
+                _stat_signature(template_file_path.stat()),
+                template
+            )
+            self._update_catalog_entry(template_file_path, template_data_copy['metadata'])
             
             return True
             
@@ -283,6 +486,8 @@ class TemplateManager:
             List of template metadata
         """
         templates = []
+        catalog = self._load_catalog()
+        changed = False
         
         # Determine search directories
         if template_type:
@@ -298,28 +503,101 @@ class TemplateManager:
             if not search_dir.exists():
                 continue
             
+            seen = set()
             for template_dir in search_dir.iterdir():
-                if not template_dir.is_dir():
+                template_file = template_dir / 'template.json'
+                try:
+                    signature = list(_stat_signature(template_file.stat()))
+                except OSError:
                     continue
                 
-                template_file = template_dir / 'template.json'
-                if template_file.exists():
+                key = str(template_file)
+                seen.add(key)
+                entry = catalog.get(key)
+                
+                # Only parse template.json when it changed since it was indexed
+                if entry is None or entry['signature'] != signature:
                     try:
                         with open(template_file, 'r') as f:
                             data = json.load(f)
-                        metadata = TemplateMetadata.from_dict(data['metadata'])
-                        metadata.template_type = ttype
-                        templates.append(metadata)
+                        entry = {'signature': signature, 'metadata': data['metadata']}
+                        catalog[key] = entry
+                        changed = True
                     except Exception as e:
                         logger.error(f"Error reading template metadata from {template_dir}: {e}")
+                        continue
+                
+                try:
+                    metadata = TemplateMetadata.from_dict(dict(entry['metadata']))
+                    metadata.template_type = ttype
+                    templates.append(metadata)
+                except Exception as e:
+                    logger.error(f"Error reading template metadata from {template_dir}: {e}")
+            
+            # Forget templates removed from this directory
+            prefix = str(search_dir) + os.sep
+            for key in [k for k in catalog if k.startswith(prefix) and k not in seen]:
+                del catalog[key]
+                changed = True
+        
+        if changed:
+            self._save_catalog()
         
         return templates
     
+    def _load_catalog(self) -> Dict[str, Dict[str, Any]]:
+        """Load the catalog index from memory or disk."""
+        if self._catalog is not None:
+            return self._catalog
+        
+        self._catalog = {}
+        try:
+            with open(self.catalog_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.CATALOG_VERSION:
+                self._catalog = data.get('templates', {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable template catalog {self.catalog_path}: {e}")
+        
+        return self._catalog
+    
+    def _save_catalog(self) -> None:
+        """Atomically write the catalog index to disk."""
+        if self._catalog is None:
+            return
+        
+        tmp_path = self.catalog_path.with_name(f".{self.catalog_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': self.CATALOG_VERSION, 'templates': self._catalog}, f)
+            os.replace(tmp_path, self.catalog_path)
+        except OSError as e:
+            logger.warning(f"Could not write template catalog: {e}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _update_catalog_entry(self, template_file: Path, metadata: Optional[Dict[str, Any]]) -> None:
+        """Add, replace or (with ``metadata=None``) remove a catalog entry."""
+        catalog = self._load_catalog()
+        key = str(template_file)
+        if metadata is None:
+            if catalog.pop(key, None) is None:
+                return
+        else:
+            try:
+                signature = list(_stat_signature(template_file.stat()))
+            except OSError:
+                return
+            catalog[key] = {'signature': signature, 'metadata': metadata}
+        self._save_catalog()
+    
     def substitute_variables(self, content: str, variables: Dict[str, Any]) -> str:
         """
         Substitute variables in template content.
         
-        Supports both ${var} and {{var}} syntax.
+        Supports both ${var} and {{var}} syntax. Content is compiled once
+        (and cached by hash) and rendered in a single pass.
         
         Args:
             content: Template content with variables
@@ -328,19 +606,24 @@ class TemplateManager:
         Returns:
             Content with variables substituted
         """
-        # First handle ${var} syntax using string.Template
-        try:
-            template = StringTemplate(content)
-            content = template.safe_substitute(variables)
-        except Exception as e:
-            logger.warning(f"Error in ${} variable substitution: {e}")
-        
-        # Then handle {{var}} syntax
-        for var_name, var_value in variables.items():
-            pattern = r'\{\{\s*' + re.escape(var_name) + r'\s*\}\}'
-            content = re.sub(pattern, str(var_value), content)
+        return self.engine.render(content, variables)
+    
+    def render_template(
+        self,
+        template: Template,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """
+        Render every file of a template.
         
-        return content
+        Args:
+            template: Template to render
+            variables: Variable values (merged over the template defaults)
+            
+        Returns:
+            Dictionary mapping rendered relative paths to rendered content
+        """
+        return render_template_files(template, variables, self.engine)
     
     def validate_template(self, template: Template) -> ValidationResult:
         """
@@ -463,10 +746,9 @@ class TemplateManager:
                 logger.warning(f"Template not found: {name}")
                 return False
             
-            # Remove from cache
-            cache_key = f"{template_type.value}:{name}"
-            if cache_key in self._template_cache:
-                del self._template_cache[cache_key]
+            # Remove from cache and catalog
+            self._evict_template(f"{template_type.value}:{name}", f"any:{name}")
+            self._update_catalog_entry(template_dir / 'template.json', None)
             
             # Delete directory
             shutil.rmtree(template_dir)
@@ -930,9 +1212,7 @@ class TemplateManager:
             if success:
                 logger.info(f"Successfully updated template {name} to version {latest_template.metadata.version}")
                 # Clear cache
-                cache_key = f"{latest_template.metadata.template_type.value}:{name}"
-                if cache_key in self._template_cache:
-                    del self._template_cache[cache_key]
+                self._evict_template(f"{latest_template.metadata.template_type.value}:{name}", f"any:{name}")
                 return True
             else:
                 logger.error(f"Failed to update template {name}")
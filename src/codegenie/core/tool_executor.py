@@ -21,6 +21,8 @@ from enum import Enum
 from datetime import datetime
 import logging
 
+from .git_backend import GitBackendError, get_git_backend
+
 logger = logging.getLogger(__name__)
 
 
@@ -590,16 +592,38 @@ class FileEditor:
 class GitIntegration:
     """Handles Git version control operations."""
     
-    def __init__(self, terminal_executor: TerminalExecutor):
+    def __init__(self, terminal_executor: TerminalExecutor, use_backend: bool = True):
         """
         Initialize Git integration.
         
         Args:
             terminal_executor: Terminal executor for running git commands
+            use_backend: Serve read operations from the long-lived git backend
         """
         self.terminal = terminal_executor
+        self.use_backend = use_backend
         self.operation_history: List[GitOperation] = []
     
+    async def _backend_result(self, command: str, read: Callable[[], str]) -> Optional[CommandResult]:
+        """Run a read through the git backend, or return None to fall back to the CLI."""
+        start_time = datetime.now()
+        try:
+            # Tree walks and hashing are blocking; keep them off the event loop
+            output = await asyncio.get_running_loop().run_in_executor(None, read)
+        except (GitBackendError, OSError, ValueError) as e:
+            logger.debug(f"Git backend failed for '{command}', falling back: {e}")
+            return None
+        
+        return CommandResult(
+            command=command,
+            exit_code=0,
+            stdout=output,
+            stderr="",
+            duration=(datetime.now() - start_time).total_seconds(),
+            success=True,
+            status=CommandStatus.SUCCESS
+        )
+    
     async def create_commit(
         self,
         message: str,
@@ -698,9 +722,16 @@ class GitIntegration:
             cwd: Repository directory
             
         Returns:
-            CommandResult with status output
+            CommandResult with status output in porcelain format
         """
-        return await self.terminal.run_command("git status", cwd=cwd)
+        # -uall lists files in untracked directories, like the backend does
+        command = "git status --porcelain -uall"
+        backend = get_git_backend(cwd) if self.use_backend else None
+        if backend:
+            result = await self._backend_result(command, lambda: backend.status().to_porcelain())
+            if result:
+                return result
+        return await self.terminal.run_command(command, cwd=cwd)
     
     async def get_diff(
         self,
@@ -718,7 +749,70 @@ class GitIntegration:
             CommandResult with diff output
         """
         command = f"git diff {file_path}" if file_path else "git diff"
+        backend = get_git_backend(cwd) if self.use_backend else None
+        if backend:
+            def read_diff() -> str:
+                paths = None
+                if file_path:
+                    full_path = (Path(cwd or Path.cwd()) / file_path).resolve()
+                    paths = [full_path.relative_to(backend.work_tree).as_posix()]
+                return backend.diff(paths)
+            
+            result = await self._backend_result(command, read_diff)
+            if result:
+                return result
         return await self.terminal.run_command(command, cwd=cwd)
+    
+    async def get_current_branch(self, cwd: Optional[Path] = None) -> Optional[str]:
+        """
+        Get the checked out branch.
+        
+        Args:
+            cwd: Repository directory
+            
+        Returns:
+            Branch name, or None when HEAD is detached or unavailable
+        """
+        backend = get_git_backend(cwd) if self.use_backend else None
+        if backend:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, backend.current_branch)
+            except (GitBackendError, OSError, ValueError) as e:
+                logger.debug(f"Git backend failed to read the current branch, falling back: {e}")
+        
+        result = await self.terminal.run_command("git branch --show-current", cwd=cwd)
+        branch = result.stdout.strip()
+        return branch if result.success and branch else None
+    
+    async def get_file_content(
+        self,
+        file_path: Path,
+        revision: str = "HEAD",
+        cwd: Optional[Path] = None
+    ) -> Optional[str]:
+        """
+        Read a file as it exists in a revision.
+        
+        Args:
+            file_path: File path relative to the repository root
+            revision: Revision to read from
+            cwd: Repository directory
+            
+        Returns:
+            File content, or None if it does not exist in the revision
+        """
+        backend = get_git_backend(cwd) if self.use_backend else None
+        if backend:
+            try:
+                data = await asyncio.get_running_loop().run_in_executor(
+                    None, backend.read_blob, Path(file_path).as_posix(), revision
+                )
+                return data.decode('utf-8', errors='replace') if data is not None else None
+            except GitBackendError as e:
+                logger.debug(f"Git backend failed to read {file_path}, falling back: {e}")
+        
+        result = await self.terminal.run_command(f"git show {revision}:{file_path}", cwd=cwd)
+        return result.stdout if result.success else None
 
 
 class ToolExecutor:
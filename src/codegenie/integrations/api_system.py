@@ -13,7 +13,7 @@ import hmac
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Callable, Union
 from datetime import datetime, timedelta
 from pathlib import Path
 import jwt
@@ -24,9 +24,18 @@ from aiohttp.web_response import Response
 import redis.asyncio as redis
 from collections import defaultdict, deque
 
-from ..core.code_intelligence import CodeIntelligence
 from ..core.context_engine import ContextEngine
 from ..agents.coordinator import AgentCoordinator
+from ..core.metrics_registry import OPENMETRICS_CONTENT_TYPE, MetricsRegistry, get_default_registry
+from .credential_cache import CredentialCache
+from .rate_limiting import RateLimiter
+from .usage_metrics import LatencyHistogram, UsageAggregator
+from .webhook_delivery import (
+    CircuitBreaker, CircuitState, DeliveryLog, EndpointDeliveryState, jittered_backoff
+)
+
+if TYPE_CHECKING:
+    from ..core.code_intelligence import CodeIntelligence
 
 
 @dataclass
@@ -57,6 +66,8 @@ class WebhookEndpoint:
     is_active: bool
     created_at: datetime
     last_triggered: Optional[datetime]
+    max_concurrency: int = 4  # Simultaneous deliveries to this endpoint
+    batch_size: int = 1  # Events per request; above 1 the body is a JSON array
 
 
 @dataclass
@@ -84,73 +95,29 @@ class WebhookEvent:
     webhook_endpoints: List[str]
 
 
-class RateLimiter:
-    """Rate limiting system with Redis backend"""
-    
-    def __init__(self, redis_client: redis.Redis):
-        self.redis = redis_client
-        self.logger = logging.getLogger(self.__class__.__name__)
-    
-    async def is_allowed(self, key: str, limit: int, window: int = 3600) -> tuple[bool, Dict[str, Any]]:
-        """Check if request is allowed under rate limit"""
-        try:
-            current_time = int(time.time())
-            window_start = current_time - window
-            
-            # Use sliding window rate limiting
-            pipe = self.redis.pipeline()
-            
-            # Remove old entries
-            pipe.zremrangebyscore(f"rate_limit:{key}", 0, window_start)
-            
-            # Count current requests
-            pipe.zcard(f"rate_limit:{key}")
-            
-            # Add current request
-            pipe.zadd(f"rate_limit:{key}", {str(current_time): current_time})
-            
-            # Set expiration
-            pipe.expire(f"rate_limit:{key}", window)
-            
-            results = await pipe.execute()
-            current_count = results[1]
-            
-            if current_count >= limit:
-                # Calculate reset time
-                oldest_request = await self.redis.zrange(f"rate_limit:{key}", 0, 0, withscores=True)
-                reset_time = int(oldest_request[0][1]) + window if oldest_request else current_time + window
-                
-                return False, {
-                    "allowed": False,
-                    "limit": limit,
-                    "remaining": 0,
-                    "reset_time": reset_time,
-                    "retry_after": reset_time - current_time
-                }
-            
-            return True, {
-                "allowed": True,
-                "limit": limit,
-                "remaining": limit - current_count - 1,
-                "reset_time": current_time + window,
-                "retry_after": 0
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Rate limiting error: {e}")
-            # Fail open - allow request if rate limiter fails
-            return True, {"allowed": True, "limit": limit, "remaining": limit - 1}
-
-
 class AuthenticationManager:
     """Authentication and authorization system"""
     
-    def __init__(self, secret_key: str, redis_client: redis.Redis):
+    def __init__(self, secret_key: str, redis_client: redis.Redis, cache_size: int = 10000,
+                 cache_ttl: float = 300.0):
+        # Verified tokens and keys, so repeat callers skip signature checks and hashing
+        self.credential_cache = CredentialCache(max_entries=cache_size, max_ttl=cache_ttl)
+        
         self.secret_key = secret_key
         self.redis = redis_client
         self.logger = logging.getLogger(self.__class__.__name__)
         self.api_keys: Dict[str, APIKey] = {}
     
+    @property
+    def secret_key(self) -> str:
+        return self._secret_key
+    
+    @secret_key.setter
+    def secret_key(self, value: str):
+        # Tokens verified with the old secret must be checked again
+        self._secret_key = value
+        self.credential_cache.clear()
+    
     def generate_api_key(self, name: str, permissions: List[str], rate_limit: int = 1000,
                         expires_in_days: Optional[int] = None) -> tuple[str, APIKey]:
         """Generate new API key"""
@@ -180,18 +147,36 @@ class AuthenticationManager:
     async def validate_api_key(self, key: str) -> Optional[APIKey]:
         """Validate API key"""
         try:
-            key_hash = hashlib.sha256(key.encode()).hexdigest()
-            api_key = self.api_keys.get(key_hash)
+            api_key = self.credential_cache.get("api_key", key)
+            cached = api_key is not None
+            
+            # Keys can be dropped from the store without being revoked
+            if cached and self.api_keys.get(api_key.key_hash) is not api_key:
+                self.credential_cache.invalidate_owner(api_key.key_hash)
+                api_key = None
+                cached = False
+            
+            if not cached:
+                key_hash = hashlib.sha256(key.encode()).hexdigest()
+                api_key = self.api_keys.get(key_hash)
             
             if not api_key:
                 return None
             
             if not api_key.is_active:
+                self.credential_cache.invalidate_owner(api_key.key_hash)
                 return None
             
             if api_key.expires_at and datetime.now() > api_key.expires_at:
                 return None
             
+            if not cached:
+                self.credential_cache.put(
+                    "api_key", key, api_key,
+                    expires_at=api_key.expires_at.timestamp() if api_key.expires_at else None,
+                    owner=api_key.key_hash
+                )
+            
             # Update usage
             api_key.last_used = datetime.now()
             api_key.usage_count += 1
@@ -216,43 +201,135 @@ class AuthenticationManager:
     async def validate_jwt_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Validate JWT token"""
         try:
+            payload = self.credential_cache.get("jwt", token)
+            if payload is not None:
+                return dict(payload)
+            
             payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
-            return payload
+            self.credential_cache.put("jwt", token, payload, expires_at=payload.get("exp"))
+            return dict(payload)
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
     
+    def revoke_api_key(self, key_hash: str) -> bool:
+        """Deactivate API key and drop its cached verifications"""
+        api_key = self.api_keys.get(key_hash)
+        if not api_key:
+            return False
+        
+        api_key.is_active = False
+        self.credential_cache.invalidate_owner(key_hash)
+        return True
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get verified-credential cache statistics"""
+        return self.credential_cache.get_stats()
+    
     def has_permission(self, permissions: List[str], required_permission: str) -> bool:
         """Check if user has required permission"""
         return required_permission in permissions or "admin" in permissions
 
 
 class WebhookManager:
-    """Webhook system for event-driven workflows"""
+    """Webhook system for event-driven workflows
+
+    Events wait in a bounded queue; when it is full they are persisted to an
+    overflow log in Redis and re-queued once there is room. Workers hand each
+    event to its endpoint's buffer and deliver from it with at most
+    ``max_concurrency`` requests per endpoint, so a slow endpoint cannot take
+    every worker. Events that pile up while deliveries are in flight are sent
+    together to endpoints that accept batches. Deliveries share one pooled
+    HTTP session, are retried with jittered backoff and pass through a
+    per-endpoint circuit breaker; failed ones go to a dead-letter log. The
+    worker count scales between ``min_workers`` and ``max_workers`` with the
+    queue backlog.
+    """
+    
+    OVERFLOW_KEY = "webhook:overflow"
+    DEAD_LETTER_KEY = "webhook:dead_letter"
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, max_queue_size: int = 10000,
+                 max_pending_per_endpoint: int = 1000, min_workers: int = 3, max_workers: int = 32,
+                 pool_size: int = 100, pool_size_per_host: int = 10, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, retry_base_delay: float = 0.5, retry_max_delay: float = 30.0,
+                 scale_interval: float = 1.0):
         self.redis = redis_client
         self.logger = logging.getLogger(self.__class__.__name__)
         self.webhooks: Dict[str, WebhookEndpoint] = {}
-        self.event_queue = asyncio.Queue()
+        self.event_queue = asyncio.Queue(maxsize=max_queue_size)
         self.worker_tasks: List[asyncio.Task] = []
+        
+        self.max_pending_per_endpoint = max_pending_per_endpoint
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.scale_interval = scale_interval
+        
+        self.overflow_log = DeliveryLog(redis_client, self.OVERFLOW_KEY)
+        self.dead_letters = DeliveryLog(redis_client, self.DEAD_LETTER_KEY)
+        
+        self._endpoints: Dict[str, EndpointDeliveryState] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._idle_workers: set = set()
+        self._worker_sequence = 0
+        self._scaler_task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        self.stats = {
+            "delivered": 0,
+            "failed": 0,
+            "retries": 0,
+            "requests": 0,
+            "batches": 0,
+            "overflowed": 0,
+            "dead_lettered": 0,
+            "circuit_rejected": 0,
+            "workers_added": 0,
+            "workers_retired": 0,
+        }
     
     async def start_workers(self, num_workers: int = 3):
         """Start webhook worker tasks"""
-        for i in range(num_workers):
-            task = asyncio.create_task(self._webhook_worker(f"worker-{i}"))
-            self.worker_tasks.append(task)
+        self.min_workers = num_workers
+        self.max_workers = max(self.max_workers, num_workers)
+        
+        for _ in range(num_workers):
+            self._add_worker()
+        
+        if self._scaler_task is None:
+            self._scaler_task = asyncio.create_task(self._scaler_loop())
         
         self.logger.info(f"Started {num_workers} webhook workers")
     
     async def stop_workers(self):
         """Stop webhook worker tasks"""
+        if self._scaler_task is not None:
+            self._scaler_task.cancel()
+            await asyncio.gather(self._scaler_task, return_exceptions=True)
+            self._scaler_task = None
+        
         for task in self.worker_tasks:
             task.cancel()
         
         await asyncio.gather(*self.worker_tasks, return_exceptions=True)
         self.worker_tasks.clear()
+        self._workers.clear()
+        self._idle_workers.clear()
+        
+        # Keep undelivered events for the next start (or another node)
+        await self._persist_undelivered()
+        
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        
         self.logger.info("Stopped webhook workers")
     
     def register_webhook(self, webhook: WebhookEndpoint):
@@ -264,6 +341,7 @@ class WebhookManager:
         """Unregister webhook endpoint"""
         if webhook_id in self.webhooks:
             del self.webhooks[webhook_id]
+            self._endpoints.pop(webhook_id, None)
             self.logger.info(f"Unregistered webhook: {webhook_id}")
     
     async def trigger_event(self, event: WebhookEvent):
@@ -279,15 +357,53 @@ class WebhookManager:
                 self.logger.debug(f"No webhooks registered for event: {event.event_type}")
                 return
             
-            # Queue event for processing
-            for webhook in matching_webhooks:
-                await self.event_queue.put((event, webhook))
+            # Queue event for processing, spilling to the overflow log when full
+            overflow = self._enqueue([(event, webhook) for webhook in matching_webhooks])
+            if overflow:
+                await self._overflow(overflow)
             
             self.logger.info(f"Queued event {event.event_type} for {len(matching_webhooks)} webhooks")
             
         except Exception as e:
             self.logger.error(f"Error triggering webhook event: {e}")
     
+    async def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued and buffered event has been handled"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self.pending_count():
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.005)
+        return True
+    
+    def pending_count(self) -> int:
+        """Get the number of events queued, buffered or being delivered"""
+        return self.event_queue.qsize() + sum(
+            len(state.pending) + state.in_flight for state in self._endpoints.values()
+        )
+    
+    async def replay_dead_letters(self, limit: int = 100) -> int:
+        """Re-queue up to ``limit`` dead-lettered events"""
+        requeued = await self._requeue(await self.dead_letters.pop(limit))
+        self.logger.info(f"Replayed {requeued} dead-lettered webhook events")
+        return requeued
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get webhook delivery statistics"""
+        return {
+            **self.stats,
+            "workers": len(self.worker_tasks),
+            "idle_workers": len(self._idle_workers),
+            "queued": self.event_queue.qsize(),
+            "pending": self.pending_count(),
+            "open_circuits": [
+                webhook_id for webhook_id, state in self._endpoints.items()
+                if state.breaker.state != CircuitState.CLOSED
+            ],
+            "persist_failures": self.overflow_log.lost + self.dead_letters.lost,
+        }
+    
     async def _webhook_worker(self, worker_id: str):
         """Webhook worker to process events"""
         self.logger.info(f"Webhook worker {worker_id} started")
@@ -295,69 +411,288 @@ class WebhookManager:
         while True:
             try:
                 # Get event from queue
+                self._idle_workers.add(worker_id)
                 event, webhook = await self.event_queue.get()
+                self._idle_workers.discard(worker_id)
                 
-                # Process webhook
-                await self._send_webhook(event, webhook)
-                
-                # Mark task as done
-                self.event_queue.task_done()
+                # Buffer for the endpoint and deliver if a slot is free
+                try:
+                    await self._dispatch(event, webhook)
+                finally:
+                    self.event_queue.task_done()
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Webhook worker {worker_id} error: {e}")
+        
+        self._idle_workers.discard(worker_id)
+    
+    async def _dispatch(self, event: WebhookEvent, webhook: WebhookEndpoint):
+        """Buffer an event for its endpoint and drain the buffer if a delivery slot is free"""
+        state = self._endpoint_state(webhook)
+        if len(state.pending) >= self.max_pending_per_endpoint:
+            await self._overflow([(event, webhook)])
+            return
+        
+        state.pending.append(event)
+        if state.in_flight >= max(1, webhook.max_concurrency):
+            # A worker already delivering to this endpoint will pick it up
+            return
+        
+        state.in_flight += 1
+        try:
+            while state.pending:
+                if self.webhooks.get(webhook.id) is not webhook or not webhook.is_active:
+                    self.logger.debug(f"Dropping {len(state.pending)} events for removed webhook {webhook.id}")
+                    state.pending.clear()
+                    break
+                
+                batch_size = min(max(1, webhook.batch_size), len(state.pending))
+                batch = [state.pending.popleft() for _ in range(batch_size)]
+                await self._deliver(batch, webhook, state)
+        finally:
+            state.in_flight -= 1
     
-    async def _send_webhook(self, event: WebhookEvent, webhook: WebhookEndpoint):
+    async def _send_webhook(self, event: WebhookEvent, webhook: WebhookEndpoint) -> bool:
         """Send webhook HTTP request"""
         try:
-            # Prepare payload
-            payload = {
-                "event_id": event.event_id,
-                "event_type": event.event_type,
-                "timestamp": event.timestamp.isoformat(),
-                "data": event.data,
-                "source": event.source
-            }
-            
-            # Prepare headers
-            headers = webhook.headers.copy()
-            headers["Content-Type"] = "application/json"
-            headers["User-Agent"] = "CodeGenie-Webhook/1.0"
-            
-            # Add signature if secret is provided
-            if webhook.secret:
-                signature = self._generate_signature(json.dumps(payload), webhook.secret)
-                headers["X-CodeGenie-Signature"] = signature
+            return await self._deliver([event], webhook, self._endpoint_state(webhook))
+        except Exception as e:
+            self.logger.error(f"Error sending webhook: {e}")
+            return False
+    
+    async def _deliver(self, events: List[WebhookEvent], webhook: WebhookEndpoint,
+                       state: EndpointDeliveryState) -> bool:
+        """Deliver events in one request with retries, honouring the circuit breaker"""
+        if not state.breaker.allow():
+            self.stats["circuit_rejected"] += len(events)
+            await self._dead_letter(events, webhook, "circuit_open")
+            return False
+        
+        try:
+            body, headers = self._build_request(events, webhook)
+            error = "unknown"
             
             # Send webhook with retries
             for attempt in range(webhook.retry_count + 1):
-                try:
-                    timeout = aiohttp.ClientTimeout(total=webhook.timeout)
-                    async with aiohttp.ClientSession(timeout=timeout) as session:
-                        async with session.post(webhook.url, json=payload, headers=headers) as response:
-                            if response.status < 400:
-                                # Success
-                                webhook.last_triggered = datetime.now()
-                                self.logger.info(f"Webhook sent successfully: {webhook.url}")
-                                return
-                            else:
-                                self.logger.warning(f"Webhook failed with status {response.status}: {webhook.url}")
+                status, retryable, error = await self._post(webhook, body, headers)
                 
-                except asyncio.TimeoutError:
-                    self.logger.warning(f"Webhook timeout (attempt {attempt + 1}): {webhook.url}")
-                except Exception as e:
-                    self.logger.warning(f"Webhook error (attempt {attempt + 1}): {webhook.url} - {e}")
+                if status is not None and status < 400:
+                    # Success
+                    state.breaker.record_success()
+                    webhook.last_triggered = datetime.now()
+                    self.stats["delivered"] += len(events)
+                    if len(events) > 1:
+                        self.stats["batches"] += 1
+                    self.logger.debug(f"Webhook sent successfully: {webhook.url} ({len(events)} events)")
+                    return True
                 
-                # Wait before retry (exponential backoff)
+                self.logger.warning(f"Webhook attempt {attempt + 1} failed ({error}): {webhook.url}")
+                if not retryable:
+                    break
+                
+                # Wait before retry (exponential backoff with full jitter)
                 if attempt < webhook.retry_count:
-                    wait_time = 2 ** attempt
-                    await asyncio.sleep(wait_time)
-            
-            self.logger.error(f"Webhook failed after {webhook.retry_count + 1} attempts: {webhook.url}")
-            
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(jittered_backoff(attempt, self.retry_base_delay, self.retry_max_delay))
+        except BaseException:
+            # Errors and cancellation end a half-open trial too, or no trial is ever admitted again
+            state.breaker.record_failure()
+            raise
+        
+        state.breaker.record_failure()
+        self.stats["failed"] += len(events)
+        self.logger.error(f"Webhook failed after {attempt + 1} attempts: {webhook.url}")
+        await self._dead_letter(events, webhook, error)
+        return False
+    
+    async def _post(self, webhook: WebhookEndpoint, body: str, headers: Dict[str, str]) -> tuple:
+        """Send one request; returns (status, retryable, error)"""
+        self.stats["requests"] += 1
+        try:
+            session = self._get_session()
+            timeout = aiohttp.ClientTimeout(total=webhook.timeout)
+            async with session.post(webhook.url, data=body, headers=headers, timeout=timeout) as response:
+                # Read the body so the connection goes back to the pool
+                await response.read()
+                if response.status < 400:
+                    return response.status, False, None
+                retryable = response.status >= 500 or response.status in (408, 429)
+                return response.status, retryable, f"HTTP {response.status}"
+        
+        except asyncio.TimeoutError:
+            return None, True, "timeout"
+        except aiohttp.ClientError as e:
+            return None, True, f"{e.__class__.__name__}: {e}"
         except Exception as e:
-            self.logger.error(f"Error sending webhook: {e}")
+            self.logger.error(f"Unexpected error sending webhook to {webhook.url}: {e}")
+            return None, False, f"{e.__class__.__name__}: {e}"
+    
+    def _build_request(self, events: List[WebhookEvent], webhook: WebhookEndpoint) -> tuple:
+        """Build the request body and headers for a delivery"""
+        # Prepare payload
+        payloads = [self._event_payload(event) for event in events]
+        body = json.dumps(payloads if webhook.batch_size > 1 else payloads[0])
+        
+        # Prepare headers
+        headers = webhook.headers.copy()
+        headers["Content-Type"] = "application/json"
+        headers["User-Agent"] = "CodeGenie-Webhook/1.0"
+        if webhook.batch_size > 1:
+            headers["X-CodeGenie-Batch-Size"] = str(len(events))
+        
+        # Add signature if secret is provided
+        if webhook.secret:
+            headers["X-CodeGenie-Signature"] = self._generate_signature(body, webhook.secret)
+        
+        return body, headers
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, pooling connections per destination"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    def _endpoint_state(self, webhook: WebhookEndpoint) -> EndpointDeliveryState:
+        state = self._endpoints.get(webhook.id)
+        if state is None:
+            state = EndpointDeliveryState(
+                breaker=CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            )
+            self._endpoints[webhook.id] = state
+        return state
+    
+    def _enqueue(self, items: List[tuple]) -> List[tuple]:
+        """Put items on the queue without waiting; returns those that did not fit"""
+        for index, item in enumerate(items):
+            try:
+                self.event_queue.put_nowait(item)
+            except asyncio.QueueFull:
+                return items[index:]
+        return []
+    
+    async def _overflow(self, items: List[tuple]):
+        """Persist events that do not fit in memory"""
+        self.stats["overflowed"] += len(items)
+        await self.overflow_log.append([
+            self._delivery_record(event, webhook) for event, webhook in items
+        ])
+    
+    async def _dead_letter(self, events: List[WebhookEvent], webhook: WebhookEndpoint, reason: str):
+        """Persist events that could not be delivered"""
+        self.stats["dead_lettered"] += len(events)
+        await self.dead_letters.append([
+            self._delivery_record(event, webhook, reason) for event in events
+        ])
+    
+    async def _requeue(self, records: List[Dict[str, Any]]) -> int:
+        """Put persisted records back on the queue"""
+        items = []
+        for record in records:
+            webhook = self.webhooks.get(record.get("webhook_id"))
+            if webhook is None or not webhook.is_active:
+                continue
+            items.append((self._event_from_dict(record["event"]), webhook))
+        
+        overflow = self._enqueue(items)
+        if overflow:
+            await self._overflow(overflow)
+        return len(items) - len(overflow)
+    
+    async def _persist_undelivered(self):
+        """Move queued and buffered events to the overflow log"""
+        items = []
+        while not self.event_queue.empty():
+            items.append(self.event_queue.get_nowait())
+            self.event_queue.task_done()
+        for webhook_id, state in self._endpoints.items():
+            webhook = self.webhooks.get(webhook_id)
+            if webhook is not None:
+                items.extend((event, webhook) for event in state.pending)
+            state.pending.clear()
+        if items:
+            await self._overflow(items)
+    
+    def _add_worker(self):
+        self._worker_sequence += 1
+        worker_id = f"worker-{self._worker_sequence}"
+        task = asyncio.create_task(self._webhook_worker(worker_id))
+        self._workers[worker_id] = task
+        self.worker_tasks.append(task)
+    
+    def _retire_worker(self, worker_id: str):
+        task = self._workers.pop(worker_id)
+        self._idle_workers.discard(worker_id)
+        self.worker_tasks.remove(task)
+        task.cancel()
+    
+    def _autoscale(self):
+        """Add workers while events wait for one, retire idle workers when the queue is empty"""
+        backlog = self.event_queue.qsize()
+        workers = len(self.worker_tasks)
+        
+        if backlog and not self._idle_workers and workers < self.max_workers:
+            added = min(self.max_workers - workers, max(1, workers // 2), backlog)
+            for _ in range(added):
+                self._add_worker()
+            self.stats["workers_added"] += added
+            self.logger.info(f"Scaled webhook workers up to {len(self.worker_tasks)} (backlog {backlog})")
+        
+        elif not backlog and workers > self.min_workers and len(self._idle_workers) > 1:
+            self._retire_worker(next(iter(self._idle_workers)))
+            self.stats["workers_retired"] += 1
+            self.logger.debug(f"Scaled webhook workers down to {len(self.worker_tasks)}")
+    
+    async def _scaler_loop(self):
+        """Periodically resize the worker pool and re-queue overflowed events"""
+        while True:
+            await asyncio.sleep(self.scale_interval)
+            try:
+                self._autoscale()
+                
+                room = self.event_queue.maxsize // 2 - self.event_queue.qsize()
+                if room > 0:
+                    await self._requeue(await self.overflow_log.pop(room))
+            except Exception as e:
+                self.logger.error(f"Webhook scaler error: {e}")
+    
+    @staticmethod
+    def _event_payload(event: WebhookEvent) -> Dict[str, Any]:
+        return {
+            "event_id": event.event_id,
+            "event_type": event.event_type,
+            "timestamp": event.timestamp.isoformat(),
+            "data": event.data,
+            "source": event.source
+        }
+    
+    def _delivery_record(self, event: WebhookEvent, webhook: WebhookEndpoint,
+                         reason: Optional[str] = None) -> Dict[str, Any]:
+        record = {
+            "webhook_id": webhook.id,
+            "event": {**self._event_payload(event), "webhook_endpoints": event.webhook_endpoints},
+            "recorded_at": datetime.now().isoformat()
+        }
+        if reason:
+            record["reason"] = reason
+        return record
+    
+    @staticmethod
+    def _event_from_dict(data: Dict[str, Any]) -> WebhookEvent:
+        return WebhookEvent(
+            event_id=data["event_id"],
+            event_type=data["event_type"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            data=data["data"],
+            source=data["source"],
+            webhook_endpoints=data.get("webhook_endpoints", [])
+        )
     
     def _generate_signature(self, payload: str, secret: str) -> str:
         """Generate HMAC signature for webhook"""
@@ -370,73 +705,187 @@ class WebhookManager:
 
 
 class UsageAnalytics:
-    """Usage analytics and monitoring system"""
+    """Usage analytics and monitoring system
+
+    Requests are aggregated in memory and flushed to Redis as batched counter
+    deltas every ``flush_interval`` seconds. Response times are kept in
+    mergeable latency histograms (one Redis hash per day) so percentiles can
+    be computed without storing individual samples.
+    """
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, flush_interval: float = 1.0,
+                 max_pending: int = 10000, store_raw_requests: bool = False):
         self.redis = redis_client
+        self.flush_interval = flush_interval
+        self.store_raw_requests = store_raw_requests
         self.logger = logging.getLogger(self.__class__.__name__)
+        
+        self.aggregator = UsageAggregator(max_entries=max_pending)
+        self._raw_requests: deque = deque(maxlen=max_pending)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._running = False
+        self.stats = {"recorded": 0, "flushes": 0, "flush_errors": 0}
     
-    async def record_api_request(self, request: APIRequest):
-        """Record API request for analytics"""
+    def record(self, request: APIRequest):
+        """Aggregate an API request in memory (no I/O)"""
         try:
-            # Store request data
-            request_data = asdict(request)
-            request_data["timestamp"] = request.timestamp.isoformat()
-            
-            # Store in Redis with TTL (30 days)
-            await self.redis.setex(
-                f"api_request:{request.request_id}",
-                30 * 24 * 3600,  # 30 days
-                json.dumps(request_data)
-            )
-            
-            # Update counters
             date_key = request.timestamp.strftime("%Y-%m-%d")
             hour_key = request.timestamp.strftime("%Y-%m-%d:%H")
+            status_field = f"status_{request.status_code}"
             
-            pipe = self.redis.pipeline()
+            aggregator = self.aggregator
             
             # Daily counters
-            pipe.hincrby(f"api_stats:daily:{date_key}", "total_requests", 1)
-            pipe.hincrby(f"api_stats:daily:{date_key}", f"status_{request.status_code}", 1)
-            pipe.hincrby(f"api_stats:daily:{date_key}", f"endpoint_{request.endpoint}", 1)
+            aggregator.increment(f"api_stats:daily:{date_key}", "total_requests")
+            aggregator.increment(f"api_stats:daily:{date_key}", status_field)
+            aggregator.increment(f"api_stats:daily:{date_key}", f"endpoint_{request.endpoint}")
             
             # Hourly counters
-            pipe.hincrby(f"api_stats:hourly:{hour_key}", "total_requests", 1)
-            pipe.hincrby(f"api_stats:hourly:{hour_key}", f"status_{request.status_code}", 1)
+            aggregator.increment(f"api_stats:hourly:{hour_key}", "total_requests")
+            aggregator.increment(f"api_stats:hourly:{hour_key}", status_field)
             
             # API key usage
-            pipe.hincrby(f"api_key_stats:{request.api_key_id}", "total_requests", 1)
-            pipe.hincrby(f"api_key_stats:{request.api_key_id}", f"status_{request.status_code}", 1)
+            aggregator.increment(f"api_key_stats:{request.api_key_id}", "total_requests")
+            aggregator.increment(f"api_key_stats:{request.api_key_id}", status_field)
+            
+            # Response time distribution
+            aggregator.observe(f"response_time_hist:{date_key}", request.response_time)
             
-            # Response time tracking
-            pipe.lpush(f"response_times:{date_key}", request.response_time)
-            pipe.ltrim(f"response_times:{date_key}", 0, 999)  # Keep last 1000 entries
+            if self.store_raw_requests:
+                self._raw_requests.append(request)
             
-            await pipe.execute()
+            self.stats["recorded"] += 1
+            if self._flush_task is None:
+                self._ensure_flush_task()
             
         except Exception as e:
             self.logger.error(f"Error recording API request: {e}")
     
+    async def record_api_request(self, request: APIRequest):
+        """Record API request for analytics"""
+        self.record(request)
+    
+    async def flush(self) -> bool:
+        """Write aggregated deltas to Redis in a single pipeline"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        async with self._flush_lock:
+            if self.aggregator.is_empty and not self._raw_requests:
+                return True
+            
+            counters, histograms = self.aggregator.drain()
+            raw_requests = list(self._raw_requests)
+            self._raw_requests.clear()
+            
+            try:
+                pipe = self.redis.pipeline()
+                
+                for key, fields in counters.items():
+                    for field_name, amount in fields.items():
+                        pipe.hincrby(key, field_name, amount)
+                
+                for key, histogram in histograms.items():
+                    for field_name, amount in histogram.to_fields().items():
+                        pipe.hincrby(key, field_name, amount)
+                
+                for request in raw_requests:
+                    request_data = asdict(request)
+                    request_data["timestamp"] = request.timestamp.isoformat()
+                    pipe.setex(
+                        f"api_request:{request.request_id}",
+                        30 * 24 * 3600,  # 30 days
+                        json.dumps(request_data)
+                    )
+                
+                await pipe.execute()
+                self.stats["flushes"] += 1
+                return True
+                
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                self.logger.error(f"Error flushing API analytics: {e}")
+                self.aggregator.restore(counters, histograms)
+                # Keep the unwritten requests ahead of newer ones; the bound drops the oldest
+                self._raw_requests = deque(
+                    raw_requests + list(self._raw_requests), maxlen=self._raw_requests.maxlen
+                )
+                return False
+    
+    async def start(self):
+        """Start periodic flushing"""
+        self._ensure_flush_task()
+    
+    async def stop(self):
+        """Stop periodic flushing and write what is left"""
+        self._running = False
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+    
+    def _ensure_flush_task(self):
+        if self._flush_task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._running = True
+        self._flush_task = loop.create_task(self._flush_loop())
+    
+    async def _flush_loop(self):
+        while self._running:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error(f"Analytics flush loop error: {e}")
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Get recording and flushing statistics"""
+        return {
+            **self.stats,
+            "pending_entries": self.aggregator.entries,
+            "dropped": self.aggregator.dropped,
+        }
+    
     async def get_usage_stats(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """Get usage statistics for date range"""
         try:
+            # Include requests still buffered in memory
+            await self.flush()
+            
             stats = {
                 "total_requests": 0,
                 "status_codes": defaultdict(int),
                 "endpoints": defaultdict(int),
                 "daily_breakdown": {},
-                "average_response_time": 0.0
+                "average_response_time": 0.0,
+                "response_time_percentiles": {"p50": 0.0, "p95": 0.0, "p99": 0.0}
             }
             
+            date_keys = []
             current_date = start_date
-            response_times = []
-            
             while current_date <= end_date:
-                date_key = current_date.strftime("%Y-%m-%d")
-                
-                # Get daily stats
-                daily_stats = await self.redis.hgetall(f"api_stats:daily:{date_key}")
+                date_keys.append(current_date.strftime("%Y-%m-%d"))
+                current_date += timedelta(days=1)
+            
+            # Fetch every day's counters and histogram in one round trip
+            pipe = self.redis.pipeline()
+            for date_key in date_keys:
+                pipe.hgetall(f"api_stats:daily:{date_key}")
+                pipe.hgetall(f"response_time_hist:{date_key}")
+            results = await pipe.execute()
+            
+            response_times = LatencyHistogram()
+            for index, date_key in enumerate(date_keys):
+                daily_stats = results[index * 2]
                 
                 if daily_stats:
                     daily_total = int(daily_stats.get(b"total_requests", 0))
@@ -453,15 +902,18 @@ class UsageAnalytics:
                             endpoint = key_str.replace("endpoint_", "")
                             stats["endpoints"][endpoint] += int(value)
                 
-                # Get response times
-                daily_response_times = await self.redis.lrange(f"response_times:{date_key}", 0, -1)
-                response_times.extend([float(rt) for rt in daily_response_times])
-                
-                current_date += timedelta(days=1)
-            
-            # Calculate average response time
-            if response_times:
-                stats["average_response_time"] = sum(response_times) / len(response_times)
+                if results[index * 2 + 1]:
+                    response_times.merge(LatencyHistogram.from_fields(results[index * 2 + 1]))
+            
+            # Response time distribution
+            if response_times.count:
+                summary = response_times.summary()
+                stats["average_response_time"] = summary["mean"]
+                stats["response_time_percentiles"] = {
+                    "p50": summary["p50"],
+                    "p95": summary["p95"],
+                    "p99": summary["p99"]
+                }
             
             return dict(stats)
             
@@ -472,6 +924,7 @@ class UsageAnalytics:
     async def get_api_key_usage(self, api_key_id: str) -> Dict[str, Any]:
         """Get usage statistics for specific API key"""
         try:
+            await self.flush()
             key_stats = await self.redis.hgetall(f"api_key_stats:{api_key_id}")
             
             if not key_stats:
@@ -497,8 +950,9 @@ class UsageAnalytics:
 class APISystem:
     """Main API system with REST endpoints"""
     
-    def __init__(self, code_intelligence: CodeIntelligence, context_engine: ContextEngine,
-                 agent_coordinator: AgentCoordinator, secret_key: str, redis_url: str = "redis://localhost"):
+    def __init__(self, code_intelligence: "CodeIntelligence", context_engine: ContextEngine,
+                 agent_coordinator: AgentCoordinator, secret_key: str, redis_url: str = "redis://localhost",
+                 metrics_registry: Optional[MetricsRegistry] = None):
         self.code_intelligence = code_intelligence
         self.context_engine = context_engine
         self.agent_coordinator = agent_coordinator
@@ -510,6 +964,7 @@ class APISystem:
         self.rate_limiter = RateLimiter(self.redis)
         self.webhook_manager = WebhookManager(self.redis)
         self.usage_analytics = UsageAnalytics(self.redis)
+        self.metrics_registry = metrics_registry or get_default_registry()
         
         # Web application
         self.app = web.Application(middlewares=[
@@ -548,14 +1003,17 @@ class APISystem:
         # Health check
         self.app.router.add_get("/health", self._health_check)
         
+        # In-process metrics for scrapers
+        self.app.router.add_get("/metrics", self._metrics)
+        
         # API documentation
         self.app.router.add_get("/api/docs", self._api_docs)
     
     @web.middleware
     async def _auth_middleware(self, request: Request, handler: Callable) -> Response:
         """Authentication middleware"""
-        # Skip auth for health check and docs
-        if request.path in ["/health", "/api/docs"]:
+        # Skip auth for health check, metrics and docs
+        if request.path in ["/health", "/metrics", "/api/docs"]:
             return await handler(request)
         
         # Get authorization header
@@ -590,8 +1048,8 @@ class APISystem:
     @web.middleware
     async def _rate_limit_middleware(self, request: Request, handler: Callable) -> Response:
         """Rate limiting middleware"""
-        # Skip rate limiting for health check
-        if request.path == "/health":
+        # Skip rate limiting for health check and metrics
+        if request.path in ["/health", "/metrics"]:
             return await handler(request)
         
         # Get rate limit key
@@ -604,8 +1062,8 @@ class APISystem:
         else:
             return web.json_response({"error": "No authentication found"}, status=401)
         
-        # Check rate limit
-        allowed, info = await self.rate_limiter.is_allowed(rate_limit_key, limit)
+        # Check rate limit (decided in-process; Redis is reconciled in the background)
+        allowed, info = self.rate_limiter.check(rate_limit_key, limit)
         
         if not allowed:
             response = web.json_response({
@@ -635,13 +1093,14 @@ class APISystem:
         # Process request
         response = await handler(request)
         
-        # Record analytics (skip for health check)
-        if request.path != "/health":
+        # Record analytics (skip for health check and metrics)
+        if request.path not in ["/health", "/metrics"]:
             response_time = time.time() - start_time
             
+            api_key = request.get("api_key")
             api_request = APIRequest(
                 request_id=f"{int(time.time() * 1000000)}",  # Microsecond timestamp
-                api_key_id=request.get("api_key", {}).get("key_id", "unknown"),
+                api_key_id=api_key.key_id if api_key else "unknown",
                 endpoint=request.path,
                 method=request.method,
                 timestamp=datetime.now(),
@@ -651,8 +1110,8 @@ class APISystem:
                 ip_address=request.remote
             )
             
-            # Record asynchronously
-            asyncio.create_task(self.usage_analytics.record_api_request(api_request))
+            # Aggregate in memory; flushed to Redis in batches
+            self.usage_analytics.record(api_request)
         
         return response
     
@@ -838,7 +1297,9 @@ class APISystem:
                 timeout=data.get("timeout", 30),
                 is_active=data.get("is_active", True),
                 created_at=datetime.now(),
-                last_triggered=None
+                last_triggered=None,
+                max_concurrency=data.get("max_concurrency", 4),
+                batch_size=data.get("batch_size", 1)
             )
             
             self.webhook_manager.register_webhook(webhook)
@@ -952,6 +1413,13 @@ class APISystem:
                 "timestamp": datetime.now().isoformat()
             }, status=503)
     
+    async def _metrics(self, request: Request) -> Response:
+        """OpenMetrics exposition of the in-process metrics registry"""
+        return web.Response(
+            text=self.metrics_registry.render_openmetrics(),
+            headers={"Content-Type": OPENMETRICS_CONTENT_TYPE}
+        )
+    
     async def _api_docs(self, request: Request) -> Response:
         """API documentation endpoint"""
         docs = {
@@ -971,7 +1439,8 @@ class APISystem:
                 "DELETE /api/v1/webhooks/{webhook_id}": "Delete webhook endpoint",
                 "GET /api/v1/analytics/usage": "Get usage analytics",
                 "GET /api/v1/analytics/api-keys/{key_id}": "Get API key analytics",
-                "GET /health": "Health check endpoint"
+                "GET /health": "Health check endpoint",
+                "GET /metrics": "Metrics in the OpenMetrics text format"
             },
             "authentication": {
                 "api_key": "Use 'Authorization: ApiKey <your-api-key>' header",
@@ -987,6 +1456,10 @@ class APISystem:
             # Start webhook workers
             await self.webhook_manager.start_workers()
             
+            # Start rate limit reconciliation and analytics flushing
+            await self.rate_limiter.start()
+            await self.usage_analytics.start()
+            
             # Start web server
             runner = web.AppRunner(self.app)
             await runner.setup()
@@ -1006,6 +1479,10 @@ class APISystem:
             # Stop webhook workers
             await self.webhook_manager.stop_workers()
             
+            # Push remaining rate limit usage and analytics
+            await self.rate_limiter.stop()
+            await self.usage_analytics.stop()
+            
             # Close Redis connection
             await self.redis.close()
             
@@ -1021,10 +1498,7 @@ class APISystem:
     
     def revoke_api_key(self, key_hash: str) -> bool:
         """Revoke API key"""
-        if key_hash in self.auth_manager.api_keys:
-            self.auth_manager.api_keys[key_hash].is_active = False
-            return True
-        return False
+        return self.auth_manager.revoke_api_key(key_hash)
     
     async def trigger_webhook_event(self, event_type: str, data: Dict[str, Any], source: str = "api"):
         """Trigger webhook event"""
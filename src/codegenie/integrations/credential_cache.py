@@ -0,0 +1,126 @@
+"""
+Verified Credential Cache
+
+Provides a bounded LRU cache of credentials (JWT payloads and API keys) that
+already passed verification, so the authentication middleware does not repeat
+signature checks and key hashing for every request from the same caller.
+"""
+
+import hashlib
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set
+
+
+@dataclass
+class CachedCredential:
+    """A verified credential and when it stops being valid"""
+    value: Any
+    expires_at: float
+    owner: Optional[str] = None  # e.g. the API key hash, for revocation
+
+
+class CredentialCache:
+    """Bounded cache of verified credentials
+
+    Entries are keyed by a keyed BLAKE2b digest of the raw credential, so the
+    cache never holds bearer tokens or API keys in clear text and a lookup
+    costs one short hash. Entries expire at the credential's own expiry
+    (capped by ``max_ttl``) and can be dropped by owner, which is how API key
+    revocation reaches every cached copy of the key.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_ttl: float = 300.0,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._digest_key = secrets.token_bytes(32)
+        self._entries: "OrderedDict[bytes, CachedCredential]" = OrderedDict()
+        self._by_owner: Dict[str, Set[bytes]] = {}
+
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def digest(self, credential: str) -> bytes:
+        """Hash a raw credential into a cache key"""
+        return hashlib.blake2b(credential.encode(), key=self._digest_key, digest_size=16).digest()
+
+    def get(self, kind: str, credential: str) -> Optional[Any]:
+        """Get the cached value for a credential, or None"""
+        cache_key = self.digest(f"{kind}:{credential}")
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        if self.clock() >= entry.expires_at:
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            self._remove(cache_key)
+            return None
+
+        self._entries.move_to_end(cache_key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def put(self, kind: str, credential: str, value: Any, expires_at: Optional[float] = None,
+            owner: Optional[str] = None):
+        """Cache a verified credential until ``expires_at`` (epoch seconds)"""
+        if self.max_entries <= 0:
+            return
+
+        limit = self.clock() + self.max_ttl
+        expires_at = limit if expires_at is None else min(expires_at, limit)
+
+        cache_key = self.digest(f"{kind}:{credential}")
+        if cache_key in self._entries:
+            self._remove(cache_key)
+
+        self._entries[cache_key] = CachedCredential(value=value, expires_at=expires_at, owner=owner)
+        if owner is not None:
+            self._by_owner.setdefault(owner, set()).add(cache_key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def invalidate_owner(self, owner: str) -> int:
+        """Drop every entry belonging to ``owner``"""
+        cache_keys = self._by_owner.pop(owner, set())
+        for cache_key in cache_keys:
+            self._entries.pop(cache_key, None)
+        self.stats["invalidations"] += len(cache_keys)
+        return len(cache_keys)
+
+    def clear(self):
+        """Drop all entries"""
+        self.stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+        self._by_owner.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, cache_key: bytes):
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None and entry.owner is not None:
+            owned = self._by_owner.get(entry.owner)
+            if owned is not None:
+                owned.discard(cache_key)
+                if not owned:
+                    del self._by_owner[entry.owner]
@@ -0,0 +1,213 @@
+"""
+Hybrid Rate Limiting
+
+Provides the API rate limiter: decisions are made in-process with a per-key GCRA
+(generic cell rate algorithm, equivalent to a token bucket) and periodically
+reconciled with Redis so that usage on other nodes is charged locally.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class RateLimitState:
+    """GCRA state of one rate limit key"""
+    limit: int
+    window: float
+    tat: float  # Theoretical arrival time: when the bucket is full again
+    pending: int = 0  # Requests admitted locally but not yet pushed to Redis
+    synced_total: Optional[int] = None  # Global counter value seen at the last sync
+    last_seen: float = 0.0
+
+    @property
+    def emission_interval(self) -> float:
+        """Seconds of budget one request consumes"""
+        return self.window / self.limit
+
+
+class RateLimiter:
+    """Rate limiting system with local GCRA decisions and Redis reconciliation
+
+    Every node keeps its own bucket per key and answers without I/O. Each sync
+    interval the node adds the requests it admitted to a shared Redis counter
+    per key (one pipelined ``INCRBY``/``EXPIRE`` pair per active key) and
+    charges whatever the other nodes admitted in the meantime to its local
+    bucket. Buckets use float timestamps, so bursts within the same second
+    are accounted exactly.
+    """
+
+    def __init__(self, redis_client: Optional[Any] = None, sync_interval: float = 1.0,
+                 key_prefix: str = "rate_limit", clock: Callable[[], float] = time.time,
+                 max_keys: int = 100000):
+        self.redis = redis_client
+        self.sync_interval = sync_interval
+        self.key_prefix = key_prefix
+        self.clock = clock
+        self.max_keys = max_keys
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._states: Dict[str, RateLimitState] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+        self._sync_lock: Optional[asyncio.Lock] = None
+        self._running = False
+
+        self.stats = {
+            "decisions": 0,
+            "denied": 0,
+            "syncs": 0,
+            "sync_errors": 0,
+            "remote_charged": 0,
+        }
+
+    async def is_allowed(self, key: str, limit: int, window: int = 3600) -> tuple[bool, Dict[str, Any]]:
+        """Check if request is allowed under rate limit"""
+        return self.check(key, limit, window)
+
+    def check(self, key: str, limit: int, window: float = 3600) -> Tuple[bool, Dict[str, Any]]:
+        """Check and record a request synchronously (no I/O)"""
+        try:
+            if self._sync_task is None and self.redis is not None:
+                self._ensure_sync_task()
+
+            now = self.clock()
+            state = self._states.get(key)
+            if state is None:
+                state = RateLimitState(limit=limit, window=float(window), tat=now)
+                self._states[key] = state
+            elif state.limit != limit or state.window != window:
+                state.limit = limit
+                state.window = float(window)
+            state.last_seen = now
+
+            interval = state.emission_interval
+            tat = state.tat if state.tat > now else now
+            self.stats["decisions"] += 1
+
+            # Allow up to ``limit`` requests in a burst: the bucket holds ``window`` seconds
+            if tat + interval - now > state.window + 1e-9:
+                self.stats["denied"] += 1
+                retry_after = tat + interval - state.window - now
+                return False, {
+                    "allowed": False,
+                    "limit": limit,
+                    "remaining": 0,
+                    "reset_time": int(math.ceil(tat)),
+                    "retry_after": max(1, int(math.ceil(retry_after)))
+                }
+
+            tat += interval
+            state.tat = tat
+            state.pending += 1
+
+            return True, {
+                "allowed": True,
+                "limit": limit,
+                "remaining": max(0, int((state.window - (tat - now)) / interval + 1e-9)),
+                "reset_time": int(math.ceil(tat)),
+                "retry_after": 0
+            }
+
+        except Exception as e:
+            self.logger.error(f"Rate limiting error: {e}")
+            # Fail open - allow request if rate limiter fails
+            return True, {"allowed": True, "limit": limit, "remaining": limit - 1}
+
+    async def sync(self) -> bool:
+        """Push local usage to Redis and charge usage from other nodes"""
+        if self.redis is None:
+            return False
+
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+
+        async with self._sync_lock:
+            now = self.clock()
+            self._prune(now)
+
+            batch: List[Tuple[str, RateLimitState, int]] = [
+                (key, state, state.pending) for key, state in self._states.items()
+            ]
+            if not batch:
+                return True
+
+            try:
+                pipe = self.redis.pipeline()
+                for key, state, sent in batch:
+                    redis_key = f"{self.key_prefix}:{key}"
+                    pipe.incrby(redis_key, sent)
+                    pipe.expire(redis_key, int(math.ceil(state.window * 2)))
+                results = await pipe.execute()
+            except Exception as e:
+                self.stats["sync_errors"] += 1
+                self.logger.warning(f"Rate limit sync failed, deciding locally: {e}")
+                return False
+
+            now = self.clock()
+            for index, (key, state, sent) in enumerate(batch):
+                total = int(results[index * 2])
+                state.pending -= sent
+
+                if state.synced_total is not None:
+                    remote = total - state.synced_total - sent
+                    if remote > 0:
+                        # Charge other nodes' requests as if they arrived now
+                        state.tat = max(state.tat, now) + remote * state.emission_interval
+                        self.stats["remote_charged"] += remote
+                state.synced_total = total
+
+            self.stats["syncs"] += 1
+            return True
+
+    async def start(self):
+        """Start periodic reconciliation with Redis"""
+        self._ensure_sync_task()
+
+    async def stop(self):
+        """Stop reconciliation after a final sync"""
+        self._running = False
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.sync()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        return {**self.stats, "tracked_keys": len(self._states)}
+
+    def _ensure_sync_task(self):
+        if self._sync_task is not None or self.redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._running = True
+        self._sync_task = loop.create_task(self._sync_loop())
+
+    async def _sync_loop(self):
+        while self._running:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                self.logger.error(f"Rate limit sync loop error: {e}")
+
+    def _prune(self, now: float):
+        """Drop idle keys whose bucket has refilled and whose usage was pushed"""
+        idle = [
+            key for key, state in self._states.items()
+            if state.pending == 0 and state.tat <= now and now - state.last_seen > self.sync_interval
+        ]
+        if len(self._states) - len(idle) > self.max_keys:
+            self.logger.warning(f"Tracking {len(self._states) - len(idle)} rate limit keys")
+        for key in idle:
+            del self._states[key]
@@ -0,0 +1,208 @@
+"""
+Usage Metrics Aggregation
+
+Provides the in-memory side of API usage analytics: mergeable log-linear latency
+histograms (HDR-style) and a bounded aggregator of counter deltas that is drained
+and flushed to Redis in batches.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Mapping, Tuple, Union
+
+
+# 2^8 linear sub-buckets per power of two: every bucket is narrower than 1/128 of its value
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT >> 1
+
+COUNT_FIELD = "count"
+SUM_FIELD = "sum_us"
+
+
+def bucket_index(value: int) -> int:
+    """Map a non-negative integer value to its histogram bucket"""
+    if value < SUB_BUCKET_COUNT:
+        return max(0, value)
+    exponent = value.bit_length() - SUB_BUCKET_BITS
+    mantissa = value >> exponent
+    return SUB_BUCKET_COUNT + (exponent - 1) * HALF_SUB_BUCKET_COUNT + (mantissa - HALF_SUB_BUCKET_COUNT)
+
+
+def bucket_range(index: int) -> Tuple[int, int]:
+    """Get the inclusive value range covered by a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    offset = index - SUB_BUCKET_COUNT
+    exponent = offset // HALF_SUB_BUCKET_COUNT + 1
+    mantissa = offset % HALF_SUB_BUCKET_COUNT + HALF_SUB_BUCKET_COUNT
+    return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+
+@dataclass
+class LatencyHistogram:
+    """Log-linear histogram of durations recorded in microseconds
+
+    Histograms merge by adding bucket counts, so per-node or per-day histograms
+    can be combined (including with ``HINCRBY`` on a Redis hash) without losing
+    percentile accuracy.
+    """
+    counts: Dict[int, int] = field(default_factory=dict)
+    count: int = 0
+    sum_us: int = 0
+    max_us: int = 0
+
+    def record(self, seconds: float, times: int = 1):
+        """Record a duration given in seconds"""
+        self.record_us(int(round(seconds * 1_000_000)), times)
+
+    def record_us(self, value: int, times: int = 1):
+        """Record a duration given in microseconds"""
+        value = max(0, value)
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + times
+        self.count += times
+        self.sum_us += value * times
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add another histogram's counts to this one"""
+        for index, bucket_count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + bucket_count
+        self.count += other.count
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percentile: float) -> float:
+        """Get the value at a percentile (0-100) in seconds"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(-(-percentile * self.count // 100)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_range(index)
+                return min((low + high) / 2, self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        """Mean duration in seconds"""
+        return self.sum_us / self.count / 1_000_000 if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Get count, mean, max and the standard percentiles in seconds"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max_us / 1_000_000,
+        }
+
+    def to_fields(self) -> Dict[str, int]:
+        """Encode as hash fields whose values can be summed to merge"""
+        fields = {str(index): bucket_count for index, bucket_count in self.counts.items()}
+        fields[COUNT_FIELD] = self.count
+        fields[SUM_FIELD] = self.sum_us
+        return fields
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[Union[str, bytes], Union[str, bytes, int]]) -> 'LatencyHistogram':
+        """Decode hash fields written by ``to_fields``"""
+        histogram = cls()
+        for key, value in fields.items():
+            key = key.decode() if isinstance(key, bytes) else str(key)
+            value = int(value)
+            if key == COUNT_FIELD:
+                histogram.count = value
+            elif key == SUM_FIELD:
+                histogram.sum_us = value
+            elif key.isdigit():
+                histogram.counts[int(key)] = value
+        if histogram.counts:
+            # The exact maximum is not summable; use the top of the highest bucket
+            histogram.max_us = bucket_range(max(histogram.counts))[1]
+        return histogram
+
+
+class UsageAggregator:
+    """Bounded buffer of counter deltas and latency histograms
+
+    Recording is O(1) and performs no I/O. ``drain`` hands the accumulated
+    deltas to a flusher; if the flush fails they can be handed back with
+    ``restore``. Once ``max_entries`` distinct counters are buffered, new
+    counters are dropped (and counted) until the next drain.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.entries = 0
+        self.dropped = 0
+
+    def increment(self, key: str, field_name: str, amount: int = 1) -> bool:
+        """Add to a counter in a Redis hash"""
+        fields = self.counters.get(key)
+        if fields is None:
+            if self.entries >= self.max_entries:
+                self.dropped += 1
+                return False
+            fields = self.counters[key] = {}
+        if field_name not in fields:
+            if self.entries >= self.max_entries:
+                self.dropped += 1
+                return False
+            fields[field_name] = 0
+            self.entries += 1
+        fields[field_name] += amount
+        return True
+
+    def observe(self, key: str, seconds: float) -> bool:
+        """Record a duration into the histogram stored at ``key``"""
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            if self.entries >= self.max_entries:
+                self.dropped += 1
+                return False
+            histogram = self.histograms[key] = LatencyHistogram()
+            self.entries += 1
+        histogram.record(seconds)
+        return True
+
+    def drain(self) -> Tuple[Dict[str, Dict[str, int]], Dict[str, LatencyHistogram]]:
+        """Take all buffered deltas, leaving the aggregator empty"""
+        counters, histograms = self.counters, self.histograms
+        self.counters, self.histograms = {}, {}
+        self.entries = 0
+        return counters, histograms
+
+    def restore(self, counters: Dict[str, Dict[str, int]], histograms: Dict[str, LatencyHistogram]):
+        """Merge undelivered deltas back in (subject to the bound)"""
+        for key, fields in counters.items():
+            for field_name, amount in fields.items():
+                self.increment(key, field_name, amount)
+        for key, histogram in histograms.items():
+            existing = self.histograms.get(key)
+            if existing is None:
+                if self.entries >= self.max_entries:
+                    self.dropped += histogram.count
+                    continue
+                existing = self.histograms[key] = LatencyHistogram()
+                self.entries += 1
+            existing.merge(histogram)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.entries == 0
+
+
+def merge_histograms(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    """Merge several histograms into a new one"""
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return merged
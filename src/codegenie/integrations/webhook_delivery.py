@@ -0,0 +1,157 @@
+"""
+Webhook Delivery Primitives
+
+Provides the building blocks of webhook delivery: per-endpoint circuit
+breakers, jittered exponential backoff for retries, and a Redis-backed log used
+both for events that overflow the in-memory queue and for dead letters.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CircuitState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    deliveries fail fast for ``reset_timeout`` seconds. Then a single trial
+    delivery is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    state: CircuitState = CircuitState.CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    times_opened: int = 0
+    _trial_in_flight: bool = field(default=False, repr=False)
+
+    def allow(self) -> bool:
+        """Check whether a delivery may be attempted now"""
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+
+        # Half-open: one trial delivery at a time
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        """Record a successful delivery"""
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        """Record a failed delivery"""
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self.times_opened += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = self.clock()
+
+
+@dataclass
+class EndpointDeliveryState:
+    """Delivery state of one webhook endpoint"""
+    breaker: CircuitBreaker
+    pending: deque = field(default_factory=deque)  # Events waiting for a free delivery slot
+    in_flight: int = 0  # Workers currently delivering to the endpoint
+
+
+def jittered_backoff(attempt: int, base: float = 0.5, cap: float = 30.0,
+                     rng: Optional[random.Random] = None) -> float:
+    """Get a retry delay using exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry number
+        base: Delay ceiling of the first retry in seconds
+        cap: Maximum delay ceiling in seconds
+
+    Returns:
+        Delay in seconds, uniformly drawn from ``[0, min(cap, base * 2**attempt)]``
+    """
+    ceiling = min(cap, base * (2 ** attempt))
+    return (rng or random).uniform(0, ceiling)
+
+
+class DeliveryLog:
+    """Persisted log of webhook deliveries kept in a capped Redis list
+
+    Records are JSON objects appended with ``RPUSH`` and taken back oldest
+    first with an ``LRANGE``/``LTRIM`` pair in one transaction. If Redis is unavailable the records are logged and
+    counted as lost so that callers never fail because of the log.
+    """
+
+    def __init__(self, redis_client: Any, key: str, max_length: int = 100000):
+        self.redis = redis_client
+        self.key = key
+        self.max_length = max_length
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.lost = 0
+
+    async def append(self, records: List[Dict[str, Any]]) -> bool:
+        """Append records, trimming the oldest beyond ``max_length``"""
+        if not records:
+            return True
+        try:
+            pipe = self.redis.pipeline()
+            pipe.rpush(self.key, *[json.dumps(record) for record in records])
+            pipe.ltrim(self.key, -self.max_length, -1)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            self.lost += len(records)
+            self.logger.error(f"Could not persist {len(records)} records to {self.key}: {e}")
+            return False
+
+    async def pop(self, count: int) -> List[Dict[str, Any]]:
+        """Remove and return up to ``count`` of the oldest records"""
+        try:
+            pipe = self.redis.pipeline()
+            pipe.lrange(self.key, 0, count - 1)
+            pipe.ltrim(self.key, count, -1)
+            raw_records, _ = await pipe.execute()
+        except Exception as e:
+            self.logger.error(f"Could not read records from {self.key}: {e}")
+            return []
+
+        records = []
+        for raw in raw_records or []:
+            try:
+                records.append(json.loads(raw))
+            except (TypeError, ValueError):
+                self.logger.warning(f"Skipping malformed record in {self.key}")
+        return records
+
+    async def length(self) -> int:
+        """Get the number of stored records"""
+        try:
+            return int(await self.redis.llen(self.key))
+        except Exception as e:
+            self.logger.error(f"Could not read length of {self.key}: {e}")
+            return 0
@@ -4,12 +4,17 @@ Provides WebSocket support, live progress updates, and real-time command output.
 """
 
 import asyncio
+import base64
 import json
 import logging
-from typing import Any, Dict, List, Optional, Set
+import time
+import zlib
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from aiohttp import web
+from aiohttp import web, WSCloseCode
 import weakref
 
 logger = logging.getLogger(__name__)
@@ -38,6 +43,19 @@ class CommandOutput:
     exit_code: Optional[int] = None
 
 
+@dataclass
+class CommandOutputFrame:
+    """Represents a batch of command output chunks sent as one message."""
+    command_id: str
+    command: str
+    first_line: int  # Scrollback line number of the first chunk
+    line_count: int
+    timestamp: str
+    chunks: Optional[List[Dict[str, str]]] = None  # [{'output_type': ..., 'content': ...}]
+    encoding: Optional[str] = None  # 'deflate-base64' when chunks are compressed into payload
+    payload: Optional[str] = None
+
+
 @dataclass
 class PlanUpdate:
     """Represents a plan update."""
@@ -49,24 +67,94 @@ class PlanUpdate:
     timestamp: str
 
 
+class ClientConnection:
+    """A subscribed WebSocket with its own bounded send queue."""
+    
+    def __init__(self, ws: web.WebSocketResponse, channels: List[str]):
+        self.ws = ws
+        self.channels = set(channels)
+        # Entries are [coalesce_key, message, enqueued_at]; coalescing rewrites the message in place
+        self.queue: Deque[List[Any]] = deque()
+        self.pending_keys: Dict[Any, List[Any]] = {}
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closing = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self.queue)
+    
+    def lag(self, now: float) -> float:
+        """Seconds the oldest queued message has been waiting."""
+        return now - self.queue[0][2] if self.queue else 0.0
+
+
 class RealtimeUpdateManager:
-    """Manages real-time updates via WebSocket."""
+    """Manages real-time updates via WebSocket.
+    
+    Each message is serialized once and appended to the send queue of every
+    subscriber; a sender task per connection drains its queue, so a slow
+    client only delays itself. Queues are bounded: progress and plan updates
+    replace the still-queued update for the same task or step, other
+    messages push out the oldest (or are dropped, with the ``drop_newest``
+    policy). Clients whose oldest queued message is older than ``max_lag``
+    seconds, or whose send takes longer than ``send_timeout``, are
+    disconnected.
+    
+    Registered sockets are held strongly, together with their queue and
+    sender task, so every ``register_websocket`` must be paired with an
+    ``unregister_websocket`` once the connection ends. Sockets found closed
+    when an update is broadcast are unregistered as a fallback.
+    """
     
-    def __init__(self):
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+    
+    def __init__(self, max_queue_size: int = 256, max_lag: float = 30.0,
+                 send_timeout: float = 10.0, overflow_policy: str = 'drop_oldest'):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        
         self.websockets: Set[web.WebSocketResponse] = weakref.WeakSet()
         self.subscriptions: Dict[str, Set[web.WebSocketResponse]] = {}
         self.update_queue: asyncio.Queue = asyncio.Queue()
         self.running = False
+        
+        self.max_queue_size = max_queue_size
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+        self.overflow_policy = overflow_policy
+        
+        self.clients: Dict[web.WebSocketResponse, ClientConnection] = {}
+        self._recipients_cache: Dict[str, Tuple[ClientConnection, ...]] = {}
+        self._process_task: Optional[asyncio.Task] = None
+        self.stats = {
+            'broadcasts': 0,
+            'enqueued': 0,
+            'sent': 0,
+            'dropped': 0,
+            'coalesced': 0,
+            'send_errors': 0,
+            'disconnected_slow': 0,
+        }
     
     async def start(self):
         """Start the update manager."""
         self.running = True
-        asyncio.create_task(self._process_updates())
+        self._process_task = asyncio.create_task(self._process_updates())
         logger.info("Real-time update manager started")
     
     async def stop(self):
         """Stop the update manager."""
         self.running = False
+        
+        tasks = [client.task for client in self.clients.values() if client.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
         logger.info("Real-time update manager stopped")
     
     async def _process_updates(self):
@@ -82,26 +170,155 @@ class RealtimeUpdateManager:
     
     async def _broadcast_update(self, update: Dict[str, Any]):
         """Broadcast update to subscribed clients."""
-        update_type = update.get('type')
         channel = update.get('channel', 'global')
         
-        # Get subscribers for this channel
-        subscribers = self.subscriptions.get(channel, set())
+        # Subscribers of this channel plus global subscribers, cached between registrations
+        recipients = self._recipients(channel)
+        if not recipients:
+            return
+        
+        message = json.dumps(update)
+        coalesce_key = self._coalesce_key(update)
+        now = time.monotonic()
+        
+        self.stats['broadcasts'] += 1
+        closed = []
+        for client in recipients:
+            if client.ws.closed:
+                closed.append(client)
+                continue
+            self._enqueue(client, message, coalesce_key, now)
+        
+        for client in closed:
+            if self.clients.get(client.ws) is client:
+                self.unregister_websocket(client.ws)
+    
+    def _recipients(self, channel: str) -> Tuple[ClientConnection, ...]:
+        recipients = self._recipients_cache.get(channel)
+        if recipients is None:
+            subscribers = set(self.subscriptions.get(channel, ()))
+            subscribers.update(self.subscriptions.get('global', ()))
+            recipients = tuple(self.clients[ws] for ws in subscribers if ws in self.clients)
+            self._recipients_cache[channel] = recipients
+        return recipients
+    
+    @staticmethod
+    def _coalesce_key(update: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+        """Key under which a newer update supersedes a queued one (None if it never does)."""
+        data = update.get('data') or {}
+        if update.get('type') == 'progress_update' and 'task_id' in data:
+            return ('progress', data['task_id'])
+        if update.get('type') == 'plan_update' and 'plan_id' in data:
+            return ('plan', data['plan_id'], data.get('step_id'))
+        return None
+    
+    def _enqueue(self, client: ClientConnection, message: str, coalesce_key: Optional[Tuple[str, ...]],
+                 now: float):
+        """Queue a serialized message for one client without waiting on the socket."""
+        if client.closing:
+            return
         
-        # Also send to global subscribers
-        subscribers = subscribers.union(self.subscriptions.get('global', set()))
+        if coalesce_key is not None:
+            entry = client.pending_keys.get(coalesce_key)
+            if entry is not None:
+                entry[1] = message
+                client.coalesced += 1
+                self.stats['coalesced'] += 1
+                return
+        
+        if len(client.queue) >= self.max_queue_size:
+            if client.lag(now) > self.max_lag:
+                self._disconnect(client, "client fell too far behind")
+                return
+            
+            client.dropped += 1
+            self.stats['dropped'] += 1
+            if self.overflow_policy == 'drop_newest':
+                return
+            dropped = client.queue.popleft()
+            if dropped[0] is not None and client.pending_keys.get(dropped[0]) is dropped:
+                del client.pending_keys[dropped[0]]
+        
+        entry = [coalesce_key, message, now]
+        client.queue.append(entry)
+        if coalesce_key is not None:
+            client.pending_keys[coalesce_key] = entry
+        self.stats['enqueued'] += 1
+        
+        if client.task is None:
+            client.task = asyncio.create_task(self._sender(client))
+        client.wakeup.set()
+    
+    async def _sender(self, client: ClientConnection):
+        """Drain one client's queue in order."""
+        try:
+            while not client.closing:
+                if not client.queue:
+                    client.wakeup.clear()
+                    await client.wakeup.wait()
+                    continue
+                
+                entry = client.queue.popleft()
+                if entry[0] is not None and client.pending_keys.get(entry[0]) is entry:
+                    del client.pending_keys[entry[0]]
+                
+                if client.ws.closed:
+                    break
+                
+                await self._send(client.ws, entry[1])
+                client.sent += 1
+                self.stats['sent'] += 1
+        
+        except asyncio.TimeoutError:
+            self._disconnect(client, "send timed out")
+            return
+        except asyncio.CancelledError:
+            # Restarted by the next update if the client is still registered
+            client.task = None
+            raise
+        except Exception as e:
+            self.stats['send_errors'] += 1
+            logger.error(f"Error sending update to WebSocket: {e}")
+        
+        if self.clients.get(client.ws) is client:
+            self.unregister_websocket(client.ws)
+    
+    async def _send(self, ws: web.WebSocketResponse, message: str):
+        """Send with a timeout; unlike wait_for this never swallows a cancellation."""
+        send = asyncio.ensure_future(ws.send_str(message))
+        try:
+            done, _ = await asyncio.wait({send}, timeout=self.send_timeout)
+        except asyncio.CancelledError:
+            send.cancel()
+            raise
+        if not done:
+            send.cancel()
+            raise asyncio.TimeoutError()
+        send.result()
+    
+    def _disconnect(self, client: ClientConnection, reason: str):
+        """Drop a slow client and close its socket in the background."""
+        if client.closing:
+            return
         
-        if subscribers:
-            message = json.dumps(update)
-            for ws in list(subscribers):
-                try:
-                    await ws.send_str(message)
-                except Exception as e:
-                    logger.error(f"Error sending update to WebSocket: {e}")
-                    subscribers.discard(ws)
+        self.stats['disconnected_slow'] += 1
+        logger.warning(f"Disconnecting WebSocket ({reason}); {client.queue_depth} updates pending")
+        self.unregister_websocket(client.ws)
+        asyncio.ensure_future(self._close(client.ws))
+    
+    @staticmethod
+    async def _close(ws: web.WebSocketResponse):
+        try:
+            await ws.close(code=WSCloseCode.TRY_AGAIN_LATER, message=b'Too far behind')
+        except Exception as e:
+            logger.debug(f"Error closing slow WebSocket: {e}")
     
     def register_websocket(self, ws: web.WebSocketResponse, channels: List[str] = None):
-        """Register a WebSocket connection."""
+        """Register a WebSocket connection.
+        
+        The manager keeps the socket alive until ``unregister_websocket`` is
+        called for it, which the connection handler must do when it exits.
+        """
         self.websockets.add(ws)
         
         if channels is None:
@@ -112,6 +329,13 @@ class RealtimeUpdateManager:
                 self.subscriptions[channel] = weakref.WeakSet()
             self.subscriptions[channel].add(ws)
         
+        client = self.clients.get(ws)
+        if client is None:
+            self.clients[ws] = ClientConnection(ws, channels)
+        else:
+            client.channels.update(channels)
+        self._recipients_cache.clear()
+        
         logger.info(f"WebSocket registered for channels: {channels}")
     
     def unregister_websocket(self, ws: web.WebSocketResponse):
@@ -121,8 +345,27 @@ class RealtimeUpdateManager:
         for channel_subs in self.subscriptions.values():
             channel_subs.discard(ws)
         
+        client = self.clients.pop(ws, None)
+        if client is not None:
+            client.closing = True
+            client.queue.clear()
+            client.pending_keys.clear()
+            if client.task is not None and client.task is not asyncio.current_task():
+                client.task.cancel()
+        self._recipients_cache.clear()
+        
         logger.info("WebSocket unregistered")
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fan-out statistics, including per-client queue depth."""
+        depths = [client.queue_depth for client in self.clients.values()]
+        return {
+            **self.stats,
+            'clients': len(self.clients),
+            'queued': sum(depths),
+            'max_queue_depth': max(depths, default=0),
+        }
+    
     async def send_progress_update(self, update: ProgressUpdate):
         """Send a progress update."""
         await self.update_queue.put({
@@ -139,6 +382,14 @@ class RealtimeUpdateManager:
             'data': asdict(output)
         })
     
+    async def send_command_frame(self, frame: CommandOutputFrame):
+        """Send a batch of command output."""
+        await self.update_queue.put({
+            'type': 'command_output',
+            'channel': 'commands',
+            'data': asdict(frame)
+        })
+    
     async def send_plan_update(self, update: PlanUpdate):
         """Send a plan update."""
         await self.update_queue.put({
@@ -272,18 +523,39 @@ class ProgressTracker:
 
 
 class CommandOutputStreamer:
-    """Streams command output in real-time."""
+    """Streams command output in real-time.
     
-    def __init__(self, update_manager: RealtimeUpdateManager):
+    Output chunks are batched into frames: a frame is sent ``flush_interval``
+    seconds after its first chunk, or as soon as it holds ``max_frame_bytes``
+    of output. Frames at least ``compress_threshold`` bytes long are sent
+    deflate-compressed. Each command keeps the last ``max_scrollback_lines``
+    chunks, addressable by line number through ``get_output_range``.
+    """
+    
+    COMPRESSED_ENCODING = 'deflate-base64'
+    
+    def __init__(self, update_manager: RealtimeUpdateManager, flush_interval: float = 0.05,
+                 max_frame_bytes: int = 16 * 1024, max_scrollback_lines: int = 10000,
+                 compress_threshold: Optional[int] = None):
         self.update_manager = update_manager
         self.active_commands: Dict[str, Dict[str, Any]] = {}
+        self.flush_interval = flush_interval
+        self.max_frame_bytes = max_frame_bytes
+        self.max_scrollback_lines = max_scrollback_lines
+        self.compress_threshold = compress_threshold
+        self.stats = {'chunks': 0, 'frames': 0, 'compressed_frames': 0, 'bytes_in': 0, 'bytes_sent': 0}
     
     async def start_command(self, command_id: str, command: str):
         """Start streaming a command."""
         self.active_commands[command_id] = {
             'command': command,
             'started_at': datetime.now().isoformat(),
-            'output_lines': []
+            'output_lines': deque(maxlen=self.max_scrollback_lines),
+            'total_lines': 0,
+            'pending': [],
+            'pending_bytes': 0,
+            'pending_first_line': 0,
+            'flush_task': None
         }
         
         await self.update_manager.send_notification(
@@ -297,21 +569,85 @@ class CommandOutputStreamer:
             logger.warning(f"Command {command_id} not found")
             return
         
-        self.active_commands[command_id]['output_lines'].append({
+        cmd = self.active_commands[command_id]
+        line = cmd['total_lines']
+        cmd['total_lines'] += 1
+        cmd['output_lines'].append({
+            'line': line,
             'type': output_type,
             'content': content,
             'timestamp': datetime.now().isoformat()
         })
         
-        output = CommandOutput(
+        if not cmd['pending']:
+            cmd['pending_first_line'] = line
+        cmd['pending'].append({'output_type': output_type, 'content': content})
+        size = len(content.encode('utf-8'))
+        cmd['pending_bytes'] += size
+        self.stats['chunks'] += 1
+        self.stats['bytes_in'] += size
+        
+        if cmd['pending_bytes'] >= self.max_frame_bytes:
+            await self._flush(command_id)
+        elif cmd['flush_task'] is None:
+            cmd['flush_task'] = asyncio.create_task(self._flush_later(command_id))
+    
+    async def flush(self, command_id: Optional[str] = None):
+        """Send pending output now (for one command or all of them)."""
+        command_ids = [command_id] if command_id is not None else list(self.active_commands)
+        for cid in command_ids:
+            if cid in self.active_commands:
+                await self._flush(cid)
+    
+    async def _flush_later(self, command_id: str):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        except asyncio.CancelledError:
+            return
+        cmd = self.active_commands.get(command_id)
+        if cmd is not None and cmd['flush_task'] is asyncio.current_task():
+            cmd['flush_task'] = None
+        await self._flush(command_id)
+    
+    async def _flush(self, command_id: str):
+        """Send the pending chunks of a command as one frame."""
+        cmd = self.active_commands.get(command_id)
+        if cmd is None:
+            return
+        
+        task = cmd['flush_task']
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        cmd['flush_task'] = None
+        
+        chunks = cmd['pending']
+        if not chunks:
+            return
+        cmd['pending'] = []
+        size = cmd['pending_bytes']
+        cmd['pending_bytes'] = 0
+        
+        frame = CommandOutputFrame(
             command_id=command_id,
-            command=self.active_commands[command_id]['command'],
-            output_type=output_type,
-            content=content,
-            timestamp=datetime.now().isoformat()
+            command=cmd['command'],
+            first_line=cmd['pending_first_line'],
+            line_count=len(chunks),
+            timestamp=datetime.now().isoformat(),
+            chunks=chunks
         )
         
-        await self.update_manager.send_command_output(output)
+        if self.compress_threshold is not None and size >= self.compress_threshold:
+            compressed = zlib.compress(json.dumps(chunks).encode(), 6)
+            frame.chunks = None
+            frame.encoding = self.COMPRESSED_ENCODING
+            frame.payload = base64.b64encode(compressed).decode('ascii')
+            self.stats['compressed_frames'] += 1
+            self.stats['bytes_sent'] += len(frame.payload)
+        else:
+            self.stats['bytes_sent'] += size
+        
+        self.stats['frames'] += 1
+        await self.update_manager.send_command_frame(frame)
     
     async def complete_command(self, command_id: str, exit_code: int):
         """Mark command as completed."""
@@ -319,6 +655,9 @@ class CommandOutputStreamer:
             logger.warning(f"Command {command_id} not found")
             return
         
+        # Output must arrive before the completion message
+        await self._flush(command_id)
+        
         cmd = self.active_commands[command_id]
         cmd['completed_at'] = datetime.now().isoformat()
         cmd['exit_code'] = exit_code
@@ -341,10 +680,31 @@ class CommandOutputStreamer:
         )
     
     def get_command_output(self, command_id: str) -> Optional[List[Dict[str, Any]]]:
-        """Get all output for a command."""
+        """Get the retained output for a command."""
         if command_id in self.active_commands:
-            return self.active_commands[command_id]['output_lines']
+            return list(self.active_commands[command_id]['output_lines'])
         return None
+    
+    def get_output_range(self, command_id: str, start: int = 0, end: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Get retained output lines ``start`` (inclusive) to ``end`` (exclusive)."""
+        cmd = self.active_commands.get(command_id)
+        if cmd is None:
+            return None
+        
+        lines = cmd['output_lines']
+        first_available = cmd['total_lines'] - len(lines)
+        end = cmd['total_lines'] if end is None else min(end, cmd['total_lines'])
+        begin = max(start, first_available)
+        
+        selected = list(islice(lines, begin - first_available, end - first_available)) if begin < end else []
+        return {
+            'command_id': command_id,
+            'lines': selected,
+            'first_line': begin,
+            'total_lines': cmd['total_lines'],
+            'first_available': first_available,
+            'truncated': start < first_available
+        }
 
 
 class PlanProgressTracker:
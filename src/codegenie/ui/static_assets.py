@@ -0,0 +1,172 @@
+"""
+Static asset store for the CodeGenie web interface.
+Builds assets once into bytes with precompressed variants and content-hash
+ETags, and serves them with HTTP cache validation.
+"""
+
+import gzip
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+try:
+    import brotli
+    _BROTLI_AVAILABLE = True
+except ImportError:
+    _BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Responses for versioned URLs never change; everything else must be revalidated
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+@dataclass
+class StaticAsset:
+    """A static asset prepared for serving."""
+    path: str
+    content_type: str
+    body: bytes
+    etag: str  # Of the uncompressed representation
+    version: str
+    variants: Dict[str, bytes] = field(default_factory=dict)  # Content-Encoding -> body
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of one representation; each content coding gets its own."""
+        return self.etag if encoding is None else f'"{self.version}-{encoding}"'
+
+
+def build_asset(path: str, content: str, content_type: str, min_compress_size: int = 256) -> StaticAsset:
+    """Encode an asset and precompress it with every available encoding."""
+    body = content.encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()
+    version = digest[:16]
+
+    variants: Dict[str, bytes] = {}
+    if len(body) >= min_compress_size:
+        if _BROTLI_AVAILABLE:
+            variants['br'] = brotli.compress(body, quality=11)
+        # mtime=0 keeps the gzip bytes (and so caches downstream) deterministic
+        variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        variants = {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+    return StaticAsset(
+        path=path,
+        content_type=content_type,
+        body=body,
+        etag=f'"{version}"',
+        version=version,
+        variants=variants
+    )
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into encoding -> q-value."""
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        encoding = parts[0].strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding] = quality
+    return accepted
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag[2:] == etag if tag.startswith('W/') else tag == etag for tag in candidates)
+
+
+class StaticAssetStore:
+    """In-memory static assets served with ETags and precompressed bodies."""
+
+    # Preferred order when the client accepts several encodings equally
+    ENCODING_PREFERENCE = ('br', 'gzip')
+
+    def __init__(self, min_compress_size: int = 256):
+        self.min_compress_size = min_compress_size
+        self.assets: Dict[str, StaticAsset] = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'compressed': 0, 'bytes_sent': 0}
+
+    def add(self, path: str, content: str, content_type: str) -> StaticAsset:
+        """Build an asset and make it servable under ``path``."""
+        asset = build_asset(path, content, content_type, self.min_compress_size)
+        self.assets[path] = asset
+        logger.debug(
+            f"Built static asset {path}: {len(asset.body)} bytes, "
+            + ", ".join(f"{enc} {len(data)}" for enc, data in asset.variants.items())
+        )
+        return asset
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self.assets.get(path)
+
+    def versioned_url(self, path: str) -> str:
+        """URL of an asset that changes whenever its content does."""
+        return f"{path}?v={self.assets[path].version}"
+
+    def choose_encoding(self, asset: StaticAsset, accept_encoding: Optional[str]) -> Optional[str]:
+        """Pick the best precompressed variant the client accepts."""
+        accepted = parse_accept_encoding(accept_encoding)
+        best: Tuple[float, int, Optional[str]] = (0.0, 0, None)
+        for rank, encoding in enumerate(self.ENCODING_PREFERENCE):
+            if encoding not in asset.variants:
+                continue
+            quality = accepted.get(encoding, accepted.get('*', 0.0))
+            candidate = (quality, -rank, encoding)
+            if quality > 0 and candidate > best:
+                best = candidate
+        return best[2]
+
+    def response(self, request: web.Request, path: str) -> Optional[web.Response]:
+        """Build the response for an asset, or None if there is no such asset."""
+        asset = self.assets.get(path)
+        if asset is None:
+            return None
+
+        self.stats['requests'] += 1
+        versioned = request.rel_url.query.get('v') == asset.version
+        # Validate against the representation this request would get
+        encoding = self.choose_encoding(asset, request.headers.get('Accept-Encoding'))
+        headers = {
+            'ETag': asset.etag_for(encoding),
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+            self.stats['not_modified'] += 1
+            return web.Response(status=304, headers=headers)
+
+        body = asset.body
+        if encoding is not None:
+            body = asset.variants[encoding]
+            headers['Content-Encoding'] = encoding
+            self.stats['compressed'] += 1
+        self.stats['bytes_sent'] += len(body)
+
+        # The prebuilt bytes are handed to aiohttp as-is: no per-request encoding or copying
+        return web.Response(body=body, headers=headers, content_type=asset.content_type, charset='utf-8')
+
+    def paths(self) -> List[str]:
+        return list(self.assets)
@@ -18,6 +18,7 @@ import weakref
 
 from ..core.agent import CodeGenieAgent
 from ..core.config import Config
+from ..core.metrics_registry import OPENMETRICS_CONTENT_TYPE, get_default_registry
 from .web_components import (
     WebComponentsManager, ExecutionPlan, PlanStep, FileDiff,
     ApprovalRequest, ProgressMetrics
@@ -26,6 +27,7 @@ from .realtime_updates import (
     RealtimeUpdateManager, ProgressTracker, CommandOutputStreamer,
     PlanProgressTracker, ProgressUpdate, CommandOutput
 )
+from .static_assets import StaticAssetStore
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +45,8 @@ class WebInterface:
         self.approval_requests = {}
         self.progress_metrics = {}
         self.recent_activities = []
+        self.static_assets = StaticAssetStore()
+        self.metrics_registry = get_default_registry()
         
         # Real-time updates
         self.realtime_manager = RealtimeUpdateManager()
@@ -133,10 +137,14 @@ class WebInterface:
         cors.add(self.app.router.add_post('/api/approvals/{request_id}/approve', self.approve_request))
         cors.add(self.app.router.add_post('/api/approvals/{request_id}/reject', self.reject_request))
         cors.add(self.app.router.add_get('/api/progress', self.get_progress))
+        cors.add(self.app.router.add_get('/api/commands/{command_id}/output', self.get_command_output))
         
         # WebSocket route
         cors.add(self.app.router.add_get('/ws', self.websocket_handler))
         
+        # Metrics exposition
+        cors.add(self.app.router.add_get('/metrics', self.get_metrics))
+        
         # Main page
         cors.add(self.app.router.add_get('/', self.serve_index))
         cors.add(self.app.router.add_get('/{path:.*}', self.serve_static))
@@ -144,39 +152,47 @@ class WebInterface:
     def _setup_static_files(self) -> None:
         """Setup static file serving."""
         
+        css_content = self._generate_css()
+        js_content = self._generate_javascript()
+        
+        # Build stylesheet and script first so the page can reference them by content hash
+        self.static_assets.add('style.css', css_content, 'text/css')
+        self.static_assets.add('script.js', js_content, 'application/javascript')
+        
         # Create basic HTML interface
         html_content = self._generate_html_interface()
+        html_content = html_content.replace(
+            'href="style.css"', f'href="{self.static_assets.versioned_url("style.css")}"'
+        ).replace(
+            'src="script.js"', f'src="{self.static_assets.versioned_url("script.js")}"'
+        )
+        self.static_assets.add('index.html', html_content, 'text/html')
         
-        # Store in memory for now (in production, use proper static files)
+        # Generated sources, kept for inspection; requests are served from static_assets
         self.static_files = {
             'index.html': html_content,
-            'style.css': self._generate_css(),
-            'script.js': self._generate_javascript()
+            'style.css': css_content,
+            'script.js': js_content
         }
     
-    async def serve_index(self, request) -> web.Response:
-        """Serve the main index page."""
+    async def get_metrics(self, request) -> web.Response:
+        """Render the in-process metrics in the OpenMetrics text format."""
         return web.Response(
-            text=self.static_files['index.html'],
-            content_type='text/html'
+            text=self.metrics_registry.render_openmetrics(),
+            headers={'Content-Type': OPENMETRICS_CONTENT_TYPE}
         )
     
+    async def serve_index(self, request) -> web.Response:
+        """Serve the main index page."""
+        return self.static_assets.response(request, 'index.html')
+    
     async def serve_static(self, request) -> web.Response:
         """Serve static files."""
         path = request.match_info['path']
         
-        if path in self.static_files:
-            if path.endswith('.css'):
-                content_type = 'text/css'
-            elif path.endswith('.js'):
-                content_type = 'application/javascript'
-            else:
-                content_type = 'text/plain'
-            
-            return web.Response(
-                text=self.static_files[path],
-                content_type=content_type
-            )
+        response = self.static_assets.response(request, path)
+        if response is not None:
+            return response
         
         return web.Response(status=404, text="File not found")
     
@@ -680,6 +696,25 @@ class WebInterface:
         except Exception as e:
             return web.json_response({'error': str(e)}, status=500)
     
+    async def get_command_output(self, request) -> web.Response:
+        """Get a range of retained command output lines."""
+        try:
+            command_id = request.match_info['command_id']
+            start = int(request.rel_url.query.get('start', 0))
+            end = request.rel_url.query.get('end')
+            
+            output = self.command_streamer.get_output_range(
+                command_id, start, int(end) if end is not None else None
+            )
+            if output is None:
+                return web.json_response({'error': 'Command not found'}, status=404)
+            
+            return web.json_response(output)
+        except ValueError:
+            return web.json_response({'error': 'start and end must be integers'}, status=400)
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=500)
+    
     async def get_progress(self, request) -> web.Response:
         """Get progress dashboard data."""
         try:
@@ -1129,6 +1164,8 @@ input, select {
         return """
 let ws = null;
 let currentTab = 'chat';
+// Per-command chain of pending output frames, so decoding never reorders them
+const commandOutputQueues = new Map();
 
 // Initialize WebSocket connection
 function initWebSocket() {
@@ -1184,7 +1221,7 @@ function handleWebSocketMessage(data) {
             handleProgressUpdate(data.data);
             break;
         case 'command_output':
-            handleCommandOutput(data.data);
+            queueCommandOutput(data.data);
             break;
         case 'plan_update':
             handlePlanUpdate(data.data);
@@ -1219,18 +1256,48 @@ function handleProgressUpdate(data) {
     }
 }
 
-function handleCommandOutput(data) {
-    console.log('Command output:', data);
-    
+async function decodeCommandChunks(data) {
+    if (data.encoding !== 'deflate-base64') {
+        return data.chunks || [{output_type: data.output_type, content: data.content}];
+    }
+    const bytes = Uint8Array.from(atob(data.payload), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+    return JSON.parse(await new Response(stream).text());
+}
+
+function queueCommandOutput(data) {
+    // Compressed frames decode asynchronously; append each one after the previous
+    const commandId = data.command_id;
+    const previous = commandOutputQueues.get(commandId) || Promise.resolve();
+    const next = previous
+        .then(() => handleCommandOutput(data))
+        .catch(error => console.error('Command output error:', error));
+    commandOutputQueues.set(commandId, next);
+    next.then(() => {
+        if (commandOutputQueues.get(commandId) === next) {
+            commandOutputQueues.delete(commandId);
+        }
+    });
+}
+
+async function handleCommandOutput(data) {
     // Add to command output display if exists
     const outputElement = document.getElementById('command-output-' + data.command_id);
-    if (outputElement) {
+    if (!outputElement) {
+        return;
+    }
+    
+    // Frames batch many chunks; append them in one DOM update
+    const chunks = await decodeCommandChunks(data);
+    const fragment = document.createDocumentFragment();
+    for (const chunk of chunks) {
         const line = document.createElement('div');
-        line.className = 'command-line ' + data.output_type;
-        line.textContent = data.content;
-        outputElement.appendChild(line);
-        outputElement.scrollTop = outputElement.scrollHeight;
+        line.className = 'command-line ' + chunk.output_type;
+        line.textContent = chunk.content;
+        fragment.appendChild(line);
     }
+    outputElement.appendChild(fragment);
+    outputElement.scrollTop = outputElement.scrollHeight;
 }
 
 function handlePlanUpdate(data) {
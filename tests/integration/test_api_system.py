@@ -10,15 +10,16 @@ import json
 import time
 import jwt
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import datetime
 from aiohttp import web
 from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
 import redis.asyncio as redis
 
 from src.codegenie.integrations.api_system import (
     APISystem, AuthenticationManager, RateLimiter, WebhookManager,
-    UsageAnalytics, APIKey, WebhookEndpoint, WebhookEvent, APIRequest
+    UsageAnalytics, APIKey, WebhookEndpoint, WebhookEvent
 )
+from tests.memory_redis import InMemoryRedis
 from src.codegenie.core.code_intelligence import CodeIntelligence
 from src.codegenie.core.context_engine import ContextEngine
 from src.codegenie.agents.coordinator import AgentCoordinator
@@ -242,38 +243,75 @@ class TestAuthenticationManager:
         
         # Test admin permission
         assert auth_manager.has_permission(["admin"], "anything") is True
+    
+    @pytest.mark.asyncio
+    async def test_verified_credentials_are_cached(self, auth_manager):
+        """Test repeat validations are served from the credential cache"""
+        key, api_key = auth_manager.generate_api_key("Test Key", ["read"])
+        token = auth_manager.generate_jwt_token("user123", ["read"])
+        
+        for _ in range(5):
+            assert await auth_manager.validate_api_key(key) is api_key
+            assert (await auth_manager.validate_jwt_token(token))["user_id"] == "user123"
+        
+        stats = auth_manager.get_cache_stats()
+        assert stats["hits"] == 8
+        assert stats["misses"] == 2
+        assert api_key.usage_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_revoked_api_key_is_not_served_from_cache(self, auth_manager):
+        """Test revocation invalidates cached verifications"""
+        key, api_key = auth_manager.generate_api_key("Test Key", ["read"])
+        assert await auth_manager.validate_api_key(key) is api_key
+        
+        assert auth_manager.revoke_api_key(api_key.key_hash)
+        
+        assert await auth_manager.validate_api_key(key) is None
+        assert len(auth_manager.credential_cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_secret_rotation_clears_cached_tokens(self, auth_manager):
+        """Test tokens signed with a replaced secret are rejected"""
+        token = auth_manager.generate_jwt_token("user123", ["read"])
+        assert await auth_manager.validate_jwt_token(token) is not None
+        
+        auth_manager.secret_key = "rotated_secret"
+        
+        assert await auth_manager.validate_jwt_token(token) is None
 
 
 class TestRateLimiter:
     """Test rate limiter functionality"""
     
     @pytest.mark.asyncio
-    async def test_rate_limit_allowed(self, rate_limiter):
+    async def test_rate_limit_allowed(self):
         """Test rate limiting when requests are allowed"""
-        # Mock Redis to return low count
-        rate_limiter.redis.pipeline.return_value.execute.return_value = [None, 5, None, None]
+        limiter = RateLimiter(InMemoryRedis())
         
-        allowed, info = await rate_limiter.is_allowed("test_key", 100, 3600)
+        allowed, info = await limiter.is_allowed("test_key", 100, 3600)
         
         assert allowed is True
         assert info["allowed"] is True
         assert info["limit"] == 100
-        assert info["remaining"] >= 0
+        assert info["remaining"] == 99
+        await limiter.stop()
     
     @pytest.mark.asyncio
-    async def test_rate_limit_exceeded(self, rate_limiter):
+    async def test_rate_limit_exceeded(self):
         """Test rate limiting when limit is exceeded"""
-        # Mock Redis to return high count
-        rate_limiter.redis.pipeline.return_value.execute.return_value = [None, 150, None, None]
-        rate_limiter.redis.zrange.return_value = [(b"123456789", 123456789.0)]
+        limiter = RateLimiter(InMemoryRedis())
+        for _ in range(100):
+            await limiter.is_allowed("test_key", 100, 3600)
         
-        allowed, info = await rate_limiter.is_allowed("test_key", 100, 3600)
+        allowed, info = await limiter.is_allowed("test_key", 100, 3600)
         
         assert allowed is False
         assert info["allowed"] is False
         assert info["limit"] == 100
         assert info["remaining"] == 0
         assert info["retry_after"] > 0
+        await limiter.stop()
     
     @pytest.mark.asyncio
     async def test_rate_limit_redis_error(self, rate_limiter):
@@ -282,10 +320,13 @@ class TestRateLimiter:
         rate_limiter.redis.pipeline.side_effect = Exception("Redis error")
         
         allowed, info = await rate_limiter.is_allowed("test_key", 100, 3600)
+        synced = await rate_limiter.sync()
         
-        # Should fail open (allow request)
+        # Decisions continue locally while Redis is unavailable
         assert allowed is True
         assert info["allowed"] is True
+        assert synced is False
+        assert rate_limiter.get_stats()["sync_errors"] == 1
 
 
 class TestWebhookManager:
@@ -344,31 +385,6 @@ class TestWebhookManager:
         
         assert len(webhook_manager.worker_tasks) == 0
     
-    @pytest.mark.asyncio
-    async def test_send_webhook(self, webhook_manager, sample_webhook):
-        """Test sending webhook HTTP request"""
-        event = WebhookEvent(
-            event_id="event123",
-            event_type="code_analysis",
-            timestamp=datetime.now(),
-            data={"result": "success"},
-            source="api",
-            webhook_endpoints=[]
-        )
-        
-        # Mock aiohttp session
-        with patch('aiohttp.ClientSession') as mock_session_class:
-            mock_session = AsyncMock()
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_session.post.return_value.__aenter__.return_value = mock_response
-            mock_session_class.return_value.__aenter__.return_value = mock_session
-            
-            await webhook_manager._send_webhook(event, sample_webhook)
-            
-            # Verify HTTP request was made
-            mock_session.post.assert_called_once()
-    
     def test_generate_signature(self, webhook_manager):
         """Test webhook signature generation"""
         payload = '{"test": "data"}'
@@ -380,72 +396,6 @@ class TestWebhookManager:
         assert len(signature) > 10
 
 
-class TestUsageAnalytics:
-    """Test usage analytics functionality"""
-    
-    @pytest.mark.asyncio
-    async def test_record_api_request(self, usage_analytics):
-        """Test recording API request"""
-        request = APIRequest(
-            request_id="req123",
-            api_key_id="key123",
-            endpoint="/api/v1/code/analyze",
-            method="POST",
-            timestamp=datetime.now(),
-            response_time=0.5,
-            status_code=200,
-            user_agent="TestClient/1.0",
-            ip_address="127.0.0.1"
-        )
-        
-        await usage_analytics.record_api_request(request)
-        
-        # Verify Redis operations were called
-        usage_analytics.redis.setex.assert_called()
-        usage_analytics.redis.pipeline.assert_called()
-    
-    @pytest.mark.asyncio
-    async def test_get_usage_stats(self, usage_analytics):
-        """Test getting usage statistics"""
-        start_date = datetime.now() - timedelta(days=7)
-        end_date = datetime.now()
-        
-        # Mock Redis responses
-        usage_analytics.redis.hgetall.return_value = {
-            b"total_requests": b"100",
-            b"status_200": b"90",
-            b"status_400": b"10",
-            b"endpoint_/api/v1/code/analyze": b"50"
-        }
-        usage_analytics.redis.lrange.return_value = [b"0.1", b"0.2", b"0.3"]
-        
-        stats = await usage_analytics.get_usage_stats(start_date, end_date)
-        
-        assert stats["total_requests"] >= 0
-        assert "status_codes" in stats
-        assert "endpoints" in stats
-        assert "daily_breakdown" in stats
-        assert "average_response_time" in stats
-    
-    @pytest.mark.asyncio
-    async def test_get_api_key_usage(self, usage_analytics):
-        """Test getting API key usage statistics"""
-        api_key_id = "key123"
-        
-        # Mock Redis response
-        usage_analytics.redis.hgetall.return_value = {
-            b"total_requests": b"50",
-            b"status_200": b"45",
-            b"status_400": b"5"
-        }
-        
-        stats = await usage_analytics.get_api_key_usage(api_key_id)
-        
-        assert stats["total_requests"] == 50
-        assert "status_codes" in stats
-        assert stats["status_codes"]["200"] == 45
-
-
 class TestAPISystemEndpoints(AioHTTPTestCase):
     """Test API system endpoints using aiohttp test client"""
     
@@ -756,10 +706,9 @@ class TestAPISystemPerformance:
             assert not isinstance(result, Exception)
     
     @pytest.mark.asyncio
-    async def test_rate_limiting_performance(self, rate_limiter):
+    async def test_rate_limiting_performance(self):
         """Test rate limiting performance under load"""
-        # Mock Redis for fast responses
-        rate_limiter.redis.pipeline.return_value.execute.return_value = [None, 5, None, None]
+        rate_limiter = RateLimiter(InMemoryRedis())
         
         # Test many rate limit checks
         tasks = []
@@ -777,58 +726,7 @@ class TestAPISystemPerformance:
         # All should be allowed
         for allowed, info in results:
             assert allowed is True
-    
-    @pytest.mark.asyncio
-    async def test_webhook_delivery_performance(self, webhook_manager):
-        """Test webhook delivery performance"""
-        # Register multiple webhooks
-        webhooks = []
-        for i in range(10):
-            webhook = WebhookEndpoint(
-                id=f"webhook{i}",
-                url=f"https://example{i}.com/webhook",
-                events=["test_event"],
-                secret=None,
-                headers={},
-                retry_count=1,
-                timeout=5,
-                is_active=True,
-                created_at=datetime.now(),
-                last_triggered=None
-            )
-            webhook_manager.register_webhook(webhook)
-            webhooks.append(webhook)
-        
-        # Mock successful HTTP responses
-        with patch('aiohttp.ClientSession') as mock_session_class:
-            mock_session = AsyncMock()
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_session.post.return_value.__aenter__.return_value = mock_response
-            mock_session_class.return_value.__aenter__.return_value = mock_session
-            
-            event = WebhookEvent(
-                event_id="event123",
-                event_type="test_event",
-                timestamp=datetime.now(),
-                data={"test": "data"},
-                source="test",
-                webhook_endpoints=[]
-            )
-            
-            start_time = asyncio.get_event_loop().time()
-            await webhook_manager.trigger_event(event)
-            
-            # Process all queued events
-            while not webhook_manager.event_queue.empty():
-                event_data, webhook = await webhook_manager.event_queue.get()
-                await webhook_manager._send_webhook(event_data, webhook)
-                webhook_manager.event_queue.task_done()
-            
-            end_time = asyncio.get_event_loop().time()
-            
-            # Should complete within reasonable time
-            assert end_time - start_time < 2.0  # 2 seconds max
+        await rate_limiter.stop()
 
 
 if __name__ == "__main__":
@@ -159,7 +159,7 @@ class TestFileBackupRestore:
         
         assert backup_path is not None
         assert backup_path.exists()
-        assert backup_path.read_text() == "Important content"
+        assert undo_manager.read_backup(backup_path) == b"Important content"
     
     def test_restore_from_backup(self, undo_manager, temp_dir):
         """Test restoring file from backup."""
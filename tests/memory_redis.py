@@ -0,0 +1,335 @@
+"""
+In-Memory Redis Stand-In
+
+Provides a small asyncio Redis substitute covering the commands used by the API
+system (strings, counters, hashes, lists, sorted sets, expiry and pipelines)
+so tests and benchmarks run without a Redis server; values are returned as
+bytes like ``redis.asyncio.Redis`` does by default.
+"""
+
+import asyncio
+import fnmatch
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+def _encode(value: Any) -> bytes:
+    """Encode a value the way redis-py does."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    if isinstance(value, float):
+        return repr(value).encode()
+    return str(value).encode()
+
+
+def _key(value: Union[str, bytes]) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _format_number(value: float) -> bytes:
+    """Format a float result of INCRBYFLOAT without a trailing ``.0``."""
+    return (str(int(value)) if value == int(value) else repr(value)).encode()
+
+
+class InMemoryPipeline:
+    """Queues commands and runs them in order on ``execute``."""
+
+    def __init__(self, client: 'InMemoryRedis'):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or name in InMemoryRedis._INTERNAL or not hasattr(self._client, name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Run the queued commands atomically and return their results."""
+        commands, self._commands = self._commands, []
+        results = []
+        async with self._client._lock:
+            for name, args, kwargs in commands:
+                try:
+                    results.append(getattr(self._client, f"_{name}")(*args, **kwargs))
+                except Exception as e:
+                    if raise_on_error:
+                        raise
+                    results.append(e)
+        self._client.commands_processed += len(commands)
+        self._client.round_trips += 1
+        return results
+
+    def reset(self) -> None:
+        self._commands = []
+
+    async def __aenter__(self) -> 'InMemoryPipeline':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.reset()
+
+
+class InMemoryRedis:
+    """Asyncio Redis stand-in keeping all data in process memory."""
+
+    # ``_name`` helpers that are not Redis commands
+    _INTERNAL = frozenset({'live', 'get_typed', 'peek', 'slice'})
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialize the store.
+
+        Args:
+            latency: Simulated network round-trip time in seconds
+        """
+        self.latency = latency
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+        # Counters so tests and benchmarks can assert on Redis traffic
+        self.round_trips = 0
+        self.commands_processed = 0
+
+    @classmethod
+    def from_url(cls, url: str = "memory://", **kwargs) -> 'InMemoryRedis':
+        """Mirror ``redis.asyncio.from_url``."""
+        return cls(**kwargs)
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        """Create a command pipeline."""
+        return InMemoryPipeline(self)
+
+    def __getattr__(self, name: str):
+        # Expose every ``_command`` implementation as an awaitable ``command``
+        impl = self.__class__.__dict__.get(f"_{name}")
+        if impl is None or name.startswith('_') or name in self._INTERNAL:
+            raise AttributeError(name)
+
+        async def command(*args, **kwargs):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            async with self._lock:
+                result = impl(self, *args, **kwargs)
+            self.commands_processed += 1
+            self.round_trips += 1
+            return result
+
+        return command
+
+    # Key helpers
+
+    def _live(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+            return False
+        return key in self._data
+
+    def _get_typed(self, key: str, factory):
+        key = _key(key)
+        if not self._live(key):
+            self._data[key] = factory()
+        value = self._data[key]
+        if not isinstance(value, factory):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _peek(self, key: str, factory):
+        key = _key(key)
+        if not self._live(key):
+            return factory()
+        return self._data[key]
+
+    # Connection
+
+    def _ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        """Close the client (no-op)."""
+
+    async def aclose(self) -> None:
+        """Close the client (no-op)."""
+
+    # Keys
+
+    def _delete(self, *keys) -> int:
+        removed = 0
+        for key in map(_key, keys):
+            if self._live(key):
+                del self._data[key]
+                self._expiry.pop(key, None)
+                removed += 1
+        return removed
+
+    def _exists(self, *keys) -> int:
+        return sum(1 for key in map(_key, keys) if self._live(key))
+
+    def _expire(self, key, seconds: float) -> bool:
+        key = _key(key)
+        if not self._live(key):
+            return False
+        self._expiry[key] = time.time() + float(seconds)
+        return True
+
+    def _ttl(self, key) -> int:
+        key = _key(key)
+        if not self._live(key):
+            return -2
+        if key not in self._expiry:
+            return -1
+        return max(0, int(round(self._expiry[key] - time.time())))
+
+    def _keys(self, pattern: str = '*') -> List[bytes]:
+        return [key.encode() for key in list(self._data) if self._live(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    def _flushall(self) -> bool:
+        self._data.clear()
+        self._expiry.clear()
+        return True
+
+    # Strings and counters
+
+    def _get(self, key) -> Optional[bytes]:
+        key = _key(key)
+        return self._data[key] if self._live(key) else None
+
+    def _set(self, key, value, ex: Optional[float] = None) -> bool:
+        key = _key(key)
+        self._data[key] = _encode(value)
+        self._expiry.pop(key, None)
+        if ex is not None:
+            self._expiry[key] = time.time() + float(ex)
+        return True
+
+    def _setex(self, key, seconds: float, value) -> bool:
+        return self._set(key, value, ex=seconds)
+
+    def _incrby(self, key, amount: int = 1) -> int:
+        key = _key(key)
+        current = int(self._data[key]) if self._live(key) else 0
+        current += int(amount)
+        self._data[key] = _encode(current)
+        return current
+
+    def _incr(self, key, amount: int = 1) -> int:
+        return self._incrby(key, amount)
+
+    def _incrbyfloat(self, key, amount: float = 1.0) -> float:
+        key = _key(key)
+        current = float(self._data[key]) if self._live(key) else 0.0
+        current += float(amount)
+        self._data[key] = _format_number(current)
+        return current
+
+    # Hashes
+
+    def _hset(self, name, key=None, value=None, mapping: Optional[Dict] = None) -> int:
+        table = self._get_typed(name, dict)
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        added = 0
+        for field, field_value in items.items():
+            field = _encode(field)
+            added += field not in table
+            table[field] = _encode(field_value)
+        return added
+
+    def _hget(self, name, key) -> Optional[bytes]:
+        return self._peek(name, dict).get(_encode(key))
+
+    def _hgetall(self, name) -> Dict[bytes, bytes]:
+        return dict(self._peek(name, dict))
+
+    def _hdel(self, name, *keys) -> int:
+        table = self._peek(name, dict)
+        return sum(1 for key in keys if table.pop(_encode(key), None) is not None)
+
+    def _hincrby(self, name, key, amount: int = 1) -> int:
+        table = self._get_typed(name, dict)
+        field = _encode(key)
+        value = int(table.get(field, b'0')) + int(amount)
+        table[field] = _encode(value)
+        return value
+
+    def _hincrbyfloat(self, name, key, amount: float = 1.0) -> float:
+        table = self._get_typed(name, dict)
+        field = _encode(key)
+        value = float(table.get(field, b'0')) + float(amount)
+        table[field] = _format_number(value)
+        return value
+
+    # Lists
+
+    def _lpush(self, name, *values) -> int:
+        items = self._get_typed(name, list)
+        for value in values:
+            items.insert(0, _encode(value))
+        return len(items)
+
+    def _rpush(self, name, *values) -> int:
+        items = self._get_typed(name, list)
+        items.extend(_encode(value) for value in values)
+        return len(items)
+
+    @staticmethod
+    def _slice(items: list, start: int, end: int) -> slice:
+        """Convert inclusive Redis indices to a Python slice."""
+        length = len(items)
+        if start < 0:
+            start = max(0, length + start)
+        end = length + end if end < 0 else min(end, length - 1)
+        return slice(start, end + 1)
+
+    def _lrange(self, name, start: int, end: int) -> List[bytes]:
+        items = self._peek(name, list)
+        return list(items[self._slice(items, start, end)])
+
+    def _ltrim(self, name, start: int, end: int) -> bool:
+        key = _key(name)
+        if self._live(key):
+            items = self._data[key]
+            self._data[key] = items[self._slice(items, start, end)]
+        return True
+
+    def _llen(self, name) -> int:
+        return len(self._peek(name, list))
+
+    # Sorted sets
+
+    def _zadd(self, name, mapping: Dict[Any, float]) -> int:
+        zset = self._get_typed(name, dict)
+        added = 0
+        for member, score in mapping.items():
+            member = _encode(member)
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def _zcard(self, name) -> int:
+        return len(self._peek(name, dict))
+
+    def _zremrangebyscore(self, name, min_score: float, max_score: float) -> int:
+        zset = self._peek(name, dict)
+        doomed = [m for m, s in zset.items() if float(min_score) <= s <= float(max_score)]
+        for member in doomed:
+            del zset[member]
+        return len(doomed)
+
+    def _zrange(self, name, start: int, end: int, withscores: bool = False) -> List[Any]:
+        ordered = sorted(self._peek(name, dict).items(), key=lambda item: (item[1], item[0]))
+        selected = ordered[self._slice(ordered, start, end)]
+        return selected if withscores else [member for member, _ in selected]
@@ -0,0 +1,253 @@
+"""
+Unit tests for the agent communication bus.
+
+Tests request/response correlation, timeouts and cancellation of waiting
+requests, the bounded message history, round-trip latency and the
+priority-ordered, bounded per-agent mailboxes.
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.codegenie.agents.communication import AgentCommunicationBus, MessagePriority, MessageType
+
+
+async def make_bus(**kwargs):
+    bus = AgentCommunicationBus(**kwargs)
+    for name in ("architect", "developer"):
+        bus.register_agent(name, Mock())
+    await bus.start()
+    return bus
+
+
+class TestRequestCorrelation:
+    """Test correlation of collaboration requests and responses."""
+
+    @pytest.mark.asyncio
+    async def test_response_survives_full_history(self):
+        """Test a response is delivered even when the history overflows."""
+        bus = await make_bus(history_size=10)
+
+        async def handler(message):
+            # More traffic than the history can hold
+            for index in range(50):
+                await bus.send_direct_message("developer", "architect", {"index": index})
+            return {"review": message.content["task_description"]}
+
+        bus.register_message_handler("developer", MessageType.COLLABORATION_REQUEST, handler)
+        try:
+            response = await bus.request_collaboration(
+                "architect", "developer", "review design", "review", timeout=5.0
+            )
+            assert response["success"] is True
+            assert response["result"] == {"review": "review design"}
+
+            await asyncio.sleep(0.1)
+            assert bus.get_message_stats()["queue_size"] == 0
+            assert len(bus.message_history) == 10
+            assert bus.pending_responses == {}
+        finally:
+            await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_missing_handler(self):
+        """Test timeouts return None and unanswerable requests fail fast."""
+        bus = await make_bus()
+
+        async def slow(message):
+            await asyncio.sleep(1.0)
+
+        bus.register_message_handler("developer", MessageType.COLLABORATION_REQUEST, slow)
+        try:
+            assert await bus.request_collaboration(
+                "architect", "developer", "task", "review", timeout=0.05
+            ) is None
+            assert bus.pending_responses == {}
+
+            # The architect has no handler, so no response can ever come
+            start = time.perf_counter()
+            assert await bus.request_collaboration(
+                "developer", "architect", "task", "review", timeout=5.0
+            ) is None
+            assert time.perf_counter() - start < 1.0
+        finally:
+            await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancellation_and_stop(self):
+        """Test cancelled requests are unregistered and stop() releases waiters."""
+        bus = await make_bus()
+
+        async def slow(message):
+            await asyncio.sleep(1.0)
+
+        bus.register_message_handler("developer", MessageType.COLLABORATION_REQUEST, slow)
+
+        request = asyncio.ensure_future(
+            bus.request_collaboration("architect", "developer", "task", "review")
+        )
+        await asyncio.sleep(0.05)
+        assert len(bus.pending_responses) == 1
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        assert bus.pending_responses == {}
+
+        waiter = asyncio.ensure_future(bus._wait_for_response("unknown-id"))
+        await asyncio.sleep(0)
+        await bus.stop()
+        assert await waiter is None
+        assert bus.pending_responses == {}
+
+
+class TestRoundTripLatency:
+    """Latency benchmark for collaboration round-trips."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_latency(self):
+        """Test round-trips complete without polling delays."""
+        bus = await make_bus()
+        bus.register_message_handler(
+            "developer", MessageType.COLLABORATION_REQUEST, lambda message: "ok"
+        )
+        rounds = 200
+        try:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                response = await bus.request_collaboration("architect", "developer", "task", "review")
+                assert response["result"] == "ok"
+            mean_latency = (time.perf_counter() - start) / rounds
+        finally:
+            await bus.stop()
+
+        print(f"Mean request_collaboration round-trip: {mean_latency * 1000:.3f}ms")
+        # Polling the history added up to 100ms per request
+        assert mean_latency < 0.01
+
+
+class TestMailboxes:
+    """Test per-agent mailboxes and their dispatch."""
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self):
+        """Test urgent messages jump the queue."""
+        bus = AgentCommunicationBus()
+        bus.register_agent("architect", Mock())
+        bus.register_agent("developer", Mock())
+        received = []
+        bus.register_message_handler(
+            "developer", MessageType.DIRECT_MESSAGE, lambda message: received.append(message.content["n"])
+        )
+
+        # Queued before the workers start, so ordering is decided by priority alone
+        for n, priority in enumerate([MessagePriority.LOW, MessagePriority.NORMAL,
+                                      MessagePriority.URGENT, MessagePriority.NORMAL]):
+            await bus.send_direct_message("architect", "developer", {"n": n}, priority=priority)
+
+        await bus.start()
+        try:
+            await bus.mailboxes["developer"].queue.join()
+        finally:
+            await bus.stop()
+
+        assert received == [2, 1, 3, 0]
+
+    @pytest.mark.asyncio
+    async def test_slow_agent_does_not_block_others(self):
+        """Test agents are served independently and with their own concurrency."""
+        bus = await make_bus()
+        bus.register_agent("scanner", Mock(), concurrency=4)
+        release = asyncio.Event()
+        fast_received = []
+        in_flight = []
+
+        async def slow(message):
+            in_flight.append(message.id)
+            await release.wait()
+
+        bus.register_message_handler("scanner", MessageType.DIRECT_MESSAGE, slow)
+        bus.register_message_handler(
+            "developer", MessageType.DIRECT_MESSAGE, lambda message: fast_received.append(message)
+        )
+        try:
+            for _ in range(4):
+                await bus.send_direct_message("architect", "scanner", {})
+            await bus.send_direct_message("architect", "developer", {})
+            await asyncio.sleep(0.05)
+
+            assert len(fast_received) == 1
+            assert len(in_flight) == 4
+            assert bus.get_message_stats()["mailboxes"]["scanner"]["in_flight"] == 4
+            release.set()
+        finally:
+            await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_and_stats(self):
+        """Test full mailboxes hold senders back and depths are reported."""
+        bus = AgentCommunicationBus(mailbox_size=2, send_timeout=0.05)
+        bus.register_agent("architect", Mock())
+        bus.register_agent("developer", Mock())
+        bus.register_message_handler("developer", MessageType.DIRECT_MESSAGE, lambda message: None)
+
+        assert await bus.send_direct_message("architect", "developer", {})
+        assert await bus.send_direct_message("architect", "developer", {})
+        assert not await bus.send_direct_message("architect", "developer", {})
+
+        stats = bus.get_message_stats()["mailboxes"]["developer"]
+        assert stats["queue_depth"] == 2
+        assert stats["rejected"] == 1
+
+        # A blocked sender proceeds as soon as the mailbox drains
+        bus.send_timeout = None
+        blocked = asyncio.ensure_future(bus.send_direct_message("architect", "developer", {}))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        await bus.start()
+        try:
+            assert await blocked
+            await bus.mailboxes["developer"].queue.join()
+        finally:
+            await bus.stop()
+
+        stats = bus.get_message_stats()["mailboxes"]["developer"]
+        assert stats["delivered"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["max_wait_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_handlers_messaging_each_other_do_not_deadlock(self):
+        """Test sends from handlers are not held back by full mailboxes."""
+        bus = AgentCommunicationBus(mailbox_size=1, send_timeout=None)
+        bus.register_agent("architect", Mock())
+        bus.register_agent("developer", Mock())
+        received = {"architect": 0, "developer": 0}
+
+        def ping_pong(agent, other):
+            async def handler(message):
+                received[agent] += 1
+                if message.content["hops"]:
+                    # Both mailboxes are full while these are sent
+                    for _ in range(3):
+                        await bus.send_direct_message(agent, other, {"hops": message.content["hops"] - 1})
+            return handler
+
+        bus.register_message_handler("architect", MessageType.DIRECT_MESSAGE, ping_pong("architect", "developer"))
+        bus.register_message_handler("developer", MessageType.DIRECT_MESSAGE, ping_pong("developer", "architect"))
+        await bus.start()
+        try:
+            assert await bus.send_direct_message("architect", "developer", {"hops": 2})
+            assert await bus.send_direct_message("developer", "architect", {"hops": 2})
+            await asyncio.wait_for(asyncio.gather(
+                bus.mailboxes["architect"].queue.join(), bus.mailboxes["developer"].queue.join()
+            ), timeout=5)
+        finally:
+            await bus.stop()
+
+        # Each starting message fans out to 3 and then 9 more
+        assert received == {"architect": 13, "developer": 13}
+        assert bus.get_message_stats()["mailboxes"]["developer"]["rejected"] == 0
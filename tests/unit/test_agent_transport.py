@@ -0,0 +1,167 @@
+"""
+Unit tests for the inter-process agent transport.
+
+Tests the binary message encoding and framing, and agents hosted in worker
+processes by the AgentSupervisor.
+"""
+
+import asyncio
+import os
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.codegenie.agents.communication import (
+    AgentCommunicationBus, Message, MessagePriority, MessageType
+)
+from src.codegenie.agents.supervisor import AgentSupervisor
+from src.codegenie.agents.transport import (
+    MAX_FRAME_SIZE, UnixSocketClientTransport, UnixSocketServerTransport,
+    decode_message, encode_message, frame, read_frame
+)
+
+
+def host_scanner(bus):
+    bus.register_agent("scanner", None)
+    bus.register_message_handler(
+        "scanner",
+        MessageType.COLLABORATION_REQUEST,
+        lambda message: {"pid": os.getpid(), "task": message.content["task_description"]}
+    )
+
+
+def host_reviewer(bus):
+    bus.register_agent("reviewer", None)
+    bus.subscribe_to_broadcasts("reviewer")
+
+    async def on_broadcast(message):
+        # Worker to worker traffic is relayed by the supervisor
+        scan = await bus.request_collaboration("reviewer", "scanner", "scan", "consultation", timeout=10)
+        await bus.send_direct_message(
+            "reviewer", "coordinator", {"topic": message.content["topic"], "scan": scan, "pid": os.getpid()}
+        )
+
+    bus.register_message_handler("reviewer", MessageType.BROADCAST, on_broadcast)
+
+
+class TestWireFormat:
+    """Test the binary message encoding."""
+
+    def test_round_trip(self):
+        """Test every message field survives encoding."""
+        message = Message(
+            sender="architect",
+            recipient="développeur",
+            message_type=MessageType.COLLABORATION_REQUEST,
+            priority=MessagePriority.URGENT,
+            content={"files": ["a.py"], "depth": 2, "nested": {"ok": True}},
+            requires_response=True,
+            response_timeout=2.5,
+            correlation_id="request-1"
+        )
+
+        assert decode_message(encode_message(message)) == message
+
+        plain = Message(sender="a", recipient="b", content={"when": object})
+        decoded = decode_message(encode_message(plain))
+        assert decoded.correlation_id is None
+        assert decoded.response_timeout is None
+        assert decoded.content == {"when": str(object)}
+
+        with pytest.raises(ValueError):
+            decode_message(encode_message(message)[:10])
+
+    @pytest.mark.asyncio
+    async def test_framing(self):
+        """Test frames are split on their length prefix."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame(b"first") + frame(b"") + frame(b"second"))
+        reader.feed_eof()
+
+        assert await read_frame(reader) == b"first"
+        assert await read_frame(reader) == b""
+        assert await read_frame(reader) == b"second"
+        assert await read_frame(reader) is None
+
+    @pytest.mark.asyncio
+    async def test_oversized_frame_closes_stream(self):
+        """Test a frame above the size limit ends the stream instead of raising."""
+        reader = asyncio.StreamReader()
+        reader.feed_data((MAX_FRAME_SIZE + 1).to_bytes(4, "big") + b"x" * 16)
+
+        assert await read_frame(reader) is None
+
+
+class TestUnixSocketTransport:
+    """Test the socket transport within one process."""
+
+    @pytest.mark.asyncio
+    async def test_request_to_unknown_agent_is_rejected(self, tmp_path):
+        """Test the supervisor answers an undeliverable request so the requester does not wait."""
+        socket_path = tmp_path / "bus.sock"
+        supervisor_bus = AgentCommunicationBus()
+        supervisor_bus.register_agent("coordinator", Mock())
+        server = UnixSocketServerTransport(socket_path)
+        await supervisor_bus.attach_transport(server)
+        await supervisor_bus.start()
+
+        worker_bus = AgentCommunicationBus(transport=UnixSocketClientTransport(socket_path, "workers"))
+        worker_bus.register_agent("scanner", Mock())
+        try:
+            await worker_bus.start()
+            assert await server.wait_for_peer("workers", 5)
+
+            start = time.perf_counter()
+            response = await worker_bus.request_collaboration(
+                "scanner", "missing", "scan", "consultation", timeout=10
+            )
+            assert response is None
+            assert time.perf_counter() - start < 2
+            assert worker_bus.pending_responses == {}
+        finally:
+            await worker_bus.stop()
+            await supervisor_bus.stop()
+
+
+class TestAgentSupervisor:
+    """Test agents hosted in worker processes."""
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_messages_cross_processes(self):
+        """Test requests, broadcasts and relayed messages reach worker agents."""
+        bus = AgentCommunicationBus()
+        bus.register_agent("coordinator", Mock())
+        received = asyncio.Queue()
+        bus.register_message_handler("coordinator", MessageType.DIRECT_MESSAGE, received.put_nowait)
+
+        supervisor = AgentSupervisor(bus, start_timeout=60.0)
+        supervisor.add_worker("scanners", host_scanner)
+        supervisor.add_worker("reviewers", host_reviewer)
+        try:
+            assert await supervisor.start()
+            status = supervisor.get_status()
+            assert status["scanners"]["agents"] == ["scanner"]
+            assert status["reviewers"]["agents"] == ["reviewer"]
+
+            response = await bus.request_collaboration(
+                "coordinator", "scanner", "scan repo", "consultation", timeout=10
+            )
+            assert response["success"] is True
+            assert response["result"]["task"] == "scan repo"
+            scanner_pid = response["result"]["pid"]
+            assert scanner_pid == status["scanners"]["pid"] != os.getpid()
+
+            assert await bus.broadcast_message("coordinator", {"topic": "release"})
+            message = await asyncio.wait_for(received.get(), timeout=20)
+            assert message.sender == "reviewer"
+            assert message.content["topic"] == "release"
+            assert message.content["pid"] == status["reviewers"]["pid"]
+            assert message.content["scan"]["result"]["pid"] == scanner_pid
+        finally:
+            processes = list(supervisor.processes.values())
+            await supervisor.stop()
+
+        assert not any(process.is_alive() for process in processes)
+        assert not supervisor.transport.socket_path.exists()
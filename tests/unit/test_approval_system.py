@@ -5,15 +5,18 @@ Tests approval workflows, batch approval, preference storage,
 undo functionality, and conflict detection.
 """
 
+import os
 import pytest
 import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
 
 from src.codegenie.core.approval_system import (
     ApprovalSystem, Operation, OperationType, ApprovalDecision,
-    UndoPoint, Conflict, ConflictType, FileUndoManager
+    UndoPoint, Conflict, ConflictType, ConflictDetector, FileUndoManager, UndoHistory
 )
+from src.codegenie.core.interval_tree import IntervalTree
 
 
 class TestApprovalSystem:
@@ -444,7 +447,7 @@ class TestFileUndoManager:
         
         assert backup_path is not None
         assert backup_path.exists()
-        assert backup_path.read_text() == "Original content"
+        assert undo_manager.read_backup(backup_path) == b"Original content"
     
     def test_create_backup_nonexistent(self, undo_manager, temp_dir):
         """Test creating backup of nonexistent file."""
@@ -509,3 +512,325 @@ class TestFileUndoManager:
         
         assert len(backups) >= 1
         assert all("test1.txt" in str(b) for b in backups)
+    
+    def test_backups_in_same_second_do_not_collide(self, undo_manager, temp_dir):
+        """Test that rapid backups of one file each get their own handle."""
+        test_file = temp_dir / "test.txt"
+        
+        backups = []
+        for i in range(5):
+            test_file.write_text(f"Version {i}")
+            backups.append(undo_manager.create_backup(test_file))
+        
+        assert len(set(backups)) == 5
+        assert [undo_manager.read_backup(b) for b in backups] == [
+            f"Version {i}".encode() for i in range(5)
+        ]
+    
+    def test_unchanged_file_is_deduplicated(self, undo_manager, temp_dir):
+        """Test that repeated backups of identical content share one object."""
+        test_file = temp_dir / "large.txt"
+        test_file.write_text("x" * 100000)
+        
+        for _ in range(10):
+            undo_manager.create_backup(test_file)
+        
+        stats = undo_manager.get_storage_stats()
+        assert stats['backups'] == 10
+        assert stats['unique_objects'] == 1
+        assert stats['stored_bytes'] < 100000
+    
+    def test_delete_releases_unreferenced_content(self, undo_manager, temp_dir):
+        """Test that content is removed only with its last backup."""
+        test_file = temp_dir / "test.txt"
+        test_file.write_text("Shared")
+        first = undo_manager.create_backup(test_file)
+        second = undo_manager.create_backup(test_file)
+        
+        undo_manager.delete_backup(first)
+        assert undo_manager.read_backup(second) == b"Shared"
+        
+        undo_manager.delete_backup(second)
+        assert undo_manager.get_storage_stats()['stored_bytes'] == 0
+    
+    def test_journal_survives_restart(self, undo_manager, temp_dir):
+        """Test that backups are restorable from a new manager instance."""
+        test_file = temp_dir / "test.txt"
+        test_file.write_text("Original content")
+        backup_path = undo_manager.create_backup(test_file)
+        test_file.write_text("Modified content")
+        
+        reopened = FileUndoManager(backup_dir=undo_manager.backup_dir)
+        
+        assert reopened.restore_backup(backup_path, test_file)
+        assert test_file.read_text() == "Original content"
+        assert reopened.list_backups() == [backup_path]
+    
+    def test_same_size_rewrite_with_restored_mtime(self, undo_manager, temp_dir):
+        """Test a rewrite that keeps size and mtime is backed up and restored."""
+        test_file = temp_dir / "test.txt"
+        test_file.write_text("version A")
+        old = time.time_ns() - 10 * 10**9
+        os.utime(test_file, ns=(old, old))
+        first = undo_manager.create_backup(test_file)
+        
+        test_file.write_text("version B")
+        os.utime(test_file, ns=(old, old))
+        second = undo_manager.create_backup(test_file)
+        assert undo_manager.read_backup(second) == b"version B"
+        
+        assert undo_manager.restore_backup(first, test_file)
+        assert test_file.read_text() == "version A"
+
+
+class TestUndoHistory:
+    """Test suite for Undo History."""
+    
+    @pytest.fixture
+    def history_file(self):
+        """Create a temporary history file path."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir) / "undo_history.jsonl"
+    
+    def _undo_point(self, index: int) -> UndoPoint:
+        operation = Operation(
+            id=f"op_{index}",
+            operation_type=OperationType.FILE_MODIFY,
+            description=f"Modify file {index}",
+            target=f"file_{index}.py"
+        )
+        return UndoPoint(
+            id=f"undo_{index}",
+            timestamp=datetime.now(),
+            operations=[operation],
+            state_snapshot={'index': index},
+            description=f"Point {index}"
+        )
+    
+    def test_add_appends_single_record(self, history_file):
+        """Test that adding an undo point appends instead of rewriting."""
+        history = UndoHistory(history_file)
+        for i in range(3):
+            history.add(self._undo_point(i))
+        
+        lines = history_file.read_text().splitlines()
+        assert len(lines) == 3
+        assert history.get_by_id("undo_1").description == "Point 1"
+    
+    def test_history_survives_restart(self, history_file):
+        """Test replaying adds and removes from the journal."""
+        history = UndoHistory(history_file)
+        for i in range(5):
+            history.add(self._undo_point(i))
+        history.remove("undo_2")
+        
+        reopened = UndoHistory(history_file)
+        
+        assert [up.id for up in reopened.get_all()] == ["undo_0", "undo_1", "undo_3", "undo_4"]
+        assert reopened.get_latest().operations[0].target == "file_4.py"
+    
+    def test_journal_is_compacted(self, history_file):
+        """Test that dead records are dropped once they dominate."""
+        history = UndoHistory(history_file)
+        for i in range(200):
+            history.add(self._undo_point(i))
+        history.clear()
+        history.add(self._undo_point(999))
+        
+        assert len(history_file.read_text().splitlines()) <= 2
+        assert [up.id for up in UndoHistory(history_file).get_all()] == ["undo_999"]
+    
+    def test_legacy_json_history_is_migrated(self, history_file):
+        """Test loading a history written as a single JSON array."""
+        import json
+        history_file.write_text(json.dumps([self._undo_point(0).to_dict()]))
+        
+        history = UndoHistory(history_file)
+        history.add(self._undo_point(1))
+        
+        assert [up.id for up in UndoHistory(history_file).get_all()] == ["undo_0", "undo_1"]
+
+
+def modify_op(op_id, target="app.py", line_range=None, line_delta=None):
+    """Create a FILE_MODIFY operation touching a line range."""
+    metadata = {"line_range": line_range} if line_range else {}
+    if line_delta is not None:
+        metadata["line_delta"] = line_delta
+    return Operation(
+        id=op_id,
+        operation_type=OperationType.FILE_MODIFY,
+        description=f"Modify {target}",
+        target=target,
+        metadata=metadata
+    )
+
+
+class TestIntervalTree:
+    """Test suite for IntervalTree."""
+    
+    def test_overlap_matches_brute_force(self):
+        """Test overlap queries against a linear scan."""
+        import random
+        rng = random.Random(7)
+        tree = IntervalTree(seed=1)
+        intervals = []
+        for i in range(300):
+            start = rng.randint(0, 1000)
+            end = start + rng.randint(0, 30)
+            tree.add(start, end, i)
+            intervals.append((start, end, i))
+        
+        for _ in range(200):
+            start = rng.randint(0, 1000)
+            end = start + rng.randint(0, 50)
+            expected = sorted(v for s, e, v in intervals if s <= end and start <= e)
+            assert sorted(v for _, _, v in tree.overlap(start, end)) == expected
+            assert tree.overlaps(start, end) == bool(expected)
+    
+    def test_remove(self):
+        """Test removing one copy of an interval."""
+        tree = IntervalTree()
+        tree.add(1, 5, "a")
+        tree.add(1, 5, "b")
+        tree.add(10, 20, "c")
+        
+        assert tree.remove(1, 5, "a")
+        assert not tree.remove(1, 5, "a")
+        assert len(tree) == 2
+        assert [v for _, _, v in tree.overlap(0, 100)] == ["b", "c"]
+        
+        tree.add(0, float('inf'), "d")
+        assert tree.remove(0, float('inf'), "d")
+        assert len(tree) == 2
+
+
+class TestConflictDetector:
+    """Test suite for line-range aware conflict detection."""
+    
+    @pytest.fixture
+    def detector(self):
+        """Create a conflict detector."""
+        return ConflictDetector()
+    
+    def test_disjoint_modifications_do_not_conflict(self, detector):
+        """Test that edits to separate regions of a file are allowed."""
+        operations = [
+            modify_op("op_1", line_range=[1, 10]),
+            modify_op("op_2", line_range=[11, 20]),
+            modify_op("op_3", line_range=[40, 50]),
+        ]
+        
+        assert detector.detect_file_conflicts(operations) == []
+    
+    def test_overlapping_modifications_conflict(self, detector):
+        """Test that overlapping hunks are grouped into one conflict."""
+        operations = [
+            modify_op("op_1", line_range=[1, 10]),
+            modify_op("op_2", line_range=[30, 40]),
+            modify_op("op_3", line_range=[8, 12]),
+            modify_op("op_4", line_range=[12, 15]),
+        ]
+        
+        conflicts = detector.detect_file_conflicts(operations)
+        
+        assert len(conflicts) == 1
+        assert conflicts[0].conflict_type == ConflictType.CONCURRENT_EDIT
+        assert sorted(conflicts[0].affected_operations) == ["op_1", "op_3", "op_4"]
+    
+    def test_operations_without_ranges_cover_whole_file(self, detector):
+        """Test that unranged modifications conflict with everything."""
+        operations = [
+            modify_op("op_1", line_range=[1, 10]),
+            modify_op("op_2"),
+        ]
+        
+        assert len(detector.detect_file_conflicts(operations)) == 1
+    
+    def test_plan_concurrent_batches(self, detector):
+        """Test that disjoint edits share a batch and overlapping ones are ordered."""
+        operations = [
+            modify_op("op_1", line_range=[1, 10], line_delta=0),
+            modify_op("op_2", line_range=[20, 30], line_delta=0),
+            modify_op("op_3", line_range=[5, 25], line_delta=0),
+            modify_op("op_4", target="other.py"),
+            modify_op("op_5", line_range=[40, 50], line_delta=0),
+        ]
+        
+        batches = detector.plan_concurrent_batches(operations)
+        
+        assert [[op.id for op in batch] for batch in batches] == [
+            ["op_1", "op_2", "op_4", "op_5"],
+            ["op_3"],
+        ]
+    
+    def test_line_count_changes_are_not_batched_with_later_lines(self, detector):
+        """Test edits below an insert or delete wait for it."""
+        operations = [
+            modify_op("op_1", line_range=[20, 30], line_delta=0),
+            modify_op("op_2", line_range=[1, 10], line_delta=3),
+            modify_op("op_3", line_range=[40, 50], line_delta=0),
+            modify_op("op_4", line_range=[60, 70]),
+            modify_op("op_5", line_range=[80, 90], line_delta=0),
+        ]
+        
+        batches = detector.plan_concurrent_batches(operations)
+        
+        assert [[op.id for op in batch] for batch in batches] == [
+            ["op_1"],
+            ["op_2"],
+            ["op_3", "op_4"],
+            ["op_5"],
+        ]
+        
+        # Edits above a shifting edit are unaffected by it
+        batches = detector.plan_concurrent_batches([
+            modify_op("op_1", line_range=[40, 50], line_delta=-2),
+            modify_op("op_2", line_range=[1, 10], line_delta=0),
+        ])
+        assert [[op.id for op in batch] for batch in batches] == [["op_1", "op_2"]]
+    
+    def test_conflict_ids_are_unique(self, detector):
+        """Test conflicts detected at the same time get distinct ids."""
+        operations = [
+            modify_op("op_1", target="a.py"),
+            modify_op("op_2", target="a.py"),
+            modify_op("op_3", target="b.py"),
+            modify_op("op_4", target="b.py"),
+        ]
+        
+        conflicts = detector.detect_file_conflicts(operations)
+        
+        assert len({conflict.id for conflict in conflicts}) == 2
+    
+    def test_pending_index(self, detector):
+        """Test registering and releasing pending operations."""
+        assert detector.register_pending(modify_op("op_1", line_range=[1, 10])) == []
+        assert detector.register_pending(modify_op("op_2", line_range=[20, 30])) == []
+        assert detector.register_pending(modify_op("op_3", line_range=[10, 20])) == ["op_1", "op_2"]
+        
+        assert detector.release_pending("op_1")
+        assert detector.register_pending(modify_op("op_4", line_range=[1, 5])) == []
+    
+    def test_release_whole_file_operation(self, detector):
+        """Test operations without line ranges leave the pending index when released."""
+        assert detector.register_pending(modify_op("op_1")) == []
+        assert detector.release_pending("op_1")
+        assert detector._pending_index == {}
+        
+        assert detector.register_pending(modify_op("op_2")) == []
+    
+    def test_approval_system_allows_disjoint_edits(self, tmp_path):
+        """Test ApprovalSystem conflict detection and pending bookkeeping."""
+        approval_system = ApprovalSystem(preferences_file=tmp_path / "prefs.json", auto_approve_safe=False)
+        operations = [
+            modify_op("op_1", line_range=[1, 10]),
+            modify_op("op_2", line_range=[11, 20]),
+        ]
+        
+        assert approval_system.detect_conflicts(operations) == []
+        
+        for operation in operations:
+            assert approval_system.request_approval(operation) == ApprovalDecision.DEFERRED
+        assert approval_system.approve("op_1")
+        assert approval_system.approve("op_2")
+        assert approval_system.conflict_detector._pending_index == {}
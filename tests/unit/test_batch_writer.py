@@ -0,0 +1,178 @@
+"""
+Unit tests for the batched SQLite writer.
+
+Tests batching into transactions, flushing, overflow policies, rows that
+must never be dropped and recovery from write errors.
+"""
+
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.codegenie.core.batch_writer import BatchWriter, OverflowPolicy
+
+
+INSERT_SQL = "INSERT INTO rows (value) VALUES (?)"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "rows.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE rows (value INTEGER)")
+    return path
+
+
+def stored_values(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT value FROM rows ORDER BY rowid")]
+
+
+class TestBatchWriter:
+    """Test suite for BatchWriter."""
+
+    def test_flush_writes_rows_in_batches(self, db_path):
+        """Test rows are written in order in batches of at most batch_size."""
+        writer = BatchWriter(db_path, batch_size=100, flush_interval=10)
+        for value in range(250):
+            assert writer.submit(INSERT_SQL, (value,))
+
+        assert writer.flush(timeout=5)
+        writer.close()
+
+        assert stored_values(db_path) == list(range(250))
+        stats = writer.get_stats()
+        assert stats["written"] == 250
+        assert stats["max_batch"] == 100
+        assert stats["pending"] == 0
+
+    def test_flush_interval_writes_partial_batch(self, db_path):
+        """Test a partial batch is written once the interval elapses."""
+        writer = BatchWriter(db_path, batch_size=1000, flush_interval=0.01)
+        writer.submit(INSERT_SQL, (1,))
+
+        with writer._cond:
+            assert writer._cond.wait_for(lambda: writer.stats["written"] == 1, 5)
+        writer.close()
+
+        assert stored_values(db_path) == [1]
+
+    def test_overflow_policies(self, db_path):
+        """Test drop-newest rejects and drop-oldest evicts when full."""
+        newest = BatchWriter(db_path, max_pending=3, overflow_policy=OverflowPolicy.DROP_NEWEST)
+        oldest = BatchWriter(db_path, max_pending=3, overflow_policy=OverflowPolicy.DROP_OLDEST)
+
+        # Keep the writer threads from draining the buffers
+        with patch.object(BatchWriter, "_ensure_thread"):
+            accepted = [newest.submit(INSERT_SQL, (value,)) for value in range(5)]
+            for value in range(5):
+                oldest.submit(INSERT_SQL, (value,))
+
+        assert accepted == [True, True, True, False, False]
+        assert [params[0] for _, params, _ in newest._pending] == [0, 1, 2]
+        assert [params[0] for _, params, _ in oldest._pending] == [2, 3, 4]
+        assert newest.stats["dropped"] == oldest.stats["dropped"] == 2
+
+    def test_block_policy_waits_for_room(self, db_path):
+        """Test blocking submitters proceed once the writer drains the buffer."""
+        writer = BatchWriter(db_path, max_pending=10, batch_size=10, flush_interval=0.01,
+                             overflow_policy=OverflowPolicy.BLOCK, block_timeout=5)
+
+        threads = [
+            threading.Thread(target=lambda start=start: [
+                writer.submit(INSERT_SQL, (value,)) for value in range(start, start + 100)
+            ])
+            for start in (0, 100)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        assert sorted(stored_values(db_path)) == list(range(200))
+        assert writer.stats["dropped"] == 0
+
+    def test_reliable_rows_are_never_dropped(self, db_path):
+        """Test non-droppable rows bypass the bound and are written first."""
+        writer = BatchWriter(db_path, max_pending=1, overflow_policy=OverflowPolicy.DROP_NEWEST)
+
+        with patch.object(BatchWriter, "_ensure_thread"):
+            writer.submit(INSERT_SQL, (1,))
+            writer.submit(INSERT_SQL, (2,))
+            for value in (10, 11, 12):
+                assert writer.submit(INSERT_SQL, (value,), droppable=False)
+        writer.close()
+
+        assert stored_values(db_path) == [10, 11, 12, 1]
+
+    def test_failed_batch_is_counted(self, db_path):
+        """Test a failing statement is logged and counted, not raised."""
+        writer = BatchWriter(db_path)
+        writer.submit("INSERT INTO missing (value) VALUES (?)", (1,))
+        writer.close()
+
+        assert writer.stats["failed"] == 1
+        assert not writer.submit(INSERT_SQL, (2,))
+
+    def test_failed_batch_keeps_good_rows(self, db_path):
+        """Test one bad statement does not discard the rest of its batch."""
+        writer = BatchWriter(db_path)
+
+        with patch.object(BatchWriter, "_ensure_thread"):
+            writer.submit(INSERT_SQL, (1,), droppable=False)
+            writer.submit("INSERT INTO missing (value) VALUES (?)", (2,), droppable=False)
+            writer.submit(INSERT_SQL, (3,), droppable=False)
+            writer.submit(INSERT_SQL, (4,))
+        writer.close()
+
+        assert stored_values(db_path) == [1, 3, 4]
+        assert writer.stats["written"] == 3
+        assert writer.stats["failed"] == 1
+
+    def test_failed_connect_restarts_writer(self, tmp_path):
+        """Test a writer thread that could not connect is replaced on the next submit."""
+        db_path = tmp_path / "later" / "rows.db"
+        writer = BatchWriter(db_path, flush_interval=0.01)
+        writer.submit(INSERT_SQL, (1,), droppable=False)
+        assert not writer.flush(timeout=0.5)
+        assert writer._thread is None
+
+        db_path.parent.mkdir()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE rows (value INTEGER)")
+        writer.submit(INSERT_SQL, (2,), droppable=False)
+        writer.close()
+
+        assert stored_values(db_path) == [1, 2]
+
+    def test_flush_is_not_starved_by_ingest(self, db_path):
+        """Test flush waits only for rows submitted before it."""
+        writer = BatchWriter(db_path, batch_size=50, flush_interval=10)
+        stop = threading.Event()
+
+        def ingest():
+            value = 0
+            while not stop.is_set():
+                writer.submit(INSERT_SQL, (value,))
+                value += 1
+                if value % 50 == 0:
+                    time.sleep(0.001)
+
+        thread = threading.Thread(target=ingest)
+        thread.start()
+        try:
+            time.sleep(0.05)
+            with writer._cond:
+                mark = writer._seq
+            assert writer.flush(timeout=5)
+            with writer._cond:
+                oldest = writer._oldest_seq()
+            assert oldest is None or oldest > mark
+        finally:
+            stop.set()
+            thread.join()
+            writer.close()
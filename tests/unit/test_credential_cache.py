@@ -0,0 +1,160 @@
+"""
+Unit tests for the verified credential cache.
+
+Tests expiry, LRU bounds, invalidation by owner and hit-rate statistics, and
+benchmarks the API authentication middleware with cached credentials.
+"""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from src.codegenie.integrations.api_system import APISystem
+from src.codegenie.integrations.credential_cache import CredentialCache
+from src.codegenie.integrations.rate_limiting import RateLimiter
+from tests.memory_redis import InMemoryRedis
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCredentialCache:
+    """Test suite for CredentialCache."""
+
+    def test_hit_and_miss(self):
+        """Test cached values are returned and misses counted."""
+        cache = CredentialCache(clock=FakeClock())
+        assert cache.get("jwt", "token") is None
+
+        cache.put("jwt", "token", {"user_id": "u1"})
+
+        assert cache.get("jwt", "token") == {"user_id": "u1"}
+        assert cache.get("api_key", "token") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["hit_rate"] == 1 / 3
+
+    def test_expires_at_credential_expiry(self):
+        """Test entries expire at the credential's expiry."""
+        clock = FakeClock()
+        cache = CredentialCache(clock=clock)
+        cache.put("jwt", "token", "payload", expires_at=clock.now + 10)
+
+        clock.now += 9.9
+        assert cache.get("jwt", "token") == "payload"
+        clock.now += 0.1
+        assert cache.get("jwt", "token") is None
+        assert len(cache) == 0
+
+    def test_max_ttl_caps_lifetime(self):
+        """Test long-lived credentials are re-verified after max_ttl."""
+        clock = FakeClock()
+        cache = CredentialCache(max_ttl=60, clock=clock)
+        cache.put("api_key", "key", "value", expires_at=clock.now + 3600)
+
+        clock.now += 61
+        assert cache.get("api_key", "key") is None
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted at the bound."""
+        cache = CredentialCache(max_entries=2, clock=FakeClock())
+        cache.put("jwt", "a", 1)
+        cache.put("jwt", "b", 2)
+        cache.get("jwt", "a")
+        cache.put("jwt", "c", 3)
+
+        assert cache.get("jwt", "b") is None
+        assert cache.get("jwt", "a") == 1
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_invalidate_owner(self):
+        """Test every entry of an owner is dropped."""
+        cache = CredentialCache(clock=FakeClock())
+        cache.put("api_key", "k1", "v", owner="hash1")
+        cache.put("api_key", "k2", "v", owner="hash1")
+        cache.put("api_key", "k3", "v", owner="hash2")
+
+        assert cache.invalidate_owner("hash1") == 2
+        assert cache.get("api_key", "k1") is None
+        assert cache.get("api_key", "k3") == "v"
+
+    def test_does_not_store_raw_credentials(self):
+        """Test cache keys are digests rather than the credentials."""
+        cache = CredentialCache(clock=FakeClock())
+        cache.put("api_key", "cg_secret", "v")
+
+        assert all(b"cg_secret" not in key for key in cache._entries)
+
+
+class TestAuthMiddleware:
+    """Test API authentication with the credential cache."""
+
+    @pytest.mark.asyncio
+    async def test_removed_api_key_is_rejected(self):
+        """Test a key dropped from the key store is not served from the cache."""
+        api_system = APISystem(Mock(), Mock(), Mock(), "test_secret_key")
+        key, api_key = api_system.create_api_key("Temp Key", ["read"])
+        auth_manager = api_system.auth_manager
+
+        assert await auth_manager.validate_api_key(key) is api_key
+        assert await auth_manager.validate_api_key(key) is api_key
+        assert auth_manager.get_cache_stats()["hits"] == 1
+
+        del auth_manager.api_keys[api_key.key_hash]
+
+        assert await auth_manager.validate_api_key(key) is None
+        assert auth_manager.get_cache_stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_auth_middleware_chain_throughput(self):
+        """Benchmark the auth and rate limit middleware chain with cached credentials."""
+        api_system = APISystem(Mock(), Mock(), Mock(), "test_secret_key")
+        api_system.rate_limiter = RateLimiter(InMemoryRedis(), sync_interval=0.05)
+        key, _ = api_system.create_api_key("Bench Key", ["read"], rate_limit=1_000_000)
+        token = api_system.auth_manager.generate_jwt_token("bench_user", ["read"])
+
+        async def handler(request):
+            return web.Response(text="ok")
+
+        async def rate_limited(request):
+            return await api_system._rate_limit_middleware(request, handler)
+
+        async def run(header, num_requests):
+            request = make_mocked_request(
+                "GET", "/api/v1/context/search", headers={"Authorization": header}
+            )
+            start_time = time.perf_counter()
+            for _ in range(num_requests):
+                response = await api_system._auth_middleware(request, rate_limited)
+            elapsed = time.perf_counter() - start_time
+            assert response.status == 200
+            return elapsed / num_requests
+
+        # JWT callers share a fixed budget of 1000 requests
+        num_requests = 400
+        results = {}
+        for name, header in (("jwt", f"Bearer {token}"), ("api_key", f"ApiKey {key}")):
+            api_system.auth_manager.credential_cache.max_entries = 0
+            uncached = await run(header, num_requests)
+            api_system.auth_manager.credential_cache.max_entries = 10000
+            cached = await run(header, num_requests)
+            results[name] = (uncached, cached)
+            print(f"Auth middleware chain ({name}): {uncached * 1e6:.1f} us/req uncached, "
+                  f"{cached * 1e6:.1f} us/req cached")
+        await api_system.rate_limiter.stop()
+
+        stats = api_system.auth_manager.get_cache_stats()
+        assert stats["hit_rate"] > 0.4
+        # Skipping HS256 verification must be a clear win for JWT callers
+        uncached, cached = results["jwt"]
+        assert cached < uncached
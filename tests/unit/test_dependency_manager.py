@@ -0,0 +1,243 @@
+"""
+Unit tests for DependencyManager import scanning.
+
+Tests missing dependency detection, the persisted per-file import cache,
+parallel scanning of changed files and cached, concurrent version resolution.
+"""
+
+import asyncio
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.codegenie.core.dependency_manager import DependencyManager, Language
+
+
+def make_project(tmp_path):
+    (tmp_path / "requirements.txt").write_text("requests==2.31.0\n")
+    (tmp_path / "app.py").write_text("import os\nimport requests\nimport numpy\n")
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "index.js").write_text("const express = require('express');\n")
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / "node_modules" / "lib" / "index.js").write_text("require('ignored');\n")
+    age_files(tmp_path)
+    return tmp_path
+
+
+def age_files(root, seconds=10):
+    """Backdate files so their stat is outside the racy window and can be cached."""
+    for path in root.rglob("*"):
+        if path.is_file():
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10 ** 9))
+
+
+def missing_names(manager, file_path=None):
+    return sorted(dep.name for dep in manager.detect_missing_dependencies(file_path))
+
+
+class TestImportScanning:
+    """Test suite for cached import scanning."""
+
+    def test_detects_missing_dependencies(self, tmp_path):
+        """Test undeclared imports are reported and ignored dirs skipped."""
+        manager = DependencyManager(make_project(tmp_path))
+
+        assert missing_names(manager) == ["express", "numpy"]
+        assert all("node_modules" not in str(f) for f in manager._get_source_files())
+
+    def test_cache_persists_across_instances(self, tmp_path):
+        """Test a second manager reuses imports scanned by the first."""
+        project = make_project(tmp_path)
+        first = DependencyManager(project)
+        missing_names(first)
+
+        cache_file = project / ".codegenie" / "import_cache.json"
+        assert set(json.loads(cache_file.read_text())["files"]) == {"app.py", "web/index.js"}
+
+        second = DependencyManager(project)
+        assert missing_names(second) == ["express", "numpy"]
+        assert second.import_cache_stats == {"hits": 2, "rehashed": 0, "scanned": 0}
+
+    def test_only_changed_files_are_rescanned(self, tmp_path):
+        """Test edits are rescanned while touched files are only rehashed."""
+        project = make_project(tmp_path)
+        manager = DependencyManager(project)
+        missing_names(manager)
+
+        app = project / "app.py"
+        app.write_text("import requests\nimport pandas\n")
+        index = project / "web" / "index.js"
+        stat = index.stat()
+        os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        assert missing_names(manager) == ["express", "pandas"]
+        assert manager.import_cache_stats["scanned"] == 3
+        assert manager.import_cache_stats["rehashed"] == 1
+
+    def test_recently_modified_files_are_not_cached(self, tmp_path):
+        """Test a file written within the racy window is rescanned."""
+        project = make_project(tmp_path)
+        manager = DependencyManager(project)
+        missing_names(manager)
+
+        app = project / "app.py"
+        app.write_text("import requests\nimport pandas\n")
+        mtime_ns = app.stat().st_mtime_ns
+        assert missing_names(manager) == ["express", "pandas"]
+        assert "app.py" not in manager._load_import_cache()
+
+        # Same size and mtime: only rescanning tells the edits apart
+        app.write_text("import requests\nimport polars\n")
+        os.utime(app, ns=(mtime_ns, mtime_ns))
+        assert missing_names(manager) == ["express", "polars"]
+
+    def test_deleted_files_are_pruned(self, tmp_path):
+        """Test a full scan drops cache entries of removed files."""
+        project = make_project(tmp_path)
+        manager = DependencyManager(project)
+        missing_names(manager)
+
+        (project / "app.py").unlink()
+
+        assert missing_names(manager) == ["express"]
+        assert list(manager._load_import_cache()) == ["web/index.js"]
+
+    def test_parallel_scan_matches_serial(self, tmp_path):
+        """Test scanning in a worker pool gives the same result."""
+        project = make_project(tmp_path)
+        for index in range(20):
+            (project / f"module_{index}.py").write_text(f"import pkg_{index}\nimport json\n")
+
+        serial = DependencyManager(project, import_cache_path=tmp_path / "serial.json", max_workers=1)
+        parallel = DependencyManager(project, import_cache_path=tmp_path / "parallel.json",
+                                     parallel_threshold=2)
+
+        assert missing_names(parallel) == missing_names(serial)
+        assert parallel.import_cache_stats["scanned"] == 22
+
+    def test_single_file_and_corrupt_cache(self, tmp_path):
+        """Test analyzing one file, starting from an unreadable cache."""
+        project = make_project(tmp_path)
+        cache_file = project / ".codegenie" / "import_cache.json"
+        cache_file.parent.mkdir()
+        cache_file.write_text("{not json")
+
+        manager = DependencyManager(project)
+
+        assert missing_names(manager, project / "app.py") == ["numpy"]
+        assert "app.py" in json.loads(cache_file.read_text())["files"]
+
+
+class FakeRegistry:
+    """Stands in for registry commands, answering after a delay."""
+
+    def __init__(self, delay=0.05, version="1.2.3"):
+        self.delay = delay
+        self.version = version
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def create_subprocess_exec(self, *command, **kwargs):
+        self.calls.append(command)
+        registry = self
+
+        class Process:
+            returncode = 0
+
+            async def communicate(self):
+                registry.running += 1
+                registry.max_running = max(registry.max_running, registry.running)
+                try:
+                    await asyncio.sleep(registry.delay)
+                finally:
+                    registry.running -= 1
+                return f"{command[3]} ({registry.version})\nAvailable versions: {registry.version}, 1.0.0\n".encode(), b""
+
+            def kill(self):
+                pass
+
+            async def wait(self):
+                return 0
+
+        return Process()
+
+
+class TestVersionResolution:
+    """Test suite for version resolution."""
+
+    @pytest.mark.asyncio
+    async def test_resolves_concurrently_with_bound(self, tmp_path):
+        """Test many packages resolve in parallel without exceeding the bound."""
+        registry = FakeRegistry(delay=0.05)
+        manager = DependencyManager(tmp_path, max_concurrent_resolves=20)
+        packages = [(f"pkg{index}", Language.PYTHON) for index in range(100)]
+
+        with patch("asyncio.create_subprocess_exec", registry.create_subprocess_exec):
+            start = time.perf_counter()
+            versions = await manager.resolve_versions(packages + packages[:10])
+            elapsed = time.perf_counter() - start
+
+        assert all(versions[package] == "1.2.3" for package in packages)
+        assert len(registry.calls) == 100
+        assert registry.max_running == 20
+        assert elapsed < 100 * 0.05 / 4
+
+    @pytest.mark.asyncio
+    async def test_cache_persists_and_expires(self, tmp_path):
+        """Test resolved versions are reused until the TTL passes."""
+        registry = FakeRegistry(delay=0)
+        with patch("asyncio.create_subprocess_exec", registry.create_subprocess_exec):
+            await DependencyManager(tmp_path).resolve_versions([("requests", Language.PYTHON)])
+
+            cached = DependencyManager(tmp_path)
+            assert cached.resolve_version("requests", Language.PYTHON) == "1.2.3"
+            assert cached.version_stats["cache_hits"] == 1
+
+            registry.version = "2.0.0"
+            expired = DependencyManager(tmp_path, version_cache_ttl=0)
+            result = await expired.resolve_versions([("requests", Language.PYTHON)])
+
+        assert result[("requests", Language.PYTHON)] == "2.0.0"
+        assert len(registry.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_offline_resolution_from_local_index(self, tmp_path):
+        """Test an offline manager resolves only from a snapshot."""
+        index = tmp_path / "index"
+        index.mkdir()
+        (index / "pypi.json").write_text(json.dumps({"flask": "3.0.0"}))
+        (index / "npm.json").write_text(json.dumps({"react": ["17.0.2", "18.2.0"]}))
+        manager = DependencyManager(tmp_path, local_index_path=index, offline=True)
+
+        registry = FakeRegistry()
+        with patch("asyncio.create_subprocess_exec", registry.create_subprocess_exec):
+            versions = await manager.resolve_versions([
+                ("flask", Language.PYTHON), ("react", Language.JAVASCRIPT), ("missing", Language.PYTHON)
+            ])
+
+        assert versions == {
+            ("flask", Language.PYTHON): "3.0.0",
+            ("react", Language.JAVASCRIPT): "18.2.0",
+            ("missing", Language.PYTHON): None,
+        }
+        assert registry.calls == []
+
+    @pytest.mark.asyncio
+    async def test_export_snapshot_and_mirror(self, tmp_path):
+        """Test cached versions export to a snapshot and mirrors are passed on."""
+        registry = FakeRegistry(delay=0)
+        manager = DependencyManager(tmp_path, registry_mirrors={"pypi": "http://mirror.local/simple"})
+        with patch("asyncio.create_subprocess_exec", registry.create_subprocess_exec):
+            await manager.resolve_versions([("requests", Language.PYTHON)])
+
+        assert registry.calls[0][-2:] == ("--index-url", "http://mirror.local/simple")
+        assert manager.export_version_snapshot(tmp_path / "snapshot") == {"pypi": 1}
+
+        offline = DependencyManager(tmp_path, version_cache_path=tmp_path / "empty.json",
+                                    local_index_path=tmp_path / "snapshot", offline=True)
+        assert offline.resolve_version("requests", Language.PYTHON) == "1.2.3"
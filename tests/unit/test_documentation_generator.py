@@ -0,0 +1,138 @@
+"""
+Unit tests for DocumentationGenerator module analysis.
+
+Tests the shared parsed-module cache, process-pool analysis and incremental
+API documentation generation.
+"""
+
+import os
+
+from src.codegenie.core.documentation_generator import DocumentationGenerator
+
+
+MODULE = '''"""Geometry helpers."""
+
+PI = 3.14
+
+
+def area(radius: float) -> float:
+    return PI * radius * radius
+
+
+class Shape:
+    """A shape."""
+
+    def scale(self, factor):
+        """Scale by factor."""
+        return factor
+'''
+
+
+def make_project(tmp_path, count=3):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    for index in range(count):
+        (package / f"mod{index}.py").write_text(MODULE.replace("area", f"area{index}"))
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_mod.py").write_text("def test_it():\n    pass\n")
+    for path in tmp_path.rglob("*.py"):
+        backdate(path)
+    return tmp_path
+
+
+def backdate(path, seconds=10):
+    """Move a file's mtime out of the racy window so its digest can be recorded."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10 ** 9))
+
+
+def module_names(api_doc):
+    return [module.name for module in api_doc.modules]
+
+
+class TestModuleAnalysis:
+    """Test suite for cached module analysis."""
+
+    def test_api_documentation_skips_tests(self, tmp_path):
+        """Test modules are documented and test files skipped."""
+        generator = DocumentationGenerator()
+
+        api_doc = generator.generate_api_documentation(make_project(tmp_path))
+
+        assert module_names(api_doc) == ["mod0", "mod1", "mod2"]
+        module = api_doc.modules[0]
+        assert module.description == "Geometry helpers."
+        assert [f.name for f in module.functions] == ["area0"]
+        assert module.classes[0].methods[0].name == "scale"
+        assert module.constants == [{"name": "PI", "description": "Constant PI"}]
+
+    def test_passes_share_parsed_modules(self, tmp_path):
+        """Test sync checks and docstring updates reuse the parse of API docs."""
+        project = make_project(tmp_path)
+        generator = DocumentationGenerator()
+
+        generator.generate_api_documentation(project)
+        issues = generator.check_doc_sync(project, check_readme=False)
+        added = generator._add_missing_docstrings(project)
+
+        assert generator.analysis_stats["parsed"] == 3
+        assert generator.analysis_stats["parse_hits"] == 6
+        assert {issue.description for issue in issues} == {
+            f"Function 'area{index}' is missing a docstring" for index in range(3)
+        }
+        assert added == 3
+
+    def test_only_changed_modules_are_reanalyzed(self, tmp_path):
+        """Test a second run reuses analysis of unchanged modules."""
+        project = make_project(tmp_path)
+        generator = DocumentationGenerator()
+        generator.generate_api_documentation(project)
+
+        (project / "pkg" / "mod1.py").write_text("def changed():\n    pass\n")
+        api_doc = generator.generate_api_documentation(project)
+
+        assert generator.analysis_stats["analyzed"] == 4
+        assert generator.analysis_stats["reused"] == 2
+        assert [f.name for f in api_doc.modules[1].functions] == ["changed"]
+
+    def test_recently_modified_module_is_rehashed(self, tmp_path):
+        """Test a same-size edit within the racy window is not hidden by the digest cache."""
+        project = make_project(tmp_path, count=1)
+        module = project / "pkg" / "mod0.py"
+        module.write_text("def first():\n    pass\n")
+        mtime_ns = module.stat().st_mtime_ns
+        generator = DocumentationGenerator()
+        generator.generate_api_documentation(project)
+
+        module.write_text("def other():\n    pass\n")
+        os.utime(module, ns=(mtime_ns, mtime_ns))
+        api_doc = generator.generate_api_documentation(project)
+
+        assert [f.name for f in api_doc.modules[0].functions] == ["other"]
+
+    def test_incremental_mode_persists_between_generators(self, tmp_path):
+        """Test incremental runs reuse docs from a previous process."""
+        project = make_project(tmp_path)
+        first = DocumentationGenerator()
+        expected = first.generate_api_documentation(project, incremental=True)
+        assert (project / ".codegenie" / "api_docs_cache.json").exists()
+
+        touched = project / "pkg" / "mod2.py"
+        stat = touched.stat()
+        os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        second = DocumentationGenerator()
+        api_doc = second.generate_api_documentation(project, incremental=True)
+
+        assert api_doc.modules == expected.modules
+        assert second.analysis_stats["analyzed"] == 0
+        assert second.analysis_stats["reused"] == 3
+
+    def test_process_pool_matches_serial(self, tmp_path):
+        """Test process-pool analysis gives the same documentation."""
+        project = make_project(tmp_path, count=6)
+
+        serial = DocumentationGenerator(max_workers=1).generate_api_documentation(project)
+        parallel = DocumentationGenerator(max_workers=2, parallel_threshold=2).generate_api_documentation(project)
+
+        assert parallel.modules == serial.modules
@@ -0,0 +1,254 @@
+"""
+Unit tests for the long-lived Git backend.
+
+Tests ref resolution, index parsing, status, diff and blob reads against
+real repositories created with the git CLI.
+"""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.codegenie.core.git_backend import GitBackend, GitBackendError, get_git_backend
+from src.codegenie.core.tool_executor import GitIntegration, TerminalExecutor
+
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def git(repo: Path, *args: str) -> str:
+    """Run a git command in a test repository."""
+    result = subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Create a repository with one commit."""
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    git(tmp_path, "config", "user.name", "Test")
+    git(tmp_path, "remote", "add", "origin", "https://example.com/repo.git")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('hello')\n")
+    (tmp_path / "README.md").write_text("# Project\n")
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+@pytest.fixture
+def backend(repo):
+    """Create a backend for the test repository."""
+    backend = GitBackend(repo)
+    yield backend
+    backend.close()
+
+
+def porcelain(repo: Path) -> str:
+    """Return the status as reported by git itself."""
+    return git(repo, "status", "--porcelain", "-uall")
+
+
+class TestGitBackend:
+    """Test suite for GitBackend."""
+
+    def test_refs_and_branches(self, repo, backend):
+        """Test resolving HEAD, branches and remotes."""
+        head = git(repo, "rev-parse", "HEAD").strip()
+
+        assert backend.resolve_ref("HEAD") == head
+        assert backend.current_branch() == "main"
+        assert backend.list_branches() == {"main": head}
+        assert backend.remote_url() == "https://example.com/repo.git"
+
+        git(repo, "branch", "feature")
+        git(repo, "pack-refs", "--all")
+        assert backend.list_branches() == {"main": head, "feature": head}
+        assert backend.resolve_ref("refs/heads/feature") == head
+
+    def test_clean_status(self, repo, backend):
+        """Test that a fresh checkout is clean."""
+        status = backend.status()
+
+        assert status.is_clean
+        assert status.to_porcelain() == porcelain(repo) == ""
+
+    def test_status_matches_git(self, repo, backend):
+        """Test staged, unstaged, deleted and untracked changes."""
+        (repo / "src" / "app.py").write_text("print('changed')\n")
+        (repo / "README.md").unlink()
+        (repo / "new.py").write_text("x = 1\n")
+        (repo / "debug.log").write_text("ignored\n")
+        (repo / "build").mkdir()
+        (repo / "build" / "out.txt").write_text("ignored\n")
+        (repo / "staged.py").write_text("y = 2\n")
+        git(repo, "add", "staged.py")
+
+        status = backend.status()
+
+        assert status.unstaged == {"src/app.py": "M", "README.md": "D"}
+        assert status.staged == {"staged.py": "A"}
+        assert status.untracked == ["new.py"]
+        assert status.has_uncommitted
+        assert status.to_porcelain() == porcelain(repo)
+
+    def test_porcelain_quotes_paths_like_git(self, repo, backend):
+        """Test paths with spaces, quotes and non-ASCII characters are C-quoted."""
+        for name in ("with space.py", 'quo"te.py', "naïve.py", "tab\there.py"):
+            (repo / name).write_text("x = 1\n")
+        git(repo, "add", "with space.py")
+
+        assert backend.status().to_porcelain() == porcelain(repo)
+
+        git(repo, "config", "core.quotePath", "false")
+        unquoted = GitBackend(repo)
+        try:
+            assert unquoted.status().to_porcelain() == porcelain(repo)
+        finally:
+            unquoted.close()
+
+    def test_core_excludes_file(self, repo, tmp_path_factory):
+        """Test untracked files matched by core.excludesFile are ignored."""
+        excludes = tmp_path_factory.mktemp("config") / "ignore"
+        excludes.write_text("*.tmp\n")
+        git(repo, "config", "core.excludesFile", str(excludes))
+        (repo / "scratch.tmp").write_text("ignored\n")
+        (repo / "kept.txt").write_text("kept\n")
+
+        backend = GitBackend(repo)
+        try:
+            assert backend.status().untracked == ["kept.txt"]
+            assert backend.status().to_porcelain() == porcelain(repo)
+        finally:
+            backend.close()
+
+    def test_same_size_modification_detected(self, repo, backend):
+        """Test that content changes are found even when size and mtime match."""
+        app = repo / "src" / "app.py"
+        st = app.stat()
+        app.write_text("print('HELLO')\n")
+        os.utime(app, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        assert backend.status().unstaged == {"src/app.py": "M"}
+
+    def test_index_version_4(self, repo, backend):
+        """Test parsing a path-compressed version 4 index."""
+        git(repo, "update-index", "--index-version", "4")
+        (repo / "src" / "app.py").write_text("print('v4')\n")
+
+        paths = [entry.path for entry in backend.read_index()]
+
+        assert paths == [".gitignore", "README.md", "src/app.py"]
+        assert backend.status().to_porcelain() == porcelain(repo)
+
+    def test_read_blob_loose_and_packed(self, repo, backend):
+        """Test reading blobs from loose objects and packfiles."""
+        (repo / "src" / "app.py").write_text("print('staged')\n")
+        git(repo, "add", "src/app.py")
+
+        assert backend.read_blob("src/app.py") == b"print('hello')\n"
+        assert backend.read_blob("src/app.py", revision=None) == b"print('staged')\n"
+        assert backend.read_blob("missing.py") is None
+
+        git(repo, "gc", "-q")
+        other = GitBackend(repo)
+        try:
+            assert other.read_blob("README.md") == b"# Project\n"
+            info = other.object_info("HEAD:README.md")
+            assert info.type == "blob" and info.size == len(b"# Project\n")
+        finally:
+            other.close()
+
+    def test_diff(self, repo, backend):
+        """Test unified diffs against the index and HEAD."""
+        (repo / "src" / "app.py").write_text("print('hello')\nprint('world')\n")
+
+        diff = backend.diff()
+        assert diff.startswith("diff --git a/src/app.py b/src/app.py\n")
+        assert "+print('world')\n" in diff
+        assert backend.diff(cached=True) == ""
+
+        git(repo, "add", "src/app.py")
+        assert backend.diff() == ""
+        assert "+print('world')\n" in backend.diff(cached=True)
+
+    def test_get_git_backend_is_shared(self, repo):
+        """Test that backends are reused per repository."""
+        first = get_git_backend(repo / "src")
+        second = get_git_backend(repo)
+
+        assert first is second
+        assert first.work_tree == repo.resolve()
+
+    def test_get_git_backend_outside_repo(self, tmp_path):
+        """Test that non-repositories return None."""
+        if get_git_backend(tmp_path) is not None:
+            pytest.skip("temporary directory is inside a git repository")
+        assert get_git_backend(tmp_path) is None
+
+
+class TestGitIntegrationBackend:
+    """Test suite for GitIntegration reads served by the backend."""
+
+    @pytest.mark.asyncio
+    async def test_status_and_diff(self, repo):
+        """Test that status and diff match the git CLI output."""
+        git_integration = GitIntegration(TerminalExecutor())
+        (repo / "README.md").write_text("# Project\n\nMore.\n")
+
+        status = await git_integration.get_status(cwd=repo)
+        diff = await git_integration.get_diff(Path("README.md"), cwd=repo)
+
+        assert status.success
+        assert status.stdout == porcelain(repo)
+        assert "+More.\n" in diff.stdout
+        assert git_integration.terminal.command_history == []
+
+    @pytest.mark.asyncio
+    async def test_branch_and_file_content(self, repo):
+        """Test branch and file reads."""
+        git_integration = GitIntegration(TerminalExecutor())
+
+        assert await git_integration.get_current_branch(cwd=repo) == "main"
+        assert await git_integration.get_file_content(Path("README.md"), cwd=repo) == "# Project\n"
+
+    @pytest.mark.asyncio
+    async def test_cli_fallback(self, repo):
+        """Test that the CLI is used when the backend is disabled."""
+        git_integration = GitIntegration(TerminalExecutor(), use_backend=False)
+        (repo / "new.py").write_text("x = 1\n")
+
+        status = await git_integration.get_status(cwd=repo)
+
+        assert status.stdout == "?? new.py\n"
+        assert len(git_integration.terminal.command_history) == 1
+
+    @pytest.mark.asyncio
+    async def test_backend_and_cli_status_agree(self, repo):
+        """Test untracked directories are listed file by file on both paths."""
+        (repo / "newdir").mkdir()
+        (repo / "newdir" / "a.py").write_text("x = 1\n")
+
+        backend_status = await GitIntegration(TerminalExecutor()).get_status(cwd=repo)
+        cli_status = await GitIntegration(TerminalExecutor(), use_backend=False).get_status(cwd=repo)
+
+        assert backend_status.stdout == cli_status.stdout == "?? newdir/a.py\n"
+
+    @pytest.mark.asyncio
+    async def test_branch_falls_back_on_backend_error(self, repo, monkeypatch):
+        """Test a failing backend read is served by the CLI."""
+        def fail(self):
+            raise GitBackendError("corrupt HEAD")
+
+        monkeypatch.setattr(GitBackend, "current_branch", fail)
+        git_integration = GitIntegration(TerminalExecutor())
+
+        assert await git_integration.get_current_branch(cwd=repo) == "main"
+        assert len(git_integration.terminal.command_history) == 1
@@ -0,0 +1,123 @@
+"""
+Unit tests for the learning engine.
+
+Tests the preference store, the domain-indexed preference views and the
+recommendation candidate cache.
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.codegenie.core.learning_engine import (
+    FeedbackType,
+    LearningDomain,
+    PersonalizedRecommendationEngine,
+    UserFeedback,
+    UserPreferenceModeler,
+)
+
+
+def feedback(content, feedback_type=FeedbackType.PREFERENCE, domain=LearningDomain.COMMUNICATION_STYLE):
+    return UserFeedback(feedback_type=feedback_type, domain=domain, content=content)
+
+
+class TestUserPreferenceModeler:
+    """Test suite for UserPreferenceModeler."""
+
+    @pytest.fixture
+    def modeler(self, tmp_path):
+        return UserPreferenceModeler(tmp_path / "preferences")
+
+    def test_records_persist_across_instances(self, modeler, tmp_path):
+        """Test learned data is stored and reloaded from the store."""
+        modeler.learn_from_feedback(feedback("be more concise"))
+        modeler.learn_from_code("def load_data():\n    return 1\n")
+
+        reloaded = UserPreferenceModeler(tmp_path / "preferences")
+
+        assert reloaded.get_preferences_by_domain(LearningDomain.COMMUNICATION_STYLE) == \
+            modeler.get_preferences_by_domain(LearningDomain.COMMUNICATION_STYLE)
+        assert reloaded.get_coding_style_preferences()["function_naming"]["value"] == "snake_case"
+        assert not (tmp_path / "preferences" / "user_preferences.json").exists()
+
+    def test_feedback_upserts_one_record(self, modeler):
+        """Test a learning event writes only the preference it changed."""
+        modeler.learn_from_feedback(feedback("too verbose"))
+        modeler.learn_from_feedback(feedback("add tests", domain=LearningDomain.WORKFLOW_PREFERENCE))
+        modeler.learn_from_feedback(feedback("too verbose", FeedbackType.POSITIVE))
+
+        with sqlite3.connect(modeler.store.db_path) as conn:
+            rows = conn.execute("SELECT domain, preference_key, data FROM preferences").fetchall()
+
+        assert len(rows) == 2
+        stored = {(domain, key): json.loads(data) for domain, key, data in rows}
+        assert stored[("communication_style", "verbosity_level")]["evidence_count"] == 2
+
+    def test_legacy_json_files_are_imported(self, tmp_path):
+        """Test data of the old JSON files is moved into the store once."""
+        storage = tmp_path / "preferences"
+        storage.mkdir()
+        (storage / "coding_patterns.json").write_text(json.dumps([{
+            "pattern_type": "indentation", "pattern_value": "4_spaces", "confidence": 0.9,
+            "evidence_count": 3, "last_updated": 1.0, "examples": []
+        }]))
+
+        modeler = UserPreferenceModeler(storage)
+        assert modeler.get_coding_style_preferences()["indentation"]["value"] == "4_spaces"
+
+        # Later changes to the legacy file are not imported again
+        (storage / "coding_patterns.json").write_text("[]")
+        assert "indentation" in UserPreferenceModeler(storage).coding_patterns
+
+    def test_domain_versions_track_relevant_changes(self, modeler):
+        """Test versions change with values and confidence, not evidence alone."""
+        domain = LearningDomain.COMMUNICATION_STYLE
+        modeler.learn_from_feedback(feedback("make it verbose"))
+        version = modeler.preference_version(domain)
+        other = modeler.preference_version(LearningDomain.ERROR_HANDLING)
+
+        modeler.learn_from_feedback(feedback("make it verbose"))
+        assert modeler.preference_version(domain) != version
+        assert modeler.preference_version(LearningDomain.ERROR_HANDLING) == other
+
+        # Confidence capped at 1.0: more evidence no longer changes anything relevant
+        for _ in range(20):
+            modeler.learn_from_feedback(feedback("make it verbose"))
+        version = modeler.preference_version(domain)
+        modeler.learn_from_feedback(feedback("make it verbose"))
+        assert modeler.preference_version(domain) == version
+        assert modeler.get_preferences_by_domain(domain)["verbosity_level"]["evidence_count"] == 23
+
+
+class TestRecommendationCache:
+    """Test caching of recommendation candidates."""
+
+    def test_candidates_reused_until_preferences_change(self, tmp_path):
+        """Test candidates are rebuilt only after a relevant change."""
+        modeler = UserPreferenceModeler(tmp_path / "preferences")
+        engine = PersonalizedRecommendationEngine(modeler)
+        domain = LearningDomain.COMMUNICATION_STYLE
+        for _ in range(3):
+            modeler.learn_from_feedback(feedback("make it verbose"))
+
+        first = engine.generate_recommendations({"task": "a"}, domain)
+        second = engine.generate_recommendations({"task": "b"}, domain)
+
+        assert engine.cache_stats == {"hits": 1, "misses": 1}
+        assert [r.content for r in first] == [r.content for r in second]
+        assert first[0].id != second[0].id
+        assert second[0].context == {"task": "b"}
+
+        # A change in another domain keeps the cache; a change in this one does not
+        other_version = modeler.preference_version(LearningDomain.ERROR_HANDLING)
+        modeler.learn_from_feedback(feedback("add tests", domain=LearningDomain.ERROR_HANDLING))
+        assert modeler.preference_version(LearningDomain.ERROR_HANDLING) != other_version
+        engine.generate_recommendations({}, domain)
+        assert engine.cache_stats["misses"] == 1
+
+        modeler.learn_from_feedback(feedback("be concise"))
+        updated = engine.generate_recommendations({}, domain)
+        assert engine.cache_stats["misses"] == 2
+        assert all("verbose" not in r.reasoning for r in updated)
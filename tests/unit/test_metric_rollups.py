@@ -0,0 +1,90 @@
+"""
+Unit tests for streaming metric rollups.
+
+Tests quantile sketch accuracy and merging, and sealing of rollup buckets.
+"""
+
+import random
+
+import pytest
+
+from src.codegenie.core.metric_rollups import QuantileSketch, Rollup, RollupAggregator
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestQuantileSketch:
+    """Test suite for QuantileSketch."""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test estimates stay within the configured relative error."""
+        rng = random.Random(3)
+        values = [rng.lognormvariate(0, 2) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.01, 0.5, 0.9, 0.99):
+            assert sketch.quantile(q) == pytest.approx(exact_quantile(values, q), rel=0.01)
+
+    def test_negative_and_zero_values(self):
+        """Test values on both sides of zero are ordered correctly."""
+        sketch = QuantileSketch()
+        for value in (-100, -1, 0, 0, 1, 100):
+            sketch.add(value)
+
+        assert sketch.quantile(0) == pytest.approx(-100, rel=0.01)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1) == pytest.approx(100, rel=0.01)
+
+    def test_merge_and_round_trip(self):
+        """Test merged sketches equal one sketch of all values and serialize losslessly."""
+        combined, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for index in range(1000):
+            value = (index % 97) - 20.5
+            combined.add(value)
+            (left if index % 2 else right).add(value)
+
+        left.merge(right)
+        restored = QuantileSketch.from_dict(left.to_dict())
+
+        assert restored.count == combined.count == 1000
+        for q in (0.1, 0.5, 0.95):
+            assert restored.quantile(q) == combined.quantile(q)
+        with pytest.raises(ValueError):
+            combined.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_empty_sketch(self):
+        """Test an empty sketch has no quantiles."""
+        assert QuantileSketch().quantile(0.5) is None
+        assert Rollup().summary()["p99"] is None
+
+
+class TestRollupAggregator:
+    """Test suite for RollupAggregator."""
+
+    def test_values_update_every_resolution(self):
+        """Test each value lands in one bucket per resolution."""
+        aggregator = RollupAggregator(resolutions=(1, 60))
+        aggregator.add(1, 1, 120.5, 2.0)
+        aggregator.add(1, 1, 120.7, 4.0)
+        aggregator.add(1, 1, 121.2, 6.0)
+
+        second = aggregator.open[(1, 1, 1, 120.0)].summary()
+        minute = aggregator.open[(60, 1, 1, 120.0)].summary()
+
+        assert (second["count"], second["sum"], second["min"], second["max"]) == (2, 6.0, 2.0, 4.0)
+        assert (minute["count"], minute["avg"]) == (3, 4.0)
+
+    def test_seal_respects_grace_period(self):
+        """Test buckets are sealed only after their end plus the grace period."""
+        aggregator = RollupAggregator(resolutions=(1, 60), grace_period=1.0)
+        aggregator.add(1, 1, 120.5, 1.0)
+
+        assert aggregator.seal(121.5) == []
+        assert [key for key, _ in aggregator.seal(122.0)] == [(1, 1, 1, 120.0)]
+        assert [key for key, _ in aggregator.seal(181.0)] == [(60, 1, 1, 120.0)]
+        assert aggregator.open == {}
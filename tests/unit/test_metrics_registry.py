@@ -0,0 +1,135 @@
+"""
+Unit tests for the in-process metrics registry.
+
+Tests native counter, gauge and histogram series, OpenMetrics rendering, and
+the registry feeds from MetricsCollector, Profiler and the web interface.
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from src.codegenie.core.metrics_registry import (
+    OPENMETRICS_CONTENT_TYPE, MetricsRegistry, sanitize_metric_name
+)
+from src.codegenie.core.monitoring_analytics import MetricsCollector
+from src.codegenie.core.performance_optimizer import Profiler
+from src.codegenie.ui.web_interface import WebInterface
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry."""
+
+    def test_counter_and_gauge_rendering(self):
+        """Test counters get a _total sample and labels are escaped."""
+        registry = MetricsRegistry()
+        registry.counter('api.requests', {'route': '/x'}, help_text='Requests').inc()
+        registry.counter('api.requests', {'route': '/x'}).inc(2)
+        registry.gauge('queue-depth', {'name': 'a"b'}).set(7)
+
+        text = registry.render_openmetrics()
+        assert text.splitlines() == [
+            '# TYPE api_requests counter',
+            '# HELP api_requests Requests',
+            'api_requests_total{route="/x"} 3.0',
+            '# TYPE queue_depth gauge',
+            'queue_depth{name="a\\"b"} 7.0',
+            '# EOF',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts include all smaller observations."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        lines = registry.render_openmetrics().splitlines()
+        assert 'latency_bucket{le="0.1"} 2' in lines
+        assert 'latency_bucket{le="1.0"} 3' in lines
+        assert 'latency_bucket{le="+Inf"} 4' in lines
+        assert 'latency_sum 3.65' in lines
+        assert 'latency_count 4' in lines
+
+    def test_type_conflicts_and_names(self):
+        """Test a name keeps its first type and names are sanitized."""
+        registry = MetricsRegistry()
+        registry.counter('jobs_total').inc()
+        assert 'jobs' in registry.names()
+        with pytest.raises(ValueError):
+            registry.gauge('jobs')
+        with pytest.raises(ValueError):
+            registry.counter('jobs').inc(-1)
+        assert sanitize_metric_name('9.cpu usage') == '_9_cpu_usage'
+
+    def test_concurrent_increments(self):
+        """Test no increments are lost across threads."""
+        registry = MetricsRegistry()
+
+        def work():
+            for _ in range(10000):
+                registry.counter('hits', {'worker': 'shared'}).inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert registry.counter('hits', {'worker': 'shared'}).value == 40000
+
+
+class TestRegistryFeeds:
+    """Test the registry is fed by the metric producers."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_collector_updates_registry(self):
+        """Test counters, gauges and timers reach the registry."""
+        registry = MetricsRegistry()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            collector = MetricsCollector({
+                'db_path': Path(temp_dir) / 'metrics.db',
+                'metrics_registry': registry
+            })
+            await collector.increment_counter('requests', 2, tags={'route': 'chat'})
+            await collector.increment_counter('requests', 3, tags={'route': 'chat'})
+            await collector.set_gauge('memory.usage', 51.5)
+            await collector.record_timer('request.duration', 0.2)
+            await collector.close()
+
+        lines = registry.render_openmetrics().splitlines()
+        assert 'requests_total{route="chat"} 5.0' in lines
+        assert 'memory_usage 51.5' in lines
+        assert 'request_duration_count 1' in lines
+
+    def test_profiler_observes_durations(self):
+        """Test profiled calls are observed per function."""
+        registry = MetricsRegistry()
+        profiler = Profiler(registry=registry)
+
+        @profiler.profile
+        def work():
+            return 1
+
+        work()
+        work()
+
+        histogram = registry.histogram(Profiler.DURATION_METRIC, {'function': 'work'})
+        assert histogram.count == 2
+
+    @pytest.mark.asyncio
+    async def test_web_interface_endpoint(self):
+        """Test /metrics serves the registry as OpenMetrics text."""
+        web_interface = WebInterface(Mock(), Mock())
+        web_interface.metrics_registry = MetricsRegistry()
+        web_interface.metrics_registry.gauge('workflows_active').set(2)
+
+        response = await web_interface.get_metrics(make_mocked_request('GET', '/metrics'))
+
+        assert response.headers['Content-Type'] == OPENMETRICS_CONTENT_TYPE
+        assert 'workflows_active 2.0' in response.text
+        assert response.text.endswith('# EOF\n')
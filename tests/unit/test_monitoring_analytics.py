@@ -4,6 +4,7 @@ Unit tests for the monitoring and analytics system.
 
 import asyncio
 import pytest
+import sqlite3
 import tempfile
 import time
 from datetime import datetime, timedelta
@@ -40,7 +41,10 @@ class TestMetricsCollector:
             'db_path': temp_dir / 'metrics.db',
             'max_metrics': 1000
         }
-        return MetricsCollector(config)
+        collector = MetricsCollector(config)
+        yield collector
+        # Stop the writer thread before the temporary directory is removed
+        collector.writer.close()
     
     @pytest.mark.asyncio
     async def test_record_metric(self, metrics_collector):
@@ -157,6 +161,127 @@ class TestMetricsCollector:
         )
         
         assert len(recent_metrics) >= 1
+    
+    @pytest.mark.asyncio
+    async def test_dimensions_are_interned(self, metrics_collector):
+        """Test names and label sets are stored once and samples reference them."""
+        for i in range(50):
+            await metrics_collector.record_metric(f"series_{i % 2}", i, tags={"host": f"h{i % 5}"})
+        await metrics_collector.flush()
+        
+        with sqlite3.connect(metrics_collector.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM metric_names").fetchone()[0] == 2
+            assert conn.execute("SELECT COUNT(*) FROM label_sets").fetchone()[0] == 5
+            assert conn.execute("SELECT COUNT(*) FROM metric_samples").fetchone()[0] == 50
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        
+        # A new collector on the same database continues the interned ids
+        reopened = MetricsCollector({'db_path': metrics_collector.db_path})
+        await reopened.record_metric("series_0", 1.0, tags={"host": "h0"})
+        await reopened.record_metric("series_2", 1.0, tags={"host": "h9"})
+        metrics = await reopened.get_metrics(name_pattern="series_")
+        await reopened.close()
+        
+        assert len(metrics) == 52
+        assert {m.tags["host"] for m in metrics} == {"h0", "h1", "h2", "h3", "h4", "h9"}
+    
+    @pytest.mark.asyncio
+    async def test_collectors_share_a_database(self, metrics_collector):
+        """Test collectors started together on one database keep their series apart."""
+        other = MetricsCollector({'db_path': metrics_collector.db_path})
+        try:
+            await metrics_collector.record_metric("cpu", 99.0, tags={"host": "a"})
+            await other.record_metric("mem", 1.0, tags={"host": "b"})
+            await metrics_collector.flush()
+            await other.flush()
+            
+            # Each sees the series the other stored
+            assert [m.value for m in await metrics_collector.get_metrics(name="mem")] == [1.0]
+            assert [m.tags for m in await other.get_metrics(name="cpu")] == [{"host": "a"}]
+        finally:
+            await other.close()
+        
+        fresh = MetricsCollector({'db_path': metrics_collector.db_path})
+        try:
+            assert [m.value for m in await fresh.get_metrics(name="cpu")] == [99.0]
+            assert [(m.value, m.tags) for m in await fresh.get_metrics(name="mem")] == [(1.0, {"host": "b"})]
+        finally:
+            await fresh.close()
+    
+    @pytest.mark.asyncio
+    async def test_exact_and_prefix_lookups(self, metrics_collector):
+        """Test exact, prefix and substring name filters."""
+        for name in ("api.latency", "api.errors", "db.latency"):
+            await metrics_collector.record_metric(name, 1.0)
+        
+        exact = await metrics_collector.get_metrics(name="api.latency")
+        prefix = await metrics_collector.get_metrics(name_prefix="api.")
+        pattern = await metrics_collector.get_metrics(name_pattern="latency")
+        missing = await metrics_collector.get_metrics(name="nope")
+        
+        assert [m.name for m in exact] == ["api.latency"]
+        assert sorted(m.name for m in prefix) == ["api.errors", "api.latency"]
+        assert sorted(m.name for m in pattern) == ["api.latency", "db.latency"]
+        assert missing == []
+    
+    @pytest.mark.asyncio
+    async def test_rollups_merge_stored_and_open_buckets(self, metrics_collector):
+        """Test rollups combine sealed rows with buckets still in memory."""
+        for value in range(1, 101):
+            await metrics_collector.record_metric("latency", value, tags={"host": f"h{value % 2}"})
+        # Persist everything recorded so far, as if the buckets had closed
+        assert metrics_collector._seal_rollups(time.time(), drain=True) > 0
+        for value in range(101, 201):
+            await metrics_collector.record_metric("latency", value, tags={"host": "h0"})
+        
+        merged = await metrics_collector.get_rollups(resolution=3600, name="latency")
+        by_host = await metrics_collector.get_rollups(
+            resolution=3600, name="latency", merge_label_sets=False
+        )
+        
+        assert sum(r["count"] for r in merged) == 200
+        if len(merged) == 1:  # Unless the hour rolled over mid-test
+            assert merged[0]["min"] == 1 and merged[0]["max"] == 200
+            assert merged[0]["p50"] == pytest.approx(100, rel=0.02)
+        assert {r["tags"]["host"] for r in by_host} == {"h0", "h1"}
+        with pytest.raises(ValueError):
+            await metrics_collector.get_rollups(resolution=5)
+    
+    @pytest.mark.asyncio
+    async def test_retention_downsamples(self, metrics_collector):
+        """Test old raw points and fine rollups are dropped before coarse ones."""
+        await metrics_collector.record_metric("cpu", 50.0)
+        metrics_collector._seal_rollups(time.time(), drain=True)
+        
+        await metrics_collector.apply_retention(now=time.time() + 8 * 86400)
+        
+        assert await metrics_collector.get_metrics(name="cpu") == []
+        assert await metrics_collector.get_rollups(resolution=1, name="cpu") == []
+        assert await metrics_collector.get_rollups(resolution=60, name="cpu") == []
+        hourly = await metrics_collector.get_rollups(resolution=3600, name="cpu")
+        assert [r["count"] for r in hourly] == [1]
+    
+    @pytest.mark.asyncio
+    async def test_legacy_metrics_are_migrated(self, temp_dir):
+        """Test rows of the old metrics table are moved to the sample table."""
+        db_path = temp_dir / 'legacy.db'
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                CREATE TABLE metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, value REAL NOT NULL,
+                    metric_type TEXT NOT NULL, timestamp TEXT NOT NULL, tags TEXT, labels TEXT
+                )
+            ''')
+            conn.execute(
+                "INSERT INTO metrics (name, value, metric_type, timestamp, tags, labels) VALUES (?, ?, ?, ?, ?, ?)",
+                ("old_metric", 3.0, "gauge", datetime.now().isoformat(), '{"a": "b"}', '{}')
+            )
+        
+        collector = MetricsCollector({'db_path': db_path})
+        metrics = await collector.get_metrics(name_pattern="old_metric")
+        await collector.close()
+        
+        assert [(m.name, m.value, m.tags) for m in metrics] == [("old_metric", 3.0, {"a": "b"})]
 
 
 class TestAlertManager:
@@ -172,7 +297,9 @@ class TestAlertManager:
         config = {
             'db_path': temp_dir / 'alerts.db'
         }
-        return AlertManager(config)
+        manager = AlertManager(config)
+        yield manager
+        manager.writer.close()
     
     @pytest.mark.asyncio
     async def test_create_alert(self, alert_manager):
@@ -408,7 +535,9 @@ class TestUsageTracker:
         config = {
             'db_path': temp_dir / 'usage.db'
         }
-        return UsageTracker(config)
+        tracker = UsageTracker(config)
+        yield tracker
+        tracker.writer.close()
     
     @pytest.mark.asyncio
     async def test_track_usage(self, usage_tracker):
@@ -509,7 +638,10 @@ class TestMonitoringAnalytics:
                 'db_path': temp_dir / 'usage.db'
             }
         }
-        return MonitoringAnalytics(config)
+        system = MonitoringAnalytics(config)
+        yield system
+        for component in (system.metrics_collector, system.alert_manager, system.usage_tracker):
+            component.writer.close()
     
     def test_initialization(self, monitoring_system):
         """Test monitoring system initialization."""
@@ -590,6 +722,35 @@ class TestMonitoringPerformance:
         assert collection_time < 2.0  # Under 2 seconds for 1000 metrics
         assert len(collector.metrics) == 1000
     
+    @pytest.mark.asyncio
+    async def test_sustained_ingest_rate(self, temp_dir):
+        """Benchmark sustained metric ingest including the final flush to disk."""
+        collector = MetricsCollector({
+            'db_path': temp_dir / 'metrics.db',
+            'write_batch_size': 2000
+        })
+        count = 50000
+        
+        start_time = time.perf_counter()
+        for i in range(count):
+            await collector.record_metric(
+                f"metric_{i % 20}", i, MetricType.GAUGE, tags={"shard": str(i % 8)}
+            )
+        await collector.flush()
+        elapsed = time.perf_counter() - start_time
+        
+        stats = collector.get_write_stats()
+        await collector.close()
+        
+        rate = count / elapsed
+        print(f"\nSustained ingest: {rate:,.0f} metrics/s "
+              f"({stats['batches']} batches, writer {stats['rows_per_second']:,.0f} rows/s)")
+        
+        assert stats['dropped'] == 0
+        assert stats['written'] == count  # Names and label sets are stored when first seen
+        assert (stats['series_names'], stats['label_sets']) == (20, 8)
+        assert rate > 10000
+    
     @pytest.mark.asyncio
     async def test_alert_processing_performance(self, temp_dir):
         """Test alert processing performance."""
@@ -4,6 +4,8 @@ Unit tests for Proactive Monitoring System.
 
 import pytest
 import asyncio
+import os
+import time
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime, timedelta
@@ -126,6 +128,63 @@ class TestCodebaseMonitor:
         frequency = monitor.get_change_frequency(file_path)
         
         assert frequency == 2
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_stat_skips_hashing(self, monitor, temp_project):
+        """Test files are only re-hashed when their mtime or size changed."""
+        old = time.time() - 60
+        for file_path in temp_project.glob("*.py"):
+            os.utime(file_path, (old, old))
+        await monitor.start_monitoring()
+        hashed = monitor.stats['files_hashed']
+        
+        assert await monitor.detect_changes() == []
+        assert monitor.stats['files_hashed'] == hashed
+        
+        # Touched but identical content: re-hashed, not reported
+        os.utime(temp_project / "main.py", (old + 1, old + 1))
+        assert await monitor.detect_changes() == []
+        assert monitor.stats['files_hashed'] == hashed + 1
+    
+    @pytest.mark.asyncio
+    async def test_watcher_batches_changes(self, temp_project):
+        """Test watched changes are debounced into one batch of touched files."""
+        monitor = CodebaseMonitor(temp_project, debounce_interval=0.2)
+        await monitor.start_monitoring(watch=True)
+        if not monitor.watching:
+            pytest.skip("file system watcher unavailable")
+        try:
+            # The first batch is the full scan queued when watching starts
+            await monitor.wait_for_changes(timeout=0.5)
+            statted = monitor.stats['files_statted']
+            
+            (temp_project / "a.py").write_text("x = 1\n")
+            (temp_project / "main.py").write_text("def main():\n    return 1\n")
+            (temp_project / "notes.txt").write_text("ignored")
+            
+            changes = await monitor.wait_for_changes(timeout=5)
+            
+            assert {(c.file_path.name, c.change_type) for c in changes} == {
+                ("a.py", "created"), ("main.py", "modified")
+            }
+            # Only the touched files were checked, not the whole tree
+            assert monitor.stats['files_statted'] - statted == 2
+            assert await monitor.wait_for_changes(timeout=0.3) == []
+        finally:
+            monitor.stop_watching()
+    
+    @pytest.mark.asyncio
+    async def test_polling_fallback(self, temp_project):
+        """Test changes are polled when no watcher is available."""
+        monitor = CodebaseMonitor(temp_project, poll_interval=0.05)
+        with patch('src.codegenie.core.proactive_monitoring._WATCHDOG_AVAILABLE', False):
+            await monitor.start_monitoring(watch=True)
+        assert not monitor.watching
+        
+        (temp_project / "utils.py").unlink()
+        changes = await monitor.wait_for_changes(timeout=1)
+        
+        assert [(c.file_path.name, c.change_type) for c in changes] == [("utils.py", "deleted")]
 
 
 class TestIssueDetector:
@@ -426,6 +485,57 @@ def new_function():
         assert len(result.issues) > 0  # Should find missing docstrings
         assert len(result.suggestions) > 0
     
+    @pytest.mark.asyncio
+    async def test_rescan_reuses_results_and_reports_delta(self, assistant, temp_project):
+        """Test unchanged files are not re-analyzed and the delta lists fixed and new issues."""
+        first = await assistant.scan_entire_codebase()
+        assert first.delta.files_analyzed == first.files_monitored
+        assert len(first.delta.new_issues) == len(first.issues)
+        
+        second = await assistant.scan_entire_codebase()
+        assert second.delta.files_analyzed == 0
+        assert second.delta.new_issues == [] and second.delta.resolved_issues == []
+        assert len(second.issues) == len(first.issues)
+        
+        (temp_project / "main.py").write_text('def main():\n    """Entry point."""\n')
+        (temp_project / "extra.py").write_text("def extra():\n    pass\n")
+        third = await assistant.scan_entire_codebase()
+        
+        assert third.delta.files_analyzed == 2
+        assert [issue.file_path.name for issue in third.delta.new_issues] == ["extra.py"]
+        assert third.delta.resolved_issues
+        assert all(issue.file_path.name == "main.py" for issue in third.delta.resolved_issues)
+        assert len(assistant.issue_detector.detected_issues) == len(third.issues)
+    
+    @pytest.mark.asyncio
+    async def test_parallel_detection_matches_serial(self, temp_project):
+        """Test detection in a process pool finds the same issues without blocking the loop."""
+        for index in range(6):
+            (temp_project / f"module_{index}.py").write_text(f"def function_{index}():\n    pass\n")
+        files = sorted(temp_project.glob("*.py"))
+        
+        serial, _ = await IssueDetector(parallel_threshold=1000).scan_files(files)
+        
+        ticks = 0
+        
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+        
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            parallel, _ = await IssueDetector(max_workers=2, parallel_threshold=2).scan_files(files)
+        finally:
+            heartbeat_task.cancel()
+        assert ticks > 0
+        
+        def describe(issues):
+            return sorted((issue.file_path.name, issue.description) for issue in issues)
+        
+        assert describe(parallel) == describe(serial)
+    
     def test_get_summary(self, assistant):
         """Test getting monitoring summary."""
         assistant.monitoring_active = True
@@ -0,0 +1,188 @@
+"""
+Unit tests for the hybrid rate limiter.
+
+Tests local GCRA decisions, sub-second accounting and reconciliation between
+nodes through the in-memory Redis stand-in, and benchmarks the API rate limit
+middleware.
+"""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from src.codegenie.integrations.api_system import APISystem
+from src.codegenie.integrations.rate_limiting import RateLimiter
+from tests.memory_redis import InMemoryRedis
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter."""
+
+    def test_burst_up_to_limit(self):
+        """Test that a full bucket admits exactly ``limit`` requests."""
+        limiter = RateLimiter(clock=FakeClock())
+
+        results = [limiter.check("key", 10, 60) for _ in range(11)]
+
+        assert [allowed for allowed, _ in results] == [True] * 10 + [False]
+        assert [info["remaining"] for _, info in results[:10]] == list(range(9, -1, -1))
+        assert results[-1][1]["retry_after"] == 6
+
+    def test_sub_second_refill(self):
+        """Test that budget refills continuously rather than per second."""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+        for _ in range(10):
+            limiter.check("key", 10, 1)
+
+        assert not limiter.check("key", 10, 1)[0]
+        clock.now += 0.1
+        assert limiter.check("key", 10, 1)[0]
+        assert not limiter.check("key", 10, 1)[0]
+
+    def test_same_second_requests_all_counted(self):
+        """Test that requests within one second are not collapsed."""
+        limiter = RateLimiter(clock=FakeClock())
+
+        allowed = sum(limiter.check("key", 5, 3600)[0] for _ in range(20))
+
+        assert allowed == 5
+
+    def test_keys_are_independent(self):
+        """Test separate buckets per key."""
+        limiter = RateLimiter(clock=FakeClock())
+        for _ in range(3):
+            limiter.check("a", 3, 60)
+
+        assert not limiter.check("a", 3, 60)[0]
+        assert limiter.check("b", 3, 60)[0]
+
+    @pytest.mark.asyncio
+    async def test_sync_pushes_local_usage(self):
+        """Test that admitted requests are added to the shared counter."""
+        redis_client = InMemoryRedis()
+        limiter = RateLimiter(redis_client, clock=FakeClock())
+        for _ in range(7):
+            limiter.check("key", 100, 60)
+
+        assert await limiter.sync()
+        assert await redis_client.get("rate_limit:key") == b"7"
+        assert await redis_client.ttl("rate_limit:key") == 120
+        await limiter.stop()
+
+    @pytest.mark.asyncio
+    async def test_nodes_share_budget(self):
+        """Test that usage on one node is charged to the other after a sync."""
+        redis_client = InMemoryRedis()
+        clock = FakeClock()
+        node_a = RateLimiter(redis_client, clock=clock)
+        node_b = RateLimiter(redis_client, clock=clock)
+
+        # The first sync of a key only records the shared counter
+        node_a.check("key", 10, 60)
+        node_b.check("key", 10, 60)
+        await node_a.sync()
+        await node_b.sync()
+
+        for _ in range(6):
+            assert node_a.check("key", 10, 60)[0]
+        await node_a.sync()
+        await node_b.sync()
+
+        # Node B has used 1 and is charged A's 6: three remain
+        assert [node_b.check("key", 10, 60)[0] for _ in range(4)] == [True, True, True, False]
+        await node_a.stop()
+        await node_b.stop()
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_keeps_pending_usage(self):
+        """Test that usage is retried after a failed sync."""
+        redis_client = InMemoryRedis()
+        limiter = RateLimiter(redis_client, clock=FakeClock())
+        limiter.check("key", 100, 60)
+
+        async def failing_execute(*args, **kwargs):
+            raise ConnectionError("down")
+
+        original = redis_client.pipeline
+        redis_client.pipeline = lambda *a, **kw: type("Pipe", (), {
+            "incrby": lambda self, *a: self, "expire": lambda self, *a: self,
+            "execute": failing_execute
+        })()
+        assert not await limiter.sync()
+        assert limiter.check("key", 100, 60)[0]
+
+        redis_client.pipeline = original
+        assert await limiter.sync()
+        assert await redis_client.get("rate_limit:key") == b"2"
+        await limiter.stop()
+
+
+class TestInMemoryRedis:
+    """Test suite for the Redis stand-in."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_and_commands(self):
+        """Test the commands used by the API system."""
+        redis_client = InMemoryRedis()
+        pipe = redis_client.pipeline()
+        pipe.hincrby("stats", "total", 2)
+        pipe.lpush("times", 0.5, 0.25)
+        pipe.ltrim("times", 0, 0)
+        pipe.setex("request", 60, "{}")
+
+        assert await pipe.execute() == [2, 2, True, True]
+        assert await redis_client.hgetall("stats") == {b"total": b"2"}
+        assert await redis_client.lrange("times", 0, -1) == [b"0.25"]
+        assert await redis_client.get("request") == b"{}"
+        assert redis_client.round_trips == 4
+
+
+class TestRateLimitMiddleware:
+    """Benchmark for the API rate limit middleware."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_middleware_throughput(self):
+        """Benchmark _rate_limit_middleware against a Redis with 1ms round trips."""
+        api_system = APISystem(Mock(), Mock(), Mock(), "test_secret_key")
+        redis_client = InMemoryRedis(latency=0.001)
+        api_system.rate_limiter = RateLimiter(redis_client, sync_interval=0.05)
+        _, api_key = api_system.create_api_key("Bench Key", ["read"], rate_limit=1_000_000)
+
+        async def handler(request):
+            return web.Response(text="ok")
+
+        request = make_mocked_request("GET", "/api/v1/context/search")
+        request["api_key"] = api_key
+
+        num_requests = 20000
+        start_time = time.perf_counter()
+        for _ in range(num_requests):
+            response = await api_system._rate_limit_middleware(request, handler)
+        elapsed = time.perf_counter() - start_time
+        await api_system.rate_limiter.stop()
+
+        throughput = num_requests / elapsed
+        print(f"Rate limit middleware: {throughput:,.0f} req/s, "
+              f"{elapsed / num_requests * 1e6:.1f} us/req, {redis_client.round_trips} Redis round trips")
+
+        assert response.status == 200
+        # The bucket refills a little while the benchmark runs
+        assert int(response.headers["X-RateLimit-Remaining"]) >= 1_000_000 - num_requests
+        # A per-request Redis round trip would cap this at well under 1000 req/s
+        assert throughput > 10000
+        assert redis_client.round_trips < num_requests / 100
+        assert int(await redis_client.get(f"rate_limit:api_key:{api_key.key_id}")) == num_requests
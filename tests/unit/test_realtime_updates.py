@@ -0,0 +1,342 @@
+"""
+Unit tests for real-time update fan-out.
+
+Tests per-client send queues: isolation from slow clients, coalescing,
+overflow policies, disconnection of lagging clients and channel routing, and
+batching of command output into frames.
+"""
+
+import asyncio
+import base64
+import json
+import zlib
+
+import pytest
+
+from src.codegenie.ui.realtime_updates import (
+    CommandOutputStreamer, PlanUpdate, ProgressUpdate, RealtimeUpdateManager
+)
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording sent messages."""
+
+    def __init__(self, blocked: bool = False):
+        self.messages = []
+        self.closed = False
+        self.close_code = None
+        self.unblock = asyncio.Event()
+        if not blocked:
+            self.unblock.set()
+
+    async def send_str(self, data):
+        await self.unblock.wait()
+        self.messages.append(json.loads(data))
+
+    async def close(self, code=None, message=b''):
+        self.closed = True
+        self.close_code = code
+        self.unblock.set()
+
+
+def progress(task_id, value):
+    return ProgressUpdate(
+        type='task_progress', task_id=task_id, task_name=task_id, progress=value,
+        message=f"{value}%", timestamp="2026-01-01T00:00:00"
+    )
+
+
+async def settle():
+    await asyncio.sleep(0.01)
+
+
+class TestRealtimeUpdateManager:
+    """Test suite for RealtimeUpdateManager fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self):
+        """Test a blocked client does not hold up delivery to other clients."""
+        manager = RealtimeUpdateManager()
+        slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+        manager.register_websocket(slow, ['global'])
+        manager.register_websocket(fast, ['global'])
+
+        for index in range(3):
+            await manager._broadcast_update({'type': 'notification', 'data': {'n': index}})
+        await settle()
+
+        assert [m['data']['n'] for m in fast.messages] == [0, 1, 2]
+        assert slow.messages == []
+        assert manager.get_stats()['max_queue_depth'] == 2
+
+        slow.unblock.set()
+        await settle()
+        assert [m['data']['n'] for m in slow.messages] == [0, 1, 2]
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_progress_updates_coalesce(self):
+        """Test queued progress updates for a task are replaced by newer ones."""
+        manager = RealtimeUpdateManager()
+        ws = FakeWebSocket(blocked=True)
+        manager.register_websocket(ws, ['progress'])
+
+        await manager._broadcast_update({'type': 'notification', 'channel': 'progress', 'data': {}})
+        await settle()
+        for value in range(10, 101, 10):
+            await manager.send_progress_update(progress('build', value))
+            await manager._broadcast_update(manager.update_queue.get_nowait())
+
+        ws.unblock.set()
+        await settle()
+
+        progress_messages = [m for m in ws.messages if m['type'] == 'progress_update']
+        assert [m['data']['progress'] for m in progress_messages] == [100]
+        assert manager.get_stats()['coalesced'] == 9
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_plan_steps_coalesce_independently(self):
+        """Test plan updates only coalesce for the same step."""
+        manager = RealtimeUpdateManager()
+        ws = FakeWebSocket(blocked=True)
+        manager.register_websocket(ws, ['plans'])
+
+        for step, status in (('a', 'in_progress'), ('b', 'in_progress'), ('a', 'completed')):
+            await manager.send_plan_update(PlanUpdate('p1', step, status, 0, '', 'now'))
+            await manager._broadcast_update(manager.update_queue.get_nowait())
+
+        ws.unblock.set()
+        await settle()
+
+        assert [(m['data']['step_id'], m['data']['status']) for m in ws.messages] == [
+            ('a', 'completed'), ('b', 'in_progress')
+        ]
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest(self):
+        """Test the oldest queued message is dropped when a queue is full."""
+        manager = RealtimeUpdateManager(max_queue_size=3)
+        ws = FakeWebSocket(blocked=True)
+        manager.register_websocket(ws)
+
+        for index in range(6):
+            await manager._broadcast_update({'type': 'notification', 'data': {'n': index}})
+            if index == 0:
+                await settle()
+        ws.unblock.set()
+        await settle()
+
+        # Message 0 was already being sent when the queue filled up
+        assert [m['data']['n'] for m in ws.messages] == [0, 3, 4, 5]
+        assert manager.get_stats()['dropped'] == 2
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_drop_newest_policy(self):
+        """Test the drop_newest policy keeps the queued messages."""
+        manager = RealtimeUpdateManager(max_queue_size=2, overflow_policy='drop_newest')
+        ws = FakeWebSocket(blocked=True)
+        manager.register_websocket(ws)
+
+        for index in range(5):
+            await manager._broadcast_update({'type': 'notification', 'data': {'n': index}})
+            if index == 0:
+                await settle()
+        ws.unblock.set()
+        await settle()
+
+        assert [m['data']['n'] for m in ws.messages] == [0, 1, 2]
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_lagging_client_is_disconnected(self):
+        """Test a client whose queue is full of stale messages is dropped."""
+        manager = RealtimeUpdateManager(max_queue_size=2, max_lag=0.01)
+        slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+        manager.register_websocket(slow)
+        manager.register_websocket(fast)
+
+        for index in range(3):
+            await manager._broadcast_update({'type': 'notification', 'data': {'n': index}})
+            if index == 0:
+                await settle()
+        await asyncio.sleep(0.02)
+        await manager._broadcast_update({'type': 'notification', 'data': {'n': 3}})
+        await settle()
+
+        assert slow.closed
+        assert slow not in manager.clients
+        assert len(fast.messages) == 4
+        assert manager.get_stats()['disconnected_slow'] == 1
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_send_timeout_disconnects(self):
+        """Test a send that never completes disconnects the client."""
+        manager = RealtimeUpdateManager(send_timeout=0.01)
+        ws = FakeWebSocket(blocked=True)
+        manager.register_websocket(ws)
+
+        await manager._broadcast_update({'type': 'notification', 'data': {}})
+        await asyncio.sleep(0.05)
+
+        assert ws.closed
+        assert manager.get_stats()['clients'] == 0
+
+    @pytest.mark.asyncio
+    async def test_channel_routing(self):
+        """Test updates reach channel and global subscribers only."""
+        manager = RealtimeUpdateManager()
+        plans, commands, everything = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        manager.register_websocket(plans, ['plans'])
+        manager.register_websocket(commands, ['commands'])
+        manager.register_websocket(everything, ['global'])
+
+        await manager._broadcast_update({'type': 'plan_update', 'channel': 'plans', 'data': {}})
+        await settle()
+
+        assert len(plans.messages) == 1
+        assert commands.messages == []
+        assert len(everything.messages) == 1
+
+        manager.unregister_websocket(plans)
+        await manager._broadcast_update({'type': 'plan_update', 'channel': 'plans', 'data': {}})
+        await settle()
+        assert len(plans.messages) == 1
+        assert len(everything.messages) == 2
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_closed_sockets_are_released(self):
+        """Test a socket closed without unregistering is dropped on the next broadcast."""
+        manager = RealtimeUpdateManager()
+        gone, live = FakeWebSocket(), FakeWebSocket()
+        manager.register_websocket(gone)
+        manager.register_websocket(live)
+        gone.closed = True
+
+        await manager._broadcast_update({'type': 'notification', 'data': {}})
+        await settle()
+
+        assert gone not in manager.clients
+        assert manager.get_stats()['clients'] == 1
+        assert len(live.messages) == 1
+        await manager.stop()
+
+
+def drain_frames(manager):
+    updates = []
+    while not manager.update_queue.empty():
+        updates.append(manager.update_queue.get_nowait())
+    return [u['data'] for u in updates if u['type'] == 'command_output']
+
+
+class TestCommandOutputStreamer:
+    """Test suite for CommandOutputStreamer batching."""
+
+    @pytest.mark.asyncio
+    async def test_lines_batched_within_interval(self):
+        """Test a burst of lines is sent as a single frame."""
+        manager = RealtimeUpdateManager()
+        streamer = CommandOutputStreamer(manager, flush_interval=0.01)
+        await streamer.start_command('c1', 'pytest -v')
+
+        for index in range(500):
+            await streamer.stream_output('c1', f"test_{index} PASSED", 'stdout' if index % 7 else 'stderr')
+        assert drain_frames(manager) == []
+
+        await asyncio.sleep(0.03)
+        frames = drain_frames(manager)
+
+        assert len(frames) == 1
+        assert frames[0]['first_line'] == 0
+        assert frames[0]['line_count'] == 500
+        assert frames[0]['chunks'][7] == {'output_type': 'stderr', 'content': 'test_7 PASSED'}
+
+    @pytest.mark.asyncio
+    async def test_frame_flushed_at_size_limit(self):
+        """Test a frame is sent as soon as it reaches the size limit."""
+        manager = RealtimeUpdateManager()
+        streamer = CommandOutputStreamer(manager, flush_interval=60, max_frame_bytes=100)
+        await streamer.start_command('c1', 'npm install')
+
+        for _ in range(10):
+            await streamer.stream_output('c1', 'x' * 30)
+        frames = drain_frames(manager)
+
+        assert [frame['line_count'] for frame in frames] == [4, 4]
+        assert [frame['first_line'] for frame in frames] == [0, 4]
+        await streamer.flush('c1')
+        assert drain_frames(manager)[0]['line_count'] == 2
+
+    @pytest.mark.asyncio
+    async def test_size_limit_counts_encoded_bytes(self):
+        """Test multi-byte output is measured in UTF-8 bytes, not characters."""
+        manager = RealtimeUpdateManager()
+        streamer = CommandOutputStreamer(manager, flush_interval=60, max_frame_bytes=100)
+        await streamer.start_command('c1', 'build')
+
+        # 30 characters but 90 bytes each
+        for _ in range(2):
+            await streamer.stream_output('c1', '█' * 30)
+        frames = drain_frames(manager)
+
+        assert [frame['line_count'] for frame in frames] == [2]
+        assert streamer.stats['bytes_in'] == 180
+
+    @pytest.mark.asyncio
+    async def test_completion_follows_pending_output(self):
+        """Test pending output is flushed before the completion message."""
+        manager = RealtimeUpdateManager()
+        streamer = CommandOutputStreamer(manager, flush_interval=60)
+        await streamer.start_command('c1', 'make')
+        await streamer.stream_output('c1', 'building')
+
+        await streamer.complete_command('c1', 0)
+
+        outputs = drain_frames(manager)
+        assert outputs[0]['chunks'] == [{'output_type': 'stdout', 'content': 'building'}]
+        assert outputs[1]['output_type'] == 'completion'
+
+    @pytest.mark.asyncio
+    async def test_bounded_scrollback_and_range_fetch(self):
+        """Test only recent lines are kept and can be fetched by line number."""
+        manager = RealtimeUpdateManager()
+        streamer = CommandOutputStreamer(manager, max_scrollback_lines=5)
+        await streamer.start_command('c1', 'tail -f log')
+
+        for index in range(12):
+            await streamer.stream_output('c1', f"line {index}")
+        await streamer.flush()
+
+        full = streamer.get_output_range('c1')
+        assert full['truncated'] is True
+        assert full['first_line'] == 7
+        assert [line['content'] for line in full['lines']] == [f"line {i}" for i in range(7, 12)]
+
+        window = streamer.get_output_range('c1', 8, 10)
+        assert [line['line'] for line in window['lines']] == [8, 9]
+        assert window['truncated'] is False
+        assert len(streamer.get_command_output('c1')) == 5
+        assert streamer.get_output_range('missing') is None
+
+    @pytest.mark.asyncio
+    async def test_large_frames_compressed(self):
+        """Test frames above the threshold are deflate-compressed."""
+        manager = RealtimeUpdateManager()
+        streamer = CommandOutputStreamer(manager, compress_threshold=1024)
+        await streamer.start_command('c1', 'pytest -v')
+
+        lines = [f"tests/test_module.py::test_case_{i} PASSED" for i in range(200)]
+        for line in lines:
+            await streamer.stream_output('c1', line)
+        await streamer.flush('c1')
+
+        frame = drain_frames(manager)[0]
+        assert frame['encoding'] == 'deflate-base64'
+        assert frame['chunks'] is None
+        chunks = json.loads(zlib.decompress(base64.b64decode(frame['payload'])))
+        assert [chunk['content'] for chunk in chunks] == lines
+        assert streamer.stats['bytes_sent'] < streamer.stats['bytes_in'] / 4
@@ -0,0 +1,131 @@
+"""
+Unit tests for static asset serving.
+
+Tests precompressed variants, content negotiation, ETag validation and
+versioned URLs in the web interface.
+"""
+
+import gzip
+from unittest.mock import Mock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from src.codegenie.ui.static_assets import (
+    StaticAssetStore, etag_matches, parse_accept_encoding
+)
+from src.codegenie.ui.web_interface import WebInterface
+
+
+CSS = "body { margin: 0; }\n" * 100
+
+
+def get(path, headers=None):
+    return make_mocked_request("GET", path, headers=headers or {})
+
+
+class TestStaticAssetStore:
+    """Test suite for StaticAssetStore."""
+
+    def test_gzip_variant_and_etag(self):
+        """Test assets are precompressed and tagged by content."""
+        store = StaticAssetStore()
+        asset = store.add('style.css', CSS, 'text/css')
+
+        assert gzip.decompress(asset.variants['gzip']) == CSS.encode()
+        assert asset.etag == f'"{asset.version}"'
+        assert store.add('other.css', CSS, 'text/css').etag == asset.etag
+        assert store.add('small.css', 'a{}', 'text/css').variants == {}
+
+    def test_negotiates_encoding(self):
+        """Test the response honours Accept-Encoding."""
+        store = StaticAssetStore()
+        store.add('style.css', CSS, 'text/css')
+
+        compressed = store.response(get('/style.css', {'Accept-Encoding': 'gzip, deflate'}), 'style.css')
+        plain = store.response(get('/style.css', {'Accept-Encoding': 'gzip;q=0, identity'}), 'style.css')
+
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.body) == CSS.encode()
+        assert compressed.headers['Vary'] == 'Accept-Encoding'
+        assert 'Content-Encoding' not in plain.headers
+        assert plain.body == CSS.encode()
+
+    def test_if_none_match_returns_304(self):
+        """Test a matching ETag is answered without a body."""
+        store = StaticAssetStore()
+        asset = store.add('style.css', CSS, 'text/css')
+
+        response = store.response(get('/style.css', {'If-None-Match': f'W/{asset.etag}'}), 'style.css')
+        stale = store.response(get('/style.css', {'If-None-Match': '"other"'}), 'style.css')
+
+        assert response.status == 304
+        assert response.body is None
+        assert stale.status == 200
+        assert store.stats['not_modified'] == 1
+
+    def test_etag_per_encoding(self):
+        """Test each content coding has its own strong ETag."""
+        store = StaticAssetStore()
+        asset = store.add('style.css', CSS, 'text/css')
+
+        compressed = store.response(get('/style.css', {'Accept-Encoding': 'gzip'}), 'style.css')
+        plain = store.response(get('/style.css'), 'style.css')
+
+        assert compressed.headers['ETag'] == f'"{asset.version}-gzip"'
+        assert plain.headers['ETag'] == asset.etag
+        # A validator only revalidates the representation it was issued for
+        revalidated = store.response(
+            get('/style.css', {'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']}), 'style.css'
+        )
+        switched = store.response(get('/style.css', {'If-None-Match': compressed.headers['ETag']}), 'style.css')
+        assert revalidated.status == 304
+        assert revalidated.headers['ETag'] == compressed.headers['ETag']
+        assert switched.status == 200
+        assert switched.body == CSS.encode()
+
+    def test_cache_control_depends_on_version(self):
+        """Test versioned URLs are immutable and others revalidated."""
+        store = StaticAssetStore()
+        store.add('style.css', CSS, 'text/css')
+
+        versioned = store.response(get('/' + store.versioned_url('style.css')), 'style.css')
+        unversioned = store.response(get('/style.css'), 'style.css')
+
+        assert 'immutable' in versioned.headers['Cache-Control']
+        assert unversioned.headers['Cache-Control'] == 'no-cache'
+
+    def test_header_parsing(self):
+        """Test Accept-Encoding and If-None-Match parsing."""
+        assert parse_accept_encoding('br;q=0.5, gzip, *;q=0') == {'br': 0.5, 'gzip': 1.0, '*': 0.0}
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('*', '"b"')
+        assert not etag_matches(None, '"b"')
+
+
+class TestWebInterfaceAssets:
+    """Test static serving through WebInterface."""
+
+    @pytest.mark.asyncio
+    async def test_index_references_versioned_assets(self):
+        """Test the page links assets by content hash and they are served."""
+        web_interface = WebInterface(Mock(), Mock())
+        web_interface._setup_static_files()
+        store = web_interface.static_assets
+
+        index = await web_interface.serve_index(get('/', {'Accept-Encoding': 'gzip'}))
+        html = gzip.decompress(index.body).decode()
+
+        assert store.versioned_url('style.css') in html
+        assert store.versioned_url('script.js') in html
+
+        request = make_mocked_request('GET', '/' + store.versioned_url('script.js'),
+                                      match_info={'path': 'script.js'})
+        script = await web_interface.serve_static(request)
+        assert script.status == 200
+        assert script.content_type == 'application/javascript'
+
+        missing = await web_interface.serve_static(
+            make_mocked_request('GET', '/nope.js', match_info={'path': 'nope.js'})
+        )
+        assert missing.status == 404
@@ -0,0 +1,169 @@
+"""
+Unit tests for the telemetry event store.
+
+Tests buffered writes and their retry after errors, summary sidecars,
+rotation of past days and the session sketch used for distinct session counts.
+"""
+
+import gzip
+import json
+import time
+
+import pytest
+import yaml
+
+from src.codegenie.core.telemetry import (
+    SessionSketch, TelemetryEvent, TelemetryManager, UsageAnalytics
+)
+
+
+def make_manager(tmp_path, **kwargs):
+    config_dir = tmp_path / "home" / "user" / "config"
+    config_dir.mkdir(parents=True)
+    (config_dir / "config.yaml").write_text(yaml.safe_dump({"telemetry": {"enabled": True}}))
+    return TelemetryManager(config_dir, **kwargs)
+
+
+def write_events(path, events):
+    with open(path, "w") as f:
+        for event_type, session_id, timestamp in events:
+            f.write(json.dumps({
+                "event_type": event_type, "timestamp": timestamp, "session_id": session_id,
+                "user_id": "u", "data": {}, "version": "1"
+            }) + "\n")
+
+
+class TestTelemetryManager:
+    """Test suite for TelemetryManager."""
+
+    def test_events_are_buffered_and_summarized(self, tmp_path):
+        """Test events reach disk in batches with an up-to-date sidecar."""
+        manager = make_manager(tmp_path, buffer_size=3, flush_interval=60)
+        manager.track_event("feature_usage", {"feature_name": "chat"})
+        manager.track_event("error", {"error_type": "x"})
+        assert not list(manager.telemetry_dir.glob("events_*.jsonl"))
+
+        manager.track_event("feature_usage", {"feature_name": "plan"})
+        events_file = next(manager.telemetry_dir.glob("events_*.jsonl"))
+        assert len(events_file.read_text().splitlines()) == 3
+
+        day = events_file.stem[len("events_"):]
+        summary = json.loads(manager._summary_file(day).read_text())
+        assert summary["events_by_type"] == {"feature_usage": 2, "error": 1}
+        assert summary["size"] == events_file.stat().st_size
+        manager.close()
+
+    def test_past_days_are_rotated(self, tmp_path):
+        """Test legacy files of past days are compressed with a sidecar."""
+        telemetry_dir = tmp_path / "home" / ".codegenie" / "telemetry"
+        telemetry_dir.mkdir(parents=True)
+        write_events(telemetry_dir / "events_20240101.jsonl", [
+            ("task_execution", "s1", "2024-01-01T10:00:00"),
+            ("task_execution", "s2", "2024-01-01T11:00:00"),
+        ])
+
+        manager = make_manager(tmp_path)
+        compressed = telemetry_dir / "events_20240101.jsonl.gz"
+        assert compressed.exists()
+        assert not (telemetry_dir / "events_20240101.jsonl").exists()
+
+        # A late event for the rotated day is appended to the compressed file
+        manager._save_event(TelemetryEvent("error", "2024-01-01T23:59:59", "s3", "u", {}, "1"))
+        manager.flush()
+        with gzip.open(compressed, "rt") as f:
+            assert len(f.read().splitlines()) == 3
+
+        stats = manager.get_usage_stats()
+        assert stats["total_events"] == 3
+        assert stats["sessions"] == 3
+        assert stats["date_range"] == {"start": "2024-01-01T10:00:00", "end": "2024-01-01T23:59:59"}
+        manager.close()
+
+    def test_stats_come_from_summaries(self, tmp_path, monkeypatch):
+        """Test usage stats do not re-read summarized event files."""
+        manager = make_manager(tmp_path, flush_interval=60)
+        analytics = UsageAnalytics(manager)
+        for _ in range(5):
+            analytics.track_agent_usage("architect", "design")
+        analytics.track_autonomous_workflow(3, 1.0, True)
+        manager.flush()
+
+        def fail(path):
+            raise AssertionError(f"{path} was re-read")
+
+        monkeypatch.setattr(manager, "_build_summary", fail)
+        insights = analytics.get_insights()
+        assert insights["summary"]["total_events"] == 6
+        assert insights["summary"]["total_sessions"] == 1
+        assert insights["most_used_features"][0] == {"event": "agent_usage", "count": 5}
+        assert insights["recommendations"] == []
+        manager.close()
+
+    def test_failed_writes_are_retried(self, tmp_path, monkeypatch):
+        """Test events survive a failed write and errors do not reach callers."""
+        manager = make_manager(tmp_path, buffer_size=2, flush_interval=60)
+        append_events = manager._append_events
+
+        def fail(day, events):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(manager, "_append_events", fail)
+        manager.track_event("feature_usage", {"feature_name": "chat"})
+        manager.track_event("feature_usage", {"feature_name": "plan"})
+        assert len(manager._buffer) == 2
+
+        monkeypatch.setattr(manager, "_append_events", append_events)
+        manager.flush()
+        events_file = next(manager.telemetry_dir.glob("events_*.jsonl"))
+        assert len(events_file.read_text().splitlines()) == 2
+        assert manager._buffer == []
+        manager.close()
+
+    def test_flush_thread_survives_errors(self, tmp_path, monkeypatch):
+        """Test the periodic flush keeps running after an error and is reset on exit."""
+        manager = make_manager(tmp_path, flush_interval=0.01)
+        calls = []
+
+        def flaky_flush():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(manager, "flush", flaky_flush)
+        manager.track_event("feature_usage", {"feature_name": "chat"})
+        thread = manager._flush_thread
+        time.sleep(0.1)
+        assert len(calls) > 1
+        assert thread.is_alive()
+
+        monkeypatch.undo()
+        manager.close()
+        thread.join(1)
+        assert manager._flush_thread is None
+
+
+class TestSessionSketch:
+    """Test suite for SessionSketch."""
+
+    def test_exact_then_estimated(self):
+        """Test small counts are exact and large counts are close."""
+        sketch = SessionSketch(exact_limit=100)
+        for index in range(50):
+            sketch.add(f"session-{index}")
+            sketch.add(f"session-{index}")
+        assert sketch.count() == 50
+
+        for index in range(50, 20000):
+            sketch.add(f"session-{index}")
+        assert sketch.exact is None
+        assert sketch.count() == pytest.approx(20000, rel=0.1)
+
+    def test_merge_round_trip(self):
+        """Test merged and deserialized sketches count the union."""
+        first, second = SessionSketch(), SessionSketch()
+        for index in range(30):
+            first.add(f"s{index}")
+        for index in range(20, 40):
+            second.add(f"s{index}")
+
+        first.merge(SessionSketch.from_dict(second.to_dict()))
+        assert first.count() == 40
@@ -0,0 +1,179 @@
+"""
+Unit tests for the compiled template engine.
+
+Tests segment compilation, single-pass rendering, the compiled template
+cache and multi-file rendering through TemplateManager, ProjectScaffolder
+and FileCreator.
+"""
+
+import re
+from string import Template as StringTemplate
+
+import pytest
+
+from src.codegenie.core.file_creator import FileCreator
+from src.codegenie.core.project_scaffolder import ProjectScaffolder, ProjectType
+from src.codegenie.core.template_engine import (
+    LITERAL, VARIABLE, TemplateEngine, TemplateSyntax, compile_template
+)
+from src.codegenie.core.template_manager import (
+    Template, TemplateFile, TemplateManager, TemplateMetadata
+)
+
+
+def legacy_substitute(content, variables):
+    """The previous two-stage substitution, used as a reference."""
+    content = StringTemplate(content).safe_substitute(variables)
+    for name, value in variables.items():
+        content = re.sub(r'\{\{\s*' + re.escape(name) + r'\s*\}\}', str(value), content)
+    return content
+
+
+class TestCompileTemplate:
+    """Test suite for template compilation."""
+
+    def test_segments(self):
+        """Test that templates are split into literal and variable segments."""
+        compiled = compile_template("Hello ${name}, {{ greeting }}!")
+
+        assert [(kind, value) for kind, value, _ in compiled.segments] == [
+            (LITERAL, "Hello "),
+            (VARIABLE, "name"),
+            (LITERAL, ", "),
+            (VARIABLE, "greeting"),
+            (LITERAL, "!"),
+        ]
+        assert compiled.variables == {"name", "greeting"}
+
+    @pytest.mark.parametrize("content", [
+        "name: ${project_name}\nversion: $version\n",
+        "{{project_name}} and {{ project_name }} and {{  version}}",
+        "Price: $$5 for ${project_name}",
+        "Unknown ${missing} and {{ missing }} and $missing stay",
+        "Invalid $1 and ${ bad } placeholders",
+        "No placeholders at all",
+    ])
+    def test_matches_legacy_substitution(self, content):
+        """Test that rendering matches the previous implementation."""
+        variables = {"project_name": "demo", "version": "1.0.0"}
+
+        assert compile_template(content).render(variables) == legacy_substitute(content, variables)
+
+    def test_values_are_not_rescanned(self):
+        """Test that substituted values are emitted literally."""
+        compiled = compile_template("${a}")
+
+        assert compiled.render({"a": "{{b}}", "b": "x"}) == "{{b}}"
+
+    def test_format_syntax(self):
+        """Test {var} placeholders used by FileCreator templates."""
+        compiled = compile_template("class {class_name}:\n    x = {{}}\n", TemplateSyntax.FORMAT)
+
+        assert compiled.render({"class_name": "Foo"}) == "class Foo:\n    x = {{}}\n"
+
+
+class TestTemplateEngine:
+    """Test suite for TemplateEngine."""
+
+    def test_compiled_templates_are_cached(self):
+        """Test that identical content is compiled once."""
+        engine = TemplateEngine()
+
+        first = engine.compile("Hello ${name}")
+        second = engine.compile("Hello ${name}")
+
+        assert first is second
+        assert engine.get_cache_stats()["hits"] == 1
+        assert engine.get_cache_stats()["misses"] == 1
+
+    def test_cache_is_bounded(self):
+        """Test least recently used eviction."""
+        engine = TemplateEngine(cache_size=2)
+        for i in range(5):
+            engine.compile(f"template {i} ${{name}}")
+
+        assert engine.get_cache_stats()["size"] == 2
+
+    def test_render_many(self):
+        """Test rendering many files from one call."""
+        engine = TemplateEngine()
+        contents = {f"file_{i}.py": f"# ${{project_name}} file {i}\n" for i in range(20)}
+
+        rendered = engine.render_many(contents, {"project_name": "demo"})
+
+        assert list(rendered) == list(contents)
+        assert rendered["file_7.py"] == "# demo file 7\n"
+
+
+class TestTemplateRendering:
+    """Test suite for multi-file template rendering."""
+
+    @pytest.fixture
+    def template(self):
+        """Create a small multi-file template."""
+        return Template(
+            metadata=TemplateMetadata(name="python-cli", version="1.0.0", description="CLI"),
+            directories=["${project_name}", "tests"],
+            files=[
+                TemplateFile(path="README.md", content="# {{ project_name }}\n"),
+                TemplateFile(path="${project_name}/__init__.py", content='__version__ = "${version}"\n'),
+                TemplateFile(path="run.sh", content="echo ${HOME}\n", is_template=False),
+            ],
+            variables={"project_name": "app", "version": "0.1.0"},
+        )
+
+    def test_substitute_variables(self, tmp_path):
+        """Test TemplateManager.substitute_variables."""
+        manager = TemplateManager(templates_dir=tmp_path)
+
+        result = manager.substitute_variables("${a} {{ b }}", {"a": 1, "b": 2})
+
+        assert result == "1 2"
+
+    def test_render_template(self, tmp_path, template):
+        """Test rendering every file of a template."""
+        manager = TemplateManager(templates_dir=tmp_path)
+
+        files = manager.render_template(template, {"project_name": "tool"})
+
+        assert files == {
+            "README.md": "# tool\n",
+            "tool/__init__.py": '__version__ = "0.1.0"\n',
+            "run.sh": "echo ${HOME}\n",
+        }
+
+    def test_scaffolder_creates_project_from_template(self, tmp_path, template):
+        """Test ProjectScaffolder.create_project_from_template."""
+        scaffolder = ProjectScaffolder(base_path=tmp_path)
+
+        project = scaffolder.create_project_from_template(template, "mycli")
+
+        assert project.project_type == ProjectType.PYTHON_CLI
+        assert (tmp_path / "mycli" / "tests").is_dir()
+        assert (tmp_path / "mycli" / "README.md").read_text() == "# mycli\n"
+        assert (tmp_path / "mycli" / "mycli" / "__init__.py").read_text() == '__version__ = "0.1.0"\n'
+
+    def test_scaffolder_reports_failed_writes(self, tmp_path, template):
+        """Test files that cannot be written fail the scaffold."""
+        scaffolder = ProjectScaffolder(base_path=tmp_path)
+        (tmp_path / "mycli").mkdir()
+        (tmp_path / "mycli" / "README.md").write_text("existing\n")
+
+        with pytest.raises(RuntimeError, match="README.md"):
+            scaffolder.create_project_from_template(template, "mycli")
+        assert (tmp_path / "mycli" / "README.md").read_text() == "existing\n"
+
+    def test_file_creator_creates_files_from_templates(self, tmp_path):
+        """Test FileCreator.create_files_from_templates."""
+        creator = FileCreator(preview_by_default=False)
+        templates = {
+            tmp_path / f"module_{i}.py": '"""{description}"""\n\nNAME = "{name}"\n'
+            for i in range(10)
+        }
+
+        operations = creator.create_files_from_templates(
+            templates, {"description": "Generated", "name": "demo"}
+        )
+
+        assert len(operations) == 10
+        assert (tmp_path / "module_3.py").read_text() == '"""Generated"""\n\nNAME = "demo"\n'
@@ -0,0 +1,146 @@
+"""
+Unit tests for TemplateManager loading and caching.
+
+Tests the mtime-validated template cache, lazy loading of file bodies and
+the template catalog index used by list_templates.
+"""
+
+import json
+import os
+
+import pytest
+
+from src.codegenie.core.template_manager import (
+    LazyTemplateFile, Template, TemplateFile, TemplateManager, TemplateMetadata, TemplateType
+)
+
+
+def make_template(name="demo", version="1.0.0"):
+    """Create a simple template."""
+    return Template(
+        metadata=TemplateMetadata(name=name, version=version, description="Demo"),
+        directories=["src"],
+        files=[
+            TemplateFile(path="README.md", content="# ${project_name}\n"),
+            TemplateFile(path="src/main.py", content="print('hi')\n"),
+        ],
+        variables={"project_name": "demo"},
+    )
+
+
+def bump_mtime(path):
+    """Move a file's mtime forward so changes are detected on coarse clocks."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create a template manager with one saved template."""
+    manager = TemplateManager(templates_dir=tmp_path)
+    assert manager.save_template(make_template(), TemplateType.CUSTOM)
+    manager.clear_cache()
+    return manager
+
+
+class TestTemplateLoading:
+    """Test suite for template loading and caching."""
+
+    def test_file_bodies_load_lazily(self, manager):
+        """Test that file bodies are read on first access."""
+        template = manager.load_template("demo")
+
+        assert all(isinstance(f, LazyTemplateFile) for f in template.files)
+        assert not any(f.is_loaded for f in template.files)
+        assert template.files[0].content == "# ${project_name}\n"
+        assert template.files[0].is_loaded
+        assert not template.files[1].is_loaded
+
+    def test_cache_hit(self, manager):
+        """Test that unchanged templates are served from the cache."""
+        first = manager.load_template("demo")
+        second = manager.load_template("demo")
+
+        assert first is second
+
+    def test_cache_invalidated_by_template_json(self, manager):
+        """Test that editing template.json reloads the template."""
+        first = manager.load_template("demo")
+        template_json = manager.custom_dir / "demo" / "template.json"
+        data = json.loads(template_json.read_text())
+        data["metadata"]["version"] = "2.0.0"
+        template_json.write_text(json.dumps(data))
+        bump_mtime(template_json)
+
+        second = manager.load_template("demo")
+
+        assert second is not first
+        assert second.metadata.version == "2.0.0"
+
+    def test_loaded_body_refreshed_on_change(self, manager):
+        """Test that a changed body file is re-read."""
+        template = manager.load_template("demo")
+        assert template.files[1].content == "print('hi')\n"
+
+        body = manager.custom_dir / "demo" / "files" / "src" / "main.py"
+        body.write_text("print('bye')\n")
+        bump_mtime(body)
+
+        assert manager.load_template("demo").files[1].content == "print('bye')\n"
+
+    def test_cache_is_bounded(self, tmp_path):
+        """Test least recently used eviction."""
+        manager = TemplateManager(templates_dir=tmp_path, cache_size=2)
+        for i in range(4):
+            manager.save_template(make_template(f"t{i}"), TemplateType.CUSTOM)
+
+        assert len(manager._template_cache) == 2
+
+    def test_resave_loaded_template(self, manager):
+        """Test saving a lazily loaded template back over its own files."""
+        template = manager.load_template("demo", TemplateType.CUSTOM)
+        template.metadata.version = "1.1.0"
+
+        assert manager.save_template(template, TemplateType.CUSTOM)
+        manager.clear_cache()
+
+        reloaded = manager.load_template("demo")
+        assert reloaded.metadata.version == "1.1.0"
+        assert [f.content for f in reloaded.files] == ["# ${project_name}\n", "print('hi')\n"]
+
+
+class TestTemplateCatalog:
+    """Test suite for the template catalog index."""
+
+    def test_list_templates_uses_catalog(self, manager, monkeypatch):
+        """Test that unchanged template.json files are not parsed again."""
+        assert [m.name for m in manager.list_templates()] == ["demo"]
+        assert manager.catalog_path.exists()
+
+        # A fresh manager reads the persisted catalog instead of template.json
+        fresh = TemplateManager(templates_dir=manager.templates_dir)
+        parsed = []
+        real_load = json.load
+        monkeypatch.setattr(json, "load", lambda f: parsed.append(f.name) or real_load(f))
+        templates = fresh.list_templates()
+
+        assert parsed == [str(manager.catalog_path)]
+        assert [(m.name, m.template_type) for m in templates] == [("demo", TemplateType.CUSTOM)]
+
+    def test_catalog_tracks_changes(self, manager):
+        """Test that added, edited and deleted templates are reflected."""
+        manager.list_templates()
+        manager.save_template(make_template("other"), TemplateType.IMPORTED)
+
+        template_json = manager.custom_dir / "demo" / "template.json"
+        data = json.loads(template_json.read_text())
+        data["metadata"]["description"] = "Edited"
+        template_json.write_text(json.dumps(data))
+        bump_mtime(template_json)
+
+        templates = {m.name: m for m in manager.list_templates()}
+        assert templates["demo"].description == "Edited"
+        assert templates["other"].template_type == TemplateType.IMPORTED
+
+        manager.delete_template("other", TemplateType.IMPORTED)
+        assert [m.name for m in manager.list_templates()] == ["demo"]
@@ -0,0 +1,285 @@
+"""
+Unit tests for usage metrics aggregation.
+
+Tests latency histogram accuracy and merging, the bounded aggregator used
+to buffer API usage counters between flushes, and the usage analytics
+that record, flush and query them.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.codegenie.integrations.api_system import APIRequest, UsageAnalytics
+from src.codegenie.integrations.usage_metrics import (
+    LatencyHistogram, UsageAggregator, bucket_index, bucket_range, merge_histograms
+)
+from tests.memory_redis import InMemoryRedis
+
+
+def exact_percentile(values, percentile):
+    ordered = sorted(values)
+    rank = max(1, -(-percentile * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+class TestLatencyHistogram:
+    """Test suite for LatencyHistogram."""
+
+    def test_buckets_cover_values(self):
+        """Test that every value falls inside its bucket's range."""
+        for value in list(range(0, 2048)) + [10 ** 6, 2 ** 31 + 12345]:
+            low, high = bucket_range(bucket_index(value))
+            assert low <= value <= high
+
+    def test_percentiles_within_one_percent(self):
+        """Test percentiles against exact values for a skewed distribution."""
+        rng = random.Random(7)
+        samples = [rng.lognormvariate(-3, 1) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+
+        for percentile in (50, 95, 99):
+            expected = exact_percentile(samples, percentile)
+            assert histogram.percentile(percentile) == pytest.approx(expected, rel=0.01)
+        assert histogram.mean == pytest.approx(sum(samples) / len(samples), rel=1e-4)
+
+    def test_merge_matches_single_histogram(self):
+        """Test that merged histograms equal one histogram of all samples."""
+        combined = LatencyHistogram()
+        parts = [LatencyHistogram() for _ in range(3)]
+        for index in range(3000):
+            value = (index * 37 % 1000) / 1000
+            combined.record(value)
+            parts[index % 3].record(value)
+
+        merged = merge_histograms(parts)
+
+        assert merged.counts == combined.counts
+        assert merged.summary() == combined.summary()
+
+    def test_fields_round_trip(self):
+        """Test encoding to summable hash fields and back."""
+        histogram = LatencyHistogram()
+        for value in (0.001, 0.002, 0.25, 1.5):
+            histogram.record(value)
+
+        fields = {key.encode(): str(value).encode() for key, value in histogram.to_fields().items()}
+        decoded = LatencyHistogram.from_fields(fields)
+
+        assert decoded.counts == histogram.counts
+        assert decoded.count == 4
+        assert decoded.percentile(50) == histogram.percentile(50)
+        assert decoded.max_us >= histogram.max_us
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram reports zeros."""
+        assert LatencyHistogram().summary()["p99"] == 0.0
+
+
+class TestUsageAggregator:
+    """Test suite for UsageAggregator."""
+
+    def test_increment_and_drain(self):
+        """Test counters accumulate and drain empties the buffer."""
+        aggregator = UsageAggregator()
+        aggregator.increment("stats", "total")
+        aggregator.increment("stats", "total", 2)
+        aggregator.observe("times", 0.5)
+
+        counters, histograms = aggregator.drain()
+
+        assert counters == {"stats": {"total": 3}}
+        assert histograms["times"].count == 1
+        assert aggregator.is_empty
+
+    def test_bound_drops_new_counters(self):
+        """Test that new counters beyond the bound are dropped."""
+        aggregator = UsageAggregator(max_entries=2)
+        aggregator.increment("stats", "a")
+        aggregator.increment("stats", "b")
+
+        assert not aggregator.increment("stats", "c")
+        assert aggregator.increment("stats", "a")
+        assert aggregator.dropped == 1
+
+    def test_restore_after_failed_flush(self):
+        """Test undelivered deltas are merged with newer ones."""
+        aggregator = UsageAggregator()
+        aggregator.increment("stats", "total", 5)
+        aggregator.observe("times", 0.1)
+        counters, histograms = aggregator.drain()
+
+        aggregator.increment("stats", "total")
+        aggregator.restore(counters, histograms)
+
+        assert aggregator.counters == {"stats": {"total": 6}}
+        assert aggregator.histograms["times"].count == 1
+
+
+class TestUsageAnalyticsFlush:
+    """Test suite for flushing UsageAnalytics."""
+
+    def _request(self, request_id):
+        return APIRequest(
+            request_id=request_id,
+            api_key_id="key123",
+            endpoint="/api/v1/code/analyze",
+            method="POST",
+            timestamp=datetime.now(),
+            response_time=0.5,
+            status_code=200,
+            user_agent="TestClient/1.0",
+            ip_address="127.0.0.1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_raw_requests(self):
+        """Test raw requests survive a failed flush and are written by the next one."""
+        redis_client = InMemoryRedis()
+        analytics = UsageAnalytics(redis_client, max_pending=3, store_raw_requests=True)
+        analytics.record(self._request("req1"))
+        analytics.record(self._request("req2"))
+
+        async def failing_execute(*args, **kwargs):
+            raise ConnectionError("down")
+
+        original = redis_client.pipeline
+
+        def failing_pipeline():
+            pipe = original()
+            pipe.execute = failing_execute
+            return pipe
+
+        redis_client.pipeline = failing_pipeline
+        assert not await analytics.flush()
+
+        # Recorded while the flush failed; the oldest request no longer fits
+        analytics.record(self._request("req3"))
+        analytics.record(self._request("req4"))
+        assert [request.request_id for request in analytics._raw_requests] == ["req2", "req3", "req4"]
+
+        redis_client.pipeline = original
+        assert await analytics.flush()
+        assert await redis_client.get("api_request:req2") is not None
+        assert await redis_client.get("api_request:req4") is not None
+        await analytics.stop()
+
+
+class TestUsageAnalytics:
+    """Test usage analytics functionality."""
+
+    def _request(self, request_id="req123", response_time=0.5, status_code=200,
+                 endpoint="/api/v1/code/analyze", timestamp=None):
+        return APIRequest(
+            request_id=request_id,
+            api_key_id="key123",
+            endpoint=endpoint,
+            method="POST",
+            timestamp=timestamp or datetime.now(),
+            response_time=response_time,
+            status_code=status_code,
+            user_agent="TestClient/1.0",
+            ip_address="127.0.0.1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_api_request(self):
+        """Test recording API request is buffered and flushed in one round trip."""
+        redis_client = InMemoryRedis()
+        usage_analytics = UsageAnalytics(redis_client)
+
+        for index in range(20):
+            await usage_analytics.record_api_request(self._request(f"req{index}"))
+
+        # Nothing is written on the request path
+        assert redis_client.round_trips == 0
+
+        assert await usage_analytics.flush()
+        assert redis_client.round_trips == 1
+
+        date_key = datetime.now().strftime("%Y-%m-%d")
+        daily = await redis_client.hgetall(f"api_stats:daily:{date_key}")
+        assert daily[b"total_requests"] == b"20"
+        assert daily[b"status_200"] == b"20"
+        await usage_analytics.stop()
+
+    @pytest.mark.asyncio
+    async def test_raw_requests_are_opt_in(self):
+        """Test individual requests are only stored when enabled."""
+        redis_client = InMemoryRedis()
+        usage_analytics = UsageAnalytics(redis_client, store_raw_requests=True)
+
+        usage_analytics.record(self._request("req1"))
+        await usage_analytics.flush()
+
+        assert await redis_client.get("api_request:req1") is not None
+        await usage_analytics.stop()
+
+    @pytest.mark.asyncio
+    async def test_get_usage_stats(self):
+        """Test getting usage statistics."""
+        redis_client = InMemoryRedis()
+        usage_analytics = UsageAnalytics(redis_client)
+        start_date = datetime.now() - timedelta(days=7)
+        end_date = datetime.now()
+
+        for index in range(100):
+            usage_analytics.record(self._request(
+                f"req{index}",
+                response_time=(index + 1) / 1000,
+                status_code=200 if index < 90 else 400
+            ))
+
+        stats = await usage_analytics.get_usage_stats(start_date, end_date)
+
+        assert stats["total_requests"] == 100
+        assert stats["status_codes"] == {"200": 90, "400": 10}
+        assert stats["endpoints"] == {"/api/v1/code/analyze": 100}
+        assert sum(stats["daily_breakdown"].values()) == 100
+        assert stats["average_response_time"] == pytest.approx(0.0505)
+
+        percentiles = stats["response_time_percentiles"]
+        assert percentiles["p50"] == pytest.approx(0.050, rel=0.01)
+        assert percentiles["p95"] == pytest.approx(0.095, rel=0.01)
+        assert percentiles["p99"] == pytest.approx(0.099, rel=0.01)
+        await usage_analytics.stop()
+
+    @pytest.mark.asyncio
+    async def test_usage_stats_merge_across_nodes(self):
+        """Test histograms from several nodes merge in Redis."""
+        redis_client = InMemoryRedis()
+        node_a = UsageAnalytics(redis_client)
+        node_b = UsageAnalytics(redis_client)
+
+        for index in range(50):
+            node_a.record(self._request(f"a{index}", response_time=0.01))
+            node_b.record(self._request(f"b{index}", response_time=0.2))
+        await node_a.flush()
+        await node_b.flush()
+
+        stats = await node_a.get_usage_stats(datetime.now(), datetime.now())
+
+        assert stats["total_requests"] == 100
+        assert stats["response_time_percentiles"]["p50"] == pytest.approx(0.01, rel=0.01)
+        assert stats["response_time_percentiles"]["p99"] == pytest.approx(0.2, rel=0.01)
+        await node_a.stop()
+        await node_b.stop()
+
+    @pytest.mark.asyncio
+    async def test_get_api_key_usage(self):
+        """Test getting API key usage statistics."""
+        redis_client = InMemoryRedis()
+        usage_analytics = UsageAnalytics(redis_client)
+
+        for index in range(50):
+            usage_analytics.record(self._request(f"req{index}", status_code=200 if index < 45 else 400))
+
+        stats = await usage_analytics.get_api_key_usage("key123")
+
+        assert stats["total_requests"] == 50
+        assert "status_codes" in stats
+        assert stats["status_codes"]["200"] == 45
+        await usage_analytics.stop()
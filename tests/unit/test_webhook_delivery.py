@@ -0,0 +1,383 @@
+"""
+Unit tests for webhook delivery primitives.
+
+Tests circuit breaker transitions, jittered backoff bounds, the persisted
+delivery log, and webhook delivery against a local HTTP stub, including a
+throughput benchmark.
+"""
+
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from src.codegenie.integrations.api_system import WebhookEndpoint, WebhookEvent, WebhookManager
+from src.codegenie.integrations.webhook_delivery import (
+    CircuitBreaker, CircuitState, DeliveryLog, jittered_backoff
+)
+from tests.memory_redis import InMemoryRedis
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class WebhookStub:
+    """Local HTTP server standing in for webhook receivers."""
+
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self._server = None
+
+    async def _handle(self, request):
+        name = request.match_info["name"]
+        self.in_flight[name] = self.in_flight.get(name, 0) + 1
+        self.max_in_flight[name] = max(self.max_in_flight.get(name, 0), self.in_flight[name])
+        try:
+            body = await request.text()
+            self.requests.append((name, dict(request.headers), json.loads(body)))
+            if self.delay:
+                await asyncio.sleep(self.delay if name.startswith("slow") else 0)
+            return web.Response(status=self.status)
+        finally:
+            self.in_flight[name] -= 1
+
+    def url(self, name: str) -> str:
+        return str(self._server.make_url(f"/hook/{name}"))
+
+    def events_for(self, name: str) -> list:
+        events = []
+        for request_name, _, body in self.requests:
+            if request_name == name:
+                events.extend(body if isinstance(body, list) else [body])
+        return events
+
+    async def __aenter__(self):
+        from aiohttp.test_utils import TestServer
+        app = web.Application()
+        app.router.add_post("/hook/{name}", self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._server.close()
+
+
+def make_webhook(webhook_id: str, url: str, **overrides) -> WebhookEndpoint:
+    """Create a webhook endpoint for the test event."""
+    fields = dict(
+        id=webhook_id, url=url, events=["test_event"], secret=None, headers={},
+        retry_count=1, timeout=5, is_active=True, created_at=datetime.now(), last_triggered=None
+    )
+    fields.update(overrides)
+    return WebhookEndpoint(**fields)
+
+
+def make_event(event_id: str = "event123", event_type: str = "test_event") -> WebhookEvent:
+    """Create a webhook event."""
+    return WebhookEvent(
+        event_id=event_id, event_type=event_type, timestamp=datetime.now(),
+        data={"test": "data"}, source="test", webhook_endpoints=[]
+    )
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit."""
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failures(self):
+        """Test a success clears the failure streak."""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_trial(self):
+        """Test one trial is allowed after the reset timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now += 10
+        assert breaker.allow()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.times_opened == 2
+
+        clock.now += 10
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestJitteredBackoff:
+    """Test suite for jittered_backoff."""
+
+    def test_bounds(self):
+        """Test delays stay within the exponential ceiling and the cap."""
+        rng = random.Random(3)
+        for attempt in range(10):
+            ceiling = min(5.0, 0.5 * 2 ** attempt)
+            delays = [jittered_backoff(attempt, 0.5, 5.0, rng) for _ in range(50)]
+            assert all(0 <= delay <= ceiling for delay in delays)
+            assert len(set(delays)) > 1
+
+
+class TestDeliveryLog:
+    """Test suite for DeliveryLog."""
+
+    @pytest.mark.asyncio
+    async def test_append_and_pop_in_order(self):
+        """Test records come back oldest first and are removed."""
+        log = DeliveryLog(InMemoryRedis(), "webhook:test", max_length=3)
+        await log.append([{"n": 1}, {"n": 2}])
+        await log.append([{"n": 3}, {"n": 4}])
+
+        assert await log.length() == 3
+        assert await log.pop(2) == [{"n": 2}, {"n": 3}]
+        assert await log.pop(10) == [{"n": 4}]
+        assert await log.pop(10) == []
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_is_counted(self):
+        """Test records are counted as lost when Redis is unavailable."""
+        redis_client = InMemoryRedis()
+
+        def broken_pipeline(*args, **kwargs):
+            raise ConnectionError("down")
+
+        redis_client.pipeline = broken_pipeline
+        log = DeliveryLog(redis_client, "webhook:test")
+
+        assert not await log.append([{"n": 1}])
+        assert log.lost == 1
+        assert await log.pop(1) == []
+
+
+class TestWebhookManager:
+    """Test suite for WebhookManager deliveries."""
+
+    @pytest.mark.asyncio
+    async def test_send_webhook(self):
+        """Test sending webhook HTTP request."""
+        webhook_manager = WebhookManager(InMemoryRedis())
+        event = make_event()
+
+        async with WebhookStub() as stub:
+            sample_webhook = make_webhook("receiver", stub.url("receiver"), secret="webhook_secret")
+
+            assert await webhook_manager._send_webhook(event, sample_webhook)
+            await webhook_manager.stop_workers()
+
+        # Verify HTTP request was made and signed over the body
+        assert len(stub.requests) == 1
+        _, headers, body = stub.requests[0]
+        assert body["event_id"] == "event123"
+        expected = webhook_manager._generate_signature(json.dumps(body), sample_webhook.secret)
+        assert headers["X-CodeGenie-Signature"] == expected
+        assert sample_webhook.last_triggered is not None
+
+    @pytest.mark.asyncio
+    async def test_batches_events_for_batching_endpoints(self):
+        """Test events that accumulate during a delivery are sent as one array."""
+        manager = WebhookManager(InMemoryRedis())
+
+        async with WebhookStub(delay=0.05) as stub:
+            manager.register_webhook(make_webhook(
+                "batched", stub.url("slow-batched"), max_concurrency=1, batch_size=50
+            ))
+            for index in range(30):
+                await manager.trigger_event(make_event(f"event{index}"))
+
+            await manager.start_workers(2)
+            assert await manager.wait_until_idle(timeout=5)
+            await manager.stop_workers()
+
+        events = stub.events_for("slow-batched")
+        assert sorted(event["event_id"] for event in events) == sorted(f"event{i}" for i in range(30))
+        assert len(stub.requests) < 30
+        assert all(headers["X-CodeGenie-Batch-Size"] for _, headers, _ in stub.requests)
+
+    @pytest.mark.asyncio
+    async def test_slow_endpoint_does_not_block_others(self):
+        """Test per-endpoint concurrency limits keep workers free for other endpoints."""
+        manager = WebhookManager(InMemoryRedis())
+
+        async with WebhookStub(delay=0.2) as stub:
+            manager.register_webhook(make_webhook("slow", stub.url("slow"), max_concurrency=1))
+            manager.register_webhook(make_webhook("fast", stub.url("fast")))
+            await manager.start_workers(3)
+
+            for index in range(5):
+                await manager.trigger_event(make_event(f"event{index}"))
+            await asyncio.sleep(0.15)
+
+            # Every fast delivery is done while the slow endpoint is on its first request
+            assert len(stub.events_for("fast")) == 5
+            assert await manager.wait_until_idle(timeout=5)
+            await manager.stop_workers()
+
+        assert stub.max_in_flight["slow"] == 1
+        assert len(stub.events_for("slow")) == 5
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_dead_letters_failures(self):
+        """Test failing endpoints trip the breaker and events are dead-lettered."""
+        redis_client = InMemoryRedis()
+        manager = WebhookManager(redis_client, failure_threshold=2, retry_base_delay=0.001)
+
+        async with WebhookStub(status=503) as stub:
+            webhook = make_webhook("failing", stub.url("failing"), max_concurrency=1)
+            manager.register_webhook(webhook)
+            for index in range(6):
+                await manager.trigger_event(make_event(f"event{index}"))
+
+            await manager.start_workers(1)
+            assert await manager.wait_until_idle(timeout=5)
+            await manager.stop_workers()
+
+        stats = manager.get_stats()
+        # Two deliveries of two attempts each, then the open circuit rejects the rest
+        assert len(stub.requests) == 4
+        assert stats["retries"] == 2
+        assert stats["circuit_rejected"] == 4
+        assert stats["open_circuits"] == ["failing"]
+
+        records = await manager.dead_letters.pop(10)
+        assert [record["event"]["event_id"] for record in records] == [f"event{i}" for i in range(6)]
+        assert records[0]["reason"] == "HTTP 503"
+        assert records[-1]["reason"] == "circuit_open"
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_ends_half_open_trial(self):
+        """Test an error outside the HTTP client does not leave the breaker stuck half-open."""
+        manager = WebhookManager(InMemoryRedis(), failure_threshold=1, reset_timeout=0)
+        webhook = make_webhook("broken", "http://127.0.0.1:9/hook", retry_count=0)
+        state = manager._endpoint_state(webhook)
+        state.breaker.record_failure()
+
+        def broken_session():
+            raise ValueError("bad session")
+
+        manager._get_session = broken_session
+        assert not await manager._deliver([make_event("event0")], webhook, state)
+        assert state.breaker.state == CircuitState.OPEN
+
+        # The next trial is admitted and, once the session works, closes the circuit
+        async with WebhookStub() as stub:
+            del manager._get_session
+            webhook.url = stub.url("broken")
+            assert await manager._deliver([make_event("event1")], webhook, state)
+            await manager.stop_workers()
+
+        assert state.breaker.state == CircuitState.CLOSED
+        records = await manager.dead_letters.pop(10)
+        assert [record["reason"] for record in records] == ["ValueError: bad session"]
+
+    @pytest.mark.asyncio
+    async def test_queue_overflow_is_persisted_and_requeued(self):
+        """Test events beyond the queue bound are persisted and delivered later."""
+        redis_client = InMemoryRedis()
+        manager = WebhookManager(redis_client, max_queue_size=4, scale_interval=0.01)
+
+        async with WebhookStub() as stub:
+            manager.register_webhook(make_webhook("receiver", stub.url("receiver")))
+            for index in range(10):
+                await manager.trigger_event(make_event(f"event{index}"))
+
+            assert manager.event_queue.qsize() == 4
+            assert await redis_client.llen(WebhookManager.OVERFLOW_KEY) == 6
+
+            await manager.start_workers(1)
+            for _ in range(200):
+                if len(stub.requests) == 10:
+                    break
+                await asyncio.sleep(0.01)
+            await manager.stop_workers()
+
+        assert sorted(event["event_id"] for event in stub.events_for("receiver")) == \
+            sorted(f"event{i}" for i in range(10))
+        assert await redis_client.llen(WebhookManager.OVERFLOW_KEY) == 0
+
+    @pytest.mark.asyncio
+    async def test_autoscale_workers(self):
+        """Test workers are added for a backlog and retired when idle."""
+        manager = WebhookManager(InMemoryRedis(), min_workers=1)
+
+        async with WebhookStub() as stub:
+            webhook = make_webhook("receiver", stub.url("receiver"))
+            manager.register_webhook(webhook)
+            for index in range(20):
+                manager.event_queue.put_nowait((make_event(f"event{index}"), webhook))
+
+            manager._add_worker()
+            manager._autoscale()
+            assert len(manager.worker_tasks) == 2
+
+            assert await manager.wait_until_idle(timeout=5)
+            await asyncio.sleep(0.01)
+            manager._autoscale()
+            assert len(manager.worker_tasks) == 1
+            await manager.stop_workers()
+
+        assert len(stub.requests) == 20
+        assert manager.get_stats()["workers_retired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_webhook_delivery_performance(self):
+        """Benchmark webhook delivery throughput against a local HTTP stub."""
+        manager = WebhookManager(InMemoryRedis())
+        num_events = 200
+
+        async with WebhookStub() as stub:
+            for i in range(10):
+                manager.register_webhook(make_webhook(f"webhook{i}", stub.url(f"receiver{i}")))
+            await manager.start_workers(8)
+
+            start_time = time.perf_counter()
+            for index in range(num_events):
+                await manager.trigger_event(make_event(f"event{index}"))
+            assert await manager.wait_until_idle(timeout=30)
+            elapsed = time.perf_counter() - start_time
+
+            stats = manager.get_stats()
+            await manager.stop_workers()
+
+        deliveries = num_events * 10
+        print(f"Webhook delivery: {deliveries / elapsed:,.0f} deliveries/s over "
+              f"{stats['requests']} pooled requests, {stats['workers']} workers")
+
+        assert stats["delivered"] == deliveries
+        assert len(stub.requests) == deliveries
+        assert elapsed < 30